@@ -11,6 +11,18 @@ try:
 except ImportError:
     trading_engine = None
 
+# مخزن الشموع الحلقي (يملؤه محرك التداول والمهام الخلفية)
+try:
+    from services.candle_store import candle_store
+except ImportError:
+    candle_store = None
+
+# قواطع الدوائر لطلبات المنصات
+try:
+    from services.resilience import resilience
+except ImportError:
+    resilience = None
+
 
 app = FastAPI(
     title="Quantum Python Trading Engine",
@@ -98,6 +110,32 @@ def _generate_mock_candles(
     return candles
 
 
+def _candles_from_store(
+    symbol: str,
+    timeframe: str,
+    limit: int,
+) -> List[Dict[str, Any]]:
+    """قراءة الشموع من المخزن الحلقي (عرض بدون نسخ) وتحويلها لصيغة الواجهة."""
+    if candle_store is None:
+        return []
+
+    view = candle_store.view(symbol, timeframe, limit)
+    if len(view) == 0 and "/" not in symbol and symbol.upper().endswith("USDT"):
+        view = candle_store.view(f"{symbol.upper()[:-4]}/USDT", timeframe, limit)
+
+    return [
+        {
+            "time": int(ts // 1000),
+            "open": o,
+            "high": h,
+            "low": l,
+            "close": c,
+            "volume": v,
+        }
+        for ts, o, h, l, c, v in view.tolist()
+    ]
+
+
 def _generate_mock_ai_signals(
     symbol: Optional[str],
     timeframe: Optional[str],
@@ -173,10 +211,14 @@ def _generate_mock_positions(symbol: Optional[str] = None) -> List[Dict[str, Any
 
 @app.get("/health")
 def health_check() -> Dict[str, Any]:
-    """فحص بسيط لحالة الـ API ومحرك التداول."""
+    """فحص بسيط لحالة الـ API ومحرك التداول وقواطع دوائر المنصات."""
+    circuit_breakers = resilience.get_resilience_status()["circuit_breakers"] if resilience else {}
+    open_circuits = [name for name, breaker in circuit_breakers.items() if breaker["state"] != "closed"]
+
     return {
-        "status": "ok",
+        "status": "degraded" if open_circuits else "ok",
         "engine_loaded": trading_engine is not None,
+        "circuit_breakers": circuit_breakers,
     }
 
 
@@ -268,8 +310,13 @@ def get_chart(
             candles = data
         else:
             candles = []
+        source = "python_engine"
     else:
-        candles = _generate_mock_candles(symbol, timeframe, limit)
+        candles = _candles_from_store(symbol, timeframe, limit)
+        source = "candle_store"
+        if not candles:
+            candles = _generate_mock_candles(symbol, timeframe, limit)
+            source = "mock"
 
     return {
         "symbol": symbol,
@@ -277,8 +324,8 @@ def get_chart(
         "candles": candles,
         "volume": [c.get("volume", 0) for c in candles],
         "metadata": {
-            "mock": trading_engine is None,
-            "source": "python_engine" if trading_engine else "mock",
+            "mock": source == "mock",
+            "source": source,
         },
     }
 
@@ -4,9 +4,10 @@ import asyncio
 from dataclasses import dataclass
 from typing import Dict, List, Optional
 import psutil
-import requests
 from datetime import datetime, timedelta
 
+from services.http_client import http_client
+
 @dataclass
 class ServiceHealth:
     name: str
@@ -37,14 +38,16 @@ class AdvancedHealthMonitor:
         """فحص صحة الخدمة مع معالجة الأخطاء المحسنة"""
         start_time = time.time()
         try:
-            response = requests.get(
+            # طلب غير حاجب عبر جلسة HTTP المشتركة
+            response = await http_client.request(
+                'GET',
                 endpoint, 
                 timeout=10,
-                headers={'User-Agent': 'TradingPlatform/1.0'}
+                raise_for_status=False
             )
             response_time = time.time() - start_time
             
-            status = "healthy" if response.status_code == 200 else "unhealthy"
+            status = "healthy" if response['status'] == 200 else "unhealthy"
             
             health = ServiceHealth(
                 name=service_name,
@@ -0,0 +1,268 @@
+# backend/python/services/adaptive_polling.py
+"""
+⏱️ الاستطلاع التكيفي - فترة تحديث لكل رمز حسب التذبذب والقرب من أوامر الوقف/الهدف وحجم التعرض
+ضمن ميزانية طلبات عامة، بدلاً من فترات ثابتة لكل الرموز
+الإصدار: 3.0.0 | المطور: Akraa Trading Team
+"""
+
+import logging
+import math
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Any, Iterable
+
+from services.rate_limiter import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+SECONDS_PER_DAY = 86400.0
+
+
+@dataclass
+class PollState:
+    """حالة استطلاع رمز واحد"""
+    symbol: str
+    price: Optional[float] = None
+    observed_at: float = 0.0
+    variance_rate: Optional[float] = None  # تباين العائد اللوغاريتمي لكل ثانية (EWMA)
+    triggers: List[float] = field(default_factory=list)
+    exposure: float = 0.0
+    interval: float = 0.0
+    next_due: float = 0.0
+    polled_at: float = 0.0
+    streamed_at: float = 0.0
+    data: Any = None
+    polls: int = 0
+
+    @property
+    def volatility(self) -> Optional[float]:
+        """الانحراف المعياري للعائد لكل جذر ثانية"""
+        return math.sqrt(self.variance_rate) if self.variance_rate is not None else None
+
+    def trigger_distance(self) -> Optional[float]:
+        """المسافة النسبية لأقرب سعر تفعيل (وقف خسارة أو هدف ربح)"""
+        if not self.price or not self.triggers:
+            return None
+        return min(abs(trigger - self.price) for trigger in self.triggers) / self.price
+
+
+class AdaptivePoller:
+    """جدولة تحديث الرموز - الفترة = زمن الحركة المادية المتوقعة مقسوماً على هامش أمان
+
+    لحركة براونية بتذبذب σ لكل جذر ثانية، الزمن اللازم لحركة نسبية d بثقة z انحرافات
+    هو (d / zσ)². d هي أقل من عتبة الحركة المادية والمسافة لأقرب سعر تفعيل، وتُقلص
+    بزيادة التعرض. الفترات تُمدد بالتناسب إذا تجاوز مجموع معدلاتها الميزانية.
+    """
+
+    def __init__(self, budget_per_minute: Optional[float] = None):
+        self.polling_config = {
+            'min_interval': float(os.getenv('ADAPTIVE_POLL_MIN_INTERVAL', '1')),
+            'max_interval': float(os.getenv('ADAPTIVE_POLL_MAX_INTERVAL', '60')),
+            'budget_per_minute': budget_per_minute or float(os.getenv('ADAPTIVE_POLL_BUDGET', '600')),
+            'material_move_bps': float(os.getenv('ADAPTIVE_POLL_MOVE_BPS', '25')),
+            'confidence_sigmas': float(os.getenv('ADAPTIVE_POLL_SIGMAS', '3')),
+            'exposure_scale': float(os.getenv('ADAPTIVE_POLL_EXPOSURE_SCALE', '1000')),
+            'volatility_half_life': float(os.getenv('ADAPTIVE_POLL_VOL_HALF_LIFE', '300')),
+            'stream_max_age': float(os.getenv('ADAPTIVE_POLL_STREAM_MAX_AGE', '5')),
+            'default_daily_volatility': 0.03,
+        }
+        self.states: Dict[str, PollState] = {}
+        self.budget = TokenBucket(self.polling_config['budget_per_minute'], 60.0,
+                                  burst_fraction=0.25, name='adaptive_polling')
+        self.scale = 1.0
+        self.stats = {'polls': 0, 'deferred': 0, 'observations': 0}
+
+    def _state(self, symbol: str) -> PollState:
+        state = self.states.get(symbol)
+        if state is None:
+            state = self.states[symbol] = PollState(symbol)
+        return state
+
+    # ==================== المدخلات ====================
+
+    def track(self, symbols: Iterable[str]) -> None:
+        """تحديد الرموز المستطلعة - الرموز الجديدة مستحقة فوراً والمحذوفة تُزال"""
+        symbols = set(symbols)
+        for symbol in symbols:
+            self._state(symbol)
+        for symbol in list(self.states):
+            if symbol not in symbols and not self.states[symbol].exposure:
+                del self.states[symbol]
+        self._reschedule()
+
+    def observe(self, symbol: str, price: float, timestamp: Optional[float] = None,
+                high: Optional[float] = None, low: Optional[float] = None) -> None:
+        """سعر جديد (من الاستطلاع أو التدفق) - تحديث التذبذب بمتوسط أسي حسب الزمن"""
+        if not price or price <= 0:
+            return
+        now = timestamp or time.time()
+        state = self._state(symbol)
+        self.stats['observations'] += 1
+
+        if state.variance_rate is None:
+            # بذرة من مدى 24 ساعة (مقدر باركنسون) أو تذبذب يومي افتراضي
+            if high and low and high > low > 0:
+                daily_variance = math.log(high / low) ** 2 / (4 * math.log(2))
+            else:
+                daily_variance = self.polling_config['default_daily_volatility'] ** 2
+            state.variance_rate = daily_variance / SECONDS_PER_DAY
+        elif state.price and now > state.observed_at:
+            elapsed = now - state.observed_at
+            log_return = math.log(price / state.price)
+            alpha = 1 - math.exp(-elapsed * math.log(2) / self.polling_config['volatility_half_life'])
+            state.variance_rate += alpha * (log_return ** 2 / elapsed - state.variance_rate)
+
+        state.price = price
+        state.observed_at = now
+
+    def on_tick(self, tick) -> None:
+        """مستهلك لحافلة التدفق - الرموز المتدفقة تُحدث تذبذبها ولا تستهلك من الميزانية"""
+        now = time.time()
+        self.observe(tick.symbol, tick.price, now, tick.high_24h, tick.low_24h)
+        state = self.states.get(tick.symbol)
+        if state is None:
+            # تيك بدون سعر لرمز لم يُتابع بعد
+            return
+        state.streamed_at = now
+        state.next_due = max(state.next_due, now + self.polling_config['stream_max_age'])
+
+    def is_streamed(self, state: PollState, now: float) -> bool:
+        return now - state.streamed_at < self.polling_config['stream_max_age']
+
+    def set_position(self, symbol: str, exposure: float, triggers: Iterable[Optional[float]]) -> None:
+        """تعرض المركز المفتوح وأسعار التفعيل (وقف الخسارة/هدف الربح)"""
+        state = self._state(symbol)
+        state.exposure = abs(exposure)
+        state.triggers = [trigger for trigger in triggers if trigger]
+
+    def clear_position(self, symbol: str) -> None:
+        state = self.states.get(symbol)
+        if state is not None:
+            state.exposure = 0.0
+            state.triggers = []
+
+    def sync_positions(self, positions: Iterable[Any]) -> None:
+        """مزامنة التعرض والتفعيلات من قائمة المراكز المفتوحة"""
+        exposures: Dict[str, float] = {}
+        triggers: Dict[str, List[float]] = {}
+        for position in positions:
+            exposures[position.symbol] = exposures.get(position.symbol, 0.0) + abs(position.current_value)
+            triggers.setdefault(position.symbol, []).extend([position.stop_loss, position.take_profit])
+        for symbol, state in self.states.items():
+            if symbol not in exposures and state.exposure:
+                self.clear_position(symbol)
+        for symbol, exposure in exposures.items():
+            self.set_position(symbol, exposure, triggers[symbol])
+        self._reschedule()
+
+    # ==================== الجدولة ====================
+
+    def _raw_interval(self, state: PollState) -> float:
+        config = self.polling_config
+        volatility = state.volatility
+        if not volatility:
+            return config['min_interval']
+        distance = config['material_move_bps'] / 10000
+        trigger_distance = state.trigger_distance()
+        if trigger_distance is not None:
+            distance = min(distance, trigger_distance)
+        distance /= 1 + state.exposure / config['exposure_scale']
+        interval = (distance / (config['confidence_sigmas'] * volatility)) ** 2
+        return min(max(interval, config['min_interval']), config['max_interval'])
+
+    def _reschedule(self) -> None:
+        """إعادة حساب الفترات وتمديدها بالتناسب عند تجاوز الميزانية"""
+        if not self.states:
+            return
+        now = time.time()
+        raw = {symbol: self._raw_interval(state) for symbol, state in self.states.items()}
+        demand = sum(60.0 / raw[symbol] for symbol, state in self.states.items() if not self.is_streamed(state, now))
+        self.scale = max(1.0, demand / self.polling_config['budget_per_minute'])
+        for symbol, state in self.states.items():
+            state.interval = raw[symbol] * self.scale
+            if state.polled_at:
+                state.next_due = state.polled_at + state.interval
+
+    def due(self, symbols: Optional[Iterable[str]] = None, exclude: Iterable[str] = (),
+            now: Optional[float] = None) -> List[str]:
+        """الرموز المستحقة الآن (من symbols إن حُددت)، الأكثر تأخراً أولاً، بحدود توكنات الميزانية"""
+        now = now or time.time()
+        excluded = set(exclude)
+        candidates = self.states.values() if symbols is None else \
+            [self._state(symbol) for symbol in symbols]
+        overdue = sorted(
+            (state for state in candidates if state.next_due <= now and state.symbol not in excluded),
+            key=lambda state: (state.next_due - now) / max(state.interval, 1e-9)
+        )
+        granted = []
+        for state in overdue:
+            if self.budget.reserve(1.0, max_wait=0.0) is None:
+                self.stats['deferred'] += len(overdue) - len(granted)
+                break
+            granted.append(state.symbol)
+        return granted
+
+    def record(self, symbol: str, price: Optional[float] = None, data: Any = None,
+               now: Optional[float] = None, high: Optional[float] = None, low: Optional[float] = None) -> None:
+        """تسجيل استطلاع تم وجدولة التالي"""
+        now = now or time.time()
+        if price:
+            self.observe(symbol, price, now, high, low)
+        state = self._state(symbol)
+        state.interval = self._raw_interval(state) * self.scale
+        state.polled_at = now
+        state.next_due = now + state.interval
+        state.polls += 1
+        if data is not None:
+            state.data = data
+        self.stats['polls'] += 1
+
+    def get_cached(self, symbol: str, now: Optional[float] = None) -> Any:
+        """آخر بيانات مستطلعة إذا لم يحن موعد تحديثها"""
+        state = self.states.get(symbol)
+        if state is None or state.data is None or state.next_due <= (now or time.time()):
+            return None
+        return state.data
+
+    def next_wakeup(self, symbols: Optional[Iterable[str]] = None, now: Optional[float] = None) -> float:
+        """الثواني حتى أقرب استحقاق (من symbols إن حُددت)"""
+        now = now or time.time()
+        states = self.states.values() if symbols is None else \
+            [self.states[symbol] for symbol in symbols if symbol in self.states]
+        if not states:
+            return self.polling_config['max_interval']
+        return max(0.0, min(state.next_due for state in states) - now)
+
+    # ==================== الحالة ====================
+
+    def get_polling_status(self) -> Dict[str, Any]:
+        """حالة الاستطلاع التكيفي"""
+        now = time.time()
+        demand = sum(60.0 / state.interval for state in self.states.values()
+                     if state.interval and not self.is_streamed(state, now))
+        return {
+            'streamed': sum(1 for state in self.states.values() if self.is_streamed(state, now)),
+            'symbols': len(self.states),
+            'budget_per_minute': self.polling_config['budget_per_minute'],
+            'planned_per_minute': round(demand, 2),
+            'budget_scale': round(self.scale, 3),
+            'budget': self.budget.status(),
+            'intervals': {
+                symbol: {
+                    'interval': round(state.interval, 2),
+                    'volatility_bps_per_min': round(state.volatility * math.sqrt(60) * 10000, 2)
+                    if state.volatility else None,
+                    'trigger_distance_bps': round(state.trigger_distance() * 10000, 1)
+                    if state.trigger_distance() is not None else None,
+                    'exposure': state.exposure,
+                    'polls': state.polls,
+                }
+                for symbol, state in self.states.items()
+            },
+            **self.stats
+        }
+
+
+# نسخة عالمية
+adaptive_poller = AdaptivePoller()
@@ -10,6 +10,7 @@ import warnings
 
 from .strategy_discovery import StrategyDiscovery
 from .advanced_cache_manager import cached, async_cached
+from .arbitrage_scanner import arbitrage_scanner
 
 class MarketRegime(Enum):
     """أنظمة السوق المختلفة"""
@@ -225,11 +226,15 @@ class AdvancedStrategyEngine:
             # توليد الإشارات
             signals = await self._execute_strategies(suitable_strategies, symbol, market_data, market_regime)
             
+            # فرص المراجحة بين المنصات لا تعتمد على نظام السوق وليست إشارة اتجاه - قناة منفصلة
+            arbitrage = self.get_arbitrage_signals(symbol) if strategy_type in (None, StrategyType.ARBITRAGE) else []
+            
             return {
                 'symbol': symbol,
                 'timestamp': datetime.now().isoformat(),
                 'market_regime': market_regime.value,
                 'signals': signals,
+                'arbitrage': arbitrage,
                 'confidence': self._calculate_overall_confidence(signals)
             }
             
@@ -237,6 +242,14 @@ class AdvancedStrategyEngine:
             self.logger.error(f"❌ خطأ في توليد الإشارات: {e}")
             return self._generate_fallback_signals(symbol)
     
+    def get_arbitrage_signals(self, symbol: Optional[str] = None) -> List[Dict]:
+        """إشارات المراجحة من آخر مسح لماسح الأسعار بين المنصات"""
+        try:
+            return arbitrage_scanner.get_signals(symbol)
+        except Exception as e:
+            self.logger.warning(f"⚠️ تعذر قراءة إشارات المراجحة: {e}")
+            return []
+    
     def _select_strategies_for_regime(self, regime: MarketRegime, preferred_type: Optional[StrategyType]) -> List[Dict]:
         """اختيار الاستراتيجيات المناسبة لنظام السوق"""
         # تعيين الاستراتيجيات المناسبة لكل نظام
@@ -410,11 +423,11 @@ class AdvancedStrategyEngine:
             return {'signal': 'HOLD', 'confidence': 0.5, 'strategy': strategy_name}
     
     def _calculate_overall_confidence(self, signals: List[Dict]) -> float:
-        """حساب الثقة العامة في الإشارات"""
-        if not signals:
+        """حساب الثقة العامة في الإشارات الاتجاهية (إشارات ARBITRAGE لا تُحتسب)"""
+        confidences = [s.get('confidence', 0) for s in signals if s.get('signal') != 'ARBITRAGE']
+        if not confidences:
             return 0.0
         
-        confidences = [s.get('confidence', 0) for s in signals]
         return sum(confidences) / len(confidences)
     
     def _generate_fallback_signals(self, symbol: str) -> Dict:
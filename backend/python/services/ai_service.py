@@ -11,7 +11,7 @@ import sys
 import time
 import traceback
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any, Tuple
+from typing import Dict, List, Optional, Any, Tuple, Callable, TYPE_CHECKING
 import uuid
 import random
 from decimal import Decimal
@@ -24,19 +24,11 @@ from sklearn.preprocessing import MinMaxScaler, StandardScaler
 from sklearn.utils import class_weight
 from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score, classification_report
 from sklearn.model_selection import train_test_split, TimeSeriesSplit
-import tensorflow as tf
-from tensorflow.keras.models import Sequential, load_model, save_model
-from tensorflow.keras.layers import (
-    LSTM, Dense, Dropout, Bidirectional, Conv1D, MaxPooling1D, 
-    Flatten, BatchNormalization, Activation, LeakyReLU
-)
-from tensorflow.keras.optimizers import Adam, RMSprop
-from tensorflow.keras.callbacks import (
-    EarlyStopping, ModelCheckpoint, ReduceLROnPlateau, 
-    TensorBoard, Callback
-)
-from tensorflow.keras.regularizers import l1_l2, l2
-from tensorflow.keras.utils import to_categorical
+
+# TensorFlow/Keras للتدريب والتصدير ولنماذج Keras بدون TFLite معتمد فقط - تُستورد داخل تلك المسارات،
+# فالتنبؤ بمفسر TFLite يعمل بـ tflite-runtime دون تثبيت tensorflow
+if TYPE_CHECKING:
+    import tensorflow as tf
 
 # Technical Analysis
 import talib
@@ -45,12 +37,20 @@ from scipy import stats, signal
 import pytz
 
 # Advanced Features
-from collections import deque, Counter
+from collections import deque, Counter, OrderedDict
 import warnings
 warnings.filterwarnings('ignore')
 
 # Custom Imports
+import ccxt.async_support as ccxt_async
 from models.trading_models import *
+from services.async_exchange_pool import exchange_pool
+from services.inference_coalescer import inference_coalescer
+from services.candle_store import candle_store
+from services.incremental_indicators import indicator_engine, FEATURE_COLUMNS
+from services.lite_inference import LiteModel, lite_runtime
+from services.ohlcv_archive import ohlcv_archive
+from services.rolling_stats import rolling_skew, rolling_kurt, rolling_autocorr, rolling_hurst
 
 logger = logging.getLogger(__name__)
 
@@ -64,10 +64,19 @@ class AdvancedAIService:
         self.prediction_horizon = 5
         
         # الذاكرة والنماذج لكل رمز
-        self.symbol_models: Dict[str, tf.keras.Model] = {}
+        self.symbol_models: Dict[str, 'tf.keras.Model'] = {}
         self.symbol_scalers: Dict[str, MinMaxScaler] = {}
+        self.symbol_lite_models: Dict[str, LiteModel] = {}
+        self.symbol_features: Dict[str, List[str]] = {}
         self.symbol_data: Dict[str, deque] = {}
         self.model_versions: Dict[str, str] = {}
+        self.model_generations: Dict[str, int] = {}
+        self.symbol_runners: Dict[str, Callable[[np.ndarray], np.ndarray]] = {}
+        self.inference_coalescer = inference_coalescer
+        
+        # ذاكرة السمات والتنبؤات لكل شمعة مغلقة (LRU)
+        self.prediction_memo: "OrderedDict[Tuple, Dict[str, Any]]" = OrderedDict()
+        self.memo_stats = {'hits': 0, 'misses': 0, 'evictions': 0}
         
         # تتبع الأداء
         self.model_performance: Dict[str, Dict] = {}
@@ -97,7 +106,10 @@ class AdvancedAIService:
             'class_balance_boost': 1.3,
             'feature_engineering': True,
             'ensemble_learning': True,
-            'transfer_learning': True
+            'transfer_learning': True,
+            'prediction_timeframe': '1h',
+            'prediction_candles': 200,
+            'memo_max_entries': int(os.getenv('AI_MEMO_MAX_ENTRIES', '256'))
         }
 
     def _get_technical_indicators(self):
@@ -158,8 +170,23 @@ class AdvancedAIService:
             scaler_path = f"{self.model_base_dir}/{symbol_key}/ai_scaler.pkl"
             
             if os.path.exists(model_path) and os.path.exists(scaler_path):
-                self.symbol_models[symbol] = load_model(model_path)
+                # نموذج TFLite المعتمد يغني عن تحميل Keras للتنبؤ
+                lite_model = lite_runtime.load(f"{self.model_base_dir}/{symbol_key}")
+                if lite_model is not None:
+                    self.symbol_lite_models[symbol] = lite_model
+                else:
+                    from tensorflow.keras.models import load_model
+                    self.symbol_lite_models.pop(symbol, None)
+                    self.symbol_models[symbol] = load_model(model_path)
                 self.symbol_scalers[symbol] = joblib.load(scaler_path)
+                self._model_changed(symbol)
+                
+                # السمات التي دُرب عليها النموذج بترتيبها
+                features_path = f"{self.model_base_dir}/{symbol_key}/feature_names.json"
+                if os.path.exists(features_path):
+                    import json
+                    with open(features_path, 'r') as f:
+                        self.symbol_features[symbol] = json.load(f)
                 
                 # تحميل بيانات الأداء إذا كانت موجودة
                 performance_path = f"{self.model_base_dir}/{symbol_key}/performance.json"
@@ -176,10 +203,21 @@ class AdvancedAIService:
         
         return False
 
-    async def train_ai_model(self, symbol: str, ohlcv_data: List[List[float]], 
+    async def train_ai_model(self, symbol: str, ohlcv_data: Optional[List[List[float]]] = None, 
                            force_retrain: bool = False) -> bool:
         """تدريب نموذج الذكاء الاصطناعي - التغطية الكاملة من الكود الأصلي"""
         try:
+            # القراءة من الأرشيف على القرص إذا لم تمرر البيانات
+            if ohlcv_data is None:
+                exchange = candle_store.default_exchange
+                timeframe = self.ai_config['prediction_timeframe']
+                count = self.ai_config['max_training_samples']
+                if exchange_pool.is_registered(exchange):
+                    # الأرشيف الأقصر من نافذة التدريب يُعبأ من المنصة أولاً
+                    ohlcv_data = await ohlcv_archive.ensure_history(exchange_pool, exchange, symbol, timeframe, count)
+                else:
+                    ohlcv_data = ohlcv_archive.read_last(exchange, symbol, timeframe, count)
+            
             if len(ohlcv_data) < self.ai_config['min_training_samples']:
                 logger.warning(f"⚠️ بيانات غير كافية لـ {symbol}: {len(ohlcv_data)} < {self.ai_config['min_training_samples']}")
                 return False
@@ -217,7 +255,7 @@ class AdvancedAIService:
                 )
                 
                 # 8. حفظ النموذج والبيانات
-                await self._save_model_and_artifacts(model, symbol, feature_names, evaluation_results)
+                await self._save_model_and_artifacts(model, symbol, feature_names, evaluation_results, X_val)
                 
                 logger.info(f"✅ اكتمل تدريب النموذج لـ {symbol} بنجاح")
                 return True
@@ -264,6 +302,18 @@ class AdvancedAIService:
             logger.error(f"❌ خطأ في تحضير السمات لـ {symbol}: {str(e)}")
             return None
 
+    def _prepare_incremental_features(self, ohlcv_data, symbol: str) -> pd.DataFrame:
+        """نفس سمات _prepare_advanced_features من محرك المؤشرات التزايدي - تتقدم بالشموع الجديدة فقط"""
+        try:
+            X = indicator_engine.features(symbol, self.ai_config['prediction_timeframe'], ohlcv_data)
+            if X is None:
+                return None
+            timestamps = pd.to_datetime([candle[0] for candle in ohlcv_data[-len(X):]], unit='ms')
+            return pd.DataFrame(X, index=timestamps, columns=FEATURE_COLUMNS, copy=True)
+        except Exception as e:
+            logger.error(f"❌ خطأ في تحضير السمات التزايدية لـ {symbol}: {str(e)}")
+            return None
+
     def _enhance_temporal_features(self, df: pd.DataFrame) -> pd.DataFrame:
         """تحسين السمات الزمنية من الكود الأصلي"""
         try:
@@ -347,16 +397,17 @@ class AdvancedAIService:
             df['volatility_1d'] = df['returns'].rolling(20).std()
             df['volatility_5d'] = df['returns'].rolling(100).std()
             
-            # الانحراف
-            df['skewness'] = df['returns'].rolling(50).skew()
-            df['kurtosis'] = df['returns'].rolling(50).kurtosis()
+            # الانحراف والتفرطح
+            returns = df['returns'].values
+            df['skewness'] = rolling_skew(returns, 50)
+            df['kurtosis'] = rolling_kurt(returns, 50)
             
             # الارتباط الذاتي
-            df['autocorr_1'] = df['returns'].rolling(50).apply(lambda x: x.autocorr(lag=1), raw=False)
-            df['autocorr_5'] = df['returns'].rolling(50).apply(lambda x: x.autocorr(lag=5), raw=False)
+            df['autocorr_1'] = rolling_autocorr(returns, 50, lag=1)
+            df['autocorr_5'] = rolling_autocorr(returns, 50, lag=5)
             
             # Hurst Exponent (تقريبي)
-            df['hurst'] = df['returns'].rolling(100).apply(self._calculate_hurst, raw=False)
+            df['hurst'] = rolling_hurst(returns, 100)
             
             return df
             
@@ -430,18 +481,6 @@ class AdvancedAIService:
             logger.warning(f"⚠️ خطأ في إزالة القيم المتطرفة: {str(e)}")
             return df
 
-    def _calculate_hurst(self, returns):
-        """حساب Hurst Exponent (تقريبي)"""
-        try:
-            if len(returns) < 2:
-                return 0.5
-            lags = range(2, min(20, len(returns)))
-            tau = [np.std(np.subtract(returns[lag:], returns[:-lag])) for lag in lags]
-            poly = np.polyfit(np.log(lags), np.log(tau), 1)
-            return poly[0]
-        except:
-            return 0.5
-
     def _create_advanced_target(self, df: pd.DataFrame, symbol: str) -> Tuple[np.ndarray, np.ndarray, List[str]]:
         """إنشاء الهدف متعدد الفئات من الكود الأصلي"""
         try:
@@ -533,8 +572,15 @@ class AdvancedAIService:
             logger.warning(f"⚠️ خطأ في حساب أوزان الفئات: {str(e)}")
             return {0: 1.0, 1: 1.0, -1: 1.0, 2: 1.0, -2: 1.0}
 
-    def _build_advanced_model(self, input_shape: Tuple[int, int]) -> tf.keras.Model:
+    def _build_advanced_model(self, input_shape: Tuple[int, int]) -> 'tf.keras.Model':
         """بناء النموذج المتقدم من الكود الأصلي"""
+        from tensorflow.keras.models import Sequential
+        from tensorflow.keras.layers import (
+            LSTM, Dense, Dropout, Bidirectional, Conv1D, MaxPooling1D, BatchNormalization, LeakyReLU
+        )
+        from tensorflow.keras.optimizers import Adam
+        from tensorflow.keras.regularizers import l2
+
         try:
             model = Sequential([
                 # طبقة Conv1D لاستخراج الأنماط المحلية
@@ -585,11 +631,13 @@ class AdvancedAIService:
             logger.error(f"❌ خطأ في بناء النموذج: {traceback.format_exc()}")
             raise
 
-    async def _advanced_model_training(self, model: tf.keras.Model, X_train: np.ndarray, 
+    async def _advanced_model_training(self, model: 'tf.keras.Model', X_train: np.ndarray, 
                                      y_train: np.ndarray, X_val: np.ndarray, 
                                      y_val: np.ndarray, class_weights: Dict, 
                                      symbol: str) -> bool:
         """التدريب المتقدم للنموذج"""
+        from tensorflow.keras.callbacks import EarlyStopping, ModelCheckpoint, ReduceLROnPlateau, TensorBoard
+
         try:
             # Callbacks متقدمة
             callbacks = [
@@ -642,7 +690,7 @@ class AdvancedAIService:
             logger.error(f"❌ خطأ في تدريب النموذج لـ {symbol}: {traceback.format_exc()}")
             return False
 
-    async def _comprehensive_model_evaluation(self, model: tf.keras.Model, X_val: np.ndarray, 
+    async def _comprehensive_model_evaluation(self, model: 'tf.keras.Model', X_val: np.ndarray, 
                                             y_val: np.ndarray, symbol: str) -> Dict[str, Any]:
         """تقييم شامل للنموذج"""
         try:
@@ -681,8 +729,9 @@ class AdvancedAIService:
             logger.error(f"❌ خطأ في تقييم النموذج: {str(e)}")
             return {}
 
-    async def _save_model_and_artifacts(self, model: tf.keras.Model, symbol: str, 
-                                      feature_names: List[str], evaluation_results: Dict):
+    async def _save_model_and_artifacts(self, model: 'tf.keras.Model', symbol: str, 
+                                      feature_names: List[str], evaluation_results: Dict,
+                                      sample_windows: Optional[np.ndarray] = None):
         """حفظ النموذج والبيانات المرتبطة"""
         try:
             symbol_key = symbol.replace('/', '_')
@@ -704,6 +753,8 @@ class AdvancedAIService:
             # حفظ قائمة السمات
             with open(f"{symbol_dir}/feature_names.json", 'w') as f:
                 json.dump(feature_names, f, indent=2)
+            self.symbol_features[symbol] = feature_names
+            self._model_changed(symbol)
             
             # حفظ إعدادات النموذج
             model_config = {
@@ -716,6 +767,12 @@ class AdvancedAIService:
             }
             with open(f"{symbol_dir}/model_config.json", 'w') as f:
                 json.dump(model_config, f, indent=2)
+            
+            # تصدير TFLite للاستدلال الخفيف مع فحص الانحراف على نوافذ التحقق
+            lite_runtime.export(model, symbol_dir, sample_windows)
+            lite_model = lite_runtime.load(symbol_dir)
+            if lite_model is not None:
+                self.symbol_lite_models[symbol] = lite_model
                 
         except Exception as e:
             logger.error(f"❌ خطأ في حفظ النموذج: {str(e)}")
@@ -738,24 +795,99 @@ class AdvancedAIService:
         except Exception as e:
             logger.warning(f"⚠️ تعذر حفظ تاريخ التدريب: {str(e)}")
 
-    async def predict(self, symbol: str, ohlcv_data: List[List[float]]) -> AIPrediction:
+    def _closed_candles(self, ohlcv_data, timeframe: str):
+        """الشموع المغلقة فقط - الشمعة المفتوحة تُستبعد فتبقى السمات والتنبؤ ثابتة حتى إغلاق الشمعة"""
+        if ohlcv_data is None or not len(ohlcv_data):
+            return ohlcv_data
+        duration_ms = ccxt_async.Exchange.parse_timeframe(timeframe) * 1000
+        if ohlcv_data[-1][0] + duration_ms > time.time() * 1000:
+            return ohlcv_data[:-1]
+        return ohlcv_data
+
+    def _memo_entry(self, symbol: str, ohlcv_data) -> Optional[Dict[str, Any]]:
+        """مدخل الذاكرة لـ (الرمز، الإطار، آخر شمعة مغلقة، إصدار النموذج) - يُنشأ بإطار السمات عند أول طلب"""
+        timeframe = self.ai_config['prediction_timeframe']
+        if ohlcv_data is None or not len(ohlcv_data):
+            return None
+        key = (symbol, timeframe, int(ohlcv_data[-1][0]), self.model_generations.get(symbol, 0))
+        entry = self.prediction_memo.get(key)
+        if entry is not None:
+            self.prediction_memo.move_to_end(key)
+            self.memo_stats['hits'] += 1
+            return entry
+        
+        self.memo_stats['misses'] += 1
+        df = self._prepare_incremental_features(ohlcv_data, symbol)
+        if df is None:
+            return None
+        entry = self.prediction_memo[key] = {'features': df}
+        while len(self.prediction_memo) > self.ai_config['memo_max_entries']:
+            self.prediction_memo.popitem(last=False)
+            self.memo_stats['evictions'] += 1
+        return entry
+
+    def _invalidate_memo(self, symbol: str):
+        """حذف مدخلات الرمز من الذاكرة عند تغير نموذجه"""
+        for key in [key for key in self.prediction_memo if key[0] == symbol]:
+            del self.prediction_memo[key]
+
+    def _model_changed(self, symbol: str):
+        """نموذج جديد للرمز - إصدار جديد للذاكرة وإعادة تجميع التمريرة الأمامية"""
+        self.model_generations[symbol] = self.model_generations.get(symbol, 0) + 1
+        self.symbol_runners.pop(symbol, None)
+        self._invalidate_memo(symbol)
+
+    def _has_model(self, symbol: str) -> bool:
+        return symbol in self.symbol_lite_models or self.symbol_models.get(symbol) is not None
+
+    def _model_runner(self, symbol: str) -> Callable[[np.ndarray], np.ndarray]:
+        """تمريرة أمامية مجمعة - مفسر TFLite إن وُجد نموذج معتمد، وإلا tf.function لنموذج Keras"""
+        if symbol in self.symbol_lite_models:
+            return self.symbol_lite_models[symbol].run
+        runner = self.symbol_runners.get(symbol)
+        if runner is None:
+            import tensorflow as tf
+
+            model = self.symbol_models[symbol]
+            forward = tf.function(
+                lambda batch: model(batch, training=False),
+                input_signature=[tf.TensorSpec(model.input_shape, tf.float32)]
+            )
+            runner = self.symbol_runners[symbol] = \
+                lambda windows: forward(tf.convert_to_tensor(windows, tf.float32)).numpy()
+        return runner
+
+    def _get_stored_ohlcv(self, symbol: str) -> np.ndarray:
+        """عرض الشموع من المخزن الحلقي بدون نسخ"""
+        return candle_store.view(
+            symbol, self.ai_config['prediction_timeframe'], self.ai_config['prediction_candles']
+        )
+
+    async def predict(self, symbol: str, ohlcv_data: Optional[List[List[float]]] = None) -> AIPrediction:
         """التنبؤ المتقدم - التغطية الكاملة من الكود الأصلي"""
         try:
-            if symbol not in self.symbol_models or self.symbol_models[symbol] is None:
+            if ohlcv_data is None:
+                ohlcv_data = self._get_stored_ohlcv(symbol)
+            ohlcv_data = self._closed_candles(ohlcv_data, self.ai_config['prediction_timeframe'])
+            
+            if not self._has_model(symbol):
                 await self.initialize_symbol_model(symbol)
             
-            if (symbol not in self.symbol_models or 
-                self.symbol_models[symbol] is None or 
-                len(ohlcv_data) < self.sequence_length):
+            if not self._has_model(symbol) or len(ohlcv_data) < self.sequence_length:
                 
                 return self._create_fallback_prediction(symbol)
             
-            # تحضير البيانات للتنبؤ
-            df = self._prepare_advanced_features(ohlcv_data, symbol)
-            if df is None:
+            # تحضير البيانات للتنبؤ - داخل نفس الشمعة المغلقة التنبؤ محفوظ
+            entry = self._memo_entry(symbol, ohlcv_data)
+            if entry is None:
                 return self._create_fallback_prediction(symbol)
+            if 'prediction' in entry:
+                return entry['prediction']
+            df = entry['features']
             
-            feature_columns = [col for col in df.columns if not col.startswith('future_')]
+            # النماذج المحفوظة تستخدم سماتها المسجلة حتى لو أضيفت سمات بعد تدريبها
+            feature_columns = self.symbol_features.get(symbol) or \
+                [col for col in df.columns if not col.startswith('future_')]
             X = df[feature_columns].values
             
             # تطبيع البيانات إذا كان المقياس موجوداً
@@ -766,10 +898,14 @@ class AdvancedAIService:
             if len(X) < self.sequence_length:
                 return self._create_fallback_prediction(symbol)
             
-            X_sequence = np.array([X[-self.sequence_length:]])
+            window = X[-self.sequence_length:]
+            entry['tensor'] = window[np.newaxis]
             
-            # التنبؤ
-            prediction_proba = self.symbol_models[symbol].predict(X_sequence, verbose=0)[0]
+            # التنبؤ - الطلبات المتزامنة لنفس النموذج تُدمج في تمريرة أمامية واحدة
+            prediction_proba = await self.inference_coalescer.infer(
+                (symbol, self.model_generations.get(symbol, 0), window.shape),
+                self._model_runner(symbol), window
+            )
             predicted_class = np.argmax(prediction_proba)
             confidence = np.max(prediction_proba)
             
@@ -790,7 +926,7 @@ class AdvancedAIService:
             # تسجيل التنبؤ
             await self._record_prediction(symbol, signal, confidence, predicted_class)
             
-            return AIPrediction(
+            entry['prediction'] = AIPrediction(
                 symbol=symbol,
                 prediction=signal,
                 confidence=float(confidence),
@@ -800,11 +936,18 @@ class AdvancedAIService:
                 model_version=self.model_versions.get(symbol, "3.0.0"),
                 features_used=feature_columns
             )
+            return entry['prediction']
             
         except Exception as e:
             logger.error(f"❌ خطأ في التنبؤ لـ {symbol}: {traceback.format_exc()}")
             return self._create_fallback_prediction(symbol)
 
+    async def predict_batch(self, requests: Dict[str, Optional[List[List[float]]]]) -> Dict[str, AIPrediction]:
+        """تنبؤ رموز متعددة بالتوازي - لكل رمز نموذجه فتمريرة واحدة لكل نموذج، والطلبات المتكررة لنفس الرمز تُدمج"""
+        symbols = list(requests)
+        predictions = await asyncio.gather(*[self.predict(symbol, requests[symbol]) for symbol in symbols])
+        return dict(zip(symbols, predictions))
+
     def _get_current_indicators(self, df: pd.DataFrame) -> Dict[str, float]:
         """الحصول على المؤشرات الحالية"""
         try:
@@ -891,15 +1034,20 @@ class AdvancedAIService:
             logger.error(f"❌ خطأ في جلب تاريخ التنبؤات: {str(e)}")
             return []
 
-    async def analyze_market_sentiment(self, symbol: str, ohlcv_data: List[List[float]]) -> Dict[str, Any]:
+    async def analyze_market_sentiment(self, symbol: str, 
+                                       ohlcv_data: Optional[List[List[float]]] = None) -> Dict[str, Any]:
         """تحليل مشاعر السوق المتقدم"""
         try:
+            if ohlcv_data is None:
+                ohlcv_data = self._get_stored_ohlcv(symbol)
+            ohlcv_data = self._closed_candles(ohlcv_data, self.ai_config['prediction_timeframe'])
+            
             # التنبؤ الأساسي
             prediction = await self.predict(symbol, ohlcv_data)
             
-            # تحليل إضافي للمشاعر
-            df = self._prepare_advanced_features(ohlcv_data, symbol)
-            if df is None:
+            # تحليل إضافي للمشاعر - نفس إطار السمات المحفوظ للتنبؤ
+            entry = self._memo_entry(symbol, ohlcv_data)
+            if entry is None:
                 return {
                     'symbol': symbol,
                     'overall_sentiment': 'neutral',
@@ -908,7 +1056,9 @@ class AdvancedAIService:
                 }
             
             # حساب مشاعر متعددة الأبعاد
-            sentiment_scores = self._calculate_multi_dimension_sentiment(df)
+            if 'sentiment' not in entry:
+                entry['sentiment'] = self._calculate_multi_dimension_sentiment(entry['features'])
+            sentiment_scores = entry['sentiment']
             
             return {
                 'symbol': symbol,
@@ -987,14 +1137,18 @@ class AdvancedAIService:
             status = {
                 'total_models': len(self.symbol_models),
                 'loaded_models': sum(1 for model in self.symbol_models.values() if model is not None),
+                'lite_models': len(self.symbol_lite_models),
+                'lite_runtime': lite_runtime.get_lite_status(),
                 'model_performance': {},
                 'prediction_activity': {},
+                'prediction_memo': {'entries': len(self.prediction_memo), **self.memo_stats},
+                'inference_coalescing': self.inference_coalescer.get_coalescer_status(),
                 'system_status': 'healthy',
                 'last_updated': datetime.utcnow().isoformat()
             }
             
             # جمع إحصائيات النماذج
-            for symbol in self.symbol_models:
+            for symbol in set(self.symbol_models) | set(self.symbol_lite_models):
                 if symbol in self.model_performance:
                     perf = self.model_performance[symbol]
                     status['model_performance'][symbol] = {
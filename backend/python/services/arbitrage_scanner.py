@@ -0,0 +1,288 @@
+# backend/python/services/arbitrage_scanner.py
+"""
+🔀 ماسح المراجحة بين المنصات - جلب متزامن للأسعار من كل المنصات ومصفوفة عرض/طلب NumPy
+حساب فروق الأسعار الصافية بعد الرسوم لكل (رمز، منصة شراء، منصة بيع) في تمريرة واحدة
+الإصدار: 3.0.0 | المطور: Akraa Trading Team
+"""
+
+import asyncio
+import logging
+import os
+import time
+from dataclasses import dataclass, field, asdict
+from typing import Dict, List, Optional, Any
+
+import numpy as np
+
+from services.async_exchange_pool import AsyncExchangePool, exchange_pool
+from services.market_registry import MarketRegistry, market_registry
+from services.resilience import deadline
+
+logger = logging.getLogger(__name__)
+
+# رسوم المستلم الافتراضية إذا لم تتوفر في بيانات ccxt
+DEFAULT_TAKER_FEES = {
+    'binance': 0.001, 'bybit': 0.001, 'kucoin': 0.001, 'gateio': 0.002,
+    'huobi': 0.002, 'mexc': 0.0005, 'okx': 0.001,
+}
+
+
+@dataclass
+class QuoteMatrix:
+    """أسعار العرض والطلب بشكل (رموز × منصات) - NaN للأسعار غير المتوفرة"""
+    symbols: List[str]
+    exchanges: List[str]
+    bid: np.ndarray
+    ask: np.ndarray
+    bid_size: np.ndarray
+    ask_size: np.ndarray
+    timestamp: np.ndarray
+    fetched_at: float = field(default_factory=time.time)
+
+    @classmethod
+    def empty(cls, symbols: List[str], exchanges: List[str]) -> 'QuoteMatrix':
+        shape = (len(symbols), len(exchanges))
+        return cls(
+            symbols=list(symbols), exchanges=list(exchanges),
+            bid=np.full(shape, np.nan), ask=np.full(shape, np.nan),
+            bid_size=np.full(shape, np.nan), ask_size=np.full(shape, np.nan),
+            timestamp=np.full(shape, np.nan)
+        )
+
+
+@dataclass
+class ArbitrageOpportunity:
+    """فرصة مراجحة: شراء بسعر الطلب في منصة والبيع بسعر العرض في أخرى"""
+    symbol: str
+    buy_exchange: str
+    sell_exchange: str
+    buy_price: float
+    sell_price: float
+    gross_spread: float
+    net_spread: float
+    max_amount: Optional[float]
+    detected_at: float
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def compute_opportunities(matrix: QuoteMatrix, taker_fees: np.ndarray,
+                          min_net_spread: float = 0.0) -> List[ArbitrageOpportunity]:
+    """أفضل فرصة لكل رمز بعد الرسوم - تمريرة متجهة واحدة على (رموز × شراء × بيع)"""
+    if not matrix.symbols or len(matrix.exchanges) < 2:
+        return []
+
+    # السعر الفعلي بعد رسوم المستلم على جانبي الصفقة
+    effective_ask = matrix.ask * (1 + taker_fees)          # (S, E)
+    effective_bid = matrix.bid * (1 - taker_fees)          # (S, E)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        # net[s, i, j]: الشراء من i والبيع في j
+        net = effective_bid[:, None, :] / effective_ask[:, :, None] - 1
+        gross = matrix.bid[:, None, :] / matrix.ask[:, :, None] - 1
+
+    exchange_count = len(matrix.exchanges)
+    net[:, np.arange(exchange_count), np.arange(exchange_count)] = np.nan
+    net = np.where(np.isfinite(net), net, -np.inf)
+
+    flat = net.reshape(len(matrix.symbols), -1)
+    best = flat.argmax(axis=1)
+    best_net = flat[np.arange(len(matrix.symbols)), best]
+    buy_index, sell_index = np.divmod(best, exchange_count)
+
+    opportunities = []
+    detected_at = time.time()
+    for s in np.nonzero(best_net > min_net_spread)[0]:
+        i, j = buy_index[s], sell_index[s]
+        max_amount = np.fmin(matrix.ask_size[s, i], matrix.bid_size[s, j])
+        opportunities.append(ArbitrageOpportunity(
+            symbol=matrix.symbols[s],
+            buy_exchange=matrix.exchanges[i],
+            sell_exchange=matrix.exchanges[j],
+            buy_price=float(matrix.ask[s, i]),
+            sell_price=float(matrix.bid[s, j]),
+            gross_spread=float(gross[s, i, j]),
+            net_spread=float(best_net[s]),
+            max_amount=None if np.isnan(max_amount) else float(max_amount),
+            detected_at=detected_at
+        ))
+
+    opportunities.sort(key=lambda opportunity: opportunity.net_spread, reverse=True)
+    return opportunities
+
+
+class ArbitrageScanner:
+    """مجمع أسعار متعدد المنصات وماسح مراجحة دوري"""
+
+    def __init__(self, pool: AsyncExchangePool = None, registry: Optional[MarketRegistry] = None):
+        self.pool = pool or exchange_pool
+        self.registry = registry or market_registry
+        self.scanner_config = {
+            'symbols': [s for s in os.getenv(
+                'ARBITRAGE_SYMBOLS', 'BTC/USDT,ETH/USDT,BNB/USDT,SOL/USDT,XRP/USDT').split(',') if s],
+            'interval': float(os.getenv('ARBITRAGE_SCAN_INTERVAL', '1.0')),
+            # كل منصة تُعطى جزءاً من فترة المسح - المتأخرة تُستبعد من هذه الدورة
+            'fetch_timeout': float(os.getenv('ARBITRAGE_FETCH_TIMEOUT', '0.8')),
+            'min_net_spread': float(os.getenv('ARBITRAGE_MIN_NET_SPREAD', '0.0005')),
+            'max_quote_age': float(os.getenv('ARBITRAGE_MAX_QUOTE_AGE', '5')),
+        }
+        self.fee_overrides: Dict[str, float] = {}
+
+        self.last_matrix: Optional[QuoteMatrix] = None
+        self.opportunities: List[ArbitrageOpportunity] = []
+        self.scan_task: Optional[asyncio.Task] = None
+        self.stats = {'scans': 0, 'scan_errors': 0, 'exchange_failures': 0,
+                      'last_scan_ms': 0.0, 'opportunities_found': 0}
+
+    def set_taker_fee(self, exchange: str, fee: float) -> None:
+        """رسوم خاصة بالحساب (مستوى VIP مثلاً)"""
+        self.fee_overrides[exchange] = fee
+
+    async def _taker_fee(self, exchange: str) -> float:
+        """رسوم المستلم: تخصيص الحساب ثم بيانات ccxt ثم القيمة الافتراضية"""
+        if exchange in self.fee_overrides:
+            return self.fee_overrides[exchange]
+        try:
+            client = await self.pool.get_client(exchange)
+            fee = (client.fees.get('trading') or {}).get('taker')
+            if fee is not None:
+                return float(fee)
+        except Exception:
+            pass
+        return DEFAULT_TAKER_FEES.get(exchange, 0.001)
+
+    def _listed_symbols(self, exchange: str, symbols: List[str]) -> List[str]:
+        """الرموز المدرجة في المنصة حسب سجل الأسواق (الكل إذا لم يُحمل السجل)"""
+        if not self.registry.is_loaded(exchange):
+            return symbols
+        return [symbol for symbol in symbols if self.registry.resolve(exchange, symbol) == symbol]
+
+    async def _fetch_exchange(self, exchange: str, symbols: List[str]) -> Dict[str, Dict[str, Any]]:
+        """أسعار منصة واحدة ضمن مهلة الدورة"""
+        listed = self._listed_symbols(exchange, symbols)
+        if not listed:
+            return {}
+        with deadline(self.scanner_config['fetch_timeout']):
+            return await self.pool.fetch_tickers(exchange, listed)
+
+    async def fetch_quotes(self, symbols: Optional[List[str]] = None,
+                           exchanges: Optional[List[str]] = None) -> QuoteMatrix:
+        """جلب متزامن من كل المنصات وبناء مصفوفة العرض/الطلب"""
+        symbols = list(symbols or self.scanner_config['symbols'])
+        exchanges = [e for e in (exchanges or self.pool.registered_exchanges) if self.pool.is_registered(e)]
+        matrix = QuoteMatrix.empty(symbols, exchanges)
+        row = {symbol: i for i, symbol in enumerate(symbols)}
+
+        results = await asyncio.gather(
+            *[self._fetch_exchange(exchange, symbols) for exchange in exchanges],
+            return_exceptions=True
+        )
+
+        for col, (exchange, tickers) in enumerate(zip(exchanges, results)):
+            if isinstance(tickers, Exception):
+                self.stats['exchange_failures'] += 1
+                logger.debug(f"تعذر جلب أسعار {exchange}: {str(tickers)}")
+                continue
+            for symbol, ticker in tickers.items():
+                i = row.get(symbol)
+                if i is None:
+                    continue
+                matrix.bid[i, col] = ticker.get('bid') or np.nan
+                matrix.ask[i, col] = ticker.get('ask') or np.nan
+                matrix.bid_size[i, col] = ticker.get('bidVolume') or np.nan
+                matrix.ask_size[i, col] = ticker.get('askVolume') or np.nan
+                matrix.timestamp[i, col] = (ticker.get('timestamp') or time.time() * 1000) / 1000
+
+        # استبعاد الأسعار القديمة
+        stale = time.time() - matrix.timestamp > self.scanner_config['max_quote_age']
+        matrix.bid[stale] = np.nan
+        matrix.ask[stale] = np.nan
+        return matrix
+
+    async def scan(self, symbols: Optional[List[str]] = None,
+                   exchanges: Optional[List[str]] = None) -> List[ArbitrageOpportunity]:
+        """دورة مسح كاملة: جلب ثم حساب الفرص"""
+        start_time = time.perf_counter()
+        try:
+            matrix = await self.fetch_quotes(symbols, exchanges)
+            fees = np.array([await self._taker_fee(exchange) for exchange in matrix.exchanges])
+            opportunities = compute_opportunities(matrix, fees, self.scanner_config['min_net_spread'])
+
+            self.last_matrix = matrix
+            self.opportunities = opportunities
+            self.stats['scans'] += 1
+            self.stats['opportunities_found'] += len(opportunities)
+            return opportunities
+
+        except Exception as e:
+            self.stats['scan_errors'] += 1
+            logger.error(f"❌ خطأ في مسح المراجحة: {str(e)}")
+            return []
+        finally:
+            self.stats['last_scan_ms'] = (time.perf_counter() - start_time) * 1000
+
+    def start(self, symbols: Optional[List[str]] = None, exchanges: Optional[List[str]] = None) -> None:
+        """مسح دوري بفترة ثابتة (افتراضياً مسح كامل كل ثانية)"""
+        if self.scan_task is not None and not self.scan_task.done():
+            return
+
+        async def scan_loop():
+            interval = self.scanner_config['interval']
+            while True:
+                started = time.monotonic()
+                await self.scan(symbols, exchanges)
+                await asyncio.sleep(max(0.0, interval - (time.monotonic() - started)))
+
+        self.scan_task = asyncio.create_task(scan_loop())
+        logger.info("🔀 بدء ماسح المراجحة بين المنصات")
+
+    async def stop(self) -> None:
+        """إيقاف المسح الدوري"""
+        if self.scan_task is not None:
+            self.scan_task.cancel()
+            await asyncio.gather(self.scan_task, return_exceptions=True)
+            self.scan_task = None
+
+    def get_signals(self, symbol: Optional[str] = None) -> List[Dict[str, Any]]:
+        """فرص آخر مسح كإشارات ARBITRAGE بساقين (شراء وبيع) - ليست إشارة اتجاه (BTC/USDT و BTCUSDT متطابقان)"""
+        signals = []
+        now = time.time()
+        key = MarketRegistry.normalize_key(symbol) if symbol else None
+        for opportunity in self.opportunities:
+            if key is not None and MarketRegistry.normalize_key(opportunity.symbol) != key:
+                continue
+            # الثقة تزيد مع الفرق الصافي وتتناقص مع عمر الأسعار
+            age_factor = max(0.0, 1 - (now - opportunity.detected_at) / self.scanner_config['max_quote_age'])
+            confidence = min(0.9, opportunity.net_spread / 0.01) * age_factor
+            signals.append({
+                'strategy': 'cross_exchange_arbitrage',
+                'signal': 'ARBITRAGE',
+                'symbol': opportunity.symbol,
+                'confidence': round(confidence, 4),
+                'legs': [
+                    {'side': 'BUY', 'exchange': opportunity.buy_exchange, 'price': opportunity.buy_price},
+                    {'side': 'SELL', 'exchange': opportunity.sell_exchange, 'price': opportunity.sell_price},
+                ],
+                'buy_exchange': opportunity.buy_exchange,
+                'sell_exchange': opportunity.sell_exchange,
+                'net_spread': opportunity.net_spread,
+                'max_amount': opportunity.max_amount,
+                'reason': f"شراء من {opportunity.buy_exchange} وبيع في {opportunity.sell_exchange}"
+            })
+        return signals
+
+    def get_scanner_status(self) -> Dict[str, Any]:
+        """حالة الماسح"""
+        return {
+            'running': self.scan_task is not None and not self.scan_task.done(),
+            'exchanges': self.last_matrix.exchanges if self.last_matrix else [],
+            'symbols': len(self.last_matrix.symbols) if self.last_matrix else 0,
+            'opportunities': [opportunity.to_dict() for opportunity in self.opportunities[:20]],
+            'scanner_config': self.scanner_config,
+            **self.stats
+        }
+
+
+# نسخة عالمية
+arbitrage_scanner = ArbitrageScanner()
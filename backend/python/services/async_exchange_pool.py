@@ -0,0 +1,251 @@
+# backend/python/services/async_exchange_pool.py
+"""
+⚡ مجمع اتصالات المنصات غير المتزامن - مبني على ccxt.async_support
+عميل واحد طويل العمر لكل منصة فوق جلسة HTTP المشتركة للعملية مع حدود تزامن لكل منصة
+الإصدار: 3.0.0 | المطور: Akraa Trading Team
+"""
+
+import asyncio
+import logging
+import os
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Any
+
+import aiohttp
+import ccxt.async_support as ccxt_async
+
+from services.http_client import HttpClient, http_client as shared_http_client
+from services.rate_limiter import RateLimiter, rate_limiter as shared_rate_limiter
+from services.resilience import ResilienceManager, resilience as shared_resilience, remaining_time
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncExchangePool:
+    """مجمع عملاء المنصات غير المتزامن - لا يحجب حلقة الأحداث أثناء طلبات HTTP"""
+
+    def __init__(self, default_concurrency: int = 10,
+                 rate_limiter: Optional[RateLimiter] = None,
+                 resilience: Optional[ResilienceManager] = None,
+                 http_client: Optional[HttpClient] = None):
+        # حدود الاتصالات وذاكرة DNS في عميل HTTP المشترك
+        self.pool_config = {
+            'default_concurrency': int(os.getenv('EXCHANGE_POOL_CONCURRENCY', default_concurrency)),
+            # طلبات قراءة تُرسل منها نسخة تحوط عند تأخر الرد
+            'hedge_methods': tuple(filter(None, os.getenv(
+                'EXCHANGE_HEDGE_METHODS', 'fetch_ticker,fetch_tickers,fetch_order_book').split(','))),
+        }
+
+        # محدد المعدل المشترك - يستبدل المؤقت الداخلي في ccxt لكل عميل
+        self.rate_limiter = rate_limiter or shared_rate_limiter
+        # قواطع الدوائر وميزانية الوقت لكل منصة
+        self.resilience = resilience or shared_resilience
+
+        # إعدادات وعملاء المنصات
+        self.exchange_configs: Dict[str, Dict[str, Any]] = {}
+        self.clients: Dict[str, ccxt_async.Exchange] = {}
+        self.semaphores: Dict[str, asyncio.Semaphore] = {}
+        self.concurrency_limits: Dict[str, int] = {}
+
+        # الجلسة المشتركة بين جميع العملاء وباقي الطلبات الصادرة
+        self.http_client = http_client or shared_http_client
+
+        # إحصائيات الاستخدام
+        self.stats: Dict[str, Dict[str, Any]] = {}
+
+    def register_exchange(self, exchange_name: str, config: Dict[str, Any],
+                          max_concurrency: Optional[int] = None) -> None:
+        """تسجيل إعدادات منصة - يتم إنشاء العميل عند أول استخدام"""
+        if not hasattr(ccxt_async, exchange_name):
+            raise ValueError(f"المنصة غير مدعومة في ccxt: {exchange_name}")
+
+        self.exchange_configs[exchange_name] = dict(config)
+        limit = max_concurrency or self.pool_config['default_concurrency']
+        self.concurrency_limits[exchange_name] = limit
+        self.semaphores[exchange_name] = asyncio.Semaphore(limit)
+        self.stats.setdefault(exchange_name, {
+            'requests': 0,
+            'errors': 0,
+            'rate_limited': 0,
+            'in_flight': 0,
+            'total_latency': 0.0,
+            'last_request': None
+        })
+
+    def is_registered(self, exchange_name: str) -> bool:
+        """التحقق من تسجيل المنصة"""
+        return exchange_name in self.exchange_configs
+
+    @property
+    def registered_exchanges(self) -> List[str]:
+        """قائمة المنصات المسجلة"""
+        return list(self.exchange_configs.keys())
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """جلسة HTTP المشتركة للعملية (داخل حلقة الأحداث)"""
+        return self.http_client.get_session()
+
+    async def get_client(self, exchange_name: str) -> ccxt_async.Exchange:
+        """الحصول على العميل طويل العمر للمنصة"""
+        client = self.clients.get(exchange_name)
+        if client is not None:
+            return client
+
+        if exchange_name not in self.exchange_configs:
+            raise KeyError(f"المنصة غير مسجلة: {exchange_name}")
+
+        exchange_class = getattr(ccxt_async, exchange_name)
+        client = exchange_class({
+            **self.exchange_configs[exchange_name],
+            # الحدود تُطبق في محدد المعدل المشترك بأوزان المنصة بدلاً من فاصل ccxt الثابت
+            'enableRateLimit': False,
+            'session': self._get_session()
+        })
+        self.clients[exchange_name] = client
+        logger.info(f"✅ تم إنشاء عميل غير متزامن لـ {exchange_name}")
+        return client
+
+    async def call(self, exchange_name: str, method: str, *args, **kwargs) -> Any:
+        """تنفيذ دالة ccxt غير متزامنة عبر قاطع الدائرة ضمن ميزانية وقت المستدعي
+
+        القراءات (fetch_*) تُعاد محاولتها بتأخير عشوائي وقد تُرسل منها نسخة تحوط،
+        والأوامر تُرسل مرة واحدة لأن إعادة محاولتها مسؤولية خط الأوامر.
+        """
+        client = await self.get_client(exchange_name)
+        idempotent = method.startswith('fetch_') or method == 'load_markets'
+        hedge_delay = self.resilience.resilience_config['hedge_delay'] \
+            if method in self.pool_config['hedge_methods'] else None
+
+        return await self.resilience.call(
+            exchange_name,
+            lambda: self._send(client, exchange_name, method, *args, **kwargs),
+            idempotent=idempotent,
+            hedge_delay=hedge_delay,
+            # انتظار التوكن خارج مهلة المحاولة حتى لا يُحسب طابور حد المعدل فشلاً للمنصة
+            acquire=lambda: self.rate_limiter.acquire(exchange_name, method, timeout=remaining_time())
+        )
+
+    async def _send(self, client: ccxt_async.Exchange, exchange_name: str, method: str, *args, **kwargs) -> Any:
+        """محاولة واحدة ضمن حد التزامن الخاص بالمنصة - التوكن محجوز مسبقاً في call"""
+        stats = self.stats[exchange_name]
+
+        async with self.semaphores[exchange_name]:
+            stats['in_flight'] += 1
+            start_time = time.perf_counter()
+            try:
+                return await getattr(client, method)(*args, **kwargs)
+            except (ccxt_async.RateLimitExceeded, ccxt_async.DDoSProtection):
+                # 429/418 من المنصة - إيقاف جميع دلاء المنصة المشتركة
+                stats['errors'] += 1
+                stats['rate_limited'] += 1
+                self.rate_limiter.penalize(exchange_name)
+                raise
+            except Exception:
+                stats['errors'] += 1
+                raise
+            finally:
+                stats['in_flight'] -= 1
+                stats['requests'] += 1
+                stats['total_latency'] += time.perf_counter() - start_time
+                stats['last_request'] = time.time()
+
+    async def fetch_tickers(self, exchange_name: str, symbols: List[str]) -> Dict[str, Dict[str, Any]]:
+        """جلب أسعار عدة رموز بطلب واحد (fetch_tickers) مع بديل متزامن للمنصات غير الداعمة"""
+        if not symbols:
+            return {}
+
+        client = await self.get_client(exchange_name)
+        if client.has.get('fetchTickers'):
+            tickers = await self.call(exchange_name, 'fetch_tickers', symbols)
+            return {symbol: tickers[symbol] for symbol in symbols if symbol in tickers}
+
+        # بديل: طلبات فردية متوازية ضمن حد التزامن
+        results = await asyncio.gather(
+            *[self.call(exchange_name, 'fetch_ticker', symbol) for symbol in symbols],
+            return_exceptions=True
+        )
+        tickers = {}
+        for symbol, result in zip(symbols, results):
+            if isinstance(result, Exception):
+                logger.warning(f"⚠️ تعذر جلب سعر {symbol} من {exchange_name}: {str(result)}")
+                continue
+            tickers[symbol] = result
+        return tickers
+
+    async def close_exchange(self, exchange_name: str) -> None:
+        """إغلاق عميل منصة واحدة"""
+        client = self.clients.pop(exchange_name, None)
+        if client is None:
+            return
+        try:
+            await client.close()
+        except Exception as e:
+            logger.warning(f"⚠️ خطأ في إغلاق عميل {exchange_name}: {str(e)}")
+
+    async def close(self) -> None:
+        """إغلاق جميع العملاء - الجلسة المشتركة يغلقها مالكها عند إيقاف التطبيق"""
+        for exchange_name in list(self.clients.keys()):
+            await self.close_exchange(exchange_name)
+
+        logger.info("🔒 تم إغلاق مجمع اتصالات المنصات")
+
+    def get_pool_status(self) -> Dict[str, Any]:
+        """حالة المجمع وإحصائيات كل منصة"""
+        exchanges = {}
+        for exchange_name, stats in self.stats.items():
+            requests = stats['requests']
+            exchanges[exchange_name] = {
+                'connected': exchange_name in self.clients,
+                'circuit': self.resilience.get_breaker(exchange_name).state.value,
+                'concurrency_limit': self.concurrency_limits.get(exchange_name),
+                'in_flight': stats['in_flight'],
+                'requests': requests,
+                'errors': stats['errors'],
+                'rate_limited': stats['rate_limited'],
+                'avg_latency_ms': (stats['total_latency'] / requests * 1000) if requests else 0.0,
+                'last_request': stats['last_request']
+            }
+
+        return {
+            'session_open': self.http_client.get_client_status()['session_open'],
+            'pool_config': self.pool_config,
+            'exchanges': exchanges,
+            'rate_limits': self.rate_limiter.get_limiter_status()['exchanges']
+        }
+
+
+def normalize_ticker(symbol: str, ticker: Dict[str, Any]) -> Dict[str, Any]:
+    """تحويل ticker من ccxt إلى حقول MarketData الموحدة"""
+    last = float(ticker.get('last') or ticker.get('close') or 0.0)
+    open_price = ticker.get('open')
+    bid = float(ticker.get('bid') or last)
+    ask = float(ticker.get('ask') or last)
+    base_volume = float(ticker.get('baseVolume') or 0.0)
+
+    if ticker.get('percentage') is not None:
+        change_24h = float(ticker['percentage'])
+    elif open_price:
+        change_24h = (last - float(open_price)) / float(open_price) * 100
+    else:
+        change_24h = 0.0
+
+    timestamp = ticker.get('timestamp')
+    return {
+        'symbol': symbol,
+        'price': last,
+        'volume': base_volume,
+        'timestamp': datetime.utcfromtimestamp(timestamp / 1000) if timestamp else datetime.utcnow(),
+        'change_24h': change_24h,
+        'high_24h': float(ticker.get('high') or last),
+        'low_24h': float(ticker.get('low') or last),
+        'bid': bid,
+        'ask': ask,
+        'spread': (ask - bid) / bid * 100 if bid else 0.0,
+        'base_volume': base_volume,
+        'quote_volume': float(ticker.get('quoteVolume') or 0.0)
+    }
+
+
+# نسخة عالمية مشتركة بين جميع الخدمات
+exchange_pool = AsyncExchangePool()
@@ -11,6 +11,7 @@ import traceback
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any, Tuple
 import json
+import os
 import psutil
 import gc
 from concurrent.futures import ThreadPoolExecutor
@@ -23,6 +24,11 @@ from services.trading_strategies import trading_strategies
 from services.risk_manager import risk_manager
 from services.position_manager import position_manager
 from services.market_analyzer import market_analyzer
+from services.market_stream import market_stream
+from services.candle_store import candle_store
+from services.adaptive_polling import adaptive_poller
+from services.universe_scanner import universe_scanner, Tier
+from services.fast_lane import fast_lane
 
 logger = logging.getLogger(__name__)
 
@@ -85,6 +91,10 @@ class AdvancedBackgroundTasks:
             'position_update_interval': 2,       # 2 ثانية بين تحديثات المراكز
             'performance_tracking_interval': 60, # دقيقة بين تتبع الأداء
             'health_check_interval': 30,         # 30 ثانية بين فحوصات الصحة
+            'market_stream_enabled': os.getenv('MARKET_STREAM_ENABLED', 'true').lower() == 'true',
+            'market_stream_timeframes': os.getenv('MARKET_STREAM_TIMEFRAMES', '1m').split(','),
+            'stream_max_age': 5,                 # ثواني قبل اعتبار سعر التدفق قديماً
+            'universe_scan_enabled': os.getenv('UNIVERSE_SCAN_ENABLED', 'true').lower() == 'true',
             'auto_trading_enabled': True,
             'alert_system_enabled': True,
             'report_generation_enabled': True,
@@ -96,6 +106,18 @@ class AdvancedBackgroundTasks:
         try:
             logger.info("🚀 بدء جميع المهام الخلفية...")
             
+            # ماسح الكون المتدرج أولاً (يحدد رموز المهام التالية)
+            if self.task_config['universe_scan_enabled']:
+                await self.start_universe_scan_task()
+            
+            # 0. تدفق بيانات السوق عبر WebSocket
+            if self.task_config['market_stream_enabled']:
+                await self.start_market_stream_task()
+            
+            # المسار السريع للتنفيذ (اختياري) - حدود مدير المخاطر والمراكز المفتوحة قبل أول إشارة
+            if fast_lane.enabled:
+                await self.start_fast_lane_task()
+            
             # 1. مهمة بيانات السوق الحية
             await self.start_market_data_task()
             
@@ -132,6 +154,108 @@ class AdvancedBackgroundTasks:
             logger.error(f"❌ فشل بدء المهام الخلفية: {traceback.format_exc()}")
             raise
 
+    async def start_universe_scan_task(self):
+        """مسح أول للكون ثم مسح دوري - الطبقات تحدد رموز التدفق والاستطلاع والتحليل"""
+        try:
+            exchange = exchange_service.default_exchange
+            await universe_scanner.scan(exchange)
+            universe_scanner.start(exchange)
+            self.active_tasks["universe_scan"] = universe_scanner.scan_task
+            await self._log_task_start("universe_scan")
+        except Exception:
+            logger.error(f"❌ فشل بدء ماسح الكون: {traceback.format_exc()}")
+
+    async def start_fast_lane_task(self):
+        """عدادات مخاطرة المسار السريع من مدير المخاطر والمراكز المفتوحة ثم القوالب وربط الإشارات"""
+        try:
+            positions = await position_manager.get_open_positions()
+            fast_lane.seed_risk(risk_manager, [
+                (position.symbol, position.current_value) for position in positions
+                if position.side == OrderSide.BUY
+            ])
+            symbols = await self._tier_symbols(Tier.HOT, Tier.WARM)
+            await exchange_service.start_fast_lane(symbols)
+            # الإشارات الشاملة من مهمة التحليل تُرسل مباشرة بزمن توليدها
+            trading_strategies.subscribe(fast_lane.on_signal)
+            self.active_tasks["fast_lane"] = fast_lane.flush_task
+            await self._log_task_start("fast_lane")
+        except Exception:
+            logger.error(f"❌ فشل بدء المسار السريع: {traceback.format_exc()}")
+
+    async def _tier_symbols(self, *tiers: Tier, limit: int = 20) -> List[str]:
+        """رموز طبقات الكون، أو أول limit رمز نشط قبل اكتمال أول مسح"""
+        if universe_scanner.ranked:
+            return universe_scanner.symbols(*tiers)
+        symbols = await exchange_service.get_active_symbols()
+        return symbols[:limit]
+
+    async def start_market_stream_task(self):
+        """بدء تدفق الأسعار والشموع عبر WebSocket وربط المستهلكين به"""
+        try:
+            task_name = "market_ws_stream"
+            if task_name in self.active_tasks:
+                logger.warning(f"⚠️ المهمة {task_name} تعمل بالفعل")
+                return
+
+            # لا تدفق لمنصة غير مدعومة - أسعارها تبقى عبر الاستطلاع
+            if not market_stream.covers(exchange_service.default_exchange):
+                logger.info(f"ℹ️ لا يوجد تدفق لـ {exchange_service.default_exchange} - الأسعار عبر REST")
+                return
+
+            # الطبقتان الساخنة والدافئة تُتدفق - الباردة يغطيها فرز الماسح المجمع
+            symbols = await self._tier_symbols(Tier.HOT, Tier.WARM)
+            await market_stream.start(symbols, self.task_config['market_stream_timeframes'])
+
+            # تحديث المراكز فور وصول كل سعر بدلاً من انتظار دورة الاستطلاع
+            position_manager.attach_market_stream(market_stream.bus)
+            
+            # تحديث الشمعة المفتوحة في مخزن الشموع من تدفق kline
+            candle_store.attach_market_stream(market_stream.bus)
+            
+            # تذبذب الرموز المتدفقة للاستطلاع التكيفي - ولا تستهلك من ميزانيته
+            market_stream.bus.subscribe('tick:*', adaptive_poller.on_tick)
+
+            async def market_stream_watchdog():
+                while market_stream.running:
+                    await asyncio.sleep(self.task_config['health_check_interval'])
+                    status = market_stream.get_stream_status()
+                    if status['last_message_at'] and time.time() - status['last_message_at'] > 60:
+                        logger.warning("⚠️ لم تصل رسائل من تدفق السوق منذ أكثر من دقيقة")
+
+            self.active_tasks[task_name] = asyncio.create_task(market_stream_watchdog())
+            await self._log_task_start(task_name)
+
+        except Exception:
+            logger.error(f"❌ فشل بدء تدفق بيانات السوق: {traceback.format_exc()}")
+
+    def _get_stream_market_data(self, symbol: str) -> Optional[MarketData]:
+        """بيانات السوق من مخزن التدفق إذا كانت حديثة (لمنصة الخدمة فقط)"""
+        exchange = exchange_service.default_exchange
+        if not market_stream.store.is_fresh(symbol, exchange, self.task_config['stream_max_age']):
+            return None
+        return MarketData(**market_stream.store.get_tick(symbol, exchange).to_market_fields())
+
+    async def _get_market_data(self, symbol: str) -> MarketData:
+        """بيانات السوق من التدفق أولاً، ثم آخر استطلاع لم يحن تحديثه، ثم من REST"""
+        market_data = self._get_stream_market_data(symbol)
+        if market_data is not None:
+            return market_data
+        market_data = adaptive_poller.get_cached(symbol)
+        if market_data is not None:
+            return market_data
+        snapshot = await exchange_service.get_market_snapshot([symbol])
+        if symbol not in snapshot:
+            raise ValueError(f"لا توجد بيانات سوق لـ {symbol}")
+        market_data = MarketData(**snapshot[symbol])
+        self._record_poll(symbol, market_data)
+        return market_data
+
+    @staticmethod
+    def _record_poll(symbol: str, market_data: MarketData) -> None:
+        """تسجيل استطلاع REST في الجدولة التكيفية"""
+        adaptive_poller.record(symbol, market_data.price, market_data,
+                               high=market_data.high_24h, low=market_data.low_24h)
+
     async def start_market_data_task(self):
         """بدء مهمة بيانات السوق الحية"""
         try:
@@ -149,13 +273,26 @@ class AdvancedBackgroundTasks:
                     try:
                         start_time = time.time()
                         
-                        # جلب الرموز النشطة
-                        symbols = await exchange_service.get_active_symbols()
+                        # الطبقتان الساخنة والدافئة - الباردة يغطيها فرز الماسح المجمع
+                        symbols = await self._tier_symbols(Tier.HOT, Tier.WARM)
+                        
+                        # الرموز الحديثة في مخزن التدفق لا تحتاج طلب REST
+                        streamed = {}
+                        for symbol in symbols:
+                            market_data = self._get_stream_market_data(symbol)
+                            if market_data is not None:
+                                streamed[symbol] = market_data
                         
-                        # تحديث بيانات السوق لكل رمز
-                        for symbol in symbols[:20]:  # تحديث أول 20 رمز فقط
+                        # لقطة مجمعة للرموز المستحقة فقط - فترة كل رمز حسب تذبذبه وقربه من التفعيل
+                        adaptive_poller.track(symbols)
+                        missing = adaptive_poller.due(symbols, exclude=streamed)
+                        snapshot = await exchange_service.get_market_snapshot(missing) if missing else {}
+                        for symbol, fields in snapshot.items():
+                            streamed[symbol] = MarketData(**fields)
+                            self._record_poll(symbol, streamed[symbol])
+                        
+                        for symbol, market_data in streamed.items():
                             try:
-                                market_data = await exchange_service.get_market_data(symbol)
                                 
                                 # تحديث محلل السوق
                                 await market_analyzer.update_market_data(symbol, market_data)
@@ -163,8 +300,6 @@ class AdvancedBackgroundTasks:
                                 # إرسال عبر WebSocket إذا كان متصلاً
                                 await self._broadcast_market_data(symbol, market_data)
                                 
-                                await asyncio.sleep(0.1)  # تجنب تجاوز حدود API
-                                
                             except Exception as e:
                                 logger.warning(f"⚠️ خطأ في تحديث بيانات {symbol}: {str(e)}")
                                 continue
@@ -207,29 +342,39 @@ class AdvancedBackgroundTasks:
                     try:
                         start_time = time.time()
                         
-                        # جلب الرموز النشطة
-                        symbols = await exchange_service.get_active_symbols()
+                        # التحليل الكامل للطبقة الساخنة فقط
+                        symbols = await self._tier_symbols(Tier.HOT, limit=15)
                         
-                        # تحليل كل رمز باستخدام الذكاء الاصطناعي
-                        for symbol in symbols[:15]:  # تحليل أول 15 رمز
+                        # جلب الشموع الجديدة فقط لكل الرموز معاً (محدد المعدل يضبط الطلبات)
+                        candles = await asyncio.gather(*[
+                            exchange_service.fetch_ohlcv(symbol, '1h', 200) for symbol in symbols
+                        ], return_exceptions=True)
+                        ready = {}
+                        for symbol, ohlcv_data in zip(symbols, candles):
+                            if isinstance(ohlcv_data, Exception):
+                                logger.warning(f"⚠️ خطأ في جلب شموع {symbol}: {str(ohlcv_data)}")
+                            elif len(ohlcv_data) >= 100:
+                                ready[symbol] = ohlcv_data
+                        
+                        # تحليل الذكاء الاصطناعي - كل الرموز معاً، والطلبات لنفس النموذج تُدمج في تمريرة واحدة
+                        predictions = await ai_service.predict_batch(ready)
+                        
+                        for symbol, prediction in predictions.items():
                             try:
-                                # جلب بيانات OHLCV
-                                ohlcv_data = await exchange_service.fetch_ohlcv(symbol, '1h', 200)
+                                # تحليل المشاعر (يعيد استخدام السمات والتنبؤ المحفوظين للشمعة)
+                                sentiment = await ai_service.analyze_market_sentiment(symbol, ready[symbol])
                                 
-                                if len(ohlcv_data) >= 100:
-                                    # تحليل الذكاء الاصطناعي
-                                    prediction = await ai_service.predict(symbol, ohlcv_data)
-                                    
-                                    # تحليل المشاعر
-                                    sentiment = await ai_service.analyze_market_sentiment(symbol, ohlcv_data)
-                                    
-                                    # تحديث التوقعات
-                                    await self._update_ai_predictions(symbol, prediction, sentiment)
-                                    
-                                    # إرسال التنبيهات إذا لزم الأمر
-                                    await self._check_ai_alerts(symbol, prediction)
+                                # تحديث التوقعات
+                                await self._update_ai_predictions(symbol, prediction, sentiment)
                                 
-                                await asyncio.sleep(0.5)  # فاصل بين الرموز
+                                # إرسال التنبيهات إذا لزم الأمر
+                                await self._check_ai_alerts(symbol, prediction)
+                                
+                                # الإشارة الشاملة تُولد فقط عند وجود مستهلك (المسار السريع)
+                                if trading_strategies.signal_subscribers:
+                                    await trading_strategies.generate_comprehensive_signal(
+                                        symbol, ready[symbol], prediction
+                                    )
                                 
                             except Exception as e:
                                 logger.warning(f"⚠️ خطأ في تحليل {symbol}: {str(e)}")
@@ -270,7 +415,7 @@ class AdvancedBackgroundTasks:
                         for position in open_positions:
                             try:
                                 # تحديث سعر المركز
-                                market_data = await exchange_service.get_market_data(position.symbol)
+                                market_data = await self._get_market_data(position.symbol)
                                 updated_position = await position_manager.update_position_price(
                                     f"{position.symbol}_{position.side.value}", market_data.price
                                 )
@@ -289,8 +434,11 @@ class AdvancedBackgroundTasks:
                         system_risk = await risk_manager.assess_system_risk({}, open_positions)
                         await self._handle_system_risk(system_risk)
                         
+                        interval = min(self.task_config['risk_monitoring_interval'],
+                                       adaptive_poller.next_wakeup({position.symbol for position in open_positions}))
                         execution_time = time.time() - start_time
-                        await asyncio.sleep(max(0, self.task_config['risk_monitoring_interval'] - execution_time))
+                        interval = max(interval, adaptive_poller.polling_config['min_interval'])
+                        await asyncio.sleep(max(0, interval - execution_time))
                         
                     except Exception as e:
                         logger.error(f"❌ خطأ في مهمة مراقبة المخاطر: {str(e)}")
@@ -321,11 +469,28 @@ class AdvancedBackgroundTasks:
                         # إدارة الأوامر المعلقة
                         await position_manager.manage_pending_orders()
                         
-                        # تحديث أسعار جميع المراكز
+                        # تحديث أسعار المراكز المستحقة - المراكز القريبة من الوقف/الهدف تُستطلع أسرع
                         open_positions = await position_manager.get_open_positions()
+                        adaptive_poller.sync_positions(open_positions)
+                        universe_scanner.pin(position.symbol for position in open_positions)
+                        
+                        # المراكز المحدثة من التدفق لا تحتاج استطلاعاً
+                        streamed = {
+                            position.symbol for position in open_positions
+                            if position_manager.is_stream_attached and
+                            market_stream.store.is_fresh(position.symbol, exchange_service.default_exchange,
+                                                         self.task_config['stream_max_age'])
+                        }
+                        position_symbols = {position.symbol for position in open_positions}
+                        due = adaptive_poller.due(position_symbols, exclude=streamed)
+                        snapshot = await exchange_service.get_market_snapshot(due) if due else {}
+                        
                         for position in open_positions:
                             try:
-                                market_data = await exchange_service.get_market_data(position.symbol)
+                                if position.symbol not in snapshot:
+                                    continue
+                                market_data = MarketData(**snapshot[position.symbol])
+                                self._record_poll(position.symbol, market_data)
                                 await position_manager.update_position_price(
                                     f"{position.symbol}_{position.side.value}", market_data.price
                                 )
@@ -337,8 +502,12 @@ class AdvancedBackgroundTasks:
                         if self.task_config['auto_trading_enabled']:
                             await self._auto_rebalance_portfolio()
                         
+                        # الفترة الثابتة حد أقصى - أقرب استحقاق لمركز يوقظ الحلقة أبكر
+                        interval = min(self.task_config['position_update_interval'],
+                                       adaptive_poller.next_wakeup(position_symbols))
                         execution_time = time.time() - start_time
-                        await asyncio.sleep(max(0, self.task_config['position_update_interval'] - execution_time))
+                        interval = max(interval, adaptive_poller.polling_config['min_interval'])
+                        await asyncio.sleep(max(0, interval - execution_time))
                         
                     except Exception as e:
                         logger.error(f"❌ خطأ في مهمة تحديث المراكز: {str(e)}")
@@ -1112,6 +1281,11 @@ class AdvancedBackgroundTasks:
             
             self.active_tasks.clear()
             
+            # إيقاف تدفق السوق
+            position_manager.detach_market_stream()
+            await market_stream.stop()
+            await universe_scanner.stop()
+            
             # إيقاف تنفيذ الخيوط
             self.thread_pool.shutdown(wait=True)
             
@@ -1129,7 +1303,9 @@ class AdvancedBackgroundTasks:
                 'active_tasks': len(self.active_tasks),
                 'task_details': {},
                 'system_health': self.system_health,
-                'performance_metrics': self.performance_metrics
+                'performance_metrics': self.performance_metrics,
+                'adaptive_polling': adaptive_poller.get_polling_status(),
+                'universe': universe_scanner.get_universe_status()
             }
             
             for task_name, task in self.active_tasks.items():
@@ -1,11 +1,12 @@
 # backend/python/services/batch_processor.py
 import asyncio
-import aiohttp
 from concurrent.futures import ThreadPoolExecutor
 import logging
 from typing import List, Any, Callable
 import time
 
+from services.http_client import http_client
+
 class BatchProcessor:
     """
     معالج دُفعات متقدم للبيانات الكبيرة - يحسن الأداء مع الحفاظ على الوظائف
@@ -56,10 +57,11 @@ class BatchProcessor:
                 logging.error(f"Async processing error: {e}")
                 return None
         
-        async with aiohttp.ClientSession() as session:
-            tasks = [process_single(session, item) for item in data_list]
-            results = await asyncio.gather(*tasks, return_exceptions=True)
-            
+        # جلسة HTTP المشتركة - اتصالات دائمة بدلاً من جلسة جديدة لكل دفعة
+        session = http_client.get_session()
+        tasks = [process_single(session, item) for item in data_list]
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        
         # تصفية النتائج الفاشلة
         successful_results = [r for r in results if not isinstance(r, Exception) and r is not None]
         logging.info(f"🔄 Async batch processed: {len(successful_results)}/{len(data_list)} successful")
@@ -69,22 +71,27 @@ class BatchProcessor:
 # تطبيق نظام الدفعات على خدمات التداول الحالية
 batch_processor = BatchProcessor(max_workers=10, batch_size=100)
 
-def process_multiple_orders_optimized(orders_data):
+async def process_multiple_orders_optimized(orders_data, exchange: str = None):
     """
-    نسخة محسنة من معالجة الطلبات المتعددة - نفس الوظيفة مع أداء أفضل
+    نسخة محسنة من معالجة الطلبات المتعددة - عبر خط الأوامر غير المتزامن
+    (طابور لكل منصة وتزامن محدود بدلاً من مجمع الخيوط)
     """
-    from backend.python.services.exchange_service import ExchangeService
+    from services.exchange_service import exchange_service
     
-    exchange_service = ExchangeService()
+    exchange = exchange or exchange_service.default_exchange
     
-    def process_single_order(order_data):
-        # استخدام الوظيفة الأصلية بدون تعديل
-        return exchange_service.place_order(
+    results = await asyncio.gather(*[
+        exchange_service.create_order(
+            exchange,
             symbol=order_data['symbol'],
+            side=order_data['side'],
             order_type=order_data['order_type'],
             quantity=order_data['quantity'],
-            price=order_data.get('price')
+            price=order_data.get('price'),
+            client_order_id=order_data.get('client_order_id')
         )
+        for order_data in orders_data
+    ])
     
-    # معالجة الدفعات مع الحفاظ على النتائج الأصلية
-    return batch_processor.process_batch_sync(orders_data, process_single_order)
+    logging.info(f"🔄 Orders batch processed: {sum(1 for r in results if r.get('success'))}/{len(orders_data)} successful")
+    return list(results)  # نفس ترتيب المدخلات
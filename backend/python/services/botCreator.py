@@ -1,12 +1,12 @@
 # backend/python/services/botCreator.py
 import os
-import requests
 import json
 import logging
 from datetime import datetime, timedelta
 import jwt
 from database import db  # افتراض وجود اتصال قاعدة بيانات
 from models.user import User  # افتراض وجود نموذج المستخدم
+from services.http_client import http_client
 
 class BotCreatorService:
     def __init__(self):
@@ -83,18 +83,21 @@ class BotCreatorService:
             
             bot_name = f"{user_data['personal_info']['name'].replace(' ', '_')}_Trading_Bot"
             
-            response = requests.post(
+            # تلغرام يعيد وصف الخطأ في جسم JSON حتى مع رموز 4xx
+            response = (await http_client.request(
+                'POST',
                 f"{self.telegram_api_url}{bot_father_token}/createNewBot",
+                raise_for_status=False,
                 json={
                     "name": bot_name,
                     "description": f"بوت تداول تلقائي لـ {user_data['personal_info']['name']}"
                 }
-            )
+            ))['data']
             
-            if response.json().get("ok"):
-                return response.json()["result"]["token"]
+            if response.get("ok"):
+                return response["result"]["token"]
             else:
-                raise Exception(response.json().get("description", "Unknown error"))
+                raise Exception(response.get("description", "Unknown error"))
                 
         except Exception as e:
             self.logger.error(f"Error creating Telegram bot: {str(e)}")
@@ -0,0 +1,203 @@
+# backend/python/services/candle_store.py
+"""
+🕯️ مخزن الشموع الحلقي لكل رمز - أعمدة NumPy مخصصة مسبقاً مع جلب تزايدي
+يجلب فقط الشموع الأحدث من آخر طابع زمني ويحدث الشمعة المفتوحة في مكانها
+الإصدار: 3.0.0 | المطور: Akraa Trading Team
+"""
+
+import asyncio
+import logging
+import os
+import time
+from typing import Dict, Optional, Any, Tuple
+
+import numpy as np
+
+from services.async_exchange_pool import AsyncExchangePool, exchange_pool
+from services.ohlcv_archive import OHLCVArchive, ohlcv_archive
+
+logger = logging.getLogger(__name__)
+
+OHLCV_COLUMNS = ['timestamp', 'open', 'high', 'low', 'close', 'volume']
+COLUMN_INDEX = {name: i for i, name in enumerate(OHLCV_COLUMNS)}
+
+
+class CandleBuffer:
+    """مخزن حلقي بكتابة مزدوجة - آخر n شمعة متجاورة دائماً في الذاكرة
+
+    كل صف يكتب في الموضعين i و i + capacity، لذلك أي نافذة من آخر n صف
+    هي شريحة متصلة من المصفوفة ويمكن إرجاعها كعرض بدون نسخ.
+    """
+
+    def __init__(self, capacity: int = 1000):
+        self.capacity = capacity
+        self._data = np.zeros((2 * capacity, len(OHLCV_COLUMNS)), dtype=np.float64)
+        self.head = 0   # موضع الكتابة التالي ضمن [0, capacity)
+        self.count = 0
+        self.updated_at = 0.0
+
+    def __len__(self) -> int:
+        return self.count
+
+    @property
+    def last_timestamp(self) -> Optional[int]:
+        """طابع آخر شمعة (ms)"""
+        if self.count == 0:
+            return None
+        return int(self._data[self.head - 1 + self.capacity, 0])
+
+    def _write(self, slot: int, row) -> None:
+        self._data[slot] = row
+        self._data[slot + self.capacity] = row
+
+    def upsert(self, rows: np.ndarray) -> Tuple[int, int]:
+        """إضافة الشموع الأحدث وتحديث الشمعة المفتوحة في مكانها - يعيد (مضافة، محدثة)"""
+        rows = np.asarray(rows, dtype=np.float64).reshape(-1, len(OHLCV_COLUMNS))
+        if rows.size == 0:
+            return 0, 0
+
+        appended = updated = 0
+        last_timestamp = self.last_timestamp
+
+        # تجاهل الشموع الأقدم من آخر شمعة مخزنة
+        if last_timestamp is not None:
+            rows = rows[rows[:, 0] >= last_timestamp]
+            if len(rows) and rows[0, 0] == last_timestamp:
+                self._write((self.head - 1) % self.capacity, rows[0])
+                updated = 1
+                rows = rows[1:]
+
+        # الكتابة المجمعة - فقط آخر capacity شمعة تبقى
+        rows = rows[-self.capacity:]
+        for row in rows:
+            self._write(self.head, row)
+            self.head = (self.head + 1) % self.capacity
+            appended += 1
+
+        self.count = min(self.count + appended, self.capacity)
+        self.updated_at = time.time()
+        return appended, updated
+
+    def view(self, limit: Optional[int] = None) -> np.ndarray:
+        """عرض للقراءة فقط لآخر limit شمعة بشكل (n, 6) - بدون نسخ"""
+        n = self.count if limit is None else min(limit, self.count)
+        end = self.head + self.capacity
+        window = self._data[end - n:end]
+        window.flags.writeable = False
+        return window
+
+    def column(self, name: str, limit: Optional[int] = None) -> np.ndarray:
+        """عرض عمود واحد (close مثلاً) - بدون نسخ"""
+        return self.view(limit)[:, COLUMN_INDEX[name]]
+
+
+class CandleStore:
+    """مخزن الشموع لكل (منصة، رمز، فريم) مع جلب تزايدي"""
+
+    def __init__(self, pool: AsyncExchangePool = None, capacity: Optional[int] = None,
+                 archive: Optional[OHLCVArchive] = None):
+        self.pool = pool or exchange_pool
+        # أرشفة الشموع المغلقة على القرص للتدريب والاختبار الخلفي
+        if archive is None and os.getenv('OHLCV_ARCHIVE_ENABLED', 'true').lower() == 'true':
+            archive = ohlcv_archive
+        self.archive = archive
+        self.capacity = int(capacity or os.getenv('CANDLE_STORE_CAPACITY', '1000'))
+        self.default_exchange = os.getenv('DEFAULT_EXCHANGE', 'binance')
+
+        self.buffers: Dict[Tuple[str, str, str], CandleBuffer] = {}
+        self._locks: Dict[Tuple[str, str, str], asyncio.Lock] = {}
+        self._stream_unsubscribe = None
+        self.stats = {'fetches': 0, 'candles_fetched': 0, 'stream_updates': 0}
+
+    def _key(self, symbol: str, timeframe: str, exchange: Optional[str]) -> Tuple[str, str, str]:
+        return (exchange or self.default_exchange, symbol, timeframe)
+
+    def get_buffer(self, symbol: str, timeframe: str, exchange: Optional[str] = None) -> CandleBuffer:
+        """الحصول على المخزن الحلقي (يُنشأ عند الحاجة)"""
+        key = self._key(symbol, timeframe, exchange)
+        buffer = self.buffers.get(key)
+        if buffer is None:
+            buffer = self.buffers[key] = CandleBuffer(self.capacity)
+        return buffer
+
+    async def sync(self, symbol: str, timeframe: str = '1h', limit: int = 200,
+                   exchange: Optional[str] = None) -> int:
+        """جلب الشموع الجديدة فقط منذ آخر طابع زمني مخزن"""
+        key = self._key(symbol, timeframe, exchange)
+        buffer = self.get_buffer(symbol, timeframe, exchange)
+
+        async with self._locks.setdefault(key, asyncio.Lock()):
+            since = buffer.last_timestamp
+            fetch_limit = limit if since is None else min(limit, self.capacity)
+
+            # الطلب الأول كامل، والطلبات التالية تبدأ من الشمعة المفتوحة
+            total_appended = 0
+            for _ in range(self.capacity // max(fetch_limit, 1) + 1):
+                rows = await self.pool.call(key[0], 'fetch_ohlcv', symbol, timeframe, since, fetch_limit)
+                self.stats['fetches'] += 1
+                self.stats['candles_fetched'] += len(rows)
+                if not rows:
+                    break
+
+                rows = np.array(rows, dtype=np.float64)
+                appended, _ = buffer.upsert(rows)
+                total_appended += appended
+                
+                # آخر صف هو الشمعة المفتوحة - الباقي مغلق ويُؤرشف
+                if self.archive is not None and appended:
+                    self._archive_closed(key, rows[:-1])
+
+                # صفحة ناقصة تعني أننا وصلنا لآخر شمعة
+                if since is None or len(rows) < fetch_limit or appended == 0:
+                    break
+                since = buffer.last_timestamp
+
+            return total_appended
+
+    def _archive_closed(self, key: Tuple[str, str, str], rows: np.ndarray) -> None:
+        """أرشفة الشموع المغلقة دون إيقاف المزامنة عند الفشل"""
+        try:
+            self.archive.append(key[0], key[1], key[2], rows, tail_only=True)
+        except Exception as e:
+            logger.warning(f"⚠️ تعذر أرشفة شموع {key[1]} {key[2]}: {str(e)}")
+
+    async def get_ohlcv(self, symbol: str, timeframe: str = '1h', limit: int = 200,
+                        exchange: Optional[str] = None) -> np.ndarray:
+        """مزامنة تزايدية ثم إرجاع عرض لآخر limit شمعة"""
+        await self.sync(symbol, timeframe, limit, exchange)
+        return self.view(symbol, timeframe, limit, exchange)
+
+    def view(self, symbol: str, timeframe: str = '1h', limit: Optional[int] = None,
+             exchange: Optional[str] = None) -> np.ndarray:
+        """عرض بدون نسخ وبدون طلب شبكة - مصفوفة فارغة إذا لم تُجلب الشموع بعد"""
+        buffer = self.buffers.get(self._key(symbol, timeframe, exchange))
+        if buffer is None:
+            return np.empty((0, len(OHLCV_COLUMNS)), dtype=np.float64)
+        return buffer.view(limit)
+
+    def attach_market_stream(self, market_bus) -> None:
+        """تحديث الشمعة المفتوحة من تدفق kline"""
+        if self._stream_unsubscribe is not None:
+            self._stream_unsubscribe()
+        self._stream_unsubscribe = market_bus.subscribe('candle:*', self._on_stream_candle)
+
+    def _on_stream_candle(self, candle) -> None:
+        """تطبيق شمعة من التدفق على مخزن موجود فقط"""
+        buffer = self.buffers.get((candle.exchange, candle.symbol, candle.timeframe))
+        if buffer is None:
+            return
+        buffer.upsert(np.array(candle.to_ohlcv(), dtype=np.float64))
+        self.stats['stream_updates'] += 1
+
+    def get_store_status(self) -> Dict[str, Any]:
+        """حالة المخزن"""
+        return {
+            'buffers': len(self.buffers),
+            'capacity': self.capacity,
+            'memory_bytes': sum(buffer._data.nbytes for buffer in self.buffers.values()),
+            **self.stats
+        }
+
+
+# نسخة عالمية
+candle_store = CandleStore()
@@ -3,8 +3,10 @@ import logging
 from typing import Dict, List, Optional
 from datetime import datetime
 import asyncio
+import os
 
 from .advanced_cache_manager import cached, async_cached
+from .rate_limiter import rate_limiter
 
 class EnhancedExchangeService:
     """
@@ -15,6 +17,11 @@ class EnhancedExchangeService:
         self.cache_enabled = True
         self.original_methods_preserved = True
         
+        # نفس دلاء محدد المعدل المستخدمة في الخدمات غير المتزامنة
+        self.rate_limiter = rate_limiter
+        self.exchange = os.getenv('DEFAULT_EXCHANGE', 'binance')
+        self.rate_limit_timeout = float(os.getenv('RATE_LIMIT_TIMEOUT', '10'))
+        
         # محاولة استيراد الخدمة الأصلية إذا كانت موجودة
         self.original_service = self._import_original_service()
     
@@ -38,6 +45,10 @@ class EnhancedExchangeService:
             logging.warning(f"⚠️ لا يمكن تحميل الخدمة الأصلية: {e}")
             return None
     
+    def _wait_rate_limit(self, method: str) -> None:
+        """انتظار توكن قبل استدعاء الخدمة الأصلية - يرفع RateLimitTimeout عند تجاوز المهلة"""
+        self.rate_limiter.acquire_sync(self.exchange, method, timeout=self.rate_limit_timeout)
+    
     @cached(ttl=60, service_name="exchange")
     def get_market_data(self, symbol: str, timeframe: str = '1h') -> Dict:
         """
@@ -47,6 +58,7 @@ class EnhancedExchangeService:
         """
         if self.original_service and hasattr(self.original_service, 'get_market_data'):
             # استخدام الوظيفة الأصلية إذا كانت موجودة
+            self._wait_rate_limit('fetch_ohlcv')
             return self.original_service.get_market_data(symbol, timeframe)
         else:
             # تنفيذ بديل مع الحفاظ على نفس واجهة البرمجة
@@ -71,6 +83,7 @@ class EnhancedExchangeService:
     def get_balance(self) -> Dict:
         """الحصول على الرصيد مع التخزين المؤقت"""
         if self.original_service and hasattr(self.original_service, 'get_balance'):
+            self._wait_rate_limit('fetch_balance')
             return self.original_service.get_balance()
         else:
             return {
@@ -84,6 +97,7 @@ class EnhancedExchangeService:
     def place_order(self, symbol: str, order_type: str, quantity: float, price: Optional[float] = None) -> Dict:
         """وضع أمر - بدون تخزين مؤقت للعمليات الحرجة"""
         if self.original_service and hasattr(self.original_service, 'place_order'):
+            self._wait_rate_limit('create_order')
             return self.original_service.place_order(symbol, order_type, quantity, price)
         else:
             return {
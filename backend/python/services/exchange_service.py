@@ -6,17 +6,25 @@
 import os
 import logging
 import asyncio
-import aiohttp
-import hmac
-import hashlib
+import base64
 import json
 import time
 from typing import Dict, List, Optional, Any, Union
-from decimal import Decimal
 from datetime import datetime, timedelta
 from functools import wraps
 import cachetools
 
+from services.async_exchange_pool import exchange_pool, normalize_ticker
+from services.market_registry import market_registry
+from services.fixed_point import FixedPoint
+from services.candle_store import candle_store
+from services.order_pipeline import OrderPipeline, OrderAction, OrderTicket
+from services.rate_limiter import rate_limiter, RateLimitTimeout
+from services.resilience import resilience, CircuitOpenError, DeadlineExceeded, TRANSIENT_ERRORS, remaining_time
+from services.http_client import http_client
+from services.arbitrage_scanner import arbitrage_scanner
+from services.fast_lane import fast_lane, get_signer
+
 # إعداد المسجل المتقدم
 logger = logging.getLogger(__name__)
 
@@ -24,41 +32,27 @@ class SecurityManager:
     """مدير الأمان للتحقق من الطلبات والتوقيعات"""
     
     def __init__(self):
-        self.request_count = 0
-        self.last_reset = time.time()
+        # الحدود في محدد المعدل المشترك لكل منصة وفئة نقاط نهاية
+        self.rate_limiter = rate_limiter
     
     def generate_signature(self, exchange: str, data: Dict, secret: str) -> str:
         """إنشاء توقيع آمن للطلبات"""
         try:
             if exchange == 'binance':
                 query_string = '&'.join([f"{k}={v}" for k, v in sorted(data.items())])
-                return hmac.new(
-                    secret.encode('utf-8'),
-                    query_string.encode('utf-8'),
-                    hashlib.sha256
-                ).hexdigest()
+                return get_signer(secret).hexdigest(query_string)
             
             elif exchange == 'bybit':
                 # تنفيذ توقيع Bybit
                 timestamp = str(int(time.time() * 1000))
                 signature_payload = f"{timestamp}{data.get('api_key', '')}{data.get('recv_window', '5000')}"
-                return hmac.new(
-                    secret.encode('utf-8'),
-                    signature_payload.encode('utf-8'),
-                    hashlib.sha256
-                ).hexdigest()
+                return get_signer(secret).hexdigest(signature_payload)
             
             elif exchange == 'kucoin':
                 # تنفيذ توقيع KuCoin
                 timestamp = str(int(time.time() * 1000))
                 signature_payload = f"{timestamp}GET/api/v1/accounts"
-                return base64.b64encode(
-                    hmac.new(
-                        secret.encode('utf-8'),
-                        signature_payload.encode('utf-8'),
-                        hashlib.sha256
-                    ).digest()
-                ).decode()
+                return base64.b64encode(get_signer(secret).digest(signature_payload)).decode()
                 
             else:
                 logger.warning(f"التوقيع غير مدعوم للمنصة: {exchange}")
@@ -68,18 +62,29 @@ class SecurityManager:
             logger.error(f"خطأ في إنشاء التوقيع لـ {exchange}: {e}")
             return ""
     
-    def check_rate_limit(self) -> bool:
-        """التحقق من حدود معدل الطلبات"""
-        current_time = time.time()
-        if current_time - self.last_reset > 60:  # إعادة التعيين كل دقيقة
-            self.request_count = 0
-            self.last_reset = current_time
-        
-        if self.request_count >= 50:  # 50 طلب في الدقيقة
-            return False
-        
-        self.request_count += 1
-        return True
+    def check_rate_limit(self, exchange: str = 'default', method: str = 'public') -> bool:
+        """التحقق من حدود معدل الطلبات بدون انتظار"""
+        return self.rate_limiter.try_acquire(exchange, method)
+    
+    async def wait_rate_limit(self, exchange: str, method: str = 'public',
+                              timeout: Optional[float] = None) -> Optional[Dict]:
+        """انتظار توكن حتى المهلة - يعيد قاموس خطأ عند تجاوزها"""
+        try:
+            await self.rate_limiter.acquire(exchange, method, timeout=timeout)
+            return None
+        except RateLimitTimeout as e:
+            return self.rate_limit_error(exchange, e)
+
+    @staticmethod
+    def rate_limit_error(exchange: str, error: RateLimitTimeout) -> Dict:
+        """قاموس خطأ تجاوز حد الطلبات"""
+        logger.warning(f"⚠️ {str(error)}")
+        return {
+            'error': 'تم تجاوز حد الطلبات، يرجى الانتظار',
+            'retry_after': error.wait,
+            'exchange': exchange,
+            'success': False
+        }
 
 class PerformanceCache:
     """ذاكرة التخزين المؤقت للأداء"""
@@ -89,12 +94,12 @@ class PerformanceCache:
         self.balance_cache = cachetools.TTLCache(maxsize=100, ttl=30)  # 30 ثانية للرصيد
         self.order_cache = cachetools.TTLCache(maxsize=500, ttl=60)   # 60 ثانية للأوامر
     
-    def get_cached_price(self, exchange: str, symbol: str) -> Optional[Decimal]:
+    def get_cached_price(self, exchange: str, symbol: str) -> Optional[FixedPoint]:
         """الحصول على السعر المخبأ"""
         key = f"{exchange}:{symbol}"
         return self.price_cache.get(key)
     
-    def set_cached_price(self, exchange: str, symbol: str, price: Decimal) -> None:
+    def set_cached_price(self, exchange: str, symbol: str, price: FixedPoint) -> None:
         """تخزين السعر في الذاكرة المؤقتة"""
         key = f"{exchange}:{symbol}"
         self.price_cache[key] = price
@@ -107,22 +112,48 @@ class PerformanceCache:
         """تخزين الرصيد في الذاكرة المؤقتة"""
         self.balance_cache[exchange] = balance
 
-def async_retry(max_retries: int = 3, delay: float = 1.0):
-    """مصحح الأخطاء مع إعادة المحاولة للدوال غير المتزامنة"""
+def resilient(retries: Optional[int] = None, hedge: bool = False, rate_method: Optional[str] = None):
+    """تنفيذ دالة منصة عبر قاطع الدائرة ضمن ميزانية وقت المستدعي مع تأخير عشوائي بين المحاولات
+
+    الدالة ترفع الأخطاء العابرة (شبكة/مهلة) ليعيد المصحح المحاولة ويحسبها على القاطع،
+    وبعد استنفاد المحاولات تتحول لقاموس خطأ. rate_method ينتظر توكن حد المعدل قبل كل محاولة.
+    """
     def decorator(func):
         @wraps(func)
-        async def wrapper(*args, **kwargs):
-            last_exception = None
-            for attempt in range(max_retries):
-                try:
-                    return await func(*args, **kwargs)
-                except Exception as e:
-                    last_exception = e
-                    logger.warning(f"المحاولة {attempt + 1}/{max_retries} فشلت: {e}")
-                    if attempt < max_retries - 1:
-                        await asyncio.sleep(delay * (2 ** attempt))  # Exponential backoff
-            logger.error(f"جميع المحاولات فشلت: {last_exception}")
-            raise last_exception
+        async def wrapper(self, exchange: str, *args, **kwargs):
+            hedge_delay = resilience.resilience_config['hedge_delay'] if hedge else None
+
+            def wait_token():
+                timeout = self.security_config['rate_limit_timeout']
+                remaining = remaining_time()
+                return self.security_manager.rate_limiter.acquire(
+                    exchange, rate_method, timeout=timeout if remaining is None else min(timeout, remaining)
+                )
+
+            try:
+                return await resilience.call(
+                    exchange, lambda: func(self, exchange, *args, **kwargs),
+                    idempotent=True, retries=retries, hedge_delay=hedge_delay,
+                    acquire=wait_token if rate_method else None
+                )
+            except RateLimitTimeout as e:
+                return self.security_manager.rate_limit_error(exchange, e)
+            except (CircuitOpenError, DeadlineExceeded) as e:
+                logger.warning(f"⚠️ {str(e)}")
+                return {
+                    'exchange': exchange,
+                    'error': str(e),
+                    'circuit_state': resilience.get_breaker(exchange).state.value,
+                    'success': False
+                }
+            except TRANSIENT_ERRORS as e:
+                logger.error(f"❌ فشل {func.__name__} على {exchange} بعد إعادة المحاولة: {e}")
+                return {
+                    'exchange': exchange,
+                    'error': str(e),
+                    'circuit_state': resilience.get_breaker(exchange).state.value,
+                    'success': False
+                }
         return wrapper
     return decorator
 
@@ -159,6 +190,8 @@ class AdvancedExchangeService:
     def __init__(self):
         self.security_manager = SecurityManager()
         self.performance_cache = PerformanceCache()
+        # خط أوامر خاص بالمحاكاة - الخط المشترك يحمل منفذات ccxt الحقيقية لمحرك التداول
+        self.order_pipeline = OrderPipeline()
         self.session = None
         self.setup_exchanges()
         self.setup_secure_config()
@@ -194,6 +227,7 @@ class AdvancedExchangeService:
             # إعدادات الأمان
             self.security_config = {
                 'rate_limit_delay': float(os.getenv('RATE_LIMIT_DELAY', '0.1')),
+                'rate_limit_timeout': float(os.getenv('RATE_LIMIT_TIMEOUT', '10')),
                 'max_retries': int(os.getenv('MAX_RETRIES', '3')),
                 'timeout': int(os.getenv('REQUEST_TIMEOUT', '30')),
                 'enable_caching': os.getenv('ENABLE_CACHING', 'true').lower() == 'true'
@@ -217,6 +251,7 @@ class AdvancedExchangeService:
         """إعداد اتصالات المنصات مع إدارة الأخطاء"""
         try:
             self.available_exchanges = ['binance', 'bybit', 'kucoin', 'gateio', 'huobi', 'mexc', 'okx']
+            self.default_exchange = os.getenv('DEFAULT_EXCHANGE', 'binance')
             self.exchange_status = {exchange: 'connected' for exchange in self.available_exchanges}
             logger.info(f"✅ تم إعداد {len(self.available_exchanges)} منصة تداول")
         except Exception as e:
@@ -224,22 +259,25 @@ class AdvancedExchangeService:
             self.available_exchanges = []
 
     async def __aenter__(self):
-        """إدارة السياق لفتح الجلسة"""
-        self.session = aiohttp.ClientSession(
-            timeout=aiohttp.ClientTimeout(total=self.security_config['timeout'])
-        )
+        """إدارة السياق - جلسة HTTP المشتركة للعملية بدلاً من جلسة لكل سياق"""
+        self.session = http_client.get_session()
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        """إدارة السياق لإغلاق الجلسة"""
-        if self.session:
-            await self.session.close()
+        """إدارة السياق - الجلسة المشتركة تبقى مفتوحة لإعادة استخدام الاتصالات"""
+        self.session = None
+        await self.order_pipeline.close()
 
-    @async_retry(max_retries=3, delay=1.0)
-    @validate_exchange_params
     async def get_balance(self, exchange: str) -> Dict:
         """الحصول على الرصيد مع التخزين المؤقت وإعادة المحاولة"""
         try:
+            if exchange not in self.available_exchanges:
+                return {
+                    'error': f'المنصة غير مدعومة: {exchange}',
+                    'valid_exchanges': self.available_exchanges,
+                    'success': False
+                }
+            
             # التحقق من التخزين المؤقت أولاً
             if self.security_config['enable_caching']:
                 cached_balance = self.performance_cache.get_cached_balance(exchange)
@@ -247,33 +285,11 @@ class AdvancedExchangeService:
                     logger.debug(f"📊 استخدام الرصيد المخبأ لـ {exchange}")
                     return {**cached_balance, 'cached': True}
             
-            # التحقق من حدود المعدل
-            if not self.security_manager.check_rate_limit():
-                return {
-                    'error': 'تم تجاوز حد الطلبات، يرجى الانتظار',
-                    'exchange': exchange,
-                    'success': False
-                }
-            
-            # محاكاة الحصول على الرصيد
-            await asyncio.sleep(0.1)
-            
-            balance_data = {
-                'exchange': exchange,
-                'total_balance': Decimal('1000.00'),
-                'available_balance': Decimal('800.00'),
-                'locked_balance': Decimal('200.00'),
-                'currencies': [
-                    {'asset': 'BTC', 'free': '0.5', 'locked': '0.1', 'total': '0.6'},
-                    {'asset': 'ETH', 'free': '5.0', 'locked': '1.0', 'total': '6.0'},
-                    {'asset': 'USDT', 'free': '500.0', 'locked': '100.0', 'total': '600.0'}
-                ],
-                'timestamp': datetime.now().isoformat(),
-                'success': True
-            }
+            # إعادة المحاولة وانتظار التوكن داخل _fetch_balance
+            balance_data = await self._fetch_balance(exchange)
             
             # تخزين في الذاكرة المؤقتة
-            if self.security_config['enable_caching']:
+            if self.security_config['enable_caching'] and balance_data.get('success'):
                 self.performance_cache.set_cached_balance(exchange, balance_data)
             
             return balance_data
@@ -283,59 +299,58 @@ class AdvancedExchangeService:
             return {
                 'exchange': exchange,
                 'error': str(e),
-                'total_balance': Decimal('0.00'),
+                'total_balance': '0.00',
                 'success': False
             }
 
-    @async_retry(max_retries=3, delay=1.0)
-    @validate_exchange_params
+    @resilient(retries=2, rate_method='fetch_balance')
+    async def _fetch_balance(self, exchange: str) -> Dict:
+        """طلب الرصيد من المنصة - الأخطاء ترتفع للمصحح"""
+        # محاكاة الحصول على الرصيد
+        await asyncio.sleep(0.1)
+        
+        available_balance = FixedPoint.parse('800.00')
+        locked_balance = FixedPoint.parse('200.00')
+        
+        return {
+            'exchange': exchange,
+            'total_balance': str(available_balance + locked_balance),
+            'available_balance': str(available_balance),
+            'locked_balance': str(locked_balance),
+            'currencies': [
+                {'asset': 'BTC', 'free': '0.5', 'locked': '0.1', 'total': '0.6'},
+                {'asset': 'ETH', 'free': '5.0', 'locked': '1.0', 'total': '6.0'},
+                {'asset': 'USDT', 'free': '500.0', 'locked': '100.0', 'total': '600.0'}
+            ],
+            'timestamp': datetime.now().isoformat(),
+            'success': True
+        }
+
     async def create_order(self, exchange: str, symbol: str, side: str, 
                           order_type: str, quantity: float, price: Optional[float] = None,
-                          **kwargs) -> Dict:
-        """إنشاء أمر تداول مع التحقق المتقدم من الصحة"""
+                          client_order_id: Optional[str] = None, **kwargs) -> Dict:
+        """إنشاء أمر تداول مع التحقق المتقدم من الصحة - يُرسل عبر خط الأوامر"""
         try:
-            # التحقق من حدود المعدل
-            if not self.security_manager.check_rate_limit():
+            if exchange not in self.available_exchanges:
                 return {
-                    'error': 'تم تجاوز حد الطلبات، يرجى الانتظار',
-                    'exchange': exchange,
+                    'error': f'المنصة غير مدعومة: {exchange}',
+                    'valid_exchanges': self.available_exchanges,
                     'success': False
                 }
             
             # التحقق من المدخلات
-            validation_result = self._validate_order_params(symbol, side, order_type, quantity, price)
+            validation_result = self._validate_order_params(symbol, side, order_type, quantity, price, exchange)
             if not validation_result['valid']:
                 return {**validation_result, 'exchange': exchange}
             
-            # محاكاة إنشاء الأمر
-            await asyncio.sleep(0.2)
+            # إعادة المحاولة داخل الخط بنفس معرف العميل (لا أوامر مكررة)
+            self._ensure_order_executor(exchange)
+            order_data = await self.order_pipeline.create_order(
+                exchange, symbol, side, order_type, quantity, price,
+                extra=kwargs, client_order_id=client_order_id
+            )
             
-            order_id = f'ORDER_{exchange.upper()}_{int(time.time())}'
-            
-            order_data = {
-                'exchange': exchange,
-                'order_id': order_id,
-                'symbol': symbol,
-                'side': side.upper(),
-                'type': order_type.upper(),
-                'quantity': quantity,
-                'price': price,
-                'status': 'filled',
-                'executed_quantity': quantity,
-                'cummulative_quote_quantity': quantity * (price or 1),
-                'transact_time': int(time.time() * 1000),
-                'fills': [
-                    {
-                        'price': str(price or 1),
-                        'qty': str(quantity),
-                        'commission': '0.001',
-                        'commissionAsset': symbol[-4:] if symbol.endswith('USDT') else 'USDT'
-                    }
-                ],
-                'success': True
-            }
-            
-            logger.info(f"✅ تم إنشاء أمر {order_id} على {exchange}")
+            logger.info(f"✅ تم إنشاء أمر {order_data['id']} على {exchange}")
             return order_data
             
         except Exception as e:
@@ -347,8 +362,79 @@ class AdvancedExchangeService:
                 'success': False
             }
 
+    def _ensure_order_executor(self, exchange: str) -> None:
+        """تسجيل منفذ المحاكاة لهذه المنصة في خط أوامر الخدمة"""
+        if not self.order_pipeline.has_executor(exchange):
+            self.order_pipeline.register_executor(exchange, self._execute_order_ticket)
+
+    async def _execute_order_ticket(self, ticket: OrderTicket) -> Dict:
+        """منفذ الأوامر (محاكاة) - يستدعيه عمال خط الأوامر
+
+        النتيجة بشكل ccxt (id و clientOrderId) مثل منفذات المنصات الحقيقية،
+        مع order_id و client_order_id للتوافق مع ردود الواجهة الحالية.
+        """
+        exchange, symbol, params = ticket.exchange, ticket.symbol, ticket.params
+        
+        # حد الأوامر يُطبق عند الإرسال الفعلي داخل عامل الخط
+        await self.security_manager.rate_limiter.acquire(
+            exchange, 'cancel_order' if ticket.action == OrderAction.CANCEL else 'create_order',
+            timeout=self.security_config['rate_limit_timeout']
+        )
+        
+        if ticket.action == OrderAction.CANCEL:
+            await asyncio.sleep(0.1)
+            return {
+                'id': params['order_id'], 'clientOrderId': ticket.client_order_id, 'status': 'canceled',
+                'order_id': params['order_id'], 'client_order_id': ticket.client_order_id
+            }
+        
+        if ticket.action == OrderAction.REPLACE:
+            # إلغاء الأمر الأصلي ثم إنشاء البديل في نفس خانة التزامن
+            await asyncio.sleep(0.1)
+        
+        side, order_type = params['side'], params['type']
+        
+        # الكمية والسعر بالنقطة الثابتة بدقة الرمز - نصوص دقيقة في الرد
+        precision = market_registry.get_precision(exchange, symbol)
+        quantity = precision.amount(params['amount'])
+        price = precision.price(params['price']) if params.get('price') else None
+        
+        # محاكاة إنشاء الأمر
+        await asyncio.sleep(0.2)
+        
+        order_id = f'ORDER_{exchange.upper()}_{int(time.time())}'
+        order_data = {
+            'id': order_id,
+            'clientOrderId': ticket.client_order_id,
+            'exchange': exchange,
+            'order_id': order_id,
+            'client_order_id': ticket.client_order_id,
+            'symbol': symbol,
+            'side': side.upper(),
+            'type': order_type.upper(),
+            'quantity': quantity.to_float(),
+            'price': price.to_float() if price is not None else None,
+            'status': 'filled',
+            'executed_quantity': quantity.to_float(),
+            'cummulative_quote_quantity': (quantity * price).to_float() if price is not None else quantity.to_float(),
+            'transact_time': int(time.time() * 1000),
+            'fills': [
+                {
+                    'price': price.to_string() if price is not None else '1',
+                    'qty': quantity.to_string(),
+                    'commission': '0.001',
+                    'commissionAsset': symbol[-4:] if symbol.endswith('USDT') else 'USDT'
+                }
+            ],
+            'success': True
+        }
+        
+        if ticket.action == OrderAction.REPLACE:
+            order_data['replaced_order_id'] = params['order_id']
+        return order_data
+
     def _validate_order_params(self, symbol: str, side: str, order_type: str, 
-                             quantity: float, price: Optional[float]) -> Dict:
+                             quantity: float, price: Optional[float], exchange: str = None) -> Dict:
         """التحقق من معاملات الأمر"""
         errors = []
         
@@ -367,6 +453,10 @@ class AdvancedExchangeService:
         if order_type.lower() in ['limit', 'stop_limit'] and (price is None or price <= 0):
             errors.append("السعر مطلوب للأوامر المحددة")
         
+        # الدقة والحدود من سجل الأسواق المحمل مسبقاً - بدون طلب شبكة
+        if not errors and exchange:
+            errors.extend(market_registry.validate_order(exchange, symbol, quantity, price))
+        
         return {
             'valid': len(errors) == 0,
             'errors': errors,
@@ -375,7 +465,7 @@ class AdvancedExchangeService:
 
     # === جميع الوظائف الأصلية محفوظة مع تحسينات ===
     
-    @async_retry(max_retries=2, delay=1.0)
+    @resilient(retries=1, rate_method='fetch_order')
     async def get_order(self, exchange: str, order_id: str, symbol: str) -> Dict:
         """الحصول على حالة أمر معين"""
         try:
@@ -396,6 +486,9 @@ class AdvancedExchangeService:
                 'transact_time': int(time.time() * 1000),
                 'success': True
             }
+        except TRANSIENT_ERRORS:
+            # إعادة المحاولة والقاطع في المصحح
+            raise
         except Exception as e:
             logger.error(f"❌ خطأ في الحصول على الأمر من {exchange}: {e}")
             return {
@@ -404,18 +497,18 @@ class AdvancedExchangeService:
                 'success': False
             }
 
-    @async_retry(max_retries=2, delay=1.0)
     async def cancel_order(self, exchange: str, order_id: str, symbol: str) -> Dict:
-        """إلغاء أمر معين"""
+        """إلغاء أمر معين - عبر خط الأوامر (أمر ما زال في الطابور يُلغى محلياً)"""
         try:
-            await asyncio.sleep(0.1)
-            
+            self._ensure_order_executor(exchange)
+            result = await self.order_pipeline.cancel_order(exchange, symbol, order_id)
             return {
                 'exchange': exchange,
                 'order_id': order_id,
                 'symbol': symbol,
                 'status': 'canceled',
-                'client_order_id': f'client_{order_id}',
+                'client_order_id': result.get('clientOrderId') or order_id,
+                'local': result.get('local', False),
                 'success': True
             }
         except Exception as e:
@@ -426,7 +519,27 @@ class AdvancedExchangeService:
                 'success': False
             }
 
-    @async_retry(max_retries=2, delay=1.0)
+    async def replace_order(self, exchange: str, order_id: str, symbol: str, side: str,
+                            order_type: str, quantity: float, price: Optional[float] = None) -> Dict:
+        """إلغاء ثم استبدال أمر - الاستبدالات المتتالية لنفس الأمر تُدمج قبل الإرسال"""
+        try:
+            validation_result = self._validate_order_params(symbol, side, order_type, quantity, price, exchange)
+            if not validation_result['valid']:
+                return {**validation_result, 'exchange': exchange}
+            
+            self._ensure_order_executor(exchange)
+            return await self.order_pipeline.replace_order(
+                exchange, symbol, order_id, side, order_type, quantity, price
+            )
+        except Exception as e:
+            logger.error(f"❌ خطأ في استبدال الأمر على {exchange}: {e}")
+            return {
+                'exchange': exchange,
+                'error': str(e),
+                'success': False
+            }
+
+    @resilient(retries=1, rate_method='fetch_open_orders')
     async def get_open_orders(self, exchange: str, symbol: str = None) -> Dict:
         """الحصول على الأوامر المفتوحة"""
         try:
@@ -452,6 +565,8 @@ class AdvancedExchangeService:
                 'count': len(orders),
                 'success': True
             }
+        except TRANSIENT_ERRORS:
+            raise
         except Exception as e:
             logger.error(f"❌ خطأ في الحصول على الأوامر المفتوحة من {exchange}: {e}")
             return {
@@ -460,70 +575,194 @@ class AdvancedExchangeService:
                 'success': False
             }
 
-    @async_retry(max_retries=2, delay=0.5)
     async def get_ticker_price(self, exchange: str, symbol: str) -> Dict:
         """الحصول على سعر التداول الحالي مع التخزين المؤقت"""
         try:
             # التحقق من التخزين المؤقت أولاً
             if self.security_config['enable_caching']:
                 cached_price = self.performance_cache.get_cached_price(exchange, symbol)
-                if cached_price:
+                if cached_price is not None:
                     return {
                         'exchange': exchange,
                         'symbol': symbol,
-                        'price': str(cached_price),
+                        'price': cached_price.to_string(),
                         'timestamp': int(time.time() * 1000),
                         'cached': True,
                         'success': True
                     }
             
-            await asyncio.sleep(0.05)
+            price_data = await self._fetch_ticker_price(exchange, symbol)
             
-            # محاكاة أسعار مختلفة
-            base_prices = {
-                'BTCUSDT': 50000.00,
-                'ETHUSDT': 3000.00,
-                'ADAUSDT': 0.50,
-                'DOTUSDT': 7.00
-            }
+            # تخزين في الذاكرة المؤقتة
+            if self.security_config['enable_caching'] and price_data.get('success'):
+                self.performance_cache.set_cached_price(exchange, symbol, FixedPoint.parse(price_data['price']))
             
-            base_price = base_prices.get(symbol, 100.00)
-            variation = (time.time() % 10) / 100
-            current_price = base_price * (1 + variation)
+            return price_data
             
-            price_data = {
+        except Exception as e:
+            logger.error(f"❌ خطأ في الحصول على السعر من {exchange}: {e}")
+            return {
                 'exchange': exchange,
-                'symbol': symbol,
-                'price': str(round(current_price, 2)),
-                'timestamp': int(time.time() * 1000),
-                'success': True
+                'error': str(e),
+                'success': False
             }
+
+    @resilient(retries=1, hedge=True, rate_method='fetch_ticker')
+    async def _fetch_ticker_price(self, exchange: str, symbol: str) -> Dict:
+        """طلب السعر من المنصة - الأخطاء ترتفع للمصحح"""
+        await asyncio.sleep(0.05)
+        
+        # محاكاة أسعار مختلفة
+        base_prices = {
+            'BTCUSDT': 50000.00,
+            'ETHUSDT': 3000.00,
+            'ADAUSDT': 0.50,
+            'DOTUSDT': 7.00
+        }
+        
+        base_price = base_prices.get(symbol, 100.00)
+        variation = (time.time() % 10) / 100
+        current_price = FixedPoint.from_float(base_price * (1 + variation), 2)
+        
+        return {
+            'exchange': exchange,
+            'symbol': symbol,
+            'price': current_price.to_string(),
+            'timestamp': int(time.time() * 1000),
+            'success': True
+        }
+
+    def _ensure_pool_exchange(self, exchange: str) -> None:
+        """تسجيل المنصة في مجمع الاتصالات غير المتزامن عند أول استخدام"""
+        if exchange_pool.is_registered(exchange):
+            return
+        
+        exchange_config = self.config.get(exchange, {})
+        pool_config = {
+            'enableRateLimit': True,
+            'timeout': self.security_config['timeout'] * 1000
+        }
+        if exchange_config.get('api_key'):
+            pool_config['apiKey'] = exchange_config['api_key']
+            pool_config['secret'] = exchange_config.get('api_secret', '')
+        if exchange_config.get('passphrase'):
+            pool_config['password'] = exchange_config['passphrase']
+        
+        exchange_pool.register_exchange(exchange, pool_config)
+
+    async def get_market_snapshot(self, symbols: List[str], exchange: str = None) -> Dict[str, Dict]:
+        """لقطة سوق مجمعة لعدة رموز بطلب fetch_tickers واحد"""
+        exchange = exchange or self.default_exchange
+        try:
+            self._ensure_pool_exchange(exchange)
+            tickers = await exchange_pool.fetch_tickers(exchange, symbols)
             
-            # تخزين في الذاكرة المؤقتة
-            if self.security_config['enable_caching']:
-                self.performance_cache.set_cached_price(exchange, symbol, Decimal(str(current_price)))
+            snapshot = {}
+            for symbol, ticker in tickers.items():
+                snapshot[symbol] = normalize_ticker(symbol, ticker)
+                
+                # تحديث ذاكرة الأسعار لاستخدامها في get_ticker_price
+                if self.security_config['enable_caching']:
+                    self.performance_cache.set_cached_price(
+                        exchange, symbol, market_registry.get_precision(exchange, symbol).price(snapshot[symbol]['price'])
+                    )
             
-            return price_data
+            return snapshot
             
         except Exception as e:
-            logger.error(f"❌ خطأ في الحصول على السعر من {exchange}: {e}")
+            logger.error(f"❌ خطأ في جلب لقطة السوق من {exchange}: {e}")
+            return {}
+
+    def _register_all_exchanges(self) -> List[str]:
+        """تسجيل كل المنصات المتاحة في المجمع - تجاهل غير المدعومة في نسخة ccxt المثبتة"""
+        registered = []
+        for exchange in self.available_exchanges:
+            try:
+                self._ensure_pool_exchange(exchange)
+                registered.append(exchange)
+            except ValueError as e:
+                logger.debug(f"تخطي {exchange}: {e}")
+        return registered
+
+    async def scan_arbitrage(self, symbols: Optional[List[str]] = None) -> Dict:
+        """مسح واحد لفروق الأسعار بين كل المنصات المتاحة بطلبات متزامنة"""
+        try:
+            exchanges = self._register_all_exchanges()
+            opportunities = await arbitrage_scanner.scan(symbols, exchanges)
+            return {
+                'exchanges': exchanges,
+                'opportunities': [opportunity.to_dict() for opportunity in opportunities],
+                'scan_ms': arbitrage_scanner.stats['last_scan_ms'],
+                'success': True
+            }
+        except Exception as e:
+            logger.error(f"❌ خطأ في مسح المراجحة: {e}")
             return {
-                'exchange': exchange,
                 'error': str(e),
                 'success': False
             }
 
+    def start_arbitrage_scanner(self, symbols: Optional[List[str]] = None) -> None:
+        """بدء المسح الدوري (مسح كامل كل ثانية افتراضياً)"""
+        arbitrage_scanner.start(symbols, self._register_all_exchanges())
+
+    async def start_fast_lane(self, symbols: List[str], exchange: str = None) -> int:
+        """رصيد المنصة وقوالب المسار السريع للرموز بعد تحميل فهرس الأسواق"""
+        exchange = exchange or self.default_exchange
+        if not market_registry.is_loaded(exchange):
+            await self.load_markets(exchange)
+        await fast_lane.refresh_balance(exchange)
+        prepared = fast_lane.prepare(exchange, symbols)
+        fast_lane.start()
+        return prepared
+
+    async def load_markets(self, exchange: str = None) -> int:
+        """تحميل سجل الأسواق للمنصة مرة واحدة وبدء تحديثه في الخلفية"""
+        exchange = exchange or self.default_exchange
+        self._ensure_pool_exchange(exchange)
+        count = await market_registry.load(exchange)
+        market_registry.start_background_refresh(exchange)
+        return count
+
+    async def get_active_symbols(self, exchange: str = None, quote: str = 'USDT') -> List[str]:
+        """الرموز النشطة من سجل الأسواق"""
+        exchange = exchange or self.default_exchange
+        try:
+            if not market_registry.is_loaded(exchange):
+                await self.load_markets(exchange)
+            return market_registry.active_symbols(exchange, quote=quote)
+        except Exception as e:
+            logger.error(f"❌ خطأ في جلب الرموز النشطة من {exchange}: {e}")
+            return []
+
+    async def fetch_ohlcv(self, symbol: str, timeframe: str = '1h', limit: int = 200,
+                          exchange: str = None):
+        """شموع OHLCV من المخزن الحلقي مع جلب الشموع الجديدة فقط"""
+        exchange = exchange or self.default_exchange
+        try:
+            self._ensure_pool_exchange(exchange)
+            return await candle_store.get_ohlcv(symbol, timeframe, limit, exchange)
+        except Exception as e:
+            logger.error(f"❌ خطأ في جلب شموع {symbol} من {exchange}: {e}")
+            # آخر ما هو مخزن أفضل من لا شيء
+            return candle_store.view(symbol, timeframe, limit, exchange)
+
     async def get_exchange_info(self, exchange: str) -> Dict:
-        """الحصول على معلومات المنصة"""
+        """الحصول على معلومات المنصة من سجل الأسواق"""
         try:
-            await asyncio.sleep(0.1)
+            markets = market_registry.markets.get(exchange, {})
+            active_markets = [market for market in markets.values() if market.active]
+            min_notionals = [market.min_notional for market in active_markets if market.min_notional]
             
             info = {
                 'exchange': exchange,
                 'name': exchange.upper(),
                 'status': 'operational',
-                'symbols': ['BTCUSDT', 'ETHUSDT', 'ADAUSDT', 'DOTUSDT', 'XRPUSDT'],
-                'supported_currencies': ['BTC', 'ETH', 'USDT', 'ADA', 'DOT', 'XRP'],
+                'symbols': [market.market_id for market in active_markets],
+                'supported_currencies': sorted({market.base for market in active_markets} |
+                                               {market.quote for market in active_markets}),
+                'markets': {market.market_id: market.to_dict() for market in active_markets},
+                'markets_loaded': market_registry.is_loaded(exchange),
                 'trading_fees': {
                     'maker': 0.001,
                     'taker': 0.001
@@ -534,7 +773,7 @@ class AdvancedExchangeService:
                     'USDT': 1.0
                 },
                 'limits': {
-                    'min_order_value': 10.0,
+                    'min_order_value': min(min_notionals) if min_notionals else 10.0,
                     'max_order_value': 100000.0
                 },
                 'server_time': int(time.time() * 1000),
@@ -577,16 +816,24 @@ class AdvancedExchangeService:
         """فحص صحة جميع المنصات"""
         try:
             health_status = {}
+            breaker_status = {'closed': 'healthy', 'half_open': 'degraded', 'open': 'unhealthy'}
             for exchange in self.available_exchanges:
+                circuit = resilience.get_breaker(exchange).status()
                 health_status[exchange] = {
-                    'status': 'healthy',
+                    'status': breaker_status[circuit['state']],
+                    'circuit': circuit,
                     'response_time': 100 + (hash(exchange) % 100),
                     'last_checked': datetime.now().isoformat()
                 }
             
+            statuses = {status['status'] for status in health_status.values()}
+            overall_status = 'healthy' if statuses <= {'healthy'} else \
+                'unhealthy' if statuses == {'unhealthy'} else 'degraded'
+            
             return {
                 'health_status': health_status,
-                'overall_status': 'healthy',
+                'overall_status': overall_status,
+                'rate_limits': rate_limiter.get_limiter_status()['exchanges'],
                 'timestamp': datetime.now().isoformat(),
                 'success': True
             }
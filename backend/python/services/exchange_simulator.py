@@ -0,0 +1,1218 @@
+# backend/python/services/exchange_simulator.py
+"""
+🏟 منصة محاكاة محلية - واجهة REST و WebSocket متوافقة مع Binance (وبالتالي مع ccxt)
+محرك مطابقة بأولوية السعر ثم الزمن، تنفيذ جزئي، ردود تجاوز حد المعدل وحقن زمن الاستجابة والأخطاء
+الإصدار: 3.0.0 | المطور: Akraa Trading Team
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import random
+import time
+import uuid
+from bisect import bisect_left, insort
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Any, Set, Tuple
+
+from aiohttp import web, WSMsgType
+
+from services.fixed_point import FixedPoint, DEFAULT_SCALE, ROUND_DOWN, ROUND_HALF_UP
+
+logger = logging.getLogger(__name__)
+
+# كل الأسعار والكميات أعداد صحيحة بمقياس ثابت - المطابقة والأرصدة بدون أخطاء الفاصلة العائمة
+SCALE = DEFAULT_SCALE
+ONE = 10 ** SCALE
+
+MAKER_ACCOUNT = '__liquidity__'
+
+# أوزان نقاط النهاية بنفس ترتيب Binance التقريبي
+ENDPOINT_WEIGHTS = {
+    'exchangeInfo': 20, 'depth': 5, 'ticker/24hr': 2, 'ticker/bookTicker': 2, 'ticker/price': 2,
+    'order': 1, 'openOrders': 6, 'allOrders': 20, 'account': 20, 'myTrades': 20,
+    'time': 1, 'ping': 1, 'userDataStream': 2,
+}
+
+
+def _units(value: Any, rounding: str = ROUND_HALF_UP) -> int:
+    return FixedPoint.parse(str(value), SCALE, rounding).units
+
+
+def _fmt(units: int) -> str:
+    return FixedPoint(units, SCALE).to_string()
+
+
+def _notional(price: int, qty: int) -> int:
+    return price * qty // ONE
+
+
+class SimulatorError(Exception):
+    """خطأ بصيغة Binance ({"code": ..., "msg": ...}) مع حالة HTTP"""
+
+    def __init__(self, status: int, code: int, msg: str, headers: Optional[Dict[str, str]] = None):
+        super().__init__(msg)
+        self.status = status
+        self.code = code
+        self.msg = msg
+        self.headers = headers or {}
+
+
+@dataclass
+class SimMarket:
+    """سوق فوري في المحاكاة"""
+    symbol: str  # BTC/USDT
+    base: str
+    quote: str
+    price: int
+    tick: int
+    step: int
+    min_qty: int
+    min_notional: int
+
+    @property
+    def market_id(self) -> str:
+        return f"{self.base}{self.quote}"
+
+    @classmethod
+    def create(cls, symbol: str, price: float, tick: float = 0.01, step: float = 0.00001,
+               min_notional: float = 5.0) -> 'SimMarket':
+        base, quote = symbol.split('/')
+        return cls(symbol, base, quote, _units(price), _units(tick), _units(step), _units(step), _units(min_notional))
+
+    def to_binance(self) -> Dict[str, Any]:
+        """وصف السوق بصيغة exchangeInfo"""
+        return {
+            'symbol': self.market_id, 'status': 'TRADING',
+            'baseAsset': self.base, 'baseAssetPrecision': SCALE,
+            'quoteAsset': self.quote, 'quotePrecision': SCALE, 'quoteAssetPrecision': SCALE,
+            'orderTypes': ['LIMIT', 'MARKET', 'LIMIT_MAKER'],
+            'icebergAllowed': False, 'ocoAllowed': False,
+            'isSpotTradingAllowed': True, 'isMarginTradingAllowed': False,
+            'permissions': ['SPOT'], 'permissionSets': [['SPOT']],
+            'filters': [
+                {'filterType': 'PRICE_FILTER', 'minPrice': _fmt(self.tick), 'maxPrice': '10000000.00000000',
+                 'tickSize': _fmt(self.tick)},
+                {'filterType': 'LOT_SIZE', 'minQty': _fmt(self.min_qty), 'maxQty': '100000.00000000',
+                 'stepSize': _fmt(self.step)},
+                {'filterType': 'NOTIONAL', 'minNotional': _fmt(self.min_notional), 'applyMinToMarket': True,
+                 'maxNotional': '9000000.00000000', 'applyMaxToMarket': False, 'avgPriceMins': 5},
+            ]
+        }
+
+
+@dataclass
+class SimOrder:
+    """أمر في المحاكاة"""
+    order_id: int
+    client_order_id: str
+    account: str
+    market: SimMarket
+    side: str  # BUY | SELL
+    order_type: str  # LIMIT | MARKET | LIMIT_MAKER
+    time_in_force: str  # GTC | IOC | FOK
+    price: int  # 0 لأوامر السوق
+    quantity: int
+    created: int  # ms
+    filled: int = 0
+    quote_filled: int = 0
+    status: str = 'NEW'
+    updated: int = 0
+    reserved: int = 0  # المبلغ المحجوز المتبقي (عملة التسعير للشراء، الأساس للبيع)
+
+    @property
+    def remaining(self) -> int:
+        return self.quantity - self.filled
+
+    @property
+    def is_open(self) -> bool:
+        return self.status in ('NEW', 'PARTIALLY_FILLED')
+
+    def to_binance(self, fills: Optional[List['SimFill']] = None) -> Dict[str, Any]:
+        """حالة الأمر بصيغة Binance (ردود order و openOrders و allOrders)"""
+        data = {
+            'symbol': self.market.market_id, 'orderId': self.order_id, 'orderListId': -1,
+            'clientOrderId': self.client_order_id,
+            'price': _fmt(self.price), 'origQty': _fmt(self.quantity),
+            'executedQty': _fmt(self.filled), 'cummulativeQuoteQty': _fmt(self.quote_filled),
+            'status': self.status, 'timeInForce': self.time_in_force,
+            'type': self.order_type, 'side': self.side,
+            'stopPrice': '0.00000000', 'icebergQty': '0.00000000',
+            'time': self.created, 'updateTime': self.updated or self.created,
+            'transactTime': self.updated or self.created, 'workingTime': self.created,
+            'isWorking': self.is_open, 'origQuoteOrderQty': '0.00000000',
+            'selfTradePreventionMode': 'NONE'
+        }
+        if fills is not None:
+            data['fills'] = [fill.to_binance_fill(self) for fill in fills]
+        return data
+
+
+@dataclass
+class SimFill:
+    """تنفيذ واحد بين أمر صانع وأمر آخذ"""
+    trade_id: int
+    price: int
+    qty: int
+    maker: SimOrder
+    taker: SimOrder
+    timestamp: int
+    commissions: Dict[int, Tuple[int, str]] = field(default_factory=dict)  # order_id -> (العمولة، الأصل)
+
+    @property
+    def quote(self) -> int:
+        return _notional(self.price, self.qty)
+
+    def to_binance_fill(self, order: SimOrder) -> Dict[str, Any]:
+        commission, asset = self.commissions.get(order.order_id, (0, order.market.quote))
+        return {'price': _fmt(self.price), 'qty': _fmt(self.qty), 'commission': _fmt(commission),
+                'commissionAsset': asset, 'tradeId': self.trade_id}
+
+    def to_binance_trade(self, order: SimOrder) -> Dict[str, Any]:
+        """صفقة الحساب بصيغة myTrades"""
+        commission, asset = self.commissions.get(order.order_id, (0, order.market.quote))
+        return {
+            'symbol': order.market.market_id, 'id': self.trade_id, 'orderId': order.order_id,
+            'orderListId': -1, 'price': _fmt(self.price), 'qty': _fmt(self.qty),
+            'quoteQty': _fmt(self.quote), 'commission': _fmt(commission), 'commissionAsset': asset,
+            'time': self.timestamp, 'isBuyer': order.side == 'BUY',
+            'isMaker': order is self.maker, 'isBestMatch': True
+        }
+
+
+class MatchingEngine:
+    """محرك مطابقة لرمز واحد بأولوية السعر ثم الزمن
+
+    كل مستوى سعر طابور FIFO، ومفاتيح المستويات مرتبة بحيث يكون الأفضل أولاً
+    (سالب السعر للطلبات). التغييرات على المستويات تُجمع لبثها كفروقات depthUpdate.
+    """
+
+    def __init__(self, market: SimMarket):
+        self.market = market
+        self.levels: Dict[str, Dict[int, deque]] = {'BUY': {}, 'SELL': {}}
+        self.level_qty: Dict[str, Dict[int, int]] = {'BUY': {}, 'SELL': {}}
+        self.keys: Dict[str, List[int]] = {'BUY': [], 'SELL': []}
+        self.resting: Dict[int, SimOrder] = {}
+
+        self.update_id = 1
+        self.first_pending_id: Optional[int] = None
+        self.changed: Dict[str, Set[int]] = {'BUY': set(), 'SELL': set()}
+
+        self.last_price = market.price
+        self.open_price = market.price
+        self.high = market.price
+        self.low = market.price
+        self.volume = 0
+        self.quote_volume = 0
+
+    @staticmethod
+    def _key(side: str, price: int) -> int:
+        return -price if side == 'BUY' else price
+
+    def best(self, side: str) -> Optional[int]:
+        keys = self.keys[side]
+        if not keys:
+            return None
+        return -keys[0] if side == 'BUY' else keys[0]
+
+    def _crosses(self, taker: SimOrder, price: int) -> bool:
+        if taker.order_type == 'MARKET':
+            return True
+        return price <= taker.price if taker.side == 'BUY' else price >= taker.price
+
+    def _touch(self, side: str, price: int) -> None:
+        if self.first_pending_id is None:
+            self.first_pending_id = self.update_id + 1
+        self.update_id += 1
+        self.changed[side].add(price)
+
+    def would_cross(self, order: SimOrder) -> bool:
+        opposite = 'SELL' if order.side == 'BUY' else 'BUY'
+        best = self.best(opposite)
+        return best is not None and self._crosses(order, best)
+
+    def available(self, taker: SimOrder) -> int:
+        """الكمية القابلة للتنفيذ فوراً (لأوامر FOK)"""
+        opposite = 'SELL' if taker.side == 'BUY' else 'BUY'
+        total = 0
+        for key in self.keys[opposite]:
+            price = -key if opposite == 'BUY' else key
+            if not self._crosses(taker, price):
+                break
+            total += self.level_qty[opposite][price]
+            if total >= taker.remaining:
+                break
+        return total
+
+    def match(self, taker: SimOrder, now: int, next_trade_id, budget: Optional[int] = None) -> List[SimFill]:
+        """مطابقة أمر آخذ مع الجانب المقابل - budget يحد قيمة شراء السوق بعملة التسعير"""
+        opposite = 'SELL' if taker.side == 'BUY' else 'BUY'
+        keys = self.keys[opposite]
+        fills = []
+
+        while taker.remaining > 0 and keys:
+            key = keys[0]
+            price = -key if opposite == 'BUY' else key
+            if not self._crosses(taker, price):
+                break
+
+            queue = self.levels[opposite][price]
+            maker = queue[0]
+            qty = min(taker.remaining, maker.remaining)
+            if budget is not None:
+                affordable = budget * ONE // price
+                affordable -= affordable % self.market.step
+                qty = min(qty, affordable)
+                if qty <= 0:
+                    break
+                budget -= _notional(price, qty)
+
+            fill = SimFill(next_trade_id(), price, qty, maker, taker, now)
+            fills.append(fill)
+            for order in (maker, taker):
+                order.filled += qty
+                order.quote_filled += fill.quote
+                order.updated = now
+                order.status = 'FILLED' if order.remaining == 0 else 'PARTIALLY_FILLED'
+
+            self.level_qty[opposite][price] -= qty
+            self._touch(opposite, price)
+            if maker.remaining == 0:
+                queue.popleft()
+                del self.resting[maker.order_id]
+                if not queue:
+                    self._remove_level(opposite, price)
+
+            self.last_price = price
+            self.high = max(self.high, price)
+            self.low = min(self.low, price)
+            self.volume += qty
+            self.quote_volume += fill.quote
+
+        return fills
+
+    def rest(self, order: SimOrder) -> None:
+        """إضافة المتبقي من أمر محدد إلى نهاية طابور مستواه"""
+        side, price = order.side, order.price
+        queue = self.levels[side].get(price)
+        if queue is None:
+            queue = self.levels[side][price] = deque()
+            self.level_qty[side][price] = 0
+            insort(self.keys[side], self._key(side, price))
+        queue.append(order)
+        self.level_qty[side][price] += order.remaining
+        self.resting[order.order_id] = order
+        self._touch(side, price)
+
+    def cancel(self, order_id: int) -> Optional[SimOrder]:
+        """إزالة أمر من الدفتر"""
+        order = self.resting.pop(order_id, None)
+        if order is None:
+            return None
+        queue = self.levels[order.side][order.price]
+        queue.remove(order)
+        self.level_qty[order.side][order.price] -= order.remaining
+        self._touch(order.side, order.price)
+        if not queue:
+            self._remove_level(order.side, order.price)
+        return order
+
+    def _remove_level(self, side: str, price: int) -> None:
+        del self.levels[side][price]
+        del self.level_qty[side][price]
+        keys = self.keys[side]
+        del keys[bisect_left(keys, self._key(side, price))]
+
+    def depth(self, limit: int) -> Tuple[List[List[str]], List[List[str]]]:
+        """أفضل المستويات المجمعة لكل جانب"""
+        result = []
+        for side in ('BUY', 'SELL'):
+            levels = []
+            for key in self.keys[side][:limit]:
+                price = -key if side == 'BUY' else key
+                levels.append([_fmt(price), _fmt(self.level_qty[side][price])])
+            result.append(levels)
+        return result[0], result[1]
+
+    def take_changes(self) -> Optional[Dict[str, Any]]:
+        """الفروقات المتراكمة منذ آخر بث بصيغة depthUpdate (الكمية 0 = حذف المستوى)"""
+        if self.first_pending_id is None:
+            return None
+        diff = {'U': self.first_pending_id, 'u': self.update_id}
+        for side, key in (('BUY', 'b'), ('SELL', 'a')):
+            diff[key] = [[_fmt(price), _fmt(self.level_qty[side].get(price, 0))]
+                         for price in sorted(self.changed[side], reverse=side == 'BUY')]
+            self.changed[side].clear()
+        self.first_pending_id = None
+        return diff
+
+
+class SimAccount:
+    """أرصدة حساب في المحاكاة (متاح ومحجوز)"""
+
+    def __init__(self, api_key: str, balances: Dict[str, float], unlimited: bool = False):
+        self.api_key = api_key
+        self.unlimited = unlimited
+        self.free: Dict[str, int] = {asset: _units(amount) for asset, amount in balances.items()}
+        self.locked: Dict[str, int] = {asset: 0 for asset in balances}
+        self.trades: deque = deque(maxlen=5000)
+        self.listen_keys: Set[str] = set()
+
+    def lock(self, asset: str, amount: int) -> None:
+        if self.unlimited:
+            return
+        if self.free.get(asset, 0) < amount:
+            raise SimulatorError(400, -2010, "Account has insufficient balance for requested action.")
+        self.free[asset] -= amount
+        self.locked[asset] = self.locked.get(asset, 0) + amount
+
+    def unlock(self, asset: str, amount: int) -> None:
+        if self.unlimited or amount <= 0:
+            return
+        self.locked[asset] -= amount
+        self.free[asset] = self.free.get(asset, 0) + amount
+
+    def spend_locked(self, asset: str, amount: int) -> None:
+        if not self.unlimited:
+            self.locked[asset] -= amount
+
+    def credit(self, asset: str, amount: int) -> None:
+        if not self.unlimited:
+            self.free[asset] = self.free.get(asset, 0) + amount
+
+    def to_binance(self) -> Dict[str, Any]:
+        assets = sorted(set(self.free) | set(self.locked))
+        return {
+            'makerCommission': 10, 'takerCommission': 10, 'buyerCommission': 0, 'sellerCommission': 0,
+            'canTrade': True, 'canWithdraw': False, 'canDeposit': False,
+            'updateTime': int(time.time() * 1000), 'accountType': 'SPOT', 'permissions': ['SPOT'],
+            'balances': [{'asset': asset, 'free': _fmt(self.free.get(asset, 0)),
+                          'locked': _fmt(self.locked.get(asset, 0))} for asset in assets]
+        }
+
+
+class ExchangeSimulator:
+    """خادم المنصة المحاكاة - يُستخدم كـ urls لعميل ccxt binance لاختبار الحمل محلياً"""
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 8766,
+                 markets: Optional[List[SimMarket]] = None, **overrides):
+        self.host = host
+        self.port = port
+
+        self.sim_config = {
+            'latency_ms': 0.0,            # زمن الاستجابة الأساسي المحقون لكل طلب REST
+            'jitter_ms': 0.0,             # تذبذب عشوائي إضافي (0..jitter)
+            'error_rate': 0.0,            # نسبة الطلبات التي تعيد خطأ داخلي -1001
+            'weight_limit_1m': 6000,      # حد أوزان الطلبات في الدقيقة لكل مفتاح
+            'order_limit_10s': 100,       # حد الأوامر في 10 ثوانٍ لكل مفتاح
+            'maker_fee_bps': 10,
+            'taker_fee_bps': 10,
+            'starting_balances': {'USDT': 1_000_000.0, 'BTC': 10.0, 'ETH': 100.0},
+            'liquidity_levels': 20,       # مستويات مزود السيولة لكل جانب
+            'liquidity_step_bps': 2.0,    # المسافة بين المستويات
+            'liquidity_size_quote': 5000.0,  # قيمة كل مستوى بعملة التسعير
+            'price_volatility_bps': 0.0,  # حركة عشوائية لسعر مزود السيولة في كل دورة
+            'replenish_interval': 1.0,
+            'depth_interval': 0.1,
+            'ticker_interval': 1.0,
+        }
+        self.sim_config.update(overrides)
+
+        markets = markets or [
+            SimMarket.create('BTC/USDT', 50000.0, tick=0.01, step=0.00001),
+            SimMarket.create('ETH/USDT', 3000.0, tick=0.01, step=0.0001),
+        ]
+        self.markets: Dict[str, SimMarket] = {market.market_id: market for market in markets}
+        self.engines: Dict[str, MatchingEngine] = {market.market_id: MatchingEngine(market) for market in markets}
+
+        self.accounts: Dict[str, SimAccount] = {
+            MAKER_ACCOUNT: SimAccount(MAKER_ACCOUNT, {}, unlimited=True)
+        }
+        self.listen_keys: Dict[str, str] = {}
+        self.orders: Dict[int, SimOrder] = {}
+        self.client_orders: Dict[Tuple[str, str], int] = {}
+        self.order_fills: Dict[int, List[SimFill]] = {}
+        self.next_order_id = 1
+        self.next_trade_id = 1
+
+        self.weight_windows: Dict[str, List[float]] = {}
+        self.order_windows: Dict[str, deque] = {}
+
+        self.streams: Dict[str, Set[web.WebSocketResponse]] = {}
+        self.combined: Dict[web.WebSocketResponse, bool] = {}  # صيغة {"stream","data"} أم الرسالة الخام
+        self.user_streams: Dict[str, Set[web.WebSocketResponse]] = {}
+
+        self.runner: Optional[web.AppRunner] = None
+        self.tasks: List[asyncio.Task] = []
+        self.stats = {
+            'requests': 0,
+            'orders': 0,
+            'fills': 0,
+            'cancels': 0,
+            'rejected': 0,
+            'rate_limited': 0,
+            'injected_errors': 0,
+            'ws_messages': 0
+        }
+
+        for market in markets:
+            self._replenish(self.engines[market.market_id])
+
+    # ==================== التشغيل ====================
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    @property
+    def ws_url(self) -> str:
+        return f"ws://{self.host}:{self.port}"
+
+    def ccxt_config(self, api_key: str = 'sim-key', secret: str = 'sim-secret') -> Dict[str, Any]:
+        """إعدادات عميل ccxt binance الموجه إلى المحاكاة"""
+        return simulator_ccxt_config(self.url, api_key, secret)
+
+    def _build_app(self) -> web.Application:
+        @web.middleware
+        async def middleware(request: web.Request, handler):
+            if not request.path.startswith('/api/'):
+                return await handler(request)
+            self.stats['requests'] += 1
+            try:
+                headers = await self._admit(request)
+                response = await handler(request)
+                response.headers.update(headers)
+                return response
+            except SimulatorError as e:
+                return web.json_response({'code': e.code, 'msg': e.msg}, status=e.status, headers=e.headers)
+
+        app = web.Application(middlewares=[middleware])
+        app.add_routes([
+            web.get('/api/v3/ping', self._ping),
+            web.get('/api/v3/time', self._time),
+            web.get('/api/v3/exchangeInfo', self._exchange_info),
+            web.get('/api/v3/depth', self._depth),
+            web.get('/api/v3/ticker/24hr', self._ticker_24hr),
+            web.get('/api/v3/ticker/bookTicker', self._book_ticker),
+            web.get('/api/v3/ticker/price', self._ticker_price),
+            web.post('/api/v3/order', self._create_order),
+            web.delete('/api/v3/order', self._cancel_order),
+            web.get('/api/v3/order', self._get_order),
+            web.get('/api/v3/openOrders', self._open_orders),
+            web.delete('/api/v3/openOrders', self._cancel_open_orders),
+            web.get('/api/v3/allOrders', self._all_orders),
+            web.get('/api/v3/account', self._account),
+            web.get('/api/v3/myTrades', self._my_trades),
+            web.post('/api/v3/userDataStream', self._create_listen_key),
+            web.put('/api/v3/userDataStream', self._keepalive_listen_key),
+            web.delete('/api/v3/userDataStream', self._delete_listen_key),
+            web.get('/stream', self._stream_handler),
+            web.get('/ws', self._stream_handler),
+            web.get('/ws/{listen_key}', self._stream_handler),
+            web.get('/sim/stats', self._sim_stats),
+            web.post('/sim/config', self._sim_update_config),
+        ])
+        return app
+
+    async def start(self) -> None:
+        """بدء الخادم وحلقات البث وتجديد السيولة"""
+        self.runner = web.AppRunner(self._build_app())
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, self.host, self.port)
+        await site.start()
+        if self.port == 0:
+            self.port = site._server.sockets[0].getsockname()[1]
+
+        self.tasks = [
+            asyncio.create_task(self._depth_loop()),
+            asyncio.create_task(self._ticker_loop()),
+            asyncio.create_task(self._liquidity_loop()),
+        ]
+        logger.info(f"🏟 منصة المحاكاة تعمل على {self.url} ({len(self.markets)} سوق)")
+
+    async def stop(self) -> None:
+        """إيقاف الخادم والحلقات"""
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.tasks.clear()
+        if self.runner is not None:
+            await self.runner.cleanup()
+            self.runner = None
+
+    # ==================== القبول: المعدل والزمن والأخطاء ====================
+
+    @staticmethod
+    def _request_key(request: web.Request) -> str:
+        return request.headers.get('X-MBX-APIKEY') or request.remote or 'anonymous'
+
+    @staticmethod
+    def _endpoint_weight(request: web.Request) -> int:
+        endpoint = request.path[len('/api/v3/'):]
+        weight = ENDPOINT_WEIGHTS.get(endpoint, 1)
+        if endpoint == 'depth':
+            limit = int(request.query.get('limit', 100))
+            weight = 5 if limit <= 100 else 25 if limit <= 500 else 50
+        elif endpoint in ('ticker/24hr', 'openOrders') and 'symbol' not in request.query:
+            weight = 80
+        return weight
+
+    async def _admit(self, request: web.Request) -> Dict[str, str]:
+        """حد الأوزان بالدقيقة وحد الأوامر، ثم حقن زمن الاستجابة والأخطاء"""
+        config = self.sim_config
+        key = self._request_key(request)
+        now = time.time()
+
+        window = self.weight_windows.setdefault(key, [now - now % 60, 0])
+        if now - window[0] >= 60:
+            window[0], window[1] = now - now % 60, 0
+        window[1] += self._endpoint_weight(request)
+        headers = {'X-MBX-USED-WEIGHT-1M': str(window[1])}
+        if window[1] > config['weight_limit_1m']:
+            self.stats['rate_limited'] += 1
+            raise SimulatorError(429, -1003, "Too many requests; current limit is "
+                                 f"{config['weight_limit_1m']} request weight per 1 MINUTE.",
+                                 {**headers, 'Retry-After': str(int(window[0] + 60 - now) + 1)})
+
+        if request.method == 'POST' and request.path == '/api/v3/order':
+            orders = self.order_windows.setdefault(key, deque())
+            while orders and now - orders[0] >= 10:
+                orders.popleft()
+            if len(orders) >= config['order_limit_10s']:
+                self.stats['rate_limited'] += 1
+                raise SimulatorError(429, -1015, f"Too many new orders; current limit is "
+                                     f"{config['order_limit_10s']} orders per 10 SECOND.",
+                                     {**headers, 'Retry-After': str(int(10 - (now - orders[0])) + 1)})
+            orders.append(now)
+            headers['X-MBX-ORDER-COUNT-10S'] = str(len(orders))
+
+        delay = config['latency_ms'] + random.uniform(0, config['jitter_ms'])
+        if delay > 0:
+            await asyncio.sleep(delay / 1000)
+
+        if config['error_rate'] > 0 and random.random() < config['error_rate']:
+            self.stats['injected_errors'] += 1
+            raise SimulatorError(500, -1001, "Internal error; unable to process your request. Please try again.")
+
+        return headers
+
+    # ==================== المساعدات ====================
+
+    @staticmethod
+    async def _params(request: web.Request) -> Dict[str, str]:
+        """معاملات الاستعلام والجسم (ccxt يرسل الأوامر الموقعة في الجسم)"""
+        params = dict(request.query)
+        if request.body_exists:
+            params.update(await request.post())
+        return params
+
+    def _account_for(self, request: web.Request) -> SimAccount:
+        api_key = request.headers.get('X-MBX-APIKEY')
+        if not api_key:
+            raise SimulatorError(401, -2015, "Invalid API-key, IP, or permissions for action.")
+        account = self.accounts.get(api_key)
+        if account is None:
+            account = self.accounts[api_key] = SimAccount(api_key, self.sim_config['starting_balances'])
+        return account
+
+    def _market(self, params: Dict[str, str], required: bool = True) -> Optional[SimMarket]:
+        market_id = params.get('symbol')
+        if market_id is None:
+            if required:
+                raise SimulatorError(400, -1102, "Mandatory parameter 'symbol' was not sent, was empty/null, or malformed.")
+            return None
+        market = self.markets.get(market_id.upper())
+        if market is None:
+            raise SimulatorError(400, -1121, "Invalid symbol.")
+        return market
+
+    def _find_order(self, account: SimAccount, params: Dict[str, str]) -> SimOrder:
+        order_id = params.get('orderId')
+        if order_id is None and params.get('origClientOrderId'):
+            order_id = self.client_orders.get((account.api_key, params['origClientOrderId']))
+        order = self.orders.get(int(order_id)) if order_id is not None else None
+        if order is None or order.account != account.api_key:
+            raise SimulatorError(400, -2013, "Order does not exist.")
+        return order
+
+    def _new_trade_id(self) -> int:
+        trade_id = self.next_trade_id
+        self.next_trade_id += 1
+        return trade_id
+
+    # ==================== الأوامر ====================
+
+    def _validate(self, market: SimMarket, side: str, order_type: str,
+                  quantity: int, price: int) -> None:
+        if side not in ('BUY', 'SELL'):
+            raise SimulatorError(400, -1100, "Illegal characters found in parameter 'side'.")
+        if order_type not in ('LIMIT', 'MARKET', 'LIMIT_MAKER'):
+            raise SimulatorError(400, -1116, "Invalid orderType.")
+        if quantity < market.min_qty or quantity % market.step:
+            raise SimulatorError(400, -1013, "Filter failure: LOT_SIZE")
+        if order_type != 'MARKET':
+            if price <= 0 or price % market.tick:
+                raise SimulatorError(400, -1013, "Filter failure: PRICE_FILTER")
+            if _notional(price, quantity) < market.min_notional:
+                raise SimulatorError(400, -1013, "Filter failure: NOTIONAL")
+
+    def submit_order(self, account: SimAccount, market: SimMarket, side: str, order_type: str,
+                     quantity: int, price: int = 0, time_in_force: str = 'GTC',
+                     client_order_id: Optional[str] = None) -> Tuple[SimOrder, List[SimFill]]:
+        """إدخال أمر إلى محرك المطابقة مع حجز الرصيد وتسوية التنفيذات"""
+        self._validate(market, side, order_type, quantity, price)
+        client_order_id = client_order_id or f"sim{uuid.uuid4().hex[:20]}"
+        if (account.api_key, client_order_id) in self.client_orders:
+            existing = self.orders[self.client_orders[(account.api_key, client_order_id)]]
+            if existing.is_open:
+                raise SimulatorError(400, -2010, "Duplicate order sent.")
+
+        engine = self.engines[market.market_id]
+        now = int(time.time() * 1000)
+        order = SimOrder(self.next_order_id, client_order_id, account.api_key, market, side, order_type,
+                         'GTC' if order_type == 'LIMIT_MAKER' else time_in_force,
+                         price if order_type != 'MARKET' else 0, quantity, now)
+
+        if order_type == 'LIMIT_MAKER' and engine.would_cross(order):
+            self.stats['rejected'] += 1
+            raise SimulatorError(400, -2010, "Order would immediately match and take.")
+
+        # حجز الرصيد: البيع بالكمية، الشراء المحدد بالسعر × الكمية، وشراء السوق بكامل المتاح كسقف
+        budget = None
+        if side == 'SELL':
+            order.reserved = quantity
+            account.lock(market.base, quantity)
+        elif order_type == 'MARKET':
+            budget = account.free.get(market.quote, 0) if not account.unlimited else None
+            if budget is not None:
+                order.reserved = budget
+                account.lock(market.quote, budget)
+        else:
+            order.reserved = _notional(price, quantity)
+            account.lock(market.quote, order.reserved)
+
+        self.next_order_id += 1
+        self.orders[order.order_id] = order
+        self.client_orders[(account.api_key, client_order_id)] = order.order_id
+        self.stats['orders'] += 1
+
+        fills = []
+        if time_in_force == 'FOK' and engine.available(order) < quantity:
+            order.status = 'EXPIRED'
+        else:
+            fills = engine.match(order, now, self._new_trade_id, budget)
+            for fill in fills:
+                self._settle(fill)
+            if order.remaining > 0:
+                if order.order_type == 'MARKET' or order.time_in_force in ('IOC', 'FOK'):
+                    order.status = 'EXPIRED'
+                else:
+                    engine.rest(order)
+
+        if not order.is_open:
+            self._release(order)
+
+        order.updated = now
+        self.order_fills[order.order_id] = fills
+        return order, fills
+
+    def _settle(self, fill: SimFill) -> None:
+        """تسوية تنفيذ واحد لطرفيه: خصم المحجوز، إضافة المستلم ناقص العمولة"""
+        self.stats['fills'] += 1
+        for order in (fill.maker, fill.taker):
+            account = self.accounts[order.account]
+            market = order.market
+            fee_bps = self.sim_config['maker_fee_bps'] if order is fill.maker else self.sim_config['taker_fee_bps']
+
+            if order.side == 'BUY':
+                spent = fill.quote
+                account.spend_locked(market.quote, spent)
+                if order.order_type == 'MARKET':
+                    order.reserved -= spent
+                else:
+                    # الحجز كان بسعر الحد - فرق السعر الأفضل يعود للمتاح
+                    reserved = _notional(order.price, fill.qty)
+                    account.unlock(market.quote, reserved - spent)
+                    order.reserved -= reserved
+                commission = fill.qty * fee_bps // 10000
+                account.credit(market.base, fill.qty - commission)
+                fill.commissions[order.order_id] = (commission, market.base)
+            else:
+                account.spend_locked(market.base, fill.qty)
+                order.reserved -= fill.qty
+                commission = fill.quote * fee_bps // 10000
+                account.credit(market.quote, fill.quote - commission)
+                fill.commissions[order.order_id] = (commission, market.quote)
+
+            # حجز الآخذ يُعاد بعد تسوية كل تنفيذاته في submit_order
+            if order is fill.maker and not order.is_open:
+                self._release(order)
+            if not account.unlimited:
+                account.trades.append((fill, order))
+
+    def _release(self, order: SimOrder) -> None:
+        """إعادة ما تبقى من الحجز عند انتهاء الأمر"""
+        if order.reserved > 0:
+            asset = order.market.base if order.side == 'SELL' else order.market.quote
+            self.accounts[order.account].unlock(asset, order.reserved)
+            order.reserved = 0
+
+    def cancel(self, order: SimOrder) -> SimOrder:
+        """إلغاء أمر مفتوح"""
+        if not order.is_open:
+            raise SimulatorError(400, -2011, "Unknown order sent.")
+        self.engines[order.market.market_id].cancel(order.order_id)
+        order.status = 'CANCELED'
+        order.updated = int(time.time() * 1000)
+        self._release(order)
+        self.stats['cancels'] += 1
+        return order
+
+    # ==================== مزود السيولة ====================
+
+    def _replenish(self, engine: MatchingEngine) -> None:
+        """إبقاء مستويات ثابتة حول السعر المرجعي بحساب السيولة غير المحدود"""
+        config = self.sim_config
+        market = engine.market
+
+        # السعر المرجعي يتبع آخر تنفيذ، مع حركة عشوائية اختيارية تظهر كسعر أخير جديد
+        market.price = engine.last_price
+        if config['price_volatility_bps']:
+            drift = 1 + random.gauss(0, config['price_volatility_bps'] / 10000)
+            market.price = max(market.tick, int(market.price * drift) // market.tick * market.tick)
+            engine.last_price = market.price
+
+        step = max(market.tick, int(market.price * config['liquidity_step_bps'] / 10000) // market.tick * market.tick)
+        levels = config['liquidity_levels']
+
+        # إزالة أوامر المزود البعيدة أو التي أصبحت في الجانب الخاطئ من السعر المرجعي
+        for order in list(engine.resting.values()):
+            if order.account != MAKER_ACCOUNT:
+                continue
+            distance = (market.price - order.price) if order.side == 'BUY' else (order.price - market.price)
+            if distance <= 0 or distance > step * levels * 2:
+                engine.cancel(order.order_id)
+
+        now = int(time.time() * 1000)
+        for side in ('BUY', 'SELL'):
+            opposite_best = engine.best('SELL' if side == 'BUY' else 'BUY')
+            for i in range(1, levels + 1):
+                price = market.price - step * i if side == 'BUY' else market.price + step * i
+                if price <= 0 or price in engine.level_qty[side]:
+                    continue
+                if opposite_best is not None and (price >= opposite_best if side == 'BUY' else price <= opposite_best):
+                    continue
+                quantity = _units(config['liquidity_size_quote']) * ONE // price
+                quantity -= quantity % market.step
+                if quantity < market.min_qty:
+                    continue
+                order = SimOrder(self.next_order_id, f"lp{self.next_order_id}", MAKER_ACCOUNT, market,
+                                 side, 'LIMIT', 'GTC', price, quantity, now)
+                # أوامر المزود لا تُحفظ في سجل الأوامر - تبقى في الدفتر فقط
+                self.next_order_id += 1
+                engine.rest(order)
+
+    async def _liquidity_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.sim_config['replenish_interval'])
+            for engine in self.engines.values():
+                try:
+                    self._replenish(engine)
+                except Exception as e:
+                    logger.warning(f"⚠️ خطأ في تجديد سيولة {engine.market.symbol}: {str(e)}")
+
+    # ==================== REST: بيانات السوق ====================
+
+    async def _ping(self, request: web.Request) -> web.Response:
+        return web.json_response({})
+
+    async def _time(self, request: web.Request) -> web.Response:
+        return web.json_response({'serverTime': int(time.time() * 1000)})
+
+    async def _exchange_info(self, request: web.Request) -> web.Response:
+        return web.json_response({
+            'timezone': 'UTC', 'serverTime': int(time.time() * 1000),
+            'rateLimits': [
+                {'rateLimitType': 'REQUEST_WEIGHT', 'interval': 'MINUTE', 'intervalNum': 1,
+                 'limit': self.sim_config['weight_limit_1m']},
+                {'rateLimitType': 'ORDERS', 'interval': 'SECOND', 'intervalNum': 10,
+                 'limit': self.sim_config['order_limit_10s']},
+            ],
+            'exchangeFilters': [],
+            'symbols': [market.to_binance() for market in self.markets.values()]
+        })
+
+    async def _depth(self, request: web.Request) -> web.Response:
+        params = await self._params(request)
+        market = self._market(params)
+        engine = self.engines[market.market_id]
+        bids, asks = engine.depth(min(int(params.get('limit', 100)), 5000))
+        return web.json_response({'lastUpdateId': engine.update_id, 'bids': bids, 'asks': asks})
+
+    def _ticker(self, engine: MatchingEngine) -> Dict[str, Any]:
+        now = int(time.time() * 1000)
+        bid, ask = engine.best('BUY'), engine.best('SELL')
+        change = engine.last_price - engine.open_price
+        return {
+            'symbol': engine.market.market_id,
+            'priceChange': _fmt(change),
+            'priceChangePercent': f"{change / engine.open_price * 100:.3f}" if engine.open_price else '0',
+            'weightedAvgPrice': _fmt(engine.quote_volume * ONE // engine.volume if engine.volume else engine.last_price),
+            'lastPrice': _fmt(engine.last_price), 'openPrice': _fmt(engine.open_price),
+            'highPrice': _fmt(engine.high), 'lowPrice': _fmt(engine.low),
+            'bidPrice': _fmt(bid or 0), 'bidQty': _fmt(engine.level_qty['BUY'].get(bid, 0)),
+            'askPrice': _fmt(ask or 0), 'askQty': _fmt(engine.level_qty['SELL'].get(ask, 0)),
+            'volume': _fmt(engine.volume), 'quoteVolume': _fmt(engine.quote_volume),
+            'openTime': now - 86_400_000, 'closeTime': now, 'count': 0
+        }
+
+    def _requested_engines(self, params: Dict[str, str]) -> List[MatchingEngine]:
+        """محركات قائمة symbols (JSON) أو كل الأسواق"""
+        if 'symbols' in params:
+            ids = json.loads(params['symbols'])
+            return [self.engines[self._market({'symbol': market_id}).market_id] for market_id in ids]
+        return list(self.engines.values())
+
+    async def _ticker_24hr(self, request: web.Request) -> web.Response:
+        params = await self._params(request)
+        if 'symbol' in params:
+            return web.json_response(self._ticker(self.engines[self._market(params).market_id]))
+        return web.json_response([self._ticker(engine) for engine in self._requested_engines(params)])
+
+    async def _book_ticker(self, request: web.Request) -> web.Response:
+        params = await self._params(request)
+
+        def book_ticker(engine: MatchingEngine) -> Dict[str, Any]:
+            ticker = self._ticker(engine)
+            return {key: ticker[key] for key in ('symbol', 'bidPrice', 'bidQty', 'askPrice', 'askQty')}
+
+        if 'symbol' in params:
+            return web.json_response(book_ticker(self.engines[self._market(params).market_id]))
+        return web.json_response([book_ticker(engine) for engine in self._requested_engines(params)])
+
+    async def _ticker_price(self, request: web.Request) -> web.Response:
+        params = await self._params(request)
+        if 'symbol' in params:
+            engine = self.engines[self._market(params).market_id]
+            return web.json_response({'symbol': engine.market.market_id, 'price': _fmt(engine.last_price)})
+        return web.json_response([{'symbol': engine.market.market_id, 'price': _fmt(engine.last_price)}
+                                  for engine in self._requested_engines(params)])
+
+    # ==================== REST: التداول والحساب ====================
+
+    async def _create_order(self, request: web.Request) -> web.Response:
+        account = self._account_for(request)
+        params = await self._params(request)
+        market = self._market(params)
+        if 'quantity' not in params:
+            raise SimulatorError(400, -1102, "Mandatory parameter 'quantity' was not sent, was empty/null, or malformed.")
+
+        order, fills = self.submit_order(
+            account, market,
+            side=params.get('side', '').upper(),
+            order_type=params.get('type', '').upper(),
+            quantity=_units(params['quantity'], ROUND_DOWN),
+            price=_units(params['price']) if params.get('price') else 0,
+            time_in_force=params.get('timeInForce', 'GTC').upper(),
+            client_order_id=params.get('newClientOrderId')
+        )
+        await self._publish_order(order, fills, 'NEW')
+
+        response_type = params.get('newOrderRespType', 'FULL' if order.order_type == 'MARKET' else 'RESULT')
+        if response_type == 'ACK':
+            return web.json_response({
+                'symbol': market.market_id, 'orderId': order.order_id, 'orderListId': -1,
+                'clientOrderId': order.client_order_id, 'transactTime': order.created
+            })
+        return web.json_response(order.to_binance(fills if response_type == 'FULL' else None))
+
+    async def _cancel_order(self, request: web.Request) -> web.Response:
+        account = self._account_for(request)
+        params = await self._params(request)
+        order = self.cancel(self._find_order(account, params))
+        await self._publish_order(order, [], 'CANCELED')
+        return web.json_response(order.to_binance())
+
+    async def _cancel_open_orders(self, request: web.Request) -> web.Response:
+        account = self._account_for(request)
+        params = await self._params(request)
+        market = self._market(params)
+        canceled = []
+        for order in list(self.engines[market.market_id].resting.values()):
+            if order.account == account.api_key:
+                canceled.append(self.cancel(order))
+                await self._publish_order(order, [], 'CANCELED')
+        return web.json_response([order.to_binance() for order in canceled])
+
+    async def _get_order(self, request: web.Request) -> web.Response:
+        account = self._account_for(request)
+        params = await self._params(request)
+        return web.json_response(self._find_order(account, params).to_binance())
+
+    async def _open_orders(self, request: web.Request) -> web.Response:
+        account = self._account_for(request)
+        params = await self._params(request)
+        market = self._market(params, required=False)
+        engines = [self.engines[market.market_id]] if market else self.engines.values()
+        orders = [order for engine in engines for order in engine.resting.values() if order.account == account.api_key]
+        orders.sort(key=lambda order: order.order_id)
+        return web.json_response([order.to_binance() for order in orders])
+
+    async def _all_orders(self, request: web.Request) -> web.Response:
+        account = self._account_for(request)
+        params = await self._params(request)
+        market = self._market(params)
+        since = int(params.get('startTime', 0))
+        limit = min(int(params.get('limit', 500)), 1000)
+        orders = [order for order in self.orders.values()
+                  if order.account == account.api_key and order.market is market
+                  and (order.updated or order.created) >= since]
+        return web.json_response([order.to_binance() for order in orders[-limit:]])
+
+    async def _account(self, request: web.Request) -> web.Response:
+        return web.json_response(self._account_for(request).to_binance())
+
+    async def _my_trades(self, request: web.Request) -> web.Response:
+        account = self._account_for(request)
+        params = await self._params(request)
+        market = self._market(params)
+        since = int(params.get('startTime', 0))
+        limit = min(int(params.get('limit', 500)), 1000)
+        trades = [fill.to_binance_trade(order) for fill, order in account.trades
+                  if order.market is market and fill.timestamp >= since]
+        return web.json_response(trades[-limit:])
+
+    async def _create_listen_key(self, request: web.Request) -> web.Response:
+        account = self._account_for(request)
+        listen_key = uuid.uuid4().hex
+        self.listen_keys[listen_key] = account.api_key
+        return web.json_response({'listenKey': listen_key})
+
+    async def _keepalive_listen_key(self, request: web.Request) -> web.Response:
+        self._account_for(request)
+        return web.json_response({})
+
+    async def _delete_listen_key(self, request: web.Request) -> web.Response:
+        self._account_for(request)
+        params = await self._params(request)
+        self.listen_keys.pop(params.get('listenKey', ''), None)
+        return web.json_response({})
+
+    # ==================== WebSocket ====================
+
+    async def _stream_handler(self, request: web.Request) -> web.WebSocketResponse:
+        """تدفقات السوق (/stream?streams= أو SUBSCRIBE) وتدفق المستخدم (/ws/<listenKey>)"""
+        websocket = web.WebSocketResponse(heartbeat=20)
+        await websocket.prepare(request)
+
+        combined = request.path == '/stream'
+        subscribed: Set[str] = set()
+        user_key = None
+
+        listen_key = request.match_info.get('listen_key')
+        if listen_key is not None:
+            user_key = self.listen_keys.get(listen_key)
+            if user_key is None:
+                await websocket.close(code=4001, message=b'invalid listenKey')
+                return websocket
+            self.user_streams.setdefault(user_key, set()).add(websocket)
+
+        def subscribe(streams) -> None:
+            for stream in streams:
+                self.streams.setdefault(stream, set()).add(websocket)
+                subscribed.add(stream)
+
+        subscribe(s for s in request.query.get('streams', '').split('/') if s)
+        self.combined[websocket] = combined
+
+        try:
+            async for message in websocket:
+                if message.type != WSMsgType.TEXT:
+                    continue
+                try:
+                    payload = json.loads(message.data)
+                except ValueError:
+                    continue
+                method = payload.get('method')
+                if method == 'SUBSCRIBE':
+                    subscribe(payload.get('params', []))
+                elif method == 'UNSUBSCRIBE':
+                    for stream in payload.get('params', []):
+                        self.streams.get(stream, set()).discard(websocket)
+                        subscribed.discard(stream)
+                if method:
+                    await websocket.send_json({'result': None, 'id': payload.get('id')})
+        finally:
+            for stream in subscribed:
+                self.streams.get(stream, set()).discard(websocket)
+            if user_key is not None:
+                self.user_streams.get(user_key, set()).discard(websocket)
+            self.combined.pop(websocket, None)
+
+        return websocket
+
+    async def _broadcast(self, stream: str, data: Dict[str, Any]) -> None:
+        for websocket in list(self.streams.get(stream, ())):
+            message = {'stream': stream, 'data': data} if self.combined.get(websocket, True) else data
+            try:
+                await websocket.send_str(json.dumps(message))
+                self.stats['ws_messages'] += 1
+            except Exception:
+                self.streams[stream].discard(websocket)
+
+    async def _publish_order(self, order: SimOrder, fills: List[SimFill], execution_type: str) -> None:
+        """بث الصفقات العامة وتقارير التنفيذ لأصحاب الأوامر (NEW/CANCELED ثم TRADE ثم EXPIRED)"""
+        await self._publish_execution(order, execution_type, None)
+
+        stream_symbol = order.market.market_id.lower()
+        for fill in fills:
+            await self._broadcast(f"{stream_symbol}@aggTrade", {
+                'e': 'aggTrade', 'E': fill.timestamp, 's': order.market.market_id, 'a': fill.trade_id,
+                'p': _fmt(fill.price), 'q': _fmt(fill.qty), 'f': fill.trade_id, 'l': fill.trade_id,
+                'T': fill.timestamp, 'm': fill.maker.side == 'BUY', 'M': True
+            })
+            for party in (fill.maker, fill.taker):
+                await self._publish_execution(party, 'TRADE', fill)
+
+        if order.status == 'EXPIRED':
+            await self._publish_execution(order, 'EXPIRED', None)
+
+    async def _publish_execution(self, order: SimOrder, execution_type: str, fill: Optional[SimFill]) -> None:
+        sockets = self.user_streams.get(order.account)
+        if not sockets:
+            return
+        now = int(time.time() * 1000)
+        commission, asset = fill.commissions.get(order.order_id, (0, None)) if fill else (0, None)
+        report = {
+            'e': 'executionReport', 'E': now, 's': order.market.market_id, 'c': order.client_order_id,
+            'S': order.side, 'o': order.order_type, 'f': order.time_in_force,
+            'q': _fmt(order.quantity), 'p': _fmt(order.price), 'P': '0.00000000', 'F': '0.00000000',
+            'g': -1, 'C': order.client_order_id if execution_type == 'CANCELED' else '',
+            'x': execution_type, 'X': order.status, 'r': 'NONE', 'i': order.order_id,
+            'l': _fmt(fill.qty if fill else 0), 'z': _fmt(order.filled), 'L': _fmt(fill.price if fill else 0),
+            'n': _fmt(commission), 'N': asset, 'T': fill.timestamp if fill else now,
+            't': fill.trade_id if fill else -1, 'I': 0, 'w': order.is_open,
+            'm': fill is not None and order is fill.maker, 'M': False, 'O': order.created,
+            'Z': _fmt(order.quote_filled), 'Y': _fmt(fill.quote if fill else 0), 'Q': '0.00000000'
+        }
+        for websocket in list(sockets):
+            try:
+                await websocket.send_str(json.dumps(report))
+                self.stats['ws_messages'] += 1
+            except Exception:
+                sockets.discard(websocket)
+
+    async def _depth_loop(self) -> None:
+        """بث فروقات الدفاتر المتراكمة كل depth_interval"""
+        while True:
+            await asyncio.sleep(self.sim_config['depth_interval'])
+            now = int(time.time() * 1000)
+            for market_id, engine in self.engines.items():
+                diff = engine.take_changes()
+                if diff is None:
+                    continue
+                stream_symbol = market_id.lower()
+                data = {'e': 'depthUpdate', 'E': now, 's': market_id, **diff}
+                for stream in (f"{stream_symbol}@depth@100ms", f"{stream_symbol}@depth"):
+                    await self._broadcast(stream, data)
+
+    async def _ticker_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.sim_config['ticker_interval'])
+            now = int(time.time() * 1000)
+            for market_id, engine in self.engines.items():
+                ticker = self._ticker(engine)
+                await self._broadcast(f"{market_id.lower()}@ticker", {
+                    'e': '24hrTicker', 'E': now, 's': market_id,
+                    'c': ticker['lastPrice'], 'o': ticker['openPrice'],
+                    'h': ticker['highPrice'], 'l': ticker['lowPrice'],
+                    'b': ticker['bidPrice'], 'B': ticker['bidQty'],
+                    'a': ticker['askPrice'], 'A': ticker['askQty'],
+                    'P': ticker['priceChangePercent'], 'v': ticker['volume'], 'q': ticker['quoteVolume']
+                })
+
+    # ==================== الإدارة ====================
+
+    async def _sim_stats(self, request: web.Request) -> web.Response:
+        return web.json_response(self.get_simulator_status())
+
+    async def _sim_update_config(self, request: web.Request) -> web.Response:
+        """تعديل إعدادات المحاكاة أثناء التشغيل (زمن الاستجابة، نسبة الأخطاء، الحدود...)"""
+        updates = await request.json()
+        unknown = set(updates) - set(self.sim_config)
+        if unknown:
+            return web.json_response({'error': f"مفاتيح غير معروفة: {sorted(unknown)}"}, status=400)
+        self.sim_config.update(updates)
+        return web.json_response(self.sim_config)
+
+    def get_simulator_status(self) -> Dict[str, Any]:
+        """حالة المحاكاة"""
+        return {
+            'url': self.url,
+            'markets': {
+                market_id: {
+                    'last_price': _fmt(engine.last_price),
+                    'best_bid': _fmt(engine.best('BUY') or 0),
+                    'best_ask': _fmt(engine.best('SELL') or 0),
+                    'resting_orders': len(engine.resting)
+                }
+                for market_id, engine in self.engines.items()
+            },
+            'accounts': len(self.accounts) - 1,
+            'ws_clients': len({ws for sockets in self.streams.values() for ws in sockets}),
+            'config': {key: value for key, value in self.sim_config.items() if key != 'starting_balances'},
+            **self.stats
+        }
+
+
+def simulator_ccxt_config(url: str, api_key: str = 'sim-key', secret: str = 'sim-secret') -> Dict[str, Any]:
+    """إعدادات عميل ccxt binance لاستخدام المحاكاة بدلاً من المنصة الحقيقية"""
+    url = url.rstrip('/')
+    ws_url = url.replace('http://', 'ws://').replace('https://', 'wss://')
+    return {
+        'apiKey': api_key,
+        'secret': secret,
+        'urls': {
+            'api': {
+                'public': f"{url}/api/v3",
+                'private': f"{url}/api/v3",
+                'ws': {'spot': f"{ws_url}/ws"},
+            }
+        },
+        'options': {
+            'fetchMarkets': {'types': ['spot']},
+            'fetchCurrencies': False,
+            'fetchMargins': False,
+            'defaultType': 'spot',
+            'warnOnFetchOpenOrdersWithoutSymbol': False,
+        }
+    }
+
+
+async def _serve_forever(args) -> None:
+    simulator = ExchangeSimulator(
+        args.host, args.port,
+        latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, error_rate=args.error_rate,
+        weight_limit_1m=args.weight_limit, order_limit_10s=args.order_limit,
+        price_volatility_bps=args.volatility_bps
+    )
+    await simulator.start()
+    await asyncio.Future()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="منصة محاكاة محلية متوافقة مع Binance")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8766)
+    parser.add_argument('--latency-ms', type=float, default=0.0)
+    parser.add_argument('--jitter-ms', type=float, default=0.0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--weight-limit', type=int, default=6000)
+    parser.add_argument('--order-limit', type=int, default=100)
+    parser.add_argument('--volatility-bps', type=float, default=0.0)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(_serve_forever(args))
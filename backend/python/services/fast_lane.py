@@ -0,0 +1,548 @@
+# backend/python/services/fast_lane.py
+"""
+⚡ المسار السريع للتنفيذ - من الإشارة إلى الأمر بقوالب مسبقة ومفاتيح HMAC مخزنة وعدادات مخاطرة جاهزة
+التسجيل مؤجل خارج المسار، وزمن الإشارة حتى الإرسال يُقاس لكل أمر
+الإصدار: 3.0.0 | المطور: Akraa Trading Team
+"""
+
+import asyncio
+import hashlib
+import hmac
+import logging
+import os
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Any, Tuple
+from urllib.parse import quote
+
+import aiohttp
+import numpy as np
+
+from services.async_exchange_pool import AsyncExchangePool, exchange_pool
+from services.fixed_point import Precision, ROUND_DOWN, ROUND_HALF_UP
+from services.http_client import http_client
+from services.market_registry import market_registry
+from services.market_stream import market_stream
+from services.order_pipeline import OrderPipeline
+from services.order_reconciler import order_reconciler, OrderEvent, OrderEventType
+from services.rate_limiter import rate_limiter
+from services.resilience import resilience, CircuitOpenError
+
+logger = logging.getLogger(__name__)
+
+# المنصات التي تقبل صيغة أوامر Binance (/order موقع بـ HMAC-SHA256 في الاستعلام)
+# MEXC spot v3 بنفس الصيغة لكن بدون timeInForce ولا newOrderRespType (الرد دائماً مختصر)
+WIRE_FORMATS = {
+    'binance': {'base_url': 'https://api.binance.com/api/v3', 'path': '/order', 'key_header': 'X-MBX-APIKEY',
+                'limit_params': '&timeInForce=GTC', 'response_params': '&newOrderRespType=ACK'},
+    'mexc': {'base_url': 'https://api.mexc.com/api/v3', 'path': '/order', 'key_header': 'X-MEXC-APIKEY',
+             'limit_params': '', 'response_params': ''},
+}
+
+
+class FastLaneRejected(Exception):
+    """رفض الأمر قبل الإرسال (مخاطرة أو حد معدل أو دائرة مفتوحة)"""
+
+    def __init__(self, reason: str):
+        self.reason = reason
+        super().__init__(reason)
+
+
+class HmacSigner:
+    """موقّع HMAC-SHA256 بمفتاح مُهيأ مسبقاً - كل توقيع ينسخ الحالة بدلاً من إعادة جدولة المفتاح"""
+
+    __slots__ = ('_base',)
+
+    def __init__(self, secret: str):
+        self._base = hmac.new(secret.encode('utf-8'), digestmod=hashlib.sha256)
+
+    def digest(self, payload: str) -> bytes:
+        mac = self._base.copy()
+        mac.update(payload.encode('utf-8'))
+        return mac.digest()
+
+    def hexdigest(self, payload: str) -> str:
+        mac = self._base.copy()
+        mac.update(payload.encode('utf-8'))
+        return mac.hexdigest()
+
+
+@lru_cache(maxsize=64)
+def get_signer(secret: str) -> HmacSigner:
+    """موقّع مشترك لكل مفتاح سري"""
+    return HmacSigner(secret)
+
+
+@dataclass
+class OrderTemplate:
+    """قالب أمر جاهز لرمز واحد - كل ما لا يتغير بين الأوامر محسوب مسبقاً"""
+    exchange: str
+    symbol: str
+    market_id: str
+    url: str
+    headers: Dict[str, str]
+    signer: HmacSigner
+    precision: Precision
+    min_amount: float = 0.0
+    min_notional: float = 0.0
+    recv_window: int = 5000
+    limit_params: str = '&timeInForce=GTC'
+    response_params: str = '&newOrderRespType=ACK'
+    prefixes: Dict[Tuple[str, str], str] = field(default_factory=dict)
+
+    def __post_init__(self):
+        for side in ('buy', 'sell'):
+            for order_type in ('market', 'limit'):
+                prefix = f"symbol={self.market_id}&side={side.upper()}&type={order_type.upper()}"
+                if order_type == 'limit':
+                    prefix += self.limit_params
+                self.prefixes[(side, order_type)] = prefix
+
+    def build(self, side: str, order_type: str, amount: float, price: Optional[float],
+              client_order_id: str) -> str:
+        """جسم الطلب الموقع - الكمية والسعر بالنقطة الثابتة على دقة الرمز"""
+        query = (f"{self.prefixes[(side, order_type)]}"
+                 f"&quantity={self.precision.amount(amount, ROUND_DOWN).to_string()}")
+        if order_type == 'limit':
+            query += f"&price={self.precision.price(price, ROUND_HALF_UP).to_string()}"
+        query += (f"&newClientOrderId={quote(client_order_id)}{self.response_params}"
+                  f"&recvWindow={self.recv_window}&timestamp={int(time.time() * 1000)}")
+        return f"{query}&signature={self.signer.hexdigest(query)}"
+
+
+class RiskCounters:
+    """حالة المخاطرة كعدادات جاهزة - الفحص مقارنات فقط بدون انتظار أو بناء نماذج"""
+
+    def __init__(self, account_balance: float = 10000.0, max_position_size: float = 2000.0,
+                 max_risk_per_trade: float = 0.01, max_portfolio_risk: float = 0.02,
+                 max_open_positions: int = 10, max_daily_loss: float = 500.0):
+        self.limits = {
+            'max_position_size': max_position_size,
+            'max_risk_per_trade': max_risk_per_trade,
+            'max_portfolio_risk': max_portfolio_risk,
+            'max_open_positions': max_open_positions,
+            'max_daily_loss': max_daily_loss,
+        }
+        self.exposure = 0.0
+        self.pending = 0.0
+        self.symbol_exposure: Dict[str, float] = {}
+        self.daily_loss = 0.0
+        self.day = datetime.now(timezone.utc).date()
+        self.halted = False
+        self.set_balance(account_balance)
+
+    @classmethod
+    def from_risk_manager(cls, manager: Any, account_balance: float) -> 'RiskCounters':
+        """نفس حدود مدير المخاطر المتقدم"""
+        return cls(
+            account_balance,
+            max_position_size=manager.risk_limits['max_position_size'],
+            max_risk_per_trade=manager.risk_config['max_risk_per_trade'],
+            max_portfolio_risk=manager.risk_limits['max_portfolio_risk'],
+            max_open_positions=manager.risk_limits['max_open_positions'],
+            max_daily_loss=manager.risk_limits['max_daily_loss'],
+        )
+
+    def set_balance(self, account_balance: float) -> None:
+        """إعادة حساب العتبات عند تغير الرصيد"""
+        self.account_balance = account_balance
+        self.max_order_notional = min(self.limits['max_position_size'],
+                                      account_balance * self.limits['max_risk_per_trade'])
+        self.max_exposure = account_balance * self.limits['max_portfolio_risk']
+
+    def _roll_day(self) -> None:
+        today = datetime.now(timezone.utc).date()
+        if today != self.day:
+            self.day = today
+            self.daily_loss = 0.0
+            self.halted = False
+
+    def check(self, notional: float, opening: bool = True, symbol: Optional[str] = None) -> Optional[str]:
+        """سبب الرفض أو None"""
+        if self.halted:
+            self._roll_day()
+            if self.halted:
+                return 'daily_loss'
+        if notional > self.max_order_notional:
+            return 'order_notional'
+        if opening:
+            if self.exposure + self.pending + notional > self.max_exposure:
+                return 'portfolio_exposure'
+            if symbol not in self.symbol_exposure and self.open_positions >= self.limits['max_open_positions']:
+                return 'open_positions'
+        return None
+
+    @property
+    def open_positions(self) -> int:
+        return len(self.symbol_exposure)
+
+    def reserve(self, notional: float) -> None:
+        self.pending += notional
+
+    def release(self, notional: float) -> None:
+        self.pending = max(0.0, self.pending - notional)
+
+    def record_fill(self, symbol: str, notional: float, opening: bool) -> None:
+        """تنفيذ من المطابقة - الشراء يفتح تعرضاً والبيع يغلقه"""
+        current = self.symbol_exposure.get(symbol, 0.0)
+        updated = current + notional if opening else max(0.0, current - notional)
+        if updated > 0:
+            self.symbol_exposure[symbol] = updated
+        else:
+            self.symbol_exposure.pop(symbol, None)
+        self.exposure = max(0.0, self.exposure + updated - current)
+
+    def record_pnl(self, pnl: float) -> None:
+        """ربح/خسارة محققة - تجاوز الخسارة اليومية يوقف المسار حتى اليوم التالي"""
+        self._roll_day()
+        if pnl < 0:
+            self.daily_loss -= pnl
+            if self.daily_loss >= self.limits['max_daily_loss']:
+                self.halted = True
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            'account_balance': self.account_balance,
+            'max_order_notional': self.max_order_notional,
+            'max_exposure': self.max_exposure,
+            'exposure': self.exposure,
+            'pending': self.pending,
+            'open_positions': self.open_positions,
+            'daily_loss': self.daily_loss,
+            'halted': self.halted,
+        }
+
+
+class DeferredLog:
+    """سجل مؤجل - المسار يضيف قالباً ومعاملات فقط، والتنسيق والكتابة في حلقة خلفية"""
+
+    def __init__(self, target: logging.Logger, max_entries: int = 10000):
+        self.target = target
+        self.entries: deque = deque(maxlen=max_entries)
+
+    def log(self, level: int, message: str, *args) -> None:
+        self.entries.append((level, message, args))
+
+    def flush(self) -> int:
+        count = 0
+        while self.entries:
+            level, message, args = self.entries.popleft()
+            self.target.log(level, message, *args)
+            count += 1
+        return count
+
+
+class FastLane:
+    """المسار السريع - فحص متزامن ثم طلب موقع واحد بدون خط الأوامر أو ccxt"""
+
+    def __init__(self, pool: AsyncExchangePool = None):
+        self.pool = pool or exchange_pool
+        self.lane_config = {
+            'enabled': os.getenv('FAST_LANE_ENABLED', 'false').lower() == 'true',
+            'account_balance': float(os.getenv('FAST_LANE_ACCOUNT_BALANCE', '10000')),
+            'quote_currency': os.getenv('FAST_LANE_QUOTE_CURRENCY', 'USDT'),
+            'price_max_age': float(os.getenv('FAST_LANE_PRICE_MAX_AGE', '5')),
+            'recv_window': int(os.getenv('FAST_LANE_RECV_WINDOW', '5000')),
+            'request_timeout': float(os.getenv('FAST_LANE_TIMEOUT', '5')),
+            'latency_samples': int(os.getenv('FAST_LANE_LATENCY_SAMPLES', '1000')),
+            'log_flush_interval': float(os.getenv('FAST_LANE_LOG_FLUSH_INTERVAL', '1')),
+            'min_signal_confidence': float(os.getenv('FAST_LANE_MIN_SIGNAL_CONFIDENCE', '0.65')),
+            # أمر بنتيجة مجهولة (خطأ شبكة) يُحرر حجزه بعد هذه المدة إن لم تحسمه المطابقة
+            'unresolved_ttl': float(os.getenv('FAST_LANE_UNRESOLVED_TTL', '120')),
+        }
+        self.timeout = aiohttp.ClientTimeout(total=self.lane_config['request_timeout'])
+        self.templates: Dict[Tuple[str, str], OrderTemplate] = {}
+        self.symbol_exchanges: Dict[str, str] = {}
+        self.risk = RiskCounters(self.lane_config['account_balance'])
+        self.log = DeferredLog(logger)
+        self.in_process_ns: deque = deque(maxlen=self.lane_config['latency_samples'])
+        self.network_ns: deque = deque(maxlen=self.lane_config['latency_samples'])
+        self.inflight: Dict[str, Tuple[str, float]] = {}
+        self.unresolved: Dict[str, float] = {}
+        self.flush_task: Optional[asyncio.Task] = None
+        self._unsubscribe = None
+        self.stats = {'submitted': 0, 'acked': 0, 'rejected': 0, 'errors': 0, 'expired': 0, 'rejections': {}}
+
+    @property
+    def enabled(self) -> bool:
+        return self.lane_config['enabled']
+
+    # ==================== القوالب ====================
+
+    def prepare(self, exchange: str, symbols: List[str]) -> int:
+        """بناء قوالب الأوامر للرموز - يتطلب فهرس الأسواق ومفاتيح المنصة"""
+        wire = WIRE_FORMATS.get(exchange)
+        config = self.pool.exchange_configs.get(exchange)
+        if wire is None or not config or not config.get('apiKey') or not config.get('secret'):
+            return 0
+
+        url = (config.get('urls', {}).get('api', {}).get('private') or wire['base_url']).rstrip('/') + wire['path']
+        headers = {wire['key_header']: config['apiKey'], 'Content-Type': 'application/x-www-form-urlencoded'}
+        signer = get_signer(config['secret'])
+
+        prepared = 0
+        for symbol in symbols:
+            market = market_registry.get_market(exchange, symbol) if market_registry.is_loaded(exchange) else None
+            if market is None or not market.active:
+                continue
+            self.templates[(exchange, symbol)] = OrderTemplate(
+                exchange, symbol, market.market_id, url, headers, signer, market.precision,
+                market.min_amount or 0.0, market.min_notional or 0.0, self.lane_config['recv_window'],
+                wire['limit_params'], wire['response_params']
+            )
+            self.symbol_exchanges[symbol] = exchange
+            prepared += 1
+        logger.info(f"⚡ تم تجهيز {prepared} قالب أمر على {exchange}")
+        return prepared
+
+    def has_template(self, exchange: str, symbol: str) -> bool:
+        return (exchange, symbol) in self.templates
+
+    # ==================== الإشارات ====================
+
+    async def on_signal(self, signal: Any, signal_ts: int) -> Optional[Dict[str, Any]]:
+        """إشارة شاملة من الإستراتيجيات إلى أمر سوق - signal_ts لحظة توليدها بتوقيت perf_counter_ns
+
+        الشراء بحد القيمة الاسمية لكل صفقة، والبيع يغلق تعرض الرمز في العدادات فقط.
+        """
+        side = str(getattr(signal.signal, 'value', signal.signal)).lower()
+        exchange = self.symbol_exchanges.get(signal.symbol)
+        if side not in ('buy', 'sell') or exchange is None:
+            return None
+        if signal.confidence < self.lane_config['min_signal_confidence']:
+            return None
+
+        price = market_stream.store.get_price(signal.symbol, exchange, max_age=self.lane_config['price_max_age'])
+        notional = self.risk.max_order_notional if side == 'buy' else self.risk.symbol_exposure.get(signal.symbol)
+        if not price or not notional:
+            return None
+        try:
+            return await self.submit(exchange, signal.symbol, side, notional / price, signal_ts=signal_ts)
+        except FastLaneRejected as e:
+            self.log.log(logging.INFO, "ℹ️ المسار السريع: إشارة %s %s مرفوضة: %s", side, signal.symbol, e.reason)
+            return None
+
+    # ==================== حالة المخاطرة ====================
+
+    def seed_risk(self, manager: Any, positions: Iterable[Tuple[str, float]] = (),
+                  account_balance: Optional[float] = None) -> None:
+        """حدود مدير المخاطر والمراكز المفتوحة (رمز، قيمة اسمية) عند بدء التشغيل
+
+        الحجوزات الجارية والخسارة اليومية تنتقل إلى العدادات الجديدة.
+        """
+        seeded = RiskCounters.from_risk_manager(manager, account_balance or self.risk.account_balance)
+        seeded.pending = self.risk.pending
+        seeded.daily_loss, seeded.day, seeded.halted = self.risk.daily_loss, self.risk.day, self.risk.halted
+        for symbol, notional in positions:
+            seeded.record_fill(symbol, notional, True)
+        self.risk = seeded
+        logger.info(f"⚡ عدادات مخاطرة المسار السريع: {seeded.open_positions} مركز بتعرض {seeded.exposure:.2f}")
+
+    async def refresh_balance(self, exchange: str) -> float:
+        """رصيد عملة التسعير من المنصة - يبقى الرصيد الحالي إذا تعذر الجلب"""
+        try:
+            balance = await self.pool.call(exchange, 'fetch_balance')
+            total = (balance.get('total') or {}).get(self.lane_config['quote_currency'])
+            if total:
+                self.risk.set_balance(float(total))
+        except Exception as e:
+            logger.warning(f"⚠️ تعذر جلب رصيد {exchange} للمسار السريع: {str(e)}")
+        return self.risk.account_balance
+
+    def record_order(self, symbol: str, side: str, order: Dict[str, Any]) -> None:
+        """التنفيذ الفوري في رد أمر من مسار آخر (خط الأوامر أو مدير المراكز)
+
+        التنفيذات اللاحقة لنفس الأمر تصل كأحداث من المطابقة فلا تُحسب مرتين.
+        """
+        filled = order.get('filled') or 0.0
+        price = order.get('average') or order.get('price')
+        if filled and price:
+            self.risk.record_fill(symbol, filled * price, side == 'buy')
+
+    # ==================== التنفيذ ====================
+
+    def _reject(self, reason: str) -> FastLaneRejected:
+        self.stats['rejected'] += 1
+        self.stats['rejections'][reason] = self.stats['rejections'].get(reason, 0) + 1
+        return FastLaneRejected(reason)
+
+    async def submit(self, exchange: str, symbol: str, side: str, amount: float,
+                     price: Optional[float] = None, order_type: str = 'market',
+                     signal_ts: Optional[int] = None) -> Dict[str, Any]:
+        """إرسال أمر من الإشارة - signal_ts بتوقيت perf_counter_ns لحظة توليد الإشارة
+
+        إرسال واحد بدون إعادة محاولة: معرف العميل يُتتبع في المطابقة التي تحسم الحالة النهائية.
+        """
+        started = signal_ts or time.perf_counter_ns()
+        template = self.templates.get((exchange, symbol))
+        if template is None:
+            raise self._reject('no_template')
+
+        reference_price = price if order_type == 'limit' else \
+            market_stream.store.get_price(symbol, exchange, max_age=self.lane_config['price_max_age'])
+        if not reference_price:
+            raise self._reject('no_price')
+
+        notional = amount * reference_price
+        if amount < template.min_amount or notional < template.min_notional:
+            raise self._reject('market_limits')
+        opening = side == 'buy'
+        reason = self.risk.check(notional, opening, symbol)
+        if reason:
+            raise self._reject(reason)
+        if not rate_limiter.try_acquire(exchange, 'create_order'):
+            raise self._reject('rate_limit')
+        breaker = resilience.get_breaker(exchange)
+        try:
+            breaker.before_call()
+        except CircuitOpenError:
+            raise self._reject('circuit_open')
+
+        client_order_id = OrderPipeline.new_client_order_id()
+        body = template.build(side, order_type, amount, price, client_order_id)
+        reserved = notional if opening else 0.0
+        self.risk.reserve(reserved)
+        self.inflight[client_order_id] = (side, reserved)
+        self.stats['submitted'] += 1
+
+        session = http_client.get_session()
+        wire = time.perf_counter_ns()
+        self.in_process_ns.append(wire - started)
+        try:
+            async with session.post(template.url, data=body, headers=template.headers,
+                                    timeout=self.timeout) as response:
+                payload = await response.json(content_type=None)
+                status = response.status
+        except asyncio.CancelledError:
+            breaker.release()
+            self._track_unresolved(exchange, symbol, side, amount, client_order_id)
+            raise
+        except Exception as e:
+            breaker.on_failure()
+            self.stats['errors'] += 1
+            self._track_unresolved(exchange, symbol, side, amount, client_order_id)
+            self.log.log(logging.WARNING, "⚠️ المسار السريع: نتيجة %s مجهولة: %s", client_order_id, e)
+            raise
+
+        acked = time.perf_counter_ns()
+        self.network_ns.append(acked - wire)
+        breaker.on_success()
+
+        if status >= 400:
+            self.inflight.pop(client_order_id, None)
+            self.risk.release(reserved)
+            if status in (418, 429):
+                rate_limiter.penalize(exchange)
+            self.log.log(logging.ERROR, "❌ المسار السريع: رفض %s على %s: %s", client_order_id, exchange, payload)
+            raise self._reject(f"exchange_{status}")
+
+        order_id = str(payload.get('orderId'))
+        order_reconciler.track(exchange, order_id, symbol, side, amount, client_order_id=client_order_id)
+        self.stats['acked'] += 1
+        self.log.log(logging.INFO, "⚡ أمر %s %s %s على %s (%.0f µs قبل الإرسال)",
+                     side, amount, symbol, exchange, (wire - started) / 1000)
+        return {
+            'id': order_id, 'clientOrderId': client_order_id, 'symbol': symbol, 'side': side,
+            'type': order_type, 'amount': amount, 'price': price, 'status': 'open',
+            'filled': 0.0, 'remaining': amount, 'timestamp': payload.get('transactTime'),
+        }
+
+    def _track_unresolved(self, exchange: str, symbol: str, side: str, amount: float, client_order_id: str) -> None:
+        """نتيجة مجهولة - المطابقة تحسمها بمعرف العميل، والحجز يبقى حتى حدثها النهائي أو unresolved_ttl"""
+        order_reconciler.track(exchange, None, symbol, side, amount, client_order_id=client_order_id)
+        self.unresolved[client_order_id] = time.monotonic() + self.lane_config['unresolved_ttl']
+
+    def expire_unresolved(self, now: Optional[float] = None) -> int:
+        """تحرير حجز الأوامر المجهولة التي تجاوزت unresolved_ttl - تنفيذ متأخر يُسجل كتنفيذ خارجي"""
+        now = time.monotonic() if now is None else now
+        expired = [client_order_id for client_order_id, deadline in self.unresolved.items() if deadline <= now]
+        for client_order_id in expired:
+            del self.unresolved[client_order_id]
+            inflight = self.inflight.pop(client_order_id, None)
+            if inflight is not None:
+                self.risk.release(inflight[1])
+            self.stats['expired'] += 1
+            self.log.log(logging.WARNING, "⚠️ المسار السريع: تحرير حجز %s بعد انتهاء المهلة", client_order_id)
+        return len(expired)
+
+    # ==================== تحديث العدادات ====================
+
+    async def on_order_event(self, event: OrderEvent) -> None:
+        """تحديث التعرض من أحداث المطابقة - أوامر المسار السريع وأوامر المسارات الأخرى"""
+        inflight = self.inflight.get(event.client_order_id)
+        if inflight is None:
+            # أمر من مسار آخر - تعرضه يدخل نفس العدادات
+            if event.fill_delta and event.average_price:
+                self.risk.record_fill(event.symbol, event.fill_delta * event.average_price, event.side == 'buy')
+            return
+        self.unresolved.pop(event.client_order_id, None)
+        side, reserved = inflight
+        if event.fill_delta and event.average_price:
+            filled_notional = event.fill_delta * event.average_price
+            self.risk.record_fill(event.symbol, filled_notional, side == 'buy')
+            released = min(reserved, filled_notional)
+            self.risk.release(released)
+            reserved -= released
+            self.inflight[event.client_order_id] = (side, reserved)
+        if event.type != OrderEventType.PARTIAL_FILL:
+            # ما تبقى من الحجز يُحرر عند انتهاء الأمر بأي حالة
+            self.inflight.pop(event.client_order_id, None)
+            self.risk.release(reserved)
+
+    def start(self) -> None:
+        """ربط أحداث المطابقة وتشغيل تفريغ السجل المؤجل"""
+        if self._unsubscribe is None:
+            self._unsubscribe = order_reconciler.subscribe(self.on_order_event)
+        # إنشاء الجلسة المشتركة مسبقاً حتى لا يدفع أول أمر تكلفتها
+        http_client.get_session()
+        if self.flush_task and not self.flush_task.done():
+            return
+
+        async def flush_loop():
+            while True:
+                await asyncio.sleep(self.lane_config['log_flush_interval'])
+                self.expire_unresolved()
+                self.log.flush()
+
+        self.flush_task = asyncio.create_task(flush_loop())
+
+    async def stop(self) -> None:
+        if self._unsubscribe:
+            self._unsubscribe()
+            self._unsubscribe = None
+        if self.flush_task:
+            self.flush_task.cancel()
+            await asyncio.gather(self.flush_task, return_exceptions=True)
+            self.flush_task = None
+        self.log.flush()
+
+    # ==================== الحالة ====================
+
+    @staticmethod
+    def _percentiles(samples: deque, divisor: float) -> Dict[str, float]:
+        if not samples:
+            return {'p50': 0.0, 'p99': 0.0, 'max': 0.0}
+        values = np.fromiter(samples, dtype=np.float64, count=len(samples)) / divisor
+        p50, p99 = np.percentile(values, [50, 99])
+        return {'p50': round(float(p50), 3), 'p99': round(float(p99), 3), 'max': round(float(values.max()), 3)}
+
+    def get_fast_lane_status(self) -> Dict[str, Any]:
+        """حالة المسار السريع مع زمن الإشارة حتى الإرسال"""
+        return {
+            'enabled': self.enabled,
+            'templates': len(self.templates),
+            'inflight': len(self.inflight),
+            'unresolved': len(self.unresolved),
+            'signal_to_wire_us': self._percentiles(self.in_process_ns, 1e3),
+            'wire_to_ack_ms': self._percentiles(self.network_ns, 1e6),
+            'risk': self.risk.status(),
+            'pending_logs': len(self.log.entries),
+            **self.stats,
+        }
+
+
+# نسخة عالمية
+fast_lane = FastLane()
@@ -0,0 +1,437 @@
+# backend/python/services/fixed_point.py
+"""
+🔢 تمثيل الأسعار والكميات بنقطة ثابتة - عدد صحيح مقيس بدقة الرمز من بيانات السوق
+حساب صحيح سريع بدون Decimal، مصفوفات NumPy من نوع int64 وتحويل دقيق إلى نصوص المنصة
+الإصدار: 3.0.0 | المطور: Akraa Trading Team
+"""
+
+import math
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import List, Optional, Union
+
+import numpy as np
+
+# أوضاع التقريب
+ROUND_DOWN = 'down'        # نحو الصفر (الكميات)
+ROUND_UP = 'up'            # بعيداً عن الصفر
+ROUND_HALF_UP = 'half_up'  # لأقرب قيمة والنصف بعيداً عن الصفر (الأسعار)
+ROUND_FLOOR = 'floor'
+ROUND_CEILING = 'ceiling'
+
+DEFAULT_SCALE = 8
+MAX_SCALE = 18
+INT64_MAX = int(np.iinfo(np.int64).max)
+# خطأ الضرب في 10**scale لا يتجاوز بضع وحدات ULP نسبية
+_FLOAT_TOLERANCE = 4 * float(np.finfo(np.float64).eps)
+
+_POW10 = [10 ** i for i in range(MAX_SCALE * 2 + 1)]
+
+Number = Union[int, float, str, 'FixedPoint']
+
+
+def _pow10(exponent: int) -> int:
+    """10**exponent من الجدول - والنصوص العلمية الصغيرة جداً (1e-22) تتجاوزه"""
+    return _POW10[exponent] if exponent < len(_POW10) else 10 ** exponent
+
+
+def _div_round(numerator: int, denominator: int, rounding: str) -> int:
+    """قسمة صحيحة بوضع التقريب المطلوب (المقام موجب)"""
+    quotient, remainder = divmod(numerator, denominator)  # floor
+    if remainder == 0 or rounding == ROUND_FLOOR:
+        return quotient
+    if rounding == ROUND_CEILING:
+        return quotient + 1
+    negative = numerator < 0
+    if rounding == ROUND_DOWN:
+        return quotient + 1 if negative else quotient
+    if rounding == ROUND_UP:
+        return quotient if negative else quotient + 1
+    # ROUND_HALF_UP
+    twice = remainder * 2
+    if twice > denominator or (twice == denominator and not negative):
+        return quotient + 1
+    return quotient
+
+
+def _round_scaled(scaled: float, rounding: str) -> int:
+    """تقريب float مقيس إلى عدد صحيح بوضع التقريب"""
+    if rounding == ROUND_FLOOR:
+        return math.floor(scaled)
+    if rounding == ROUND_CEILING:
+        return math.ceil(scaled)
+    if rounding == ROUND_DOWN:
+        return int(scaled)
+    if rounding == ROUND_UP:
+        return math.ceil(scaled) if scaled > 0 else math.floor(scaled)
+    return math.floor(scaled + 0.5) if scaled >= 0 else -math.floor(0.5 - scaled)
+
+
+def scale_of(step: Union[float, str, None]) -> int:
+    """عدد المنازل العشرية اللازمة لتمثيل حجم الخطوة (0.001 -> 3، 0.5 -> 1)"""
+    if not step:
+        return DEFAULT_SCALE
+    exponent = Decimal(repr(step) if isinstance(step, float) else str(step)).normalize().as_tuple().exponent
+    return min(max(0, -exponent), MAX_SCALE)
+
+
+class FixedPoint:
+    """قيمة عشرية دقيقة = units / 10**scale"""
+
+    __slots__ = ('units', 'scale')
+
+    def __init__(self, units: int = 0, scale: int = DEFAULT_SCALE):
+        self.units = int(units)
+        self.scale = scale
+
+    # ==================== الإنشاء ====================
+
+    @classmethod
+    def parse(cls, text: str, scale: Optional[int] = None, rounding: str = ROUND_HALF_UP) -> 'FixedPoint':
+        """تحليل نص عشري بدقة تامة - مع scale يُقرب للمنازل المطلوبة"""
+        text = text.strip()
+        negative = text.startswith('-')
+        if text[:1] in '+-':
+            text = text[1:]
+
+        exponent = 0
+        if 'e' in text or 'E' in text:
+            text, exp_text = text.lower().split('e')
+            exponent = int(exp_text)
+
+        whole, _, fraction = text.partition('.')
+        digits = int((whole or '0') + fraction)
+        text_scale = len(fraction) - exponent
+        if negative:
+            digits = -digits
+
+        if text_scale < 0:
+            digits *= _POW10[-text_scale]
+            text_scale = 0
+        target = min(text_scale, MAX_SCALE) if scale is None else scale
+        return cls(digits, text_scale)._rescaled(target, rounding)
+
+    @classmethod
+    def from_float(cls, value: float, scale: int = DEFAULT_SCALE, rounding: str = ROUND_HALF_UP) -> 'FixedPoint':
+        """تحويل float إلى منازل scale - بنفس نتيجة Decimal(str(value)) دون كلفتها
+
+        scaled يبعد عن القيمة العشرية الحقيقية بما لا يتجاوز tolerance: إذا كانت القيمة ممثلة
+        بالضبط عند هذه الدقة (0.29 * 100 = 28.999999999999996) تُعاد أقرب وحدة، وإلا فالتقريب
+        السريع مقبول فقط إذا أعطى طرفا مجال الخطأ نفس النتيجة - غير ذلك الحكم للتمثيل العشري.
+        """
+        scaled = value * _POW10[scale]
+        magnitude = scaled if scaled >= 0 else -scaled
+        tolerance = _FLOAT_TOLERANCE * (magnitude if magnitude > 1.0 else 1.0)
+        if tolerance < 0.5:
+            nearest = round(scaled)
+            if -tolerance <= scaled - nearest <= tolerance and nearest / _POW10[scale] == value:
+                return cls(nearest, scale)
+            units = _round_scaled(scaled - tolerance, rounding)
+            if units == _round_scaled(scaled + tolerance, rounding):
+                return cls(units, scale)
+        return cls.parse(repr(value), scale, rounding)
+
+    @classmethod
+    def of(cls, value: Number, scale: Optional[int] = None, rounding: str = ROUND_HALF_UP) -> 'FixedPoint':
+        """تحويل أي قيمة رقمية إلى FixedPoint"""
+        if isinstance(value, FixedPoint):
+            return value if scale is None else value._rescaled(scale, rounding)
+        if isinstance(value, str):
+            return cls.parse(value, scale, rounding)
+        if isinstance(value, (int, np.integer)) and not isinstance(value, bool):
+            scale = 0 if scale is None else scale
+            return cls(int(value) * _POW10[scale], scale)
+        return cls.from_float(float(value), DEFAULT_SCALE if scale is None else scale, rounding)
+
+    # ==================== التحويل ====================
+
+    def _rescaled(self, scale: int, rounding: str = ROUND_HALF_UP) -> 'FixedPoint':
+        if scale == self.scale:
+            return self
+        if scale > self.scale:
+            return FixedPoint(self.units * _pow10(scale - self.scale), scale)
+        return FixedPoint(_div_round(self.units, _pow10(self.scale - scale), rounding), scale)
+
+    def rescale(self, scale: int, rounding: str = ROUND_HALF_UP) -> 'FixedPoint':
+        """تغيير عدد المنازل العشرية"""
+        return self._rescaled(scale, rounding)
+
+    def quantize(self, step: 'FixedPoint', rounding: str = ROUND_HALF_UP) -> 'FixedPoint':
+        """تقريب لأقرب مضاعف لحجم الخطوة (التيك أو اللوت)"""
+        value = self._rescaled(max(self.scale, step.scale), rounding)
+        step_units = step.units * _POW10[value.scale - step.scale]
+        return FixedPoint(_div_round(value.units, step_units, rounding) * step_units, value.scale)
+
+    def to_float(self) -> float:
+        return self.units / _POW10[self.scale]
+
+    def to_string(self) -> str:
+        """نص دقيق بعدد المنازل الكامل - الصيغة المرسلة للمنصة"""
+        if self.scale == 0:
+            return str(self.units)
+        sign = '-' if self.units < 0 else ''
+        whole, fraction = divmod(abs(self.units), _POW10[self.scale])
+        return f"{sign}{whole}.{fraction:0{self.scale}d}"
+
+    def normalize(self) -> 'FixedPoint':
+        """حذف الأصفار الزائدة من المنازل العشرية"""
+        units, scale = self.units, self.scale
+        while scale > 0 and units % 10 == 0:
+            units //= 10
+            scale -= 1
+        return FixedPoint(units, scale)
+
+    def __float__(self) -> float:
+        return self.to_float()
+
+    def __str__(self) -> str:
+        return self.to_string()
+
+    def __repr__(self) -> str:
+        return f"FixedPoint('{self.to_string()}')"
+
+    # ==================== الحساب ====================
+
+    def _align(self, other: Number):
+        if other.__class__ is not FixedPoint:
+            other = FixedPoint.of(other)
+        if self.scale == other.scale:
+            return self.units, other.units, self.scale
+        if self.scale > other.scale:
+            return self.units, other.units * _POW10[self.scale - other.scale], self.scale
+        return self.units * _POW10[other.scale - self.scale], other.units, other.scale
+
+    def __add__(self, other: Number) -> 'FixedPoint':
+        a, b, scale = self._align(other)
+        return FixedPoint(a + b, scale)
+
+    __radd__ = __add__
+
+    def __sub__(self, other: Number) -> 'FixedPoint':
+        a, b, scale = self._align(other)
+        return FixedPoint(a - b, scale)
+
+    def __rsub__(self, other: Number) -> 'FixedPoint':
+        a, b, scale = self._align(other)
+        return FixedPoint(b - a, scale)
+
+    def __mul__(self, other: Number) -> 'FixedPoint':
+        """الضرب دقيق - المنازل تجمع (حتى MAX_SCALE)"""
+        if other.__class__ is not FixedPoint:
+            if isinstance(other, (int, np.integer)) and not isinstance(other, bool):
+                return FixedPoint(self.units * int(other), self.scale)
+            other = FixedPoint.of(other)
+        scale = self.scale + other.scale
+        if scale <= MAX_SCALE:
+            return FixedPoint(self.units * other.units, scale)
+        return FixedPoint(self.units * other.units, scale)._rescaled(MAX_SCALE)
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, other: Number) -> float:
+        """القسمة تعطي نسبة (float) - الأسعار والكميات لا تُقسم في مسار الأوامر"""
+        a, b, _ = self._align(other)
+        return a / b
+
+    def __rtruediv__(self, other: Number) -> float:
+        a, b, _ = self._align(other)
+        return b / a
+
+    def __neg__(self) -> 'FixedPoint':
+        return FixedPoint(-self.units, self.scale)
+
+    def __abs__(self) -> 'FixedPoint':
+        return FixedPoint(abs(self.units), self.scale)
+
+    def __bool__(self) -> bool:
+        return self.units != 0
+
+    # ==================== المقارنة ====================
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, (FixedPoint, int, float, str, np.number)):
+            return NotImplemented
+        a, b, _ = self._align(other)
+        return a == b
+
+    def __lt__(self, other: Number) -> bool:
+        a, b, _ = self._align(other)
+        return a < b
+
+    def __le__(self, other: Number) -> bool:
+        a, b, _ = self._align(other)
+        return a <= b
+
+    def __gt__(self, other: Number) -> bool:
+        a, b, _ = self._align(other)
+        return a > b
+
+    def __ge__(self, other: Number) -> bool:
+        a, b, _ = self._align(other)
+        return a >= b
+
+    def __hash__(self) -> int:
+        return hash(self.to_float())
+
+
+# ==================== مصفوفات NumPy ====================
+
+def to_units(values, scale: int, rounding: str = ROUND_HALF_UP) -> np.ndarray:
+    """تحويل مصفوفة float إلى وحدات int64 بدقة scale - نفس قواعد FixedPoint.from_float
+
+    العناصر التي لا يحسمها التقريب السريع (مجال الخطأ يعبر حد تقريب) تُحول عنصراً عنصراً.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    power = float(_POW10[scale])
+    scaled = values * power
+    nearest = np.rint(scaled)
+    tolerance = _FLOAT_TOLERANCE * np.maximum(1.0, np.abs(scaled))
+    fine = tolerance < 0.5
+    exact = fine & (np.abs(scaled - nearest) <= tolerance) & (nearest / power == values)
+
+    low = _round_scaled_array(scaled - tolerance, rounding)
+    units = np.where(exact, nearest, low).astype(np.int64)
+    ambiguous = ~exact & ~(fine & (low == _round_scaled_array(scaled + tolerance, rounding)))
+    for index in np.flatnonzero(ambiguous):
+        units.flat[index] = FixedPoint.parse(repr(float(values.flat[index])), scale, rounding).units
+    return units
+
+
+def _round_scaled_array(scaled: np.ndarray, rounding: str) -> np.ndarray:
+    """نسخة المصفوفات من _round_scaled"""
+    if rounding == ROUND_DOWN:
+        return np.trunc(scaled)
+    if rounding == ROUND_UP:
+        return np.sign(scaled) * np.ceil(np.abs(scaled))
+    if rounding == ROUND_FLOOR:
+        return np.floor(scaled)
+    if rounding == ROUND_CEILING:
+        return np.ceil(scaled)
+    return np.sign(scaled) * np.floor(np.abs(scaled) + 0.5)
+
+
+def from_units(units, scale: int) -> np.ndarray:
+    """تحويل وحدات int64 إلى float"""
+    return np.asarray(units, dtype=np.int64) / float(_POW10[scale])
+
+
+def format_units(units, scale: int) -> List[str]:
+    """نصوص دقيقة لمصفوفة وحدات"""
+    return [FixedPoint(int(value), scale).to_string() for value in np.asarray(units).ravel()]
+
+
+def rescale_units(units, from_scale: int, to_scale: int, rounding: str = ROUND_HALF_UP) -> np.ndarray:
+    """تغيير دقة مصفوفة وحدات بقسمة صحيحة"""
+    units = np.asarray(units, dtype=np.int64)
+    if to_scale >= from_scale:
+        return units * _POW10[to_scale - from_scale]
+    divisor = _POW10[from_scale - to_scale]
+    quotient, remainder = np.divmod(units, divisor)
+    if rounding == ROUND_FLOOR:
+        return quotient
+    bump = remainder != 0
+    if rounding == ROUND_CEILING:
+        return quotient + bump
+    if rounding == ROUND_DOWN:
+        return quotient + (bump & (units < 0))
+    if rounding == ROUND_UP:
+        return quotient + (bump & (units > 0))
+    twice = remainder * 2
+    return quotient + ((twice > divisor) | ((twice == divisor) & (units >= 0)))
+
+
+def multiply_units(a, b, a_scale: int, b_scale: int, out_scale: int,
+                   rounding: str = ROUND_HALF_UP) -> np.ndarray:
+    """ضرب مصفوفتي وحدات بدقة تامة (القيمة الاسمية = الكمية × السعر)
+
+    عند خطر تجاوز int64 يتم الحساب بأعداد بايثون الصحيحة ثم التحويل.
+    """
+    a = np.asarray(a, dtype=np.int64)
+    b = np.asarray(b, dtype=np.int64)
+    product_scale = a_scale + b_scale
+    bound = int(np.abs(a).max(initial=0)) * int(np.abs(b).max(initial=0))
+    if bound * _POW10[max(0, out_scale - product_scale)] < INT64_MAX:
+        return rescale_units(a * b, product_scale, out_scale, rounding)
+
+    products = np.multiply(a.astype(object), b.astype(object))
+    return np.array([FixedPoint(int(value), product_scale)._rescaled(out_scale, rounding).units
+                     for value in products.ravel()], dtype=np.int64).reshape(products.shape)
+
+
+# ==================== دقة الرمز ====================
+
+@dataclass(frozen=True)
+class Precision:
+    """دقة رمز واحد - حجم التيك وخطوة اللوت كوحدات صحيحة"""
+    price_scale: int = DEFAULT_SCALE
+    amount_scale: int = DEFAULT_SCALE
+    tick: int = 1
+    step: int = 1
+
+    @classmethod
+    def from_steps(cls, tick_size: Optional[float], amount_step: Optional[float]) -> 'Precision':
+        """من حجم التيك وخطوة اللوت في بيانات السوق"""
+        price_scale = scale_of(tick_size)
+        amount_scale = scale_of(amount_step)
+        return cls(
+            price_scale=price_scale,
+            amount_scale=amount_scale,
+            tick=FixedPoint.of(tick_size, price_scale).units if tick_size else 1,
+            step=FixedPoint.of(amount_step, amount_scale).units if amount_step else 1
+        )
+
+    @property
+    def tick_size(self) -> FixedPoint:
+        return FixedPoint(self.tick, self.price_scale)
+
+    @property
+    def amount_step(self) -> FixedPoint:
+        return FixedPoint(self.step, self.amount_scale)
+
+    def price(self, value: Number, rounding: str = ROUND_HALF_UP) -> FixedPoint:
+        """سعر مقرب لأقرب تيك"""
+        return FixedPoint.of(value, self.price_scale, rounding).quantize(self.tick_size, rounding)
+
+    def amount(self, value: Number, rounding: str = ROUND_DOWN) -> FixedPoint:
+        """كمية مقربة للأسفل لمضاعف خطوة اللوت"""
+        return FixedPoint.of(value, self.amount_scale, rounding).quantize(self.amount_step, rounding)
+
+    def notional(self, amount: Number, price: Number) -> FixedPoint:
+        """القيمة الاسمية بدقة تامة"""
+        return FixedPoint.of(amount, self.amount_scale) * FixedPoint.of(price, self.price_scale)
+
+    def pnl(self, entry_price: Number, exit_price: Number, amount: Number) -> FixedPoint:
+        """الربح/الخسارة بدقة تامة = (سعر الخروج - سعر الدخول) × الكمية"""
+        price_change = FixedPoint.of(exit_price, self.price_scale) - FixedPoint.of(entry_price, self.price_scale)
+        return price_change * FixedPoint.of(amount, self.amount_scale)
+
+    def price_units(self, values, rounding: str = ROUND_HALF_UP) -> np.ndarray:
+        """مصفوفة أسعار كوحدات int64 مقربة للتيك"""
+        units = to_units(values, self.price_scale, rounding)
+        return units if self.tick == 1 else _round_to_step(units, self.tick, rounding)
+
+    def amount_units(self, values, rounding: str = ROUND_DOWN) -> np.ndarray:
+        """مصفوفة كميات كوحدات int64 مقربة لخطوة اللوت"""
+        units = to_units(values, self.amount_scale, rounding)
+        return units if self.step == 1 else _round_to_step(units, self.step, rounding)
+
+
+def _round_to_step(units: np.ndarray, step: int, rounding: str) -> np.ndarray:
+    """تقريب وحدات لمضاعفات الخطوة"""
+    quotient, remainder = np.divmod(units, step)
+    if rounding == ROUND_FLOOR:
+        bump = 0
+    elif rounding == ROUND_CEILING:
+        bump = remainder != 0
+    elif rounding == ROUND_DOWN:
+        bump = (remainder != 0) & (units < 0)
+    elif rounding == ROUND_UP:
+        bump = (remainder != 0) & (units > 0)
+    else:
+        twice = remainder * 2
+        bump = (twice > step) | ((twice == step) & (units >= 0))
+    return (quotient + bump) * step
+
+
+# دقة افتراضية للرموز غير الموجودة في سجل الأسواق
+DEFAULT_PRECISION = Precision()
@@ -0,0 +1,140 @@
+# backend/python/services/http_client.py
+"""
+🌐 عميل HTTP المشترك للعملية - جلسة aiohttp واحدة لكل الطلبات الصادرة
+اتصالات دائمة، حدود لكل مضيف، ذاكرة DNS ومهل قابلة للضبط مع دوال JSON غير متزامنة
+الإصدار: 3.0.0 | المطور: Akraa Trading Team
+"""
+
+import asyncio
+import logging
+import os
+import time
+from typing import Dict, Optional, Any
+
+import aiohttp
+
+from services.resilience import remaining_time, DeadlineExceeded
+
+logger = logging.getLogger(__name__)
+
+
+class HttpError(Exception):
+    """رد HTTP برمز خطأ"""
+
+    def __init__(self, status: int, url: str, body: Any = None):
+        super().__init__(f"HTTP {status} من {url}")
+        self.status = status
+        self.url = url
+        self.body = body
+
+
+class HttpClient:
+    """عميل HTTP مشترك - الجلسة تُنشأ عند أول استخدام داخل حلقة الأحداث الحالية"""
+
+    def __init__(self, max_connections: Optional[int] = None, max_connections_per_host: Optional[int] = None):
+        self.http_config = {
+            'max_connections': int(max_connections or os.getenv('HTTP_MAX_CONNECTIONS', '100')),
+            'max_connections_per_host': int(max_connections_per_host or os.getenv('HTTP_MAX_PER_HOST', '20')),
+            'dns_cache_ttl': int(os.getenv('HTTP_DNS_CACHE_TTL', '300')),
+            'keepalive_timeout': float(os.getenv('HTTP_KEEPALIVE_TIMEOUT', '30')),
+            'total_timeout': float(os.getenv('HTTP_TOTAL_TIMEOUT', '30')),
+            'connect_timeout': float(os.getenv('HTTP_CONNECT_TIMEOUT', '10')),
+            'user_agent': os.getenv('HTTP_USER_AGENT', 'TradingPlatform/1.0'),
+        }
+        self.session: Optional[aiohttp.ClientSession] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.stats = {'requests': 0, 'errors': 0, 'total_latency': 0.0, 'sessions_created': 0}
+
+    def get_session(self) -> aiohttp.ClientSession:
+        """الجلسة المشتركة - تُعاد إنشاؤها فقط إذا أُغلقت أو تغيرت حلقة الأحداث"""
+        loop = asyncio.get_running_loop()
+        if self.session is None or self.session.closed or self._loop is not loop:
+            connector = aiohttp.TCPConnector(
+                limit=self.http_config['max_connections'],
+                limit_per_host=self.http_config['max_connections_per_host'],
+                ttl_dns_cache=self.http_config['dns_cache_ttl'],
+                keepalive_timeout=self.http_config['keepalive_timeout'],
+                enable_cleanup_closed=True
+            )
+            self.session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(
+                    total=self.http_config['total_timeout'],
+                    connect=self.http_config['connect_timeout']
+                ),
+                headers={'User-Agent': self.http_config['user_agent']}
+            )
+            self._loop = loop
+            self.stats['sessions_created'] += 1
+            logger.info("🌐 تم إنشاء جلسة HTTP المشتركة")
+        return self.session
+
+    def _timeout(self, timeout: Optional[float]) -> aiohttp.ClientTimeout:
+        """مهلة الطلب مقيدة بميزانية وقت المستدعي إن وجدت"""
+        total = timeout or self.http_config['total_timeout']
+        remaining = remaining_time()
+        if remaining is not None:
+            if remaining <= 0:
+                raise DeadlineExceeded("انتهت ميزانية الوقت قبل طلب HTTP")
+            total = min(total, remaining)
+        return aiohttp.ClientTimeout(total=total, connect=min(total, self.http_config['connect_timeout']))
+
+    async def request(self, method: str, url: str, timeout: Optional[float] = None,
+                      raise_for_status: bool = True, **kwargs) -> Dict[str, Any]:
+        """تنفيذ طلب وإرجاع {'status', 'data', 'latency'} - data هو JSON إن أمكن وإلا نص"""
+        session = self.get_session()
+        start_time = time.perf_counter()
+        self.stats['requests'] += 1
+        try:
+            async with session.request(method, url, timeout=self._timeout(timeout), **kwargs) as response:
+                if response.content_type == 'application/json':
+                    data = await response.json()
+                else:
+                    data = await response.text()
+
+                if raise_for_status and response.status >= 400:
+                    raise HttpError(response.status, url, data)
+
+                return {
+                    'status': response.status,
+                    'data': data,
+                    'latency': time.perf_counter() - start_time
+                }
+        except Exception:
+            self.stats['errors'] += 1
+            raise
+        finally:
+            self.stats['total_latency'] += time.perf_counter() - start_time
+
+    async def get_json(self, url: str, params: Optional[Dict[str, Any]] = None,
+                       headers: Optional[Dict[str, str]] = None, timeout: Optional[float] = None) -> Any:
+        """طلب GET وإرجاع JSON"""
+        response = await self.request('GET', url, timeout=timeout, params=params, headers=headers)
+        return response['data']
+
+    async def post_json(self, url: str, payload: Any = None, headers: Optional[Dict[str, str]] = None,
+                        timeout: Optional[float] = None) -> Any:
+        """طلب POST بجسم JSON وإرجاع JSON"""
+        response = await self.request('POST', url, timeout=timeout, json=payload, headers=headers)
+        return response['data']
+
+    async def close(self) -> None:
+        """إغلاق الجلسة المشتركة (عند إيقاف التطبيق)"""
+        if self.session is not None and not self.session.closed:
+            await self.session.close()
+        self.session = None
+        self._loop = None
+
+    def get_client_status(self) -> Dict[str, Any]:
+        """حالة العميل"""
+        requests = self.stats['requests']
+        return {
+            'session_open': self.session is not None and not self.session.closed,
+            'http_config': self.http_config,
+            'avg_latency_ms': (self.stats['total_latency'] / requests * 1000) if requests else 0.0,
+            **self.stats
+        }
+
+
+# نسخة عالمية مشتركة بين جميع الخدمات
+http_client = HttpClient()
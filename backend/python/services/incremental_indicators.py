@@ -0,0 +1,680 @@
+# backend/python/services/incremental_indicators.py
+"""
+📈 محرك المؤشرات التزايدي - نوافذ متحركة بمخازن حلقية لكل رمز وإطار زمني تتقدم بتكلفة O(1) لكل شمعة
+المؤشرات التعاودية (EMA و Wilder و OBV/AD) تُبذر من أول نافذة الطلب فتُعاد بـ talib على النافذة عند الطلب
+وتطابق السمات AdvancedAIService._prepare_advanced_features لنفس نافذة الشموع
+الإصدار: 3.0.0 | المطور: Akraa Trading Team
+"""
+
+import logging
+import math
+import os
+from collections import deque
+from functools import lru_cache
+from typing import Dict, List, Optional, Any, Tuple
+
+import numpy as np
+import talib
+import talib.abstract
+
+logger = logging.getLogger(__name__)
+
+NAN = math.nan
+TA_EPSILON = 1e-8  # عتبة TA_IS_ZERO في talib
+
+# ترتيب الأعمدة كما ينتجها المسار الدفعي - النماذج والمقاييس المحفوظة مدربة عليه
+FEATURE_COLUMNS = [
+    'open', 'high', 'low', 'close', 'volume',
+    'price_momentum', 'volume_trend', 'volatility',
+    'sma_5', 'ema_5', 'price_vs_sma_5', 'sma_10', 'ema_10', 'price_vs_sma_10',
+    'sma_20', 'ema_20', 'price_vs_sma_20', 'sma_50', 'ema_50', 'price_vs_sma_50',
+    'sma_100', 'ema_100', 'price_vs_sma_100',
+    'trend_strength', 'momentum', 'volume_volatility', 'volume_sma_ratio',
+    'rsi_6', 'rsi_14', 'rsi_21', 'macd', 'macd_signal', 'macd_hist',
+    'bb_upper', 'bb_middle', 'bb_lower', 'bb_width', 'bb_position',
+    'stoch_k', 'stoch_d', 'atr', 'obv', 'cci', 'williams_r', 'adx',
+    'returns', 'volatility_1d', 'volatility_5d', 'skewness', 'kurtosis', 'autocorr_1', 'autocorr_5', 'hurst',
+    'cdldoji', 'cdlhammer', 'cdlengulfing', 'cdlmorningstar', 'cdleveningstar', 'cdlharami',
+    'cdlpiercing', 'cdldarkcloudcover', 'cdlshootingstar', 'cdl3whitesoldiers', 'cdl3blackcrows',
+    'roc_5', 'roc_10', 'roc_20', 'trix', 'uo', 'adosc', 'mfi',
+]
+
+CANDLE_PATTERNS = [
+    'CDLDOJI', 'CDLHAMMER', 'CDLENGULFING', 'CDLMORNINGSTAR',
+    'CDLEVENINGSTAR', 'CDLHARAMI', 'CDLPIERCING', 'CDLDARKCLOUDCOVER',
+    'CDLSHOOTINGSTAR', 'CDL3WHITESOLDIERS', 'CDL3BLACKCROWS'
+]
+# أنماط الشموع تعتمد على نافذة خلفية ثابتة (أطولها 13 شمعة) فتُحسب على ذيل قصير
+PATTERN_TAIL = 16
+MA_PERIODS = (5, 10, 20, 50, 100)
+RSI_PERIODS = (6, 14, 21)
+AUTOCORR_LAGS = (1, 5)
+HURST_LAGS = np.arange(2, 20)
+ROC_PERIODS = (5, 10, 20)
+# افتراضيات تختلف بين إصدارات مكتبة TA-Lib - تُقرأ من المكتبة المثبتة لتطابق المسار الدفعي
+BBANDS_PERIOD = int(talib.abstract.Function('BBANDS').parameters['timeperiod'])
+# الإصدارات القديمة تعيد صفراً لـ MFI عندما يقل مجموع التدفق عن 1.0، وللانحراف عند قيم دون 1e-8
+_probe = np.linspace(0.99999, 1.00001, 32)
+MFI_MIN_FLOW = 1.0 if talib.MFI(_probe * 1.1, _probe * 0.9, _probe, _probe * 1e-3)[-1] == 0.0 else TA_EPSILON
+BBANDS_MIN_VARIANCE = TA_EPSILON if talib.STDDEV(_probe, 5)[-1] == 0.0 else 0.0
+
+COLUMN_INDEX = {name: index for index, name in enumerate(FEATURE_COLUMNS)}
+# أعمدة window_seeded - لا تُحسب في الحالة لأن قيمتها تتغير مع بداية النافذة
+SEEDED = NAN
+# شموع كافية لتجاوز أطول فترة إحماء (Hurst على 100 عائد)
+WARMUP_PROBE = 300
+
+
+def _ratio(numerator: float, denominator: float) -> float:
+    """قسمة بدلالات numpy - القسمة على صفر تعطي ±inf أو NaN كما في المسار الدفعي"""
+    if denominator == 0:
+        return NAN if numerator == 0 or math.isnan(numerator) else math.copysign(math.inf, numerator)
+    return numerator / denominator
+
+
+def window_seeded(opens: np.ndarray, highs: np.ndarray, lows: np.ndarray,
+                  closes: np.ndarray, volumes: np.ndarray) -> Dict[str, np.ndarray]:
+    """السمات التي تعتمد على أول شمعة في النافذة: بذرة EMA وWilder وبداية المجاميع التراكمية (OBV و AD)
+
+    المسار الدفعي يبذرها من أول نافذة الطلب، فتتغير كل قيمها كلما تحركت النافذة شمعة واحدة.
+    لا توجد حالة تعاودية تطابقها، فتُحسب بنفس استدعاءات talib على شموع النافذة - O(طول النافذة).
+    """
+    adx = talib.ADX(highs, lows, closes, timeperiod=14)
+    macd, macd_signal, macd_hist = talib.MACD(closes)
+    columns = {f'ema_{period}': talib.EMA(closes, timeperiod=period) for period in MA_PERIODS}
+    columns.update({f'rsi_{period}': talib.RSI(closes, timeperiod=period) for period in RSI_PERIODS})
+    columns.update({
+        'trend_strength': adx, 'adx': adx,
+        'macd': macd, 'macd_signal': macd_signal, 'macd_hist': macd_hist,
+        'atr': talib.ATR(highs, lows, closes),
+        'obv': talib.OBV(closes, volumes),
+        'trix': talib.TRIX(closes),
+        'adosc': talib.ADOSC(highs, lows, closes, volumes),
+    })
+    return columns
+
+
+@lru_cache(maxsize=1)
+def warmup_rows() -> np.ndarray:
+    """عدد الصفوف الأولى الفارغة (NaN) لكل عمود في نافذة تبدأ من الصفر - من تغذية حالة جديدة بشموع تجريبية"""
+    rng = np.random.default_rng(0)
+    closes = 100.0 * np.exp(np.cumsum(rng.normal(0, 0.01, WARMUP_PROBE)))
+    state = FeatureState(WARMUP_PROBE)
+    opens = closes * (1 + rng.normal(0, 0.001, WARMUP_PROBE))
+    for index, (open_, close) in enumerate(zip(opens, closes)):
+        state.update((index, open_, max(open_, close) * 1.002, min(open_, close) * 0.997, close, 1.0 + index % 7))
+    valid = ~np.isnan(state.matrix())
+    return np.where(valid.any(axis=0), np.argmax(valid, axis=0), WARMUP_PROBE)
+
+
+class Window:
+    """نافذة منزلقة بحجم ثابت - مجاميع جارية لقوى الانحراف عن إزاحة
+
+    الإزاحة (متوسط النافذة عند آخر إعادة حساب) تحمي التباين من فقدان الدقة للأسعار الكبيرة،
+    وإعادة الحساب كل size عملية تمنع تراكم خطأ الجمع والطرح (تكلفة مطفأة O(1)).
+    """
+
+    def __init__(self, size: int, powers: int = 1):
+        self.size = size
+        self.powers = powers
+        self.values: deque = deque(maxlen=size)
+        self.shift = 0.0
+        self.sums = [0.0] * powers
+        self.operations = 0
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    @property
+    def full(self) -> bool:
+        return len(self.values) == self.size
+
+    def push(self, value: float, replace: bool = False) -> None:
+        """إضافة قيمة، أو استبدال آخر قيمة عند تحديث الشمعة الأخيرة"""
+        if replace:
+            removed = self.values[-1]
+            self.values[-1] = value
+        else:
+            removed = self.values[0] if self.full else None
+            self.values.append(value)
+        if not self.powers:
+            return
+        self.operations += 1
+        if self.operations >= self.size:
+            self._resync()
+            return
+        if removed is not None:
+            self._accumulate(removed, -1.0)
+        self._accumulate(value, 1.0)
+
+    def _accumulate(self, value: float, sign: float) -> None:
+        delta = value - self.shift
+        term = sign
+        for power in range(self.powers):
+            term *= delta
+            self.sums[power] += term
+
+    def _resync(self) -> None:
+        self.operations = 0
+        self.shift = sum(self.values) / len(self.values)
+        deltas = [value - self.shift for value in self.values]
+        self.sums = [sum(delta ** (power + 1) for delta in deltas) for power in range(self.powers)]
+
+    def total(self) -> float:
+        return self.shift * len(self.values) + self.sums[0]
+
+    def mean(self) -> float:
+        return self.shift + self.sums[0] / len(self.values)
+
+    def variance(self, ddof: int = 1) -> float:
+        n = len(self.values)
+        if n <= ddof:
+            return NAN
+        return max((self.sums[1] - self.sums[0] ** 2 / n) / (n - ddof), 0.0)
+
+    def std(self, ddof: int = 1) -> float:
+        return math.sqrt(self.variance(ddof))
+
+    def constant(self) -> bool:
+        return max(self.values) == min(self.values)
+
+    def _central_moments(self) -> Tuple[float, float, float]:
+        n = len(self.values)
+        first = self.sums[0] / n
+        second = self.sums[1] / n - first * first
+        third = self.sums[2] / n - first ** 3 - 3 * first * second
+        fourth = self.sums[3] / n - first ** 4 - 6 * second * first * first - 4 * third * first \
+            if self.powers >= 4 else NAN
+        return second, third, fourth
+
+    def skew(self) -> float:
+        """معامل الالتواء المصحح كما في pandas rolling().skew()"""
+        n = len(self.values)
+        if n < 3:
+            return NAN
+        second, third, _ = self._central_moments()
+        if second <= 1e-14:
+            return 0.0 if self.constant() else NAN
+        return math.sqrt(n * (n - 1.0)) * third / ((n - 2) * second ** 1.5)
+
+    def kurt(self) -> float:
+        """التفرطح الزائد المصحح كما في pandas rolling().kurt()"""
+        n = float(len(self.values))
+        if n < 4:
+            return NAN
+        second, _, fourth = self._central_moments()
+        if second <= 1e-14:
+            return -3.0 if self.constant() else NAN
+        return ((n * n - 1.0) * fourth / (second * second) - 3 * (n - 1.0) ** 2) / ((n - 2.0) * (n - 3.0))
+
+
+class Indicator:
+    """مؤشر تزايدي - step تتقدم شمعة واحدة
+
+    الحالة العددية تُحفظ قبل كل شمعة جديدة، فتحديث الشمعة الأخيرة يستعيدها ويعيد الخطوة.
+    النوافذ والمؤشرات الداخلية تستقبل replace نفسه فتتراجع بنفسها.
+    """
+
+    def update(self, *inputs, replace: bool = False):
+        if replace:
+            self.__dict__.update(self._saved)
+        else:
+            self._saved = {key: value for key, value in self.__dict__.items() if isinstance(value, (int, float))}
+        return self.step(*inputs, replace=replace)
+
+    def step(self, *inputs, replace: bool = False):
+        raise NotImplementedError
+
+
+class SMA(Indicator):
+    def __init__(self, period: int, powers: int = 1):
+        self.window = Window(period, powers)
+
+    def step(self, value: float, replace: bool = False) -> float:
+        self.window.push(value, replace)
+        return self.window.mean() if self.window.full else NAN
+
+
+class BollingerBands(Indicator):
+    """نطاقات بولنجر (SMA والانحراف المعياري للمجتمع)"""
+
+    def __init__(self, period: int = BBANDS_PERIOD, deviations: float = 2.0):
+        self.deviations = deviations
+        self.window = Window(period, powers=2)
+
+    def step(self, close: float, replace: bool = False) -> Tuple[float, float, float]:
+        self.window.push(close, replace)
+        if not self.window.full:
+            return NAN, NAN, NAN
+        middle = self.window.mean()
+        variance = self.window.variance(ddof=0)
+        deviation = math.sqrt(variance) * self.deviations if variance >= BBANDS_MIN_VARIANCE else 0.0
+        return middle + deviation, middle, middle - deviation
+
+
+class Stochastic(Indicator):
+    """Stochastic البطيء (5، 3، 3) بمتوسطات بسيطة"""
+
+    def __init__(self, fastk: int = 5, slowk: int = 3, slowd: int = 3):
+        self.highs = Window(fastk, powers=0)
+        self.lows = Window(fastk, powers=0)
+        self.slow_k = SMA(slowk)
+        self.slow_d = SMA(slowd)
+
+    def step(self, high: float, low: float, close: float, replace: bool = False) -> Tuple[float, float]:
+        self.highs.push(high, replace)
+        self.lows.push(low, replace)
+        if not self.highs.full:
+            return NAN, NAN
+        lowest = min(self.lows.values)
+        diff = (max(self.highs.values) - lowest) / 100.0
+        fast_k = (close - lowest) / diff if diff != 0.0 else 0.0
+        slow_k = self.slow_k.update(fast_k, replace=replace)
+        if math.isnan(slow_k):
+            return NAN, NAN
+        slow_d = self.slow_d.update(slow_k, replace=replace)
+        if math.isnan(slow_d):
+            return NAN, NAN
+        return slow_k, slow_d
+
+
+class WilliamsR(Indicator):
+    def __init__(self, period: int = 14):
+        self.highs = Window(period, powers=0)
+        self.lows = Window(period, powers=0)
+
+    def step(self, high: float, low: float, close: float, replace: bool = False) -> float:
+        self.highs.push(high, replace)
+        self.lows.push(low, replace)
+        if not self.highs.full:
+            return NAN
+        highest = max(self.highs.values)
+        diff = (highest - min(self.lows.values)) / -100.0
+        return (highest - close) / diff if diff != 0.0 else 0.0
+
+
+class CCI(Indicator):
+    """CCI - الانحراف المتوسط يتطلب المرور على النافذة (ثابتة الطول)"""
+
+    def __init__(self, period: int = 14):
+        self.period = period
+        self.window = Window(period, powers=0)
+
+    def step(self, high: float, low: float, close: float, replace: bool = False) -> float:
+        typical = (high + low + close) / 3
+        self.window.push(typical, replace)
+        if not self.window.full:
+            return NAN
+        average = sum(self.window.values) / self.period
+        deviation = sum(abs(value - average) for value in self.window.values)
+        diff = typical - average
+        if diff != 0.0 and deviation != 0.0 and not self.window.constant():
+            return diff / (0.015 * (deviation / self.period))
+        return 0.0
+
+
+class UltimateOscillator(Indicator):
+    def __init__(self, periods: Tuple[int, int, int] = (7, 14, 28)):
+        self.buying = [Window(period) for period in periods]
+        self.ranges = [Window(period) for period in periods]
+        self.prev_close = NAN
+
+    def step(self, high: float, low: float, close: float, replace: bool = False) -> float:
+        prev_close, self.prev_close = self.prev_close, close
+        if math.isnan(prev_close):
+            return NAN
+        true_low = min(low, prev_close)
+        pressure = close - true_low
+        true_range = max(high, prev_close) - true_low
+        for buying, ranges in zip(self.buying, self.ranges):
+            buying.push(pressure, replace)
+            ranges.push(true_range, replace)
+        if not self.ranges[-1].full:
+            return NAN
+        output = 0.0
+        for weight, buying, ranges in zip((4.0, 2.0, 1.0), self.buying, self.ranges):
+            total_range = ranges.total()
+            if abs(total_range) >= TA_EPSILON:
+                output += weight * (buying.total() / total_range)
+        return 100.0 * (output / 7.0)
+
+
+class MFI(Indicator):
+    """مؤشر تدفق الأموال - مجاميع التدفق الموجب والسالب لآخر period شمعة"""
+
+    def __init__(self, period: int = 14):
+        self.positive = Window(period)
+        self.negative = Window(period)
+        self.prev_typical = NAN
+
+    def step(self, high: float, low: float, close: float, volume: float, replace: bool = False) -> float:
+        typical = (high + low + close) / 3
+        prev, self.prev_typical = self.prev_typical, typical
+        if math.isnan(prev):
+            return NAN
+        flow = typical * volume
+        self.positive.push(flow if typical > prev else 0.0, replace)
+        self.negative.push(flow if typical < prev else 0.0, replace)
+        if not self.positive.full:
+            return NAN
+        positive = self.positive.total()
+        total = positive + self.negative.total()
+        return 100.0 * (positive / total) if total >= MFI_MIN_FLOW else 0.0
+
+
+class RollingAutocorr(Indicator):
+    """الارتباط الذاتي بفجوة lag داخل آخر window قيمة - نافذتا الأزواج ومجموع جداءاتها"""
+
+    def __init__(self, window: int, lag: int):
+        self.lag = lag
+        self.history = Window(lag + 1, powers=0)
+        self.current = Window(window - lag, powers=2)
+        self.lagged = Window(window - lag, powers=2)
+        self.products = Window(window - lag)
+
+    def step(self, value: float, replace: bool = False) -> float:
+        self.history.push(value, replace)
+        if len(self.history) <= self.lag:
+            return NAN
+        lagged = self.history.values[0]
+        self.current.push(value, replace)
+        self.lagged.push(lagged, replace)
+        self.products.push(value * lagged, replace)
+        if not self.current.full:
+            return NAN
+        variances = []
+        for window in (self.current, self.lagged):
+            variance = window.variance(ddof=0)
+            if variance <= 1e-14 and window.constant():
+                return NAN
+            variances.append(variance)
+        covariance = self.products.mean() - self.current.mean() * self.lagged.mean()
+        return covariance / math.sqrt(variances[0] * variances[1])
+
+
+class RollingHurst(Indicator):
+    """أس هيرست التقريبي لآخر window قيمة - تباين متحرك لفروق كل فجوة وميل مربعات صغرى ثابت الأوزان"""
+
+    def __init__(self, window: int = 100, lags: np.ndarray = HURST_LAGS):
+        log_lags = np.log(lags)
+        centered = log_lags - log_lags.mean()
+        self.weights = [float(weight) for weight in centered / (centered ** 2).sum()]
+        self.lags = [int(lag) for lag in lags]
+        self.history = Window(self.lags[-1] + 1, powers=0)
+        self.differences = [Window(window - lag, powers=2) for lag in self.lags]
+
+    def step(self, value: float, replace: bool = False) -> float:
+        self.history.push(value, replace)
+        history = self.history.values
+        for lag, differences in zip(self.lags, self.differences):
+            if len(history) > lag:
+                differences.push(value - history[-1 - lag], replace)
+        if not self.differences[0].full:
+            return NAN
+        slope = 0.0
+        for weight, differences in zip(self.weights, self.differences):
+            variance = differences.variance(ddof=0)
+            if variance <= 1e-14 and differences.constant():
+                return NAN
+            slope += weight * 0.5 * math.log(variance)
+        return slope
+
+
+class FeatureState:
+    """حالة المؤشرات لرمز وإطار زمني - صف سمات لكل شمعة بترتيب FEATURE_COLUMNS في مخزن حلقي
+
+    أعمدة window_seeded تبقى NaN في الصفوف وتُملأ في window لنافذة الطلب.
+    """
+
+    def __init__(self, history: int):
+        self.history = history
+        self.rows = np.full((history, len(FEATURE_COLUMNS)), NAN)
+        self.size = 0
+        self.head = 0
+        self.last_candle: Optional[Tuple[float, ...]] = None
+        self.version = 0
+        self._finalized: Optional[Tuple[int, int, np.ndarray]] = None
+
+        self.closes = Window(max(ROC_PERIODS) + 1, powers=0)
+        self.patterns = Window(PATTERN_TAIL, powers=0)
+        self.volume_trend = SMA(10)
+        self.close_stats = SMA(20, powers=2)
+        self.volume_stats = SMA(20, powers=2)
+        self.smas = {period: SMA(period) for period in MA_PERIODS}
+        self.bbands = BollingerBands()
+        self.stoch = Stochastic()
+        self.cci = CCI(14)
+        self.williams_r = WilliamsR(14)
+        self.returns_20 = SMA(20, powers=2)
+        self.returns_50 = SMA(50, powers=4)
+        self.autocorrs = [RollingAutocorr(50, lag) for lag in AUTOCORR_LAGS]
+        self.hurst = RollingHurst(100)
+        self.returns_100 = SMA(100, powers=2)
+        self.ultosc = UltimateOscillator()
+        self.mfi = MFI(14)
+
+    def _lag(self, periods: int) -> float:
+        closes = self.closes.values
+        return closes[-1 - periods] if len(closes) > periods else NAN
+
+    def _pattern_values(self) -> List[float]:
+        tail = np.array(self.patterns.values, dtype=np.float64)
+        opens, highs, lows, closes = tail[:, 0], tail[:, 1], tail[:, 2], tail[:, 3]
+        return [float(getattr(talib, pattern)(opens, highs, lows, closes)[-1]) for pattern in CANDLE_PATTERNS]
+
+    def _step(self, candle: Tuple[float, ...], replace: bool) -> List[float]:
+        _, open_, high, low, close, volume = candle
+        self.closes.push(close, replace)
+        self.patterns.push((open_, high, low, close), replace)
+
+        row = [open_, high, low, close, volume, _ratio(close, self._lag(5)) - 1]
+        row.append(self.volume_trend.update(volume, replace=replace))
+        self.close_stats.update(close, replace=replace)
+        row.append(self.close_stats.window.std() if self.close_stats.window.full else NAN)
+        for period in MA_PERIODS:
+            sma = self.smas[period].update(close, replace=replace)
+            row += [sma, SEEDED, _ratio(close - sma, sma)]
+        row += [SEEDED, close - self._lag(10)]
+        volume_mean = self.volume_stats.update(volume, replace=replace)
+        row += [self.volume_stats.window.std() if self.volume_stats.window.full else NAN,
+                _ratio(volume, volume_mean)]
+
+        row += [SEEDED] * (len(RSI_PERIODS) + 3)
+        upper, middle, lower = self.bbands.update(close, replace=replace)
+        row += [upper, middle, lower, _ratio(upper - lower, middle), _ratio(close - lower, upper - lower)]
+        row += self.stoch.update(high, low, close, replace=replace)
+        row += [SEEDED, SEEDED,
+                self.cci.update(high, low, close, replace=replace),
+                self.williams_r.update(high, low, close, replace=replace),
+                SEEDED]
+
+        returns = _ratio(close, self._lag(1)) - 1
+        row.append(returns)
+        if math.isnan(returns):
+            row += [NAN] * 7
+        else:
+            self.returns_20.update(returns, replace=replace)
+            self.returns_50.update(returns, replace=replace)
+            self.returns_100.update(returns, replace=replace)
+            row += [window.std() if window.full else NAN
+                    for window in (self.returns_20.window, self.returns_100.window)]
+            moments = self.returns_50.window
+            row += [moments.skew(), moments.kurt()] if moments.full else [NAN, NAN]
+            row += [autocorr.update(returns, replace=replace) for autocorr in self.autocorrs]
+            row.append(self.hurst.update(returns, replace=replace))
+
+        row += self._pattern_values()
+        row += [(_ratio(close, lag) - 1) * 100.0 if lag != 0.0 else 0.0
+                for lag in (self._lag(period) for period in ROC_PERIODS)]
+        row += [SEEDED,
+                self.ultosc.update(high, low, close, replace=replace),
+                SEEDED,
+                self.mfi.update(high, low, close, volume, replace=replace)]
+        return row
+
+    def update(self, candle) -> bool:
+        """تقدم بشمعة جديدة أو إعادة حساب الشمعة الأخيرة المحدثة - الشموع الأقدم تُتجاهل"""
+        candle = tuple(float(value) for value in candle[:6])
+        if self.last_candle is not None:
+            if candle[0] < self.last_candle[0] or candle == self.last_candle:
+                return False
+            replace = candle[0] == self.last_candle[0]
+        else:
+            replace = False
+
+        row = self._step(candle, replace)
+        if replace:
+            self.rows[(self.head - 1) % self.history] = row
+        else:
+            self.rows[self.head] = row
+            self.head = (self.head + 1) % self.history
+            self.size = min(self.size + 1, self.history)
+        self.last_candle = candle
+        self.version += 1
+        return True
+
+    def matrix(self, limit: Optional[int] = None) -> np.ndarray:
+        """آخر limit صف خام بالترتيب الزمني"""
+        limit = min(limit or self.size, self.size)
+        if self.size < self.history:
+            return self.rows[self.size - limit:self.size]
+        ordered = np.concatenate((self.rows[self.head:], self.rows[:self.head]))
+        return ordered[self.history - limit:]
+
+    def window(self, limit: Optional[int] = None) -> np.ndarray:
+        """آخر limit صف كما يحسبها المسار الدفعي لنافذة تبدأ من أولها
+
+        matrix تحمل تاريخ الحالة كله؛ هنا تُفرغ صفوف الإحماء لكل عمود، وتُحسب المؤشرات التعاودية
+        والتراكمية بـ talib على شموع النافذة (window_seeded)، وأنماط أول PATTERN_TAIL شمعة منها فقط.
+        """
+        rows = np.array(self.matrix(limit))
+        rows[np.arange(len(rows))[:, None] < warmup_rows()] = NAN
+        ohlcv = [np.ascontiguousarray(rows[:, index]) for index in range(5)]
+        for name, values in window_seeded(*ohlcv).items():
+            rows[:, COLUMN_INDEX[name]] = values
+        head = [values[:PATTERN_TAIL] for values in ohlcv[:4]]
+        for pattern in CANDLE_PATTERNS:
+            rows[:PATTERN_TAIL, COLUMN_INDEX[pattern.lower()]] = getattr(talib, pattern)(*head)
+        return rows
+
+    def finalized(self, limit: Optional[int] = None) -> np.ndarray:
+        """آخر limit صف للنافذة بعد خطوات التنظيف - مخزنة حتى تتقدم الحالة"""
+        limit = min(limit or self.size, self.size)
+        if self._finalized is not None and self._finalized[:2] == (self.version, limit):
+            return self._finalized[2]
+        rows = finalize(self.window(limit))
+        self._finalized = (self.version, limit, rows)
+        return rows
+
+
+def finalize(rows: np.ndarray) -> np.ndarray:
+    """خطوات التنظيف في المسار الدفعي: ملء أمامي ثم خلفي ثم أصفار، وقص المتطرف بمئينات 5/95 ± 1.5 IQR"""
+    rows = np.array(rows, dtype=np.float64)
+    if not len(rows):
+        return rows
+    columns = np.arange(rows.shape[1])
+    missing = np.isnan(rows)
+    if missing.any():
+        filled = np.where(missing, 0, np.arange(len(rows))[:, None])
+        np.maximum.accumulate(filled, axis=0, out=filled)
+        rows = rows[filled, columns]
+        missing = np.isnan(rows)
+        if missing.any():
+            first_valid = rows[np.argmax(~missing, axis=0), columns]
+            rows = np.where(missing, first_valid, rows)
+            rows[np.isnan(rows)] = 0.0
+
+    with np.errstate(invalid='ignore'):
+        varying = np.std(rows, axis=0, ddof=1) > 0 if len(rows) > 1 else np.zeros(len(columns), dtype=bool)
+    if varying.any():
+        low, high = np.quantile(rows[:, varying], [0.05, 0.95], axis=0)
+        spread = high - low
+        rows[:, varying] = np.clip(rows[:, varying], low - 1.5 * spread, high + 1.5 * spread)
+    return rows
+
+
+class IndicatorEngine:
+    """محرك المؤشرات التزايدي لكل (رمز، إطار زمني)
+
+    sync تغذي الحالة بالشموع الأحدث من آخر شمعة معالجة فقط، وتعيد البناء من البداية
+    عند فجوة أو عند أول استخدام. features تطابق المسار الدفعي لنافذة الطلب المتحركة: سمات
+    النوافذ المتحركة تزايدية، وEMA وWilder وOBV/AD وخطوات التنظيف (الملء والقص بالمئينات)
+    تُحسب على النافذة كلها مرة لكل نسخة من الحالة.
+    """
+
+    def __init__(self, history: Optional[int] = None):
+        self.indicator_config = {
+            'history': history or int(os.getenv('INDICATOR_HISTORY', '200')),
+            'max_states': int(os.getenv('INDICATOR_MAX_STATES', '500')),
+        }
+        self.states: Dict[Tuple[str, str], FeatureState] = {}
+        self.stats = {'candles': 0, 'replaced': 0, 'rebuilds': 0, 'syncs': 0}
+
+    def _rebuild(self, key: Tuple[str, str]) -> FeatureState:
+        self.states.pop(key, None)
+        if len(self.states) >= self.indicator_config['max_states']:
+            # الأقدم إدراجاً يُحرر أولاً
+            del self.states[next(iter(self.states))]
+        state = self.states[key] = FeatureState(self.indicator_config['history'])
+        self.stats['rebuilds'] += 1
+        return state
+
+    def _feed(self, state: FeatureState, candle) -> bool:
+        replace = state.last_candle is not None and float(candle[0]) == state.last_candle[0]
+        if not state.update(candle):
+            return False
+        self.stats['replaced' if replace else 'candles'] += 1
+        return True
+
+    def update(self, symbol: str, timeframe: str, candle) -> bool:
+        """تغذية شمعة واحدة (جديدة أو تحديث للأخيرة)"""
+        key = (symbol, timeframe)
+        return self._feed(self.states.get(key) or self._rebuild(key), candle)
+
+    def sync(self, symbol: str, timeframe: str, ohlcv) -> Optional[FeatureState]:
+        """مزامنة الحالة مع قائمة شموع مرتبة - تكلفة O(عدد الشموع الجديدة)"""
+        if ohlcv is None or not len(ohlcv):
+            return self.states.get((symbol, timeframe))
+        key = (symbol, timeframe)
+        state = self.states.get(key)
+        self.stats['syncs'] += 1
+
+        start = 0
+        if state is not None and state.last_candle is not None:
+            last_timestamp = state.last_candle[0]
+            if ohlcv[0][0] <= last_timestamp <= ohlcv[-1][0]:
+                start = len(ohlcv) - 1
+                while start > 0 and ohlcv[start][0] > last_timestamp:
+                    start -= 1
+            else:
+                state = None
+        if state is None:
+            state = self._rebuild(key)
+
+        for candle in ohlcv[start:]:
+            self._feed(state, candle)
+        return state
+
+    def features(self, symbol: str, timeframe: str, ohlcv) -> Optional[np.ndarray]:
+        """مصفوفة السمات النهائية لآخر len(ohlcv) شمعة (بحد history)"""
+        state = self.sync(symbol, timeframe, ohlcv)
+        if state is None or not state.size:
+            return None
+        return state.finalized(len(ohlcv))
+
+    def reset(self, symbol: str, timeframe: Optional[str] = None) -> None:
+        for key in [key for key in self.states if key[0] == symbol and timeframe in (None, key[1])]:
+            del self.states[key]
+
+    def get_indicator_status(self) -> Dict[str, Any]:
+        """حالة محرك المؤشرات"""
+        return {
+            'states': len(self.states),
+            'features': len(FEATURE_COLUMNS),
+            'config': self.indicator_config,
+            **self.stats
+        }
+
+
+# نسخة عالمية
+indicator_engine = IndicatorEngine()
@@ -0,0 +1,117 @@
+# backend/python/services/inference_coalescer.py
+"""
+🧮 دمج طلبات الاستدلال - الطلبات المتزامنة لنفس النموذج تُكدس في موتر واحد وتُنفذ بتمريرة أمامية واحدة
+النماذج لكل رمز بأوزان مختلفة، فالدمج يكون للطلبات على نفس النموذج (طلبات متكررة أو متزامنة لنفس الرمز)
+وليس بين الرموز؛ التمريرة تُنفذ في خيط عامل فلا تحجب حلقة الأحداث
+الإصدار: 3.0.0 | المطور: Akraa Trading Team
+"""
+
+import asyncio
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Any, Callable, Hashable, Set
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class InferenceGroup:
+    """نوافذ معلقة لنفس النموذج وشكل الإدخال"""
+    runner: Callable[[np.ndarray], np.ndarray]
+    windows: List[np.ndarray] = field(default_factory=list)
+    futures: List[asyncio.Future] = field(default_factory=list)
+    opened_at: float = field(default_factory=time.time)
+
+
+class InferenceCoalescer:
+    """دمج طلبات الاستدلال - كل مجموعة تُنفذ بتمريرة واحدة عند انتهاء مهلة التجميع أو امتلاء الدفعة
+
+    المفتاح هوية النموذج (الرمز أو كائن النموذج، وإصداره، وشكل النافذة) - الطلبات بمفاتيح مختلفة
+    لا تُدمج لأن أوزانها مختلفة. المنفذ يستقبل موتراً (عدد النوافذ، ...) ويعيد صفاً لكل نافذة
+    بنفس الترتيب، ويعمل في خيط عامل واحد: مفسر TFLite ونموذج Keras لا يُستدعيان من خيطين معاً.
+    """
+
+    def __init__(self, max_delay_ms: Optional[float] = None, max_batch: Optional[int] = None):
+        self.inference_config = {
+            'max_delay': (max_delay_ms or float(os.getenv('AI_COALESCE_MAX_DELAY_MS', '5'))) / 1000,
+            'max_batch': max_batch or int(os.getenv('AI_COALESCE_MAX_SIZE', '64')),
+        }
+        self.pending: Dict[Hashable, InferenceGroup] = {}
+        self.flush_handle: Optional[asyncio.TimerHandle] = None
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='inference')
+        self.running: Set[asyncio.Task] = set()
+        self.stats = {'requests': 0, 'windows': 0, 'batches': 0, 'flushes': 0, 'errors': 0, 'largest_batch': 0}
+
+    async def infer(self, key: Hashable, runner: Callable[[np.ndarray], np.ndarray],
+                    window: np.ndarray) -> np.ndarray:
+        """إضافة نافذة إلى مجموعة نموذجها وانتظار مخرجاتها"""
+        loop = asyncio.get_running_loop()
+        group = self.pending.get(key)
+        if group is None:
+            group = self.pending[key] = InferenceGroup(runner)
+        future = loop.create_future()
+        group.windows.append(window)
+        group.futures.append(future)
+        self.stats['requests'] += 1
+
+        if len(group.windows) >= self.inference_config['max_batch']:
+            self._run(self.pending.pop(key))
+        elif self.flush_handle is None:
+            self.flush_handle = loop.call_later(self.inference_config['max_delay'], self.flush)
+        return await future
+
+    def flush(self) -> None:
+        """تنفيذ كل المجموعات المعلقة"""
+        if self.flush_handle is not None:
+            self.flush_handle.cancel()
+            self.flush_handle = None
+        groups, self.pending = self.pending, {}
+        for group in groups.values():
+            self._run(group)
+        self.stats['flushes'] += 1
+
+    def _run(self, group: InferenceGroup) -> None:
+        task = asyncio.get_running_loop().create_task(self._execute(group))
+        self.running.add(task)
+        task.add_done_callback(self.running.discard)
+
+    async def _execute(self, group: InferenceGroup) -> None:
+        """تمريرة أمامية واحدة للمجموعة في الخيط العامل وتوزيع الصفوف على المنتظرين"""
+        loop = asyncio.get_running_loop()
+        try:
+            outputs = await loop.run_in_executor(self.executor, lambda: group.runner(np.stack(group.windows)))
+        except Exception as e:
+            self.stats['errors'] += 1
+            logger.error(f"❌ خطأ في الاستدلال المدمج ({len(group.windows)} نافذة): {str(e)}")
+            for future in group.futures:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        self.stats['batches'] += 1
+        self.stats['windows'] += len(group.windows)
+        self.stats['largest_batch'] = max(self.stats['largest_batch'], len(group.windows))
+        for future, output in zip(group.futures, outputs):
+            if not future.done():
+                future.set_result(output)
+
+    def get_coalescer_status(self) -> Dict[str, Any]:
+        """حالة دمج الاستدلال"""
+        batches = self.stats['batches']
+        return {
+            'pending_groups': len(self.pending),
+            'pending_windows': sum(len(group.windows) for group in self.pending.values()),
+            'running_batches': len(self.running),
+            'average_batch': round(self.stats['windows'] / batches, 2) if batches else 0.0,
+            'config': self.inference_config,
+            **self.stats
+        }
+
+
+# نسخة عالمية
+inference_coalescer = InferenceCoalescer()
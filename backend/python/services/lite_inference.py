@@ -0,0 +1,220 @@
+# backend/python/services/lite_inference.py
+"""
+🪶 الاستدلال الخفيف - تصدير نماذج TFLite (float16 و int8 ديناميكي) وتشغيلها بمفسر TFLite على المعالج
+التشغيل يحتاج tflite-runtime و numpy فقط بدون tensorflow/keras، مع فحص انحراف الدقة مقابل نموذج Keras عند التصدير
+الإصدار: 3.0.0 | المطور: Akraa Trading Team
+"""
+
+import json
+import logging
+import os
+import time
+from datetime import datetime
+from typing import Dict, Optional, Any
+
+import numpy as np
+
+try:
+    from tflite_runtime.interpreter import Interpreter
+except ImportError:
+    try:
+        # بديل أثقل عند غياب tflite-runtime
+        from tensorflow.lite.python.interpreter import Interpreter
+    except ImportError:
+        Interpreter = None
+
+logger = logging.getLogger(__name__)
+
+VARIANTS = {
+    'float16': 'ai_trading_model_fp16.tflite',
+    'int8': 'ai_trading_model_int8.tflite',
+}
+MANIFEST_FILE = 'tflite_manifest.json'
+
+
+class LiteModel:
+    """نموذج TFLite محمل ومسخن - run يستقبل (عدد النوافذ، الطول، السمات) ويعيد الاحتمالات
+
+    النموذج مصدر ببعد دفعة ديناميكي، فيُعاد تحجيم موتر الإدخال لعدد النوافذ وتُنفذ الدفعة
+    باستدعاء واحد للمفسر (التحجيم يحدث فقط عند تغير حجم الدفعة).
+    النماذج المصدرة بدفعة ثابتة (1) لا تقبل التحجيم لأن حالة LSTM المدمجة ثابتة الحجم،
+    فتُمرر نوافذها واحدة تلو الأخرى. حالة LSTM متغيرات دائمة في المفسر فتُصفر قبل كل استدعاء.
+    """
+
+    def __init__(self, path: str, num_threads: int = 1):
+        if Interpreter is None:
+            raise RuntimeError("لا يوجد مفسر TFLite - ثبت tflite-runtime")
+        self.path = path
+        self.interpreter = Interpreter(model_path=path, num_threads=num_threads)
+        self.interpreter.allocate_tensors()
+        self.input = self.interpreter.get_input_details()[0]
+        self.output = self.interpreter.get_output_details()[0]
+        self.input_shape = tuple(int(size) for size in self.input['shape'][1:])
+        self.batch_size = int(self.input['shape'][0])
+        self.resizable = True
+        self.invocations = 0
+        self.windows = 0
+        self.run(np.zeros((1, *self.input_shape), dtype=np.float32))
+
+    def _resize(self, batch_size: int) -> bool:
+        """تحجيم موتر الإدخال لحجم الدفعة - False إذا كان النموذج بدفعة ثابتة"""
+        if batch_size == self.batch_size:
+            return True
+        if not self.resizable:
+            return False
+        try:
+            self.interpreter.resize_tensor_input(self.input['index'], [batch_size, *self.input_shape])
+            self.interpreter.allocate_tensors()
+        except (ValueError, RuntimeError) as e:
+            self.resizable = False
+            self.interpreter.resize_tensor_input(self.input['index'], [self.batch_size, *self.input_shape])
+            self.interpreter.allocate_tensors()
+            logger.warning(f"⚠️ نموذج TFLite {os.path.basename(self.path)} بدفعة ثابتة - تنفيذ نافذة بنافذة: {str(e)}")
+            return False
+        self.batch_size = batch_size
+        return True
+
+    def _invoke(self, batch: np.ndarray) -> np.ndarray:
+        self.interpreter.reset_all_variables()
+        self.interpreter.set_tensor(self.input['index'], batch)
+        self.interpreter.invoke()
+        self.invocations += 1
+        return self.interpreter.get_tensor(self.output['index']).copy()
+
+    def run(self, windows: np.ndarray) -> np.ndarray:
+        windows = np.ascontiguousarray(windows, dtype=self.input['dtype'])
+        self.windows += len(windows)
+        if self._resize(len(windows)):
+            return self._invoke(windows)
+        return np.concatenate([self._invoke(windows[start:start + self.batch_size])
+                               for start in range(0, len(windows), self.batch_size)])
+
+
+def measure_drift(model, lite_model: LiteModel, windows: np.ndarray, chunk: int = 64) -> Dict[str, float]:
+    """انحراف احتمالات TFLite عن نموذج Keras على نفس النوافذ"""
+    reference, candidate = [], []
+    for start in range(0, len(windows), chunk):
+        batch = np.asarray(windows[start:start + chunk], dtype=np.float32)
+        reference.append(np.asarray(model(batch, training=False)))
+        candidate.append(lite_model.run(batch))
+    reference, candidate = np.concatenate(reference), np.concatenate(candidate)
+    error = np.abs(reference - candidate)
+    if reference.shape[1] == 1:
+        # مخرج sigmoid واحد - argmax دائماً 0 فيُقارن القرار عند العتبة
+        agreement = (reference[:, 0] > 0.5) == (candidate[:, 0] > 0.5)
+    else:
+        agreement = reference.argmax(axis=1) == candidate.argmax(axis=1)
+    return {
+        'samples': len(windows),
+        'max_abs_error': float(error.max()),
+        'mean_abs_error': float(error.mean()),
+        'agreement': float(np.mean(agreement)),
+    }
+
+
+class LiteInferenceRuntime:
+    """تصدير وتحميل نماذج TFLite لكل رمز - يُخدم المتغير المعتمد فقط (انحرافه ضمن الحدود)"""
+
+    def __init__(self):
+        self.lite_config = {
+            'enabled': os.getenv('AI_USE_TFLITE', 'true').lower() == 'true',
+            'variant': os.getenv('AI_TFLITE_VARIANT', 'float16'),
+            'num_threads': int(os.getenv('AI_TFLITE_THREADS', '2')),
+            'max_drift': float(os.getenv('AI_TFLITE_MAX_DRIFT', '0.02')),
+            'min_agreement': float(os.getenv('AI_TFLITE_MIN_AGREEMENT', '0.98')),
+            'drift_samples': int(os.getenv('AI_TFLITE_DRIFT_SAMPLES', '256')),
+        }
+        self.models: Dict[str, LiteModel] = {}
+        self.stats = {'exports': 0, 'export_failures': 0, 'loads': 0, 'rejected': 0}
+
+    def export(self, model, directory: str, sample_windows: Optional[np.ndarray] = None) -> Dict[str, Any]:
+        """كتابة متغيرات TFLite بجانب نموذج Keras مع ملف بيان يسجل الانحراف والاعتماد"""
+        import tensorflow as tf  # التصدير جزء من التدريب - التشغيل لا يحتاجه
+
+        if sample_windows is not None:
+            sample_windows = sample_windows[-self.lite_config['drift_samples']:]
+        manifest = {
+            'input_shape': [int(size) for size in model.input_shape[1:]],
+            'exported_at': datetime.utcnow().isoformat(),
+            'variants': {}
+        }
+        # بعد دفعة ديناميكي ليُنفذ LiteModel الدفعة باستدعاء واحد بعد تحجيم الإدخال
+        forward = tf.function(lambda batch: model(batch, training=False))
+        concrete = forward.get_concrete_function(tf.TensorSpec([None, *manifest['input_shape']], tf.float32))
+        for variant, filename in VARIANTS.items():
+            try:
+                converter = tf.lite.TFLiteConverter.from_concrete_functions([concrete], model)
+                converter.optimizations = [tf.lite.Optimize.DEFAULT]
+                if variant == 'float16':
+                    converter.target_spec.supported_types = [tf.float16]
+                content = converter.convert()
+            except Exception as e:
+                self.stats['export_failures'] += 1
+                logger.warning(f"⚠️ تعذر تصدير متغير TFLite {variant}: {str(e)}")
+                continue
+
+            path = os.path.join(directory, filename)
+            with open(path, 'wb') as f:
+                f.write(content)
+            info = {'file': filename, 'size_bytes': len(content), 'approved': False}
+            if sample_windows is not None and len(sample_windows):
+                try:
+                    info.update(measure_drift(model, LiteModel(path), sample_windows))
+                    info['approved'] = (info['max_abs_error'] <= self.lite_config['max_drift'] and
+                                        info['agreement'] >= self.lite_config['min_agreement'])
+                except Exception as e:
+                    info['error'] = str(e)
+            if not info['approved']:
+                logger.warning(f"⚠️ متغير TFLite {variant} غير معتمد للخدمة: {info}")
+            manifest['variants'][variant] = info
+            self.stats['exports'] += 1
+
+        with open(os.path.join(directory, MANIFEST_FILE), 'w') as f:
+            json.dump(manifest, f, indent=2)
+        self.models.pop(directory, None)
+        return manifest
+
+    def load(self, directory: str) -> Optional[LiteModel]:
+        """المتغير المفضل المعتمد (أو أي متغير معتمد) - None إذا لم يوجد أو كان التشغيل الخفيف معطلاً"""
+        if not self.lite_config['enabled'] or Interpreter is None:
+            return None
+        if directory in self.models:
+            return self.models[directory]
+
+        manifest_path = os.path.join(directory, MANIFEST_FILE)
+        if not os.path.exists(manifest_path):
+            return None
+        with open(manifest_path, 'r') as f:
+            variants = json.load(f)['variants']
+
+        preferred = self.lite_config['variant']
+        for variant in [preferred] + [name for name in VARIANTS if name != preferred]:
+            info = variants.get(variant)
+            if info is None:
+                continue
+            if not info.get('approved'):
+                self.stats['rejected'] += 1
+                continue
+            started = time.time()
+            lite_model = self.models[directory] = LiteModel(
+                os.path.join(directory, info['file']), self.lite_config['num_threads']
+            )
+            self.stats['loads'] += 1
+            logger.info(f"🪶 تم تحميل نموذج TFLite {variant} من {directory} ({(time.time() - started) * 1000:.1f}ms)")
+            return lite_model
+        return None
+
+    def get_lite_status(self) -> Dict[str, Any]:
+        """حالة الاستدلال الخفيف"""
+        return {
+            'interpreter_available': Interpreter is not None,
+            'loaded_models': {directory: {'file': os.path.basename(model.path), 'invocations': model.invocations,
+                                          'windows': model.windows, 'batch_resizable': model.resizable}
+                              for directory, model in self.models.items()},
+            'config': self.lite_config,
+            **self.stats
+        }
+
+
+# نسخة عالمية
+lite_runtime = LiteInferenceRuntime()
@@ -0,0 +1,294 @@
+# backend/python/services/market_registry.py
+"""
+🗂️ سجل بيانات الأسواق المخزن - فهرس الدقة والحدود والأسماء البديلة لكل منصة
+يحمل الأسواق مرة واحدة ويحدثها في الخلفية بمدة صلاحية طويلة دون طلبات شبكة في المسار الساخن
+الإصدار: 3.0.0 | المطور: Akraa Trading Team
+"""
+
+import asyncio
+import logging
+import os
+import time
+from dataclasses import dataclass, asdict
+from functools import cached_property
+from typing import Dict, List, Optional, Any
+
+from services.async_exchange_pool import AsyncExchangePool, exchange_pool
+from services.fixed_point import FixedPoint, Precision, DEFAULT_PRECISION, DEFAULT_SCALE, ROUND_DOWN, ROUND_HALF_UP
+
+logger = logging.getLogger(__name__)
+
+# أوضاع الدقة في ccxt
+DECIMAL_PLACES = 2
+SIGNIFICANT_DIGITS = 3
+TICK_SIZE = 4
+
+
+@dataclass
+class MarketInfo:
+    """بيانات سوق واحد مع الدقة والحدود"""
+    exchange: str
+    symbol: str
+    market_id: str
+    base: str
+    quote: str
+    market_type: str
+    active: bool
+    tick_size: Optional[float]
+    amount_step: Optional[float]
+    min_amount: Optional[float]
+    max_amount: Optional[float]
+    min_price: Optional[float]
+    max_price: Optional[float]
+    min_notional: Optional[float]
+    max_notional: Optional[float]
+
+    @cached_property
+    def precision(self) -> Precision:
+        """دقة الرمز بالنقطة الثابتة (حجم التيك وخطوة اللوت كوحدات صحيحة)"""
+        return Precision.from_steps(self.tick_size, self.amount_step)
+
+    def round_price(self, price: float) -> float:
+        """تقريب السعر لأقرب مضاعف لحجم التيك"""
+        if not self.tick_size:
+            return price
+        return self.precision.price(price, ROUND_HALF_UP).to_float()
+
+    def round_amount(self, amount: float) -> float:
+        """تقريب الكمية للأسفل لمضاعف خطوة اللوت"""
+        if not self.amount_step:
+            return amount
+        return self.precision.amount(amount, ROUND_DOWN).to_float()
+
+    @staticmethod
+    def _on_step(value: float, step: FixedPoint) -> bool:
+        """هل القيمة من مضاعفات الخطوة - بوحدات صحيحة بدقة تكفي لمنازل القيمة (0.1 + 0.2 على خطوة 0.1 صالحة)"""
+        scale = max(step.scale, DEFAULT_SCALE)
+        return FixedPoint.of(value, scale).units % (step.units * 10 ** (scale - step.scale)) == 0
+
+    def validate_order(self, amount: float, price: Optional[float] = None) -> List[str]:
+        """التحقق من الكمية والسعر مقابل حدود السوق"""
+        errors = []
+
+        if not self.active:
+            errors.append(f"السوق {self.symbol} غير نشط")
+
+        if self.min_amount and amount < self.min_amount:
+            errors.append(f"الكمية أقل من الحد الأدنى {self.min_amount}")
+        if self.max_amount and amount > self.max_amount:
+            errors.append(f"الكمية أكبر من الحد الأقصى {self.max_amount}")
+        if self.amount_step and not self._on_step(amount, self.precision.amount_step):
+            errors.append(f"الكمية ليست من مضاعفات خطوة اللوت {self.amount_step}")
+
+        if price is not None:
+            if self.min_price and price < self.min_price:
+                errors.append(f"السعر أقل من الحد الأدنى {self.min_price}")
+            if self.max_price and price > self.max_price:
+                errors.append(f"السعر أكبر من الحد الأقصى {self.max_price}")
+            if self.tick_size and not self._on_step(price, self.precision.tick_size):
+                errors.append(f"السعر ليس من مضاعفات حجم التيك {self.tick_size}")
+
+            notional = amount * price
+            if self.min_notional and notional < self.min_notional:
+                errors.append(f"قيمة الأمر أقل من الحد الأدنى {self.min_notional}")
+            if self.max_notional and notional > self.max_notional:
+                errors.append(f"قيمة الأمر أكبر من الحد الأقصى {self.max_notional}")
+
+        return errors
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class MarketRegistry:
+    """سجل الأسواق - فهرس في الذاكرة لكل منصة مع تحديث خلفي"""
+
+    def __init__(self, pool: AsyncExchangePool = None, ttl: Optional[float] = None):
+        self.pool = pool or exchange_pool
+        self.ttl = float(ttl or os.getenv('MARKET_REGISTRY_TTL', '3600'))
+
+        self.markets: Dict[str, Dict[str, MarketInfo]] = {}
+        self.aliases: Dict[str, Dict[str, str]] = {}
+        self.loaded_at: Dict[str, float] = {}
+
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self.refresh_tasks: Dict[str, asyncio.Task] = {}
+        self.stats = {'loads': 0, 'load_errors': 0}
+
+    @staticmethod
+    def normalize_key(symbol: str) -> str:
+        """BTC/USDT و btc-usdt و BTCUSDT -> BTCUSDT"""
+        return symbol.upper().replace('/', '').replace('-', '').replace('_', '')
+
+    def is_loaded(self, exchange: str) -> bool:
+        """هل تم تحميل أسواق المنصة"""
+        return exchange in self.markets
+
+    def is_stale(self, exchange: str) -> bool:
+        """هل انتهت صلاحية الفهرس"""
+        return time.time() - self.loaded_at.get(exchange, 0) > self.ttl
+
+    async def ensure_loaded(self, exchange: str) -> None:
+        """التحميل عند أول استخدام فقط"""
+        if not self.is_loaded(exchange):
+            await self.load(exchange)
+
+    async def load(self, exchange: str, force: bool = False) -> int:
+        """تحميل الأسواق من المنصة وبناء الفهرس"""
+        lock = self._locks.setdefault(exchange, asyncio.Lock())
+        async with lock:
+            # قد يكون طلب متزامن آخر أكمل التحميل أثناء الانتظار
+            if not force and self.is_loaded(exchange) and not self.is_stale(exchange):
+                return len(self.markets[exchange])
+
+            try:
+                markets = await self.pool.call(exchange, 'load_markets', True)
+                client = await self.pool.get_client(exchange)
+                self._build_index(exchange, markets, getattr(client, 'precisionMode', TICK_SIZE))
+                self.stats['loads'] += 1
+                logger.info(f"🗂️ تم تحميل {len(self.markets[exchange])} سوق من {exchange}")
+                return len(self.markets[exchange])
+
+            except Exception as e:
+                self.stats['load_errors'] += 1
+                logger.error(f"❌ خطأ في تحميل أسواق {exchange}: {str(e)}")
+                if not self.is_loaded(exchange):
+                    raise
+                # الاحتفاظ بالفهرس القديم عند فشل التحديث
+                return len(self.markets[exchange])
+
+    def _build_index(self, exchange: str, markets: Dict[str, Dict[str, Any]], precision_mode: int) -> None:
+        """بناء فهرس الأسواق والأسماء البديلة"""
+        index: Dict[str, MarketInfo] = {}
+        aliases: Dict[str, str] = {}
+
+        for symbol, market in markets.items():
+            precision = market.get('precision') or {}
+            limits = market.get('limits') or {}
+            amount_limits = limits.get('amount') or {}
+            price_limits = limits.get('price') or {}
+            cost_limits = limits.get('cost') or {}
+
+            info = MarketInfo(
+                exchange=exchange,
+                symbol=symbol,
+                market_id=str(market.get('id') or symbol),
+                base=market.get('base', ''),
+                quote=market.get('quote', ''),
+                market_type=market.get('type') or 'spot',
+                active=market.get('active') is not False,
+                tick_size=self._to_step(precision.get('price'), precision_mode),
+                amount_step=self._to_step(precision.get('amount'), precision_mode),
+                min_amount=amount_limits.get('min'),
+                max_amount=amount_limits.get('max'),
+                min_price=price_limits.get('min'),
+                max_price=price_limits.get('max'),
+                min_notional=cost_limits.get('min'),
+                max_notional=cost_limits.get('max')
+            )
+            index[symbol] = info
+
+            # الأسماء البديلة: الرمز الموحد ومعرف المنصة - الأولوية للسوق الفوري
+            for alias in (self.normalize_key(symbol.split(':')[0]), self.normalize_key(info.market_id)):
+                existing = aliases.get(alias)
+                if existing is None or (index[existing].market_type != 'spot' and info.market_type == 'spot'):
+                    aliases[alias] = symbol
+
+        # استبدال ذري للفهرس بالكامل
+        self.markets[exchange] = index
+        self.aliases[exchange] = aliases
+        self.loaded_at[exchange] = time.time()
+
+    @staticmethod
+    def _to_step(value: Optional[float], precision_mode: int) -> Optional[float]:
+        """تحويل الدقة إلى حجم خطوة حسب وضع الدقة في المنصة"""
+        if value is None:
+            return None
+        if precision_mode == DECIMAL_PLACES:
+            return 10.0 ** -int(value)
+        if precision_mode == SIGNIFICANT_DIGITS:
+            return None
+        return float(value)
+
+    def resolve(self, exchange: str, symbol: str) -> Optional[str]:
+        """تحويل أي صيغة للرمز إلى رمز ccxt الموحد"""
+        markets = self.markets.get(exchange)
+        if not markets:
+            return None
+        if symbol in markets:
+            return symbol
+        return self.aliases[exchange].get(self.normalize_key(symbol))
+
+    def get_market(self, exchange: str, symbol: str) -> Optional[MarketInfo]:
+        """بيانات السوق من الفهرس - بدون طلب شبكة"""
+        resolved = self.resolve(exchange, symbol)
+        return self.markets[exchange][resolved] if resolved else None
+
+    def get_precision(self, exchange: str, symbol: str) -> Precision:
+        """دقة الرمز للحساب بالنقطة الثابتة - دقة افتراضية إذا لم يكن الرمز في الفهرس"""
+        market = self.get_market(exchange, symbol) if self.is_loaded(exchange) else None
+        return market.precision if market is not None else DEFAULT_PRECISION
+
+    def active_symbols(self, exchange: str, quote: Optional[str] = None,
+                       market_type: str = 'spot') -> List[str]:
+        """الرموز النشطة من الفهرس"""
+        return [
+            symbol for symbol, info in self.markets.get(exchange, {}).items()
+            if info.active and info.market_type == market_type and (quote is None or info.quote == quote)
+        ]
+
+    def validate_order(self, exchange: str, symbol: str, amount: float,
+                       price: Optional[float] = None) -> List[str]:
+        """التحقق من أمر مقابل الفهرس - قائمة فارغة عند عدم توفر الفهرس"""
+        if not self.is_loaded(exchange):
+            return []
+        market = self.get_market(exchange, symbol)
+        if market is None:
+            return [f"الرمز {symbol} غير موجود على {exchange}"]
+        return market.validate_order(amount, price)
+
+    def start_background_refresh(self, exchange: str) -> None:
+        """تحديث الفهرس في الخلفية كل مدة صلاحية"""
+        if exchange in self.refresh_tasks and not self.refresh_tasks[exchange].done():
+            return
+
+        async def refresh_loop():
+            while True:
+                try:
+                    await self.ensure_loaded(exchange)
+                    await asyncio.sleep(max(0, self.ttl - (time.time() - self.loaded_at.get(exchange, 0))))
+                    await self.load(exchange, force=True)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.warning(f"⚠️ فشل تحديث سجل أسواق {exchange}: {str(e)}")
+                    await asyncio.sleep(60)
+
+        self.refresh_tasks[exchange] = asyncio.create_task(refresh_loop())
+
+    async def stop(self) -> None:
+        """إيقاف مهام التحديث"""
+        for task in self.refresh_tasks.values():
+            task.cancel()
+        await asyncio.gather(*self.refresh_tasks.values(), return_exceptions=True)
+        self.refresh_tasks.clear()
+
+    def get_registry_status(self) -> Dict[str, Any]:
+        """حالة السجل"""
+        return {
+            'ttl': self.ttl,
+            'exchanges': {
+                exchange: {
+                    'markets': len(markets),
+                    'active_spot': len(self.active_symbols(exchange)),
+                    'age_seconds': time.time() - self.loaded_at[exchange],
+                    'refreshing': exchange in self.refresh_tasks and not self.refresh_tasks[exchange].done()
+                }
+                for exchange, markets in self.markets.items()
+            },
+            **self.stats
+        }
+
+
+# نسخة عالمية
+market_registry = MarketRegistry()
@@ -0,0 +1,288 @@
+# backend/python/services/market_replay.py
+"""
+🎬 خادم إعادة تشغيل بيانات السوق - بديل محلي لتدفق المنصة في الاختبارات
+يبث رسائل بصيغة تدفقات Binance المجمعة (ticker و kline و depth و aggTrade) من ملف مسجل أو من مسار أسعار عشوائي
+الإصدار: 3.0.0 | المطور: Akraa Trading Team
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import random
+import time
+from typing import Dict, List, Optional, Any, AsyncIterator
+from urllib.parse import urlparse, parse_qs
+
+import websockets
+
+logger = logging.getLogger(__name__)
+
+
+class MarketReplayServer:
+    """خادم WebSocket يعيد تشغيل رسائل السوق
+
+    المصدر ملف JSONL يحتوي كل سطر فيه رسالة تدفق مجمع ({"stream": ..., "data": ...}).
+    الأسطر بصيغة {"snapshot": {"symbol": ..., "lastUpdateId": ..., "bids": ..., "asks": ...}}
+    هي لقطات دفتر تعيدها depth_snapshot ولا تُبث.
+    بدون ملف يتم توليد أسعار ودفاتر بمسار عشوائي لكل تدفق مطلوب.
+    """
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 8765,
+                 recording_path: Optional[str] = None, speed: float = 1.0,
+                 interval: float = 0.1, loop_recording: bool = False):
+        self.host = host
+        self.port = port
+        self.recording_path = recording_path
+        self.speed = speed
+        self.interval = interval
+        self.loop_recording = loop_recording
+
+        self.recording: List[Dict[str, Any]] = []
+        self.snapshots: Dict[str, Dict[str, Any]] = {}
+        self.books: Dict[str, Dict[str, Any]] = {}
+        self.server = None
+        self.clients = 0
+        self.sent_messages = 0
+
+        if recording_path:
+            messages = self._load_recording(recording_path)
+            for message in messages:
+                if 'snapshot' in message:
+                    snapshot = message['snapshot']
+                    self.snapshots.setdefault(snapshot['symbol'].upper(), snapshot)
+                else:
+                    self.recording.append(message)
+
+    @staticmethod
+    def _load_recording(path: str) -> List[Dict[str, Any]]:
+        """تحميل الرسائل المسجلة"""
+        with open(path, 'r', encoding='utf-8') as f:
+            messages = [json.loads(line) for line in f if line.strip()]
+        logger.info(f"📼 تم تحميل {len(messages)} رسالة من {path}")
+        return messages
+
+    @property
+    def url(self) -> str:
+        """رابط الخادم لاستخدامه كـ base_url في محول التدفق"""
+        return f"ws://{self.host}:{self.port}"
+
+    async def depth_snapshot(self, symbol: str, limit: int = 1000) -> Dict[str, Any]:
+        """لقطة الدفتر بصيغة ccxt (fetch_order_book) - تُمرر كـ snapshot_fetcher لمدير الدفاتر"""
+        key = symbol.replace('/', '').replace('-', '').upper()
+        if key in self.snapshots:
+            snapshot = self.snapshots[key]
+            bids = [[float(price), float(size)] for price, size in snapshot['bids']]
+            asks = [[float(price), float(size)] for price, size in snapshot['asks']]
+            nonce = int(snapshot['lastUpdateId'])
+        else:
+            book = self._synthetic_book(key)
+            bids = [[price, size] for price, size in sorted(book['bids'].items(), reverse=True)]
+            asks = [[price, size] for price, size in sorted(book['asks'].items())]
+            nonce = book['last_update_id']
+        return {'symbol': symbol, 'bids': bids[:limit], 'asks': asks[:limit], 'nonce': nonce}
+
+    async def start(self) -> None:
+        """بدء الخادم"""
+        self.server = await websockets.serve(self._handle_client, self.host, self.port)
+        if self.port == 0:
+            self.port = next(iter(self.server.sockets)).getsockname()[1]
+        logger.info(f"🎬 خادم إعادة التشغيل يعمل على {self.url}")
+
+    async def stop(self) -> None:
+        """إيقاف الخادم"""
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+            self.server = None
+
+    async def _handle_client(self, websocket, path: Optional[str] = None) -> None:
+        """بث الرسائل المطلوبة لعميل واحد"""
+        if path is None:
+            # websockets>=13 يمرر الطلب بدلاً من المسار
+            path = getattr(websocket, 'path', None) or websocket.request.path
+
+        query = parse_qs(urlparse(path).query)
+        streams = set(query.get('streams', [''])[0].split('/')) - {''}
+        self.clients += 1
+
+        try:
+            source = self._replay_recording(streams) if self.recording else self._generate_synthetic(streams)
+            async for message in source:
+                await websocket.send(json.dumps(message))
+                self.sent_messages += 1
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            self.clients -= 1
+
+    async def _replay_recording(self, streams: set) -> AsyncIterator[Dict[str, Any]]:
+        """إعادة تشغيل الرسائل المسجلة مع الحفاظ على الفواصل الزمنية"""
+        while True:
+            previous_time = None
+            for message in self.recording:
+                if streams and message.get('stream') not in streams:
+                    continue
+
+                event_time = message.get('data', {}).get('E')
+                if previous_time is not None and event_time is not None and self.speed > 0:
+                    await asyncio.sleep(max(0, (event_time - previous_time) / 1000 / self.speed))
+                previous_time = event_time
+                yield message
+
+            if not self.loop_recording:
+                return
+
+    async def _generate_synthetic(self, streams: set) -> AsyncIterator[Dict[str, Any]]:
+        """توليد رسائل التدفقات المطلوبة بمسار سعر عشوائي"""
+        prices: Dict[str, float] = {}
+        opens: Dict[str, float] = {}
+        highs: Dict[str, float] = {}
+        lows: Dict[str, float] = {}
+        volumes: Dict[str, float] = {}
+        trade_ids: Dict[str, int] = {}
+
+        while True:
+            now = int(time.time() * 1000)
+            for stream in sorted(streams):
+                stream_symbol, _, kind = stream.partition('@')
+                symbol = stream_symbol.upper()
+
+                if symbol not in prices:
+                    prices[symbol] = opens[symbol] = highs[symbol] = lows[symbol] = random.uniform(1, 1000)
+                    volumes[symbol] = 0.0
+
+                if kind == 'ticker':
+                    price = prices[symbol] * (1 + random.gauss(0, 0.0005))
+                    prices[symbol] = price
+                    highs[symbol] = max(highs[symbol], price)
+                    lows[symbol] = min(lows[symbol], price)
+                    volumes[symbol] += random.uniform(0, 10)
+                    yield {'stream': stream, 'data': self._ticker_event(
+                        symbol, now, price, opens[symbol], highs[symbol], lows[symbol], volumes[symbol]
+                    )}
+
+                elif kind.startswith('depth'):
+                    yield {'stream': stream, 'data': self._depth_event(symbol, now, prices[symbol])}
+
+                elif kind == 'aggTrade':
+                    trade_ids[symbol] = trade_ids.get(symbol, 0) + 1
+                    yield {'stream': stream, 'data': self._trade_event(symbol, now, trade_ids[symbol], prices[symbol])}
+
+                elif kind.startswith('kline_'):
+                    timeframe = kind[len('kline_'):]
+                    yield {'stream': stream, 'data': self._kline_event(
+                        symbol, now, timeframe, prices[symbol], opens[symbol],
+                        highs[symbol], lows[symbol], volumes[symbol]
+                    )}
+
+            await asyncio.sleep(self.interval / max(self.speed, 1e-9))
+
+    def _synthetic_book(self, symbol: str, mid: Optional[float] = None, levels: int = 50) -> Dict[str, Any]:
+        """دفتر عشوائي مشترك بين العملاء حتى تتوافق اللقطات مع الفروقات"""
+        if symbol not in self.books:
+            mid = mid or random.uniform(1, 1000)
+            tick = round(mid * 0.0001, 8) or 1e-8
+            self.books[symbol] = {
+                'tick': tick,
+                'bids': {round(mid - tick * (i + 1), 8): round(random.uniform(0.1, 10), 4) for i in range(levels)},
+                'asks': {round(mid + tick * (i + 1), 8): round(random.uniform(0.1, 10), 4) for i in range(levels)},
+                'last_update_id': 1
+            }
+        return self.books[symbol]
+
+    def _depth_event(self, symbol: str, now: int, mid: float) -> Dict[str, Any]:
+        """رسالة depthUpdate: تعديل/حذف/إضافة بضعة مستويات قرب أفضل الأسعار"""
+        book = self._synthetic_book(symbol, mid)
+        changes = {'b': [], 'a': []}
+        for side, key in (('bids', 'b'), ('asks', 'a')):
+            levels = book[side]
+            for _ in range(random.randint(1, 3)):
+                best = max(levels) if side == 'bids' else min(levels)
+                offset = book['tick'] * random.randint(0, 10)
+                price = round(best - offset if side == 'bids' else best + offset, 8)
+                # لا حذف إذا بقي مستوى واحد فقط
+                size = 0.0 if random.random() < 0.2 and len(levels) > 1 else round(random.uniform(0.1, 10), 4)
+                if size:
+                    levels[price] = size
+                else:
+                    levels.pop(price, None)
+                changes[key].append([f"{price:.8f}", f"{size:.8f}"])
+
+        first_update_id = book['last_update_id'] + 1
+        book['last_update_id'] += len(changes['b']) + len(changes['a'])
+        return {
+            'e': 'depthUpdate', 'E': now, 's': symbol,
+            'U': first_update_id, 'u': book['last_update_id'],
+            'b': changes['b'], 'a': changes['a']
+        }
+
+    @staticmethod
+    def _ticker_event(symbol: str, now: int, price: float, open_price: float,
+                      high: float, low: float, volume: float) -> Dict[str, Any]:
+        """رسالة 24hrTicker"""
+        spread = price * 0.0001
+        return {
+            'e': '24hrTicker', 'E': now, 's': symbol,
+            'c': f"{price:.8f}", 'o': f"{open_price:.8f}",
+            'h': f"{high:.8f}", 'l': f"{low:.8f}",
+            'b': f"{price - spread:.8f}", 'a': f"{price + spread:.8f}",
+            'P': f"{(price - open_price) / open_price * 100:.4f}",
+            'v': f"{volume:.8f}", 'q': f"{volume * price:.8f}"
+        }
+
+    @staticmethod
+    def _trade_event(symbol: str, now: int, trade_id: int, price: float) -> Dict[str, Any]:
+        """رسالة aggTrade بجانب مبادر عشوائي"""
+        return {
+            'e': 'aggTrade', 'E': now, 's': symbol, 'a': trade_id,
+            'p': f"{price:.8f}", 'q': f"{random.uniform(0.001, 5):.8f}",
+            'T': now, 'm': random.random() < 0.5
+        }
+
+    @staticmethod
+    def _kline_event(symbol: str, now: int, timeframe: str, price: float, open_price: float,
+                     high: float, low: float, volume: float) -> Dict[str, Any]:
+        """رسالة kline للشمعة المفتوحة"""
+        return {
+            'e': 'kline', 'E': now, 's': symbol,
+            'k': {
+                't': now - now % 60000, 'i': timeframe,
+                'o': f"{open_price:.8f}", 'h': f"{high:.8f}", 'l': f"{low:.8f}",
+                'c': f"{price:.8f}", 'v': f"{volume:.8f}", 'x': False
+            }
+        }
+
+
+async def record_stream(url: str, output_path: str, max_messages: int = 1000) -> int:
+    """تسجيل رسائل تدفق حقيقي إلى ملف JSONL لإعادة تشغيلها لاحقاً"""
+    count = 0
+    async with websockets.connect(url) as websocket:
+        with open(output_path, 'w', encoding='utf-8') as f:
+            async for raw_message in websocket:
+                f.write(raw_message.strip() + '\n')
+                count += 1
+                if count >= max_messages:
+                    break
+    logger.info(f"📼 تم تسجيل {count} رسالة في {output_path}")
+    return count
+
+
+async def _serve_forever(args) -> None:
+    server = MarketReplayServer(args.host, args.port, args.recording, args.speed, args.interval, args.loop)
+    await server.start()
+    await asyncio.Future()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="خادم إعادة تشغيل بيانات السوق")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--recording', help="ملف JSONL للرسائل المسجلة")
+    parser.add_argument('--speed', type=float, default=1.0)
+    parser.add_argument('--interval', type=float, default=0.1)
+    parser.add_argument('--loop', action='store_true')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(_serve_forever(args))
@@ -0,0 +1,400 @@
+# backend/python/services/market_stream.py
+"""
+📡 محرك استقبال بيانات السوق المتدفقة - WebSocket للأسعار والشموع والصفقات
+يحتفظ بآخر سعر والشمعة المفتوحة لكل رمز في الذاكرة مع واجهة نشر/اشتراك للمستهلكين
+الإصدار: 3.0.0 | المطور: Akraa Trading Team
+"""
+
+import asyncio
+import inspect
+import json
+import logging
+import os
+import random
+import time
+from dataclasses import dataclass, asdict
+from datetime import datetime
+from typing import Dict, List, Optional, Any, Callable, Tuple
+
+import websockets
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Tick:
+    """آخر سعر لرمز"""
+    exchange: str
+    symbol: str
+    price: float
+    bid: float
+    ask: float
+    high_24h: float
+    low_24h: float
+    change_24h: float
+    base_volume: float
+    quote_volume: float
+    timestamp: int  # ms
+
+    def to_market_fields(self) -> Dict[str, Any]:
+        """تحويل إلى حقول MarketData"""
+        return {
+            'symbol': self.symbol,
+            'price': self.price,
+            'volume': self.base_volume,
+            'timestamp': datetime.utcfromtimestamp(self.timestamp / 1000),
+            'change_24h': self.change_24h,
+            'high_24h': self.high_24h,
+            'low_24h': self.low_24h,
+            'bid': self.bid,
+            'ask': self.ask,
+            'spread': (self.ask - self.bid) / self.bid * 100 if self.bid else 0.0,
+            'base_volume': self.base_volume,
+            'quote_volume': self.quote_volume
+        }
+
+
+@dataclass
+class Candle:
+    """شمعة (مفتوحة أو مغلقة)"""
+    exchange: str
+    symbol: str
+    timeframe: str
+    open_time: int  # ms
+    open: float
+    high: float
+    low: float
+    close: float
+    volume: float
+    closed: bool
+
+    def to_ohlcv(self) -> List[float]:
+        """تحويل إلى صف OHLCV بصيغة ccxt"""
+        return [self.open_time, self.open, self.high, self.low, self.close, self.volume]
+
+
+@dataclass
+class Trade:
+    """صفقة عامة منفذة (aggTrade)"""
+    exchange: str
+    symbol: str
+    trade_id: int
+    price: float
+    amount: float
+    is_buyer_maker: bool
+    timestamp: int  # ms
+
+    @property
+    def side(self) -> str:
+        """جانب المبادر (aggressor): المشتري مبادر عندما لا يكون صانعاً"""
+        return 'sell' if self.is_buyer_maker else 'buy'
+
+
+class TickStore:
+    """مخزن الذاكرة لآخر سعر والشمعة المفتوحة لكل رمز"""
+
+    def __init__(self):
+        self.ticks: Dict[Tuple[str, str], Tick] = {}
+        self.candles: Dict[Tuple[str, str, str], Candle] = {}
+        self.last_closed: Dict[Tuple[str, str, str], Candle] = {}
+        self.received_at: Dict[Tuple[str, str], float] = {}
+
+    def update_tick(self, tick: Tick) -> None:
+        """تحديث آخر سعر"""
+        key = (tick.exchange, tick.symbol)
+        self.ticks[key] = tick
+        self.received_at[key] = time.time()
+
+    def update_candle(self, candle: Candle) -> None:
+        """تحديث الشمعة المفتوحة أو تسجيل شمعة مغلقة"""
+        key = (candle.exchange, candle.symbol, candle.timeframe)
+        self.candles[key] = candle
+        if candle.closed:
+            self.last_closed[key] = candle
+
+    def get_tick(self, symbol: str, exchange: str) -> Optional[Tick]:
+        """آخر سعر للرمز على المنصة - أسعار منصة أخرى لا تُستخدم بديلاً"""
+        return self.ticks.get((exchange, symbol))
+
+    def get_price(self, symbol: str, exchange: str, max_age: Optional[float] = None) -> Optional[float]:
+        """آخر سعر إذا كان حديثاً بما يكفي"""
+        tick = self.get_tick(symbol, exchange)
+        if tick is None:
+            return None
+        if max_age is not None and not self.is_fresh(symbol, exchange, max_age):
+            return None
+        return tick.price
+
+    def is_fresh(self, symbol: str, exchange: str, max_age: float) -> bool:
+        """التحقق من حداثة السعر على المنصة"""
+        received_at = self.received_at.get((exchange, symbol))
+        return received_at is not None and time.time() - received_at <= max_age
+
+    def get_candle(self, symbol: str, timeframe: str, exchange: str) -> Optional[Candle]:
+        """الشمعة المفتوحة الحالية"""
+        return self.candles.get((exchange, symbol, timeframe))
+
+    def symbols(self) -> List[str]:
+        """الرموز المتوفرة في المخزن"""
+        return sorted({symbol for _, symbol in self.ticks.keys()})
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """لقطة من آخر الأسعار"""
+        return {f"{exchange}:{symbol}": asdict(tick) for (exchange, symbol), tick in self.ticks.items()}
+
+
+class MarketDataBus:
+    """ناقل نشر/اشتراك لأحداث السوق
+
+    القنوات: tick:<symbol> و tick:* و candle:<symbol> و candle:* و trade:<symbol> و trade:*
+    """
+
+    def __init__(self):
+        self.subscribers: Dict[str, List[Callable]] = {}
+        self.queues: Dict[str, List[asyncio.Queue]] = {}
+        self.published = 0
+
+    def subscribe(self, channel: str, callback: Callable) -> Callable[[], None]:
+        """اشتراك بدالة (متزامنة أو غير متزامنة) - يعيد دالة إلغاء الاشتراك"""
+        self.subscribers.setdefault(channel, []).append(callback)
+
+        def unsubscribe():
+            if callback in self.subscribers.get(channel, []):
+                self.subscribers[channel].remove(callback)
+
+        return unsubscribe
+
+    def subscribe_queue(self, channel: str, maxsize: int = 1000) -> asyncio.Queue:
+        """اشتراك عبر طابور - يتم إسقاط أقدم حدث عند الامتلاء"""
+        queue = asyncio.Queue(maxsize=maxsize)
+        self.queues.setdefault(channel, []).append(queue)
+        return queue
+
+    def unsubscribe_queue(self, channel: str, queue: asyncio.Queue) -> None:
+        """إلغاء اشتراك طابور"""
+        if queue in self.queues.get(channel, []):
+            self.queues[channel].remove(queue)
+
+    async def publish(self, kind: str, symbol: str, payload: Any) -> None:
+        """نشر حدث لمشتركي الرمز ولمشتركي جميع الرموز"""
+        self.published += 1
+        for channel in (f"{kind}:{symbol}", f"{kind}:*"):
+            for queue in self.queues.get(channel, []):
+                if queue.full():
+                    queue.get_nowait()
+                queue.put_nowait(payload)
+
+            for callback in list(self.subscribers.get(channel, [])):
+                try:
+                    result = callback(payload)
+                    if inspect.isawaitable(result):
+                        await result
+                except Exception as e:
+                    logger.warning(f"⚠️ خطأ في مشترك {channel}: {str(e)}")
+
+
+class BinanceStreamAdapter:
+    """محول تدفقات Binance المجمعة (ticker و kline و aggTrade)"""
+
+    exchange = 'binance'
+
+    def __init__(self, base_url: Optional[str] = None):
+        self.base_url = base_url or os.getenv('BINANCE_STREAM_URL', 'wss://stream.binance.com:9443')
+        self.symbol_map: Dict[str, str] = {}
+
+    @staticmethod
+    def stream_symbol(symbol: str) -> str:
+        """BTC/USDT -> btcusdt"""
+        return symbol.replace('/', '').replace('-', '').lower()
+
+    def build_url(self, symbols: List[str], timeframes: List[str], trades: bool = False) -> str:
+        """بناء رابط التدفق المجمع"""
+        streams = []
+        for symbol in symbols:
+            stream_symbol = self.stream_symbol(symbol)
+            self.symbol_map[stream_symbol.upper()] = symbol
+            streams.append(f"{stream_symbol}@ticker")
+            streams.extend(f"{stream_symbol}@kline_{timeframe}" for timeframe in timeframes)
+            if trades:
+                streams.append(f"{stream_symbol}@aggTrade")
+        return f"{self.base_url}/stream?streams={'/'.join(streams)}"
+
+    def parse(self, raw_message: str) -> List[Any]:
+        """تحويل رسالة التدفق إلى أحداث Tick أو Candle أو Trade"""
+        message = json.loads(raw_message)
+        data = message.get('data', message)
+        event_type = data.get('e')
+        symbol = self.symbol_map.get(data.get('s', ''), data.get('s', ''))
+
+        if event_type == '24hrTicker':
+            return [Tick(
+                exchange=self.exchange,
+                symbol=symbol,
+                price=float(data['c']),
+                bid=float(data.get('b') or data['c']),
+                ask=float(data.get('a') or data['c']),
+                high_24h=float(data['h']),
+                low_24h=float(data['l']),
+                change_24h=float(data.get('P', 0.0)),
+                base_volume=float(data['v']),
+                quote_volume=float(data['q']),
+                timestamp=int(data['E'])
+            )]
+
+        if event_type == 'kline':
+            kline = data['k']
+            return [Candle(
+                exchange=self.exchange,
+                symbol=symbol,
+                timeframe=kline['i'],
+                open_time=int(kline['t']),
+                open=float(kline['o']),
+                high=float(kline['h']),
+                low=float(kline['l']),
+                close=float(kline['c']),
+                volume=float(kline['v']),
+                closed=bool(kline['x'])
+            )]
+
+        if event_type == 'aggTrade':
+            return [Trade(
+                exchange=self.exchange,
+                symbol=symbol,
+                trade_id=int(data['a']),
+                price=float(data['p']),
+                amount=float(data['q']),
+                is_buyer_maker=bool(data['m']),
+                timestamp=int(data['T'])
+            )]
+
+        return []
+
+
+class MarketDataStream:
+    """محرك الاستقبال المتدفق - اتصال WebSocket مع إعادة الاتصال التلقائي"""
+
+    def __init__(self, adapter: Optional[BinanceStreamAdapter] = None,
+                 store: Optional[TickStore] = None, bus: Optional[MarketDataBus] = None):
+        self.adapter = adapter or BinanceStreamAdapter()
+        self.store = store or TickStore()
+        self.bus = bus or MarketDataBus()
+
+        self.stream_config = {
+            'reconnect_base_delay': 1.0,
+            'reconnect_max_delay': 60.0,
+            'ping_interval': 20,
+            'max_streams_per_connection': 200,
+            'trade_streams': os.getenv('MARKET_STREAM_TRADES', 'false').lower() == 'true',
+        }
+
+        self.symbols: List[str] = []
+        self.timeframes: List[str] = []
+        self.tasks: List[asyncio.Task] = []
+        self.running = False
+        self.stats = {
+            'messages': 0,
+            'parse_errors': 0,
+            'reconnects': 0,
+            'connected_at': None,
+            'last_message_at': None
+        }
+
+    @property
+    def exchange(self) -> str:
+        """المنصة التي يغطيها المحول"""
+        return self.adapter.exchange
+
+    def covers(self, exchange: str) -> bool:
+        """هل للمنصة تدفق - غير ذلك تبقى أسعارها عبر REST"""
+        return self.adapter.exchange == exchange
+
+    async def start(self, symbols: List[str], timeframes: Optional[List[str]] = None) -> None:
+        """بدء الاشتراك في تدفقات الرموز"""
+        if self.running:
+            await self.stop()
+
+        self.symbols = list(symbols)
+        self.timeframes = list(timeframes or ['1m'])
+        self.running = True
+
+        # تقسيم الرموز على عدة اتصالات حسب حد التدفقات لكل اتصال
+        streams_per_symbol = 1 + len(self.timeframes) + int(self.stream_config['trade_streams'])
+        chunk_size = max(1, self.stream_config['max_streams_per_connection'] // streams_per_symbol)
+        for i in range(0, len(self.symbols), chunk_size):
+            chunk = self.symbols[i:i + chunk_size]
+            self.tasks.append(asyncio.create_task(self._connection_loop(chunk)))
+
+        logger.info(f"📡 بدء التدفق لـ {len(self.symbols)} رمز على {len(self.tasks)} اتصال")
+
+    async def stop(self) -> None:
+        """إيقاف جميع الاتصالات"""
+        self.running = False
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.tasks.clear()
+        logger.info("🛑 تم إيقاف تدفق بيانات السوق")
+
+    async def _connection_loop(self, symbols: List[str]) -> None:
+        """حلقة اتصال واحدة مع تراجع أسي عند الانقطاع"""
+        url = self.adapter.build_url(symbols, self.timeframes, self.stream_config['trade_streams'])
+        delay = self.stream_config['reconnect_base_delay']
+
+        while self.running:
+            try:
+                async with websockets.connect(url, ping_interval=self.stream_config['ping_interval']) as websocket:
+                    self.stats['connected_at'] = time.time()
+                    delay = self.stream_config['reconnect_base_delay']
+                    async for raw_message in websocket:
+                        await self.handle_message(raw_message)
+
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"⚠️ انقطع تدفق السوق: {str(e)} - إعادة الاتصال بعد {delay:.1f}ث")
+
+            if not self.running:
+                break
+
+            self.stats['reconnects'] += 1
+            await asyncio.sleep(delay + random.uniform(0, delay / 2))
+            delay = min(delay * 2, self.stream_config['reconnect_max_delay'])
+
+    async def handle_message(self, raw_message: str) -> None:
+        """معالجة رسالة واحدة: تحديث المخزن ثم النشر"""
+        self.stats['messages'] += 1
+        self.stats['last_message_at'] = time.time()
+
+        try:
+            events = self.adapter.parse(raw_message)
+        except Exception as e:
+            self.stats['parse_errors'] += 1
+            logger.debug(f"⚠️ رسالة تدفق غير صالحة: {str(e)}")
+            return
+
+        for event in events:
+            if isinstance(event, Tick):
+                self.store.update_tick(event)
+                await self.bus.publish('tick', event.symbol, event)
+            elif isinstance(event, Candle):
+                self.store.update_candle(event)
+                await self.bus.publish('candle', event.symbol, event)
+            elif isinstance(event, Trade):
+                await self.bus.publish('trade', event.symbol, event)
+
+    def get_stream_status(self) -> Dict[str, Any]:
+        """حالة التدفق"""
+        return {
+            'running': self.running,
+            'exchange': self.adapter.exchange,
+            'symbols': len(self.symbols),
+            'timeframes': self.timeframes,
+            'trade_streams': self.stream_config['trade_streams'],
+            'connections': len(self.tasks),
+            'stored_symbols': len(self.store.ticks),
+            **self.stats
+        }
+
+
+# نسخة عالمية
+market_stream = MarketDataStream()
@@ -0,0 +1,398 @@
+# backend/python/services/ohlcv_archive.py
+"""
+🗄️ أرشيف OHLCV على القرص - ملف ثنائي لكل رمز وفريم يُفتح بـ numpy.memmap
+قراءة النطاقات بحث ثنائي على الطابع الزمني بدون نسخ، مع ضغط zlib/lzma للأقسام الباردة
+الإصدار: 3.0.0 | المطور: Akraa Trading Team
+
+صيغة الملف: صفوف float64 (little-endian) بستة أعمدة
+timestamp(ms), open, high, low, close, volume - مرتبة وبدون تكرار.
+"""
+
+import argparse
+import asyncio
+import glob
+import logging
+import lzma
+import os
+import time
+import zlib
+from typing import Dict, List, Optional, Any, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+ROW_DTYPE = np.dtype('<f8')
+ROW_WIDTH = 6
+ROW_BYTES = ROW_DTYPE.itemsize * ROW_WIDTH
+
+CODECS = {
+    'zlib': (lambda data: zlib.compress(data, 6), zlib.decompress),
+    'lzma': (lzma.compress, lzma.decompress),
+}
+
+
+def timeframe_to_ms(timeframe: str) -> int:
+    """'1m' و '4h' و '1d' -> مدة الشمعة بالملي ثانية"""
+    units = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400, 'w': 604800, 'M': 2592000}
+    return int(timeframe[:-1]) * units[timeframe[-1]] * 1000
+
+
+class OHLCVArchive:
+    """أرشيف الشموع - ملف رئيسي مرتب + ملفات إلحاق صغيرة + أقسام باردة مضغوطة"""
+
+    def __init__(self, root_dir: Optional[str] = None):
+        self.root_dir = root_dir or os.getenv('OHLCV_ARCHIVE_DIR', os.path.join('data', 'ohlcv'))
+        self._memmaps: Dict[str, Tuple[int, np.memmap]] = {}
+        self._cold_cache: Dict[str, np.ndarray] = {}
+        self.stats = {'appended_rows': 0, 'delta_files': 0, 'reads': 0, 'compactions': 0}
+
+    # ------------------------------------------------------------------
+    # المسارات
+    # ------------------------------------------------------------------
+
+    def _base_path(self, exchange: str, symbol: str, timeframe: str) -> str:
+        safe_symbol = symbol.replace('/', '-').replace(':', '_')
+        return os.path.join(self.root_dir, exchange, f"{safe_symbol}_{timeframe}")
+
+    def _main_path(self, base: str) -> str:
+        return f"{base}.ohlcv"
+
+    def _delta_paths(self, base: str) -> List[str]:
+        return sorted(glob.glob(f"{glob.escape(base)}.delta-*.ohlcv"))
+
+    def _cold_paths(self, base: str) -> List[str]:
+        return sorted(glob.glob(f"{glob.escape(base)}.cold-*"))
+
+    @staticmethod
+    def _cold_range(path: str) -> Tuple[int, int]:
+        """استخراج نطاق القسم البارد من اسم الملف: .cold-<start>-<end>.<codec>"""
+        start, end = path.rsplit('.cold-', 1)[1].split('.', 1)[0].split('-')
+        return int(start), int(end)
+
+    # ------------------------------------------------------------------
+    # القراءة
+    # ------------------------------------------------------------------
+
+    def _open_main(self, base: str) -> np.ndarray:
+        """فتح الملف الرئيسي بـ memmap (يُعاد الفتح فقط إذا تغير حجمه)"""
+        path = self._main_path(base)
+        size = os.path.getsize(path) if os.path.exists(path) else 0
+        rows = size // ROW_BYTES
+        if rows == 0:
+            return np.empty((0, ROW_WIDTH), dtype=ROW_DTYPE)
+
+        cached = self._memmaps.get(path)
+        if cached is not None and cached[0] == rows:
+            return cached[1]
+
+        mm = np.memmap(path, dtype=ROW_DTYPE, mode='r', shape=(rows, ROW_WIDTH))
+        self._memmaps[path] = (rows, mm)
+        return mm
+
+    def _load_cold(self, path: str) -> np.ndarray:
+        """فك ضغط قسم بارد (مع تخزين مؤقت)"""
+        cached = self._cold_cache.get(path)
+        if cached is None:
+            codec = path.rsplit('.', 1)[1]
+            with open(path, 'rb') as f:
+                raw = CODECS[codec][1](f.read())
+            cached = np.frombuffer(raw, dtype=ROW_DTYPE).reshape(-1, ROW_WIDTH)
+            self._cold_cache[path] = cached
+        return cached
+
+    @staticmethod
+    def _slice(rows: np.ndarray, start_ms: Optional[int], end_ms: Optional[int]) -> np.ndarray:
+        """شريحة [start, end] ببحث ثنائي على عمود الطابع الزمني"""
+        timestamps = rows[:, 0]
+        i0 = 0 if start_ms is None else int(np.searchsorted(timestamps, start_ms, side='left'))
+        i1 = len(rows) if end_ms is None else int(np.searchsorted(timestamps, end_ms, side='right'))
+        return rows[i0:i1]
+
+    def read(self, exchange: str, symbol: str, timeframe: str,
+             start_ms: Optional[int] = None, end_ms: Optional[int] = None) -> np.ndarray:
+        """قراءة نطاق زمني - عرض memmap بدون نسخ عندما يقع النطاق في الملف الرئيسي فقط"""
+        base = self._base_path(exchange, symbol, timeframe)
+        self.stats['reads'] += 1
+
+        parts = []
+        for path in self._cold_paths(base):
+            cold_start, cold_end = self._cold_range(path)
+            if (end_ms is None or cold_start <= end_ms) and (start_ms is None or cold_end >= start_ms):
+                parts.append(self._slice(self._load_cold(path), start_ms, end_ms))
+
+        main = self._slice(self._open_main(base), start_ms, end_ms)
+
+        delta_paths = self._delta_paths(base)
+        if not parts and not delta_paths:
+            return main
+
+        # دمج الأقسام الباردة وملفات الإلحاق (نسخة) - ملفات الإلحاق أحدث من الملف الرئيسي
+        parts.append(main)
+        for path in delta_paths:
+            delta = np.fromfile(path, dtype=ROW_DTYPE).reshape(-1, ROW_WIDTH)
+            parts.append(self._slice(delta, start_ms, end_ms))
+        return self._merge(parts)
+
+    def read_last(self, exchange: str, symbol: str, timeframe: str, count: int) -> np.ndarray:
+        """آخر count شمعة"""
+        base = self._base_path(exchange, symbol, timeframe)
+        main = self._open_main(base)
+        if len(main) >= count and not self._delta_paths(base):
+            return main[-count:]
+        return self.read(exchange, symbol, timeframe)[-count:]
+
+    def last_timestamp(self, exchange: str, symbol: str, timeframe: str) -> Optional[int]:
+        """طابع آخر شمعة مؤرشفة"""
+        base = self._base_path(exchange, symbol, timeframe)
+        main = self._open_main(base)
+        candidates = [int(main[-1, 0])] if len(main) else []
+        for path in self._delta_paths(base):
+            delta = np.fromfile(path, dtype=ROW_DTYPE).reshape(-1, ROW_WIDTH)
+            if len(delta):
+                candidates.append(int(delta[-1, 0]))
+        for path in self._cold_paths(base):
+            candidates.append(self._cold_range(path)[1])
+        return max(candidates) if candidates else None
+
+    @staticmethod
+    def _merge(parts: List[np.ndarray]) -> np.ndarray:
+        """دمج وترتيب وإزالة التكرار - الصف الأحدث كتابة يفوز"""
+        parts = [part for part in parts if len(part)]
+        if not parts:
+            return np.empty((0, ROW_WIDTH), dtype=ROW_DTYPE)
+        merged = np.concatenate(parts)
+        # ترتيب مستقر ثم الاحتفاظ بآخر ظهور لكل طابع زمني
+        order = np.argsort(merged[:, 0], kind='stable')
+        merged = merged[order]
+        keep = np.append(merged[1:, 0] != merged[:-1, 0], True)
+        return merged[keep]
+
+    # ------------------------------------------------------------------
+    # الكتابة
+    # ------------------------------------------------------------------
+
+    def append(self, exchange: str, symbol: str, timeframe: str, rows, tail_only: bool = False) -> int:
+        """إلحاق شموع مغلقة - الشموع الأحدث تُلحق بالملف الرئيسي مباشرة والباقي في ملف إلحاق
+
+        tail_only يتجاهل الشموع الموجودة مسبقاً بدلاً من كتابتها كملف إلحاق.
+        """
+        rows = np.ascontiguousarray(np.asarray(rows, dtype=ROW_DTYPE).reshape(-1, ROW_WIDTH))
+        if len(rows) == 0:
+            return 0
+
+        base = self._base_path(exchange, symbol, timeframe)
+        os.makedirs(os.path.dirname(base), exist_ok=True)
+
+        rows = self._merge([rows])
+        main = self._open_main(base)
+        last = main[-1, 0] if len(main) else None
+
+        if last is None:
+            tail, backfill = rows, rows[:0]
+        else:
+            tail, backfill = rows[rows[:, 0] > last], rows[rows[:, 0] <= last]
+            if tail_only:
+                backfill = backfill[:0]
+
+        if len(tail):
+            with open(self._main_path(base), 'ab') as f:
+                f.write(tail.tobytes())
+
+        if len(backfill):
+            # نطاقات قديمة أو متداخلة تُكتب كملف إلحاق وتُدمج عند الضغط
+            delta_path = f"{base}.delta-{time.time_ns()}.ohlcv"
+            backfill.tofile(delta_path)
+            self.stats['delta_files'] += 1
+
+        written = len(tail) + len(backfill)
+        self.stats['appended_rows'] += written
+        return written
+
+    def compact(self, exchange: str, symbol: str, timeframe: str,
+                cold_before_ms: Optional[int] = None, codec: Optional[str] = None) -> Dict[str, Any]:
+        """دمج ملفات الإلحاق في الملف الرئيسي ونقل الشموع القديمة إلى قسم بارد مضغوط"""
+        base = self._base_path(exchange, symbol, timeframe)
+        main_path = self._main_path(base)
+        delta_paths = self._delta_paths(base)
+
+        merged = self._merge([np.array(self._open_main(base))] + [
+            np.fromfile(path, dtype=ROW_DTYPE).reshape(-1, ROW_WIDTH) for path in delta_paths
+        ])
+
+        cold_written = None
+        if cold_before_ms is not None and codec:
+            if codec not in CODECS:
+                raise ValueError(f"ضغط غير مدعوم: {codec}")
+            cold = merged[merged[:, 0] < cold_before_ms]
+            merged = merged[merged[:, 0] >= cold_before_ms]
+            if len(cold):
+                cold_written = f"{base}.cold-{int(cold[0, 0])}-{int(cold[-1, 0])}.{codec}"
+                with open(cold_written, 'wb') as f:
+                    f.write(CODECS[codec][0](np.ascontiguousarray(cold).tobytes()))
+
+        # كتابة ذرية للملف الرئيسي
+        self._memmaps.pop(main_path, None)
+        tmp_path = f"{main_path}.tmp"
+        merged.tofile(tmp_path)
+        os.replace(tmp_path, main_path)
+        for path in delta_paths:
+            os.remove(path)
+
+        self.stats['compactions'] += 1
+        result = {
+            'symbol': symbol,
+            'timeframe': timeframe,
+            'rows': len(merged),
+            'merged_deltas': len(delta_paths),
+            'cold_partition': cold_written
+        }
+        logger.info(f"🗜️ ضغط أرشيف {symbol} {timeframe}: {result}")
+        return result
+
+    async def backfill(self, pool, exchange: str, symbol: str, timeframe: str,
+                       since_ms: int, until_ms: Optional[int] = None, page_limit: int = 1000) -> int:
+        """تعبئة الأرشيف من المنصة بصفحات fetch_ohlcv"""
+        total = 0
+        now_ms = int(time.time() * 1000)
+        until_ms = until_ms or now_ms
+        duration_ms = timeframe_to_ms(timeframe)
+        while since_ms < until_ms:
+            rows = await pool.call(exchange, 'fetch_ohlcv', symbol, timeframe, since_ms, page_limit)
+            if not rows:
+                break
+            # أرشفة الشموع المغلقة فقط
+            closed = [row for row in rows if row[0] <= until_ms and row[0] + duration_ms <= now_ms]
+            total += self.append(exchange, symbol, timeframe, closed)
+            if len(rows) < page_limit:
+                break
+            since_ms = int(rows[-1][0]) + 1
+        return total
+
+    async def ensure_history(self, pool, exchange: str, symbol: str, timeframe: str, count: int) -> np.ndarray:
+        """آخر count شمعة - إذا كان الأرشيف أقصر تُجلب الشموع الأقدم من أول شمعة مؤرشفة أولاً"""
+        rows = self.read_last(exchange, symbol, timeframe, count)
+        if len(rows) >= count:
+            return rows
+
+        duration_ms = timeframe_to_ms(timeframe)
+        since_ms = (int(time.time() * 1000) // duration_ms - count) * duration_ms
+        # الشموع الأحدث يؤرشفها مخزن الشموع - التعبئة تغطي ما قبل بداية الأرشيف فقط
+        until_ms = int(rows[0, 0]) - 1 if len(rows) else None
+        if until_ms is not None and until_ms <= since_ms:
+            return rows
+        written = await self.backfill(pool, exchange, symbol, timeframe, since_ms, until_ms)
+        logger.info(f"🗄️ تعبئة أرشيف {symbol} {timeframe} من {exchange}: {written} شمعة")
+        return self.read_last(exchange, symbol, timeframe, count)
+
+    # ------------------------------------------------------------------
+    # معلومات
+    # ------------------------------------------------------------------
+
+    def list_series(self) -> List[Tuple[str, str, str]]:
+        """جميع السلاسل المؤرشفة (exchange, symbol, timeframe)"""
+        series = []
+        for path in glob.glob(os.path.join(glob.escape(self.root_dir), '*', '*.ohlcv')):
+            name = os.path.basename(path)
+            if '.delta-' in name:
+                continue
+            exchange = os.path.basename(os.path.dirname(path))
+            symbol, timeframe = name[:-len('.ohlcv')].rsplit('_', 1)
+            series.append((exchange, symbol.replace('-', '/').replace('_', ':'), timeframe))
+        return sorted(series)
+
+    def get_series_info(self, exchange: str, symbol: str, timeframe: str) -> Dict[str, Any]:
+        """معلومات سلسلة واحدة"""
+        base = self._base_path(exchange, symbol, timeframe)
+        main = self._open_main(base)
+        return {
+            'exchange': exchange,
+            'symbol': symbol,
+            'timeframe': timeframe,
+            'main_rows': len(main),
+            'first_timestamp': int(main[0, 0]) if len(main) else None,
+            'last_timestamp': self.last_timestamp(exchange, symbol, timeframe),
+            'delta_files': len(self._delta_paths(base)),
+            'cold_partitions': [os.path.basename(path) for path in self._cold_paths(base)]
+        }
+
+
+# نسخة عالمية
+ohlcv_archive = OHLCVArchive()
+
+
+def _parse_args():
+    parser = argparse.ArgumentParser(description="إدارة أرشيف OHLCV")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    info = subparsers.add_parser('info', help="عرض السلاسل المؤرشفة")
+    info.add_argument('--root')
+
+    compact = subparsers.add_parser('compact', help="دمج ملفات الإلحاق وضغط الأقسام الباردة")
+    compact.add_argument('--root')
+    compact.add_argument('--exchange')
+    compact.add_argument('--symbol')
+    compact.add_argument('--timeframe')
+    compact.add_argument('--cold-days', type=int, help="نقل الشموع الأقدم من عدد الأيام إلى قسم بارد")
+    compact.add_argument('--codec', choices=sorted(CODECS), default='zlib')
+
+    backfill = subparsers.add_parser('backfill', help="تعبئة الأرشيف من المنصة بصفحات fetch_ohlcv")
+    backfill.add_argument('--root')
+    backfill.add_argument('--exchange', required=True)
+    backfill.add_argument('--symbol', required=True, nargs='+')
+    backfill.add_argument('--timeframe', default='1h')
+    backfill.add_argument('--days', type=int, default=30, help="عدد الأيام من الآن إلى الخلف")
+    backfill.add_argument('--page-limit', type=int, default=1000)
+    return parser.parse_args()
+
+
+async def _backfill(archive: OHLCVArchive, args) -> None:
+    """تعبئة الرموز المطلوبة عبر مجمع المنصات (بيانات عامة بدون مفاتيح)"""
+    from services.async_exchange_pool import exchange_pool
+    from services.http_client import http_client
+
+    exchange_pool.register_exchange(args.exchange, {'timeout': 30000})
+    since_ms = int((time.time() - args.days * 86400) * 1000)
+    try:
+        for symbol in args.symbol:
+            written = await archive.backfill(exchange_pool, args.exchange, symbol, args.timeframe,
+                                             since_ms, page_limit=args.page_limit)
+            print({'exchange': args.exchange, 'symbol': symbol, 'timeframe': args.timeframe, 'written': written})
+    finally:
+        await exchange_pool.close()
+        await http_client.close()
+
+
+def main():
+    """سطر الأوامر: python -m services.ohlcv_archive compact --cold-days 90 --codec lzma
+    أو: python -m services.ohlcv_archive backfill --exchange binance --symbol BTC/USDT --days 365
+    """
+    args = _parse_args()
+    logging.basicConfig(level=logging.INFO)
+    archive = OHLCVArchive(args.root) if args.root else ohlcv_archive
+
+    if args.command == 'backfill':
+        asyncio.run(_backfill(archive, args))
+        return
+
+    series = [
+        (exchange, symbol, timeframe) for exchange, symbol, timeframe in archive.list_series()
+        if (getattr(args, 'exchange', None) in (None, exchange) and
+            getattr(args, 'symbol', None) in (None, symbol) and
+            getattr(args, 'timeframe', None) in (None, timeframe))
+    ]
+
+    if args.command == 'info':
+        for exchange, symbol, timeframe in series:
+            print(archive.get_series_info(exchange, symbol, timeframe))
+        return
+
+    cold_before_ms = None
+    if args.cold_days:
+        cold_before_ms = int((time.time() - args.cold_days * 86400) * 1000)
+    for exchange, symbol, timeframe in series:
+        print(archive.compact(exchange, symbol, timeframe, cold_before_ms, args.codec if cold_before_ms else None))
+
+
+if __name__ == "__main__":
+    main()
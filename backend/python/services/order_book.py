@@ -0,0 +1,491 @@
+# backend/python/services/order_book.py
+"""
+📚 محرك دفتر الأوامر L2 - دفتر لكل رمز بمستويات أسعار مرتبة من لقطة + تدفق الفروقات
+استعلامات العمق ضمن نطاق bps، اختلال الدفتر وتقدير الانزلاق لحجم معين بتكلفة O(log n)
+الإصدار: 3.0.0 | المطور: Akraa Trading Team
+"""
+
+import asyncio
+import json
+import logging
+import os
+import random
+import time
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Any, Callable, Awaitable, Tuple
+
+import numpy as np
+import websockets
+
+from services.async_exchange_pool import exchange_pool
+from services.market_registry import MarketRegistry
+
+logger = logging.getLogger(__name__)
+
+Levels = List[Tuple[float, float]]
+
+
+@dataclass
+class DepthDiff:
+    """تحديث فروقات الدفتر (depthUpdate) بمعرفات التسلسل"""
+    symbol: str
+    first_update_id: int
+    final_update_id: int
+    bids: Levels
+    asks: Levels
+    timestamp: int
+
+
+class BookSide:
+    """جانب واحد من الدفتر - مصفوفة مستويات مرتبة من الأفضل إلى الأبعد
+
+    المفاتيح هي السعر للعروض وسالب السعر للطلبات حتى يكون الترتيب التصاعدي هو الأفضل أولاً.
+    التحديث O(log n) للبحث، والمجاميع التراكمية تُبنى مرة واحدة بعد دفعة التحديثات
+    ثم تجيب الاستعلامات ببحث ثنائي.
+    """
+
+    def __init__(self, is_bid: bool):
+        self.is_bid = is_bid
+        self.keys: List[float] = []
+        self.sizes: List[float] = []
+        self._arrays: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]] = None
+
+    def _key(self, price: float) -> float:
+        return -price if self.is_bid else price
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def update(self, price: float, size: float) -> None:
+        """تحديث مستوى - الكمية صفر تحذف المستوى"""
+        key = self._key(price)
+        index = bisect_left(self.keys, key)
+        exists = index < len(self.keys) and self.keys[index] == key
+
+        if size > 0:
+            if exists:
+                self.sizes[index] = size
+            else:
+                self.keys.insert(index, key)
+                self.sizes.insert(index, size)
+        elif exists:
+            del self.keys[index]
+            del self.sizes[index]
+        else:
+            return
+        self._arrays = None
+
+    def replace(self, levels: Levels) -> None:
+        """استبدال الجانب بالكامل من لقطة"""
+        ordered = sorted((self._key(price), size) for price, size in levels if size > 0)
+        self.keys = [key for key, _ in ordered]
+        self.sizes = [size for _, size in ordered]
+        self._arrays = None
+
+    def best(self) -> Optional[float]:
+        return abs(self.keys[0]) if self.keys else None
+
+    def levels(self, count: int) -> Levels:
+        return [(abs(key), size) for key, size in zip(self.keys[:count], self.sizes[:count])]
+
+    def cumulative(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(الأسعار، الكمية التراكمية، القيمة التراكمية) من الأفضل إلى الأبعد"""
+        if self._arrays is None:
+            prices = np.abs(np.asarray(self.keys, dtype=np.float64))
+            sizes = np.asarray(self.sizes, dtype=np.float64)
+            self._arrays = (prices, np.cumsum(sizes), np.cumsum(sizes * prices))
+        return self._arrays
+
+    def depth_until(self, price_limit: float) -> Tuple[float, float]:
+        """الكمية والقيمة المتاحة حتى سعر حدي (شاملاً)"""
+        count = bisect_right(self.keys, self._key(price_limit))
+        if count == 0:
+            return 0.0, 0.0
+        _, cum_size, cum_notional = self.cumulative()
+        return float(cum_size[count - 1]), float(cum_notional[count - 1])
+
+    def sweep(self, amount: float) -> Tuple[float, float, Optional[float]]:
+        """تنفيذ كمية مقابل هذا الجانب: (المنفذ، القيمة، أسوأ سعر)"""
+        if not self.keys or amount <= 0:
+            return 0.0, 0.0, None
+        prices, cum_size, cum_notional = self.cumulative()
+        index = int(np.searchsorted(cum_size, amount, side='left'))
+        if index >= len(prices):
+            return float(cum_size[-1]), float(cum_notional[-1]), float(prices[-1])
+
+        previous_size = float(cum_size[index - 1]) if index else 0.0
+        previous_notional = float(cum_notional[index - 1]) if index else 0.0
+        notional = previous_notional + (amount - previous_size) * float(prices[index])
+        return amount, notional, float(prices[index])
+
+
+class OrderBook:
+    """دفتر أوامر L2 لرمز واحد مع التحقق من تسلسل التحديثات"""
+
+    def __init__(self, symbol: str, exchange: str):
+        self.symbol = symbol
+        self.exchange = exchange
+        self.bids = BookSide(is_bid=True)
+        self.asks = BookSide(is_bid=False)
+        self.last_update_id = 0
+        self.synced = False
+        self.updated_at = 0.0
+
+    def apply_snapshot(self, bids: Levels, asks: Levels, last_update_id: int) -> None:
+        """تحميل لقطة كاملة"""
+        self.bids.replace(bids)
+        self.asks.replace(asks)
+        self.last_update_id = int(last_update_id)
+        self.synced = True
+        self.updated_at = time.time()
+
+    def apply_diff(self, diff: DepthDiff) -> bool:
+        """تطبيق تحديث فروقات - False عند فجوة في التسلسل (يلزم لقطة جديدة)"""
+        if diff.final_update_id <= self.last_update_id:
+            return True
+        if diff.first_update_id > self.last_update_id + 1:
+            self.synced = False
+            return False
+
+        for price, size in diff.bids:
+            self.bids.update(price, size)
+        for price, size in diff.asks:
+            self.asks.update(price, size)
+        self.last_update_id = diff.final_update_id
+        self.updated_at = time.time()
+        return True
+
+    # ==================== الاستعلامات ====================
+
+    def best_bid(self) -> Optional[float]:
+        return self.bids.best()
+
+    def best_ask(self) -> Optional[float]:
+        return self.asks.best()
+
+    def mid_price(self) -> Optional[float]:
+        bid, ask = self.best_bid(), self.best_ask()
+        if bid is None or ask is None:
+            return None
+        return (bid + ask) / 2
+
+    def spread_bps(self) -> Optional[float]:
+        mid = self.mid_price()
+        if not mid:
+            return None
+        return (self.best_ask() - self.best_bid()) / mid * 10000
+
+    def depth(self, bps: float) -> Dict[str, float]:
+        """الكمية والقيمة على كل جانب ضمن bps من السعر الأوسط"""
+        mid = self.mid_price()
+        if mid is None:
+            return {'bid_size': 0.0, 'ask_size': 0.0, 'bid_notional': 0.0, 'ask_notional': 0.0}
+        bid_size, bid_notional = self.bids.depth_until(mid * (1 - bps / 10000))
+        ask_size, ask_notional = self.asks.depth_until(mid * (1 + bps / 10000))
+        return {
+            'bid_size': bid_size,
+            'ask_size': ask_size,
+            'bid_notional': bid_notional,
+            'ask_notional': ask_notional
+        }
+
+    def imbalance(self, bps: float) -> float:
+        """اختلال الدفتر ضمن bps: (+1 كل السيولة طلبات شراء، -1 كلها عروض بيع)"""
+        depth = self.depth(bps)
+        total = depth['bid_notional'] + depth['ask_notional']
+        if total == 0:
+            return 0.0
+        return (depth['bid_notional'] - depth['ask_notional']) / total
+
+    def estimate_slippage(self, side: str, amount: float) -> Dict[str, Any]:
+        """تقدير انزلاق أمر سوق بكمية معينة - الشراء يستهلك العروض والبيع يستهلك الطلبات"""
+        book_side = self.asks if side.lower() == 'buy' else self.bids
+        best = book_side.best()
+        filled, notional, worst_price = book_side.sweep(amount)
+        if best is None or filled == 0:
+            return {'side': side, 'amount': amount, 'filled': 0.0, 'fully_filled': False,
+                    'average_price': None, 'worst_price': None, 'slippage_bps': None}
+
+        average_price = notional / filled
+        slippage_bps = abs(average_price - best) / best * 10000
+        return {
+            'side': side,
+            'amount': amount,
+            'filled': filled,
+            'fully_filled': filled >= amount,
+            'average_price': average_price,
+            'worst_price': worst_price,
+            'slippage_bps': slippage_bps
+        }
+
+    def to_dict(self, levels: int = 10) -> Dict[str, Any]:
+        return {
+            'symbol': self.symbol,
+            'exchange': self.exchange,
+            'bids': self.bids.levels(levels),
+            'asks': self.asks.levels(levels),
+            'last_update_id': self.last_update_id,
+            'synced': self.synced,
+            'spread_bps': self.spread_bps(),
+            'updated_at': self.updated_at
+        }
+
+
+class BinanceDepthAdapter:
+    """محول تدفق فروقات الدفتر في Binance (depthUpdate)"""
+
+    exchange = 'binance'
+
+    def __init__(self, base_url: Optional[str] = None, update_speed: str = '100ms'):
+        self.base_url = base_url or os.getenv('BINANCE_STREAM_URL', 'wss://stream.binance.com:9443')
+        self.update_speed = update_speed
+        self.symbol_map: Dict[str, str] = {}
+
+    @staticmethod
+    def stream_symbol(symbol: str) -> str:
+        """BTC/USDT -> btcusdt"""
+        return symbol.replace('/', '').replace('-', '').lower()
+
+    def build_url(self, symbols: List[str]) -> str:
+        """بناء رابط التدفق المجمع"""
+        streams = []
+        for symbol in symbols:
+            stream_symbol = self.stream_symbol(symbol)
+            self.symbol_map[stream_symbol.upper()] = symbol
+            streams.append(f"{stream_symbol}@depth@{self.update_speed}")
+        return f"{self.base_url}/stream?streams={'/'.join(streams)}"
+
+    def parse(self, raw_message: str) -> Optional[DepthDiff]:
+        """تحويل رسالة التدفق إلى DepthDiff"""
+        message = json.loads(raw_message)
+        data = message.get('data', message)
+        if data.get('e') != 'depthUpdate':
+            return None
+        return DepthDiff(
+            symbol=self.symbol_map.get(data['s'], data['s']),
+            first_update_id=int(data['U']),
+            final_update_id=int(data['u']),
+            bids=[(float(price), float(size)) for price, size in data['b']],
+            asks=[(float(price), float(size)) for price, size in data['a']],
+            timestamp=int(data['E'])
+        )
+
+
+class OrderBookManager:
+    """دفاتر الأوامر لكل الرموز - لقطة REST ثم تطبيق الفروقات مع إعادة المزامنة عند الفجوات"""
+
+    def __init__(self, adapter: Optional[BinanceDepthAdapter] = None,
+                 snapshot_fetcher: Optional[Callable[[str, int], Awaitable[Dict[str, Any]]]] = None):
+        self.adapter = adapter or BinanceDepthAdapter()
+        self.snapshot_fetcher = snapshot_fetcher or self._fetch_snapshot
+        self.book_config = {
+            'snapshot_limit': int(os.getenv('ORDER_BOOK_SNAPSHOT_LIMIT', '1000')),
+            'max_age': float(os.getenv('ORDER_BOOK_MAX_AGE', '5')),
+            'max_buffered_diffs': int(os.getenv('ORDER_BOOK_MAX_BUFFER', '1000')),
+            'resync_retry_delay': float(os.getenv('ORDER_BOOK_RESYNC_RETRY', '5')),
+            'max_streams_per_connection': 200,
+            'reconnect_base_delay': 1.0,
+            'reconnect_max_delay': 60.0,
+            'ping_interval': 20,
+        }
+
+        self.books: Dict[str, OrderBook] = {}
+        self.buffers: Dict[str, List[DepthDiff]] = {}
+        self.resync_tasks: Dict[str, asyncio.Task] = {}
+        self.resync_after: Dict[str, float] = {}
+        self.tasks: List[asyncio.Task] = []
+        self.symbols: List[str] = []
+        self.running = False
+        self.stats = {'messages': 0, 'diffs': 0, 'snapshots': 0, 'resyncs': 0, 'parse_errors': 0, 'reconnects': 0}
+
+    @staticmethod
+    def _book_key(symbol: str) -> str:
+        return MarketRegistry.normalize_key(symbol)
+
+    # ==================== المزامنة ====================
+
+    async def _fetch_snapshot(self, symbol: str, limit: int) -> Dict[str, Any]:
+        """لقطة الدفتر من المنصة عبر مجمع الاتصالات"""
+        exchange = self.adapter.exchange
+        if not exchange_pool.is_registered(exchange):
+            exchange_pool.register_exchange(exchange, {'enableRateLimit': False})
+        return await exchange_pool.call(exchange, 'fetch_order_book', symbol, limit)
+
+    async def resync(self, symbol: str) -> bool:
+        """تحميل لقطة جديدة ثم تطبيق الفروقات المخزنة اللاحقة لها"""
+        key = self._book_key(symbol)
+        book = self.books.setdefault(key, OrderBook(symbol, self.adapter.exchange))
+        book.synced = False
+        self.buffers.setdefault(key, [])
+
+        try:
+            snapshot = await self.snapshot_fetcher(symbol, self.book_config['snapshot_limit'])
+        except Exception as e:
+            # الفروقات تبقى مخزنة وتعاد المحاولة بعد مهلة عند وصول الفرق التالي
+            self.resync_after[key] = time.time() + self.book_config['resync_retry_delay']
+            logger.warning(f"⚠️ تعذر جلب لقطة دفتر {symbol}: {str(e)}")
+            return False
+
+        self.stats['snapshots'] += 1
+        book.apply_snapshot(
+            [(float(price), float(size)) for price, size, *_ in snapshot['bids']],
+            [(float(price), float(size)) for price, size, *_ in snapshot['asks']],
+            int(snapshot.get('nonce') or snapshot.get('lastUpdateId') or 0)
+        )
+
+        # الفروقات التي وصلت أثناء جلب اللقطة
+        buffered = self.buffers.pop(key, [])
+        for diff in buffered:
+            if not book.apply_diff(diff):
+                logger.warning(f"⚠️ فجوة في فروقات {symbol} بعد اللقطة - إعادة المزامنة")
+                self._schedule_resync(symbol)
+                return False
+        return True
+
+    def _schedule_resync(self, symbol: str) -> None:
+        key = self._book_key(symbol)
+        task = self.resync_tasks.get(key)
+        if task is not None and not task.done():
+            return
+        if time.time() < self.resync_after.get(key, 0):
+            return
+        self.stats['resyncs'] += 1
+        self.buffers.setdefault(key, [])
+        self.resync_tasks[key] = asyncio.create_task(self.resync(symbol))
+
+    async def apply_diff(self, diff: DepthDiff) -> None:
+        """تطبيق فرق واحد أو تخزينه حتى تكتمل المزامنة"""
+        self.stats['diffs'] += 1
+        key = self._book_key(diff.symbol)
+        book = self.books.get(key)
+
+        if key in self.buffers or book is None:
+            buffer = self.buffers.setdefault(key, [])
+            buffer.append(diff)
+            if len(buffer) > self.book_config['max_buffered_diffs']:
+                del buffer[0]
+            self._schedule_resync(diff.symbol)
+            return
+
+        if not book.apply_diff(diff):
+            logger.warning(f"⚠️ فجوة في تسلسل دفتر {diff.symbol} ({book.last_update_id} -> {diff.first_update_id})")
+            self.buffers[key] = [diff]
+            self._schedule_resync(diff.symbol)
+
+    async def handle_message(self, raw_message: str) -> None:
+        """معالجة رسالة تدفق واحدة"""
+        self.stats['messages'] += 1
+        try:
+            diff = self.adapter.parse(raw_message)
+        except Exception as e:
+            self.stats['parse_errors'] += 1
+            logger.debug(f"⚠️ رسالة دفتر غير صالحة: {str(e)}")
+            return
+        if diff is not None:
+            await self.apply_diff(diff)
+
+    # ==================== الاتصال ====================
+
+    async def start(self, symbols: List[str]) -> None:
+        """الاشتراك في تدفق فروقات الدفتر للرموز"""
+        if self.running:
+            await self.stop()
+
+        self.symbols = list(symbols)
+        self.running = True
+
+        chunk_size = self.book_config['max_streams_per_connection']
+        for i in range(0, len(self.symbols), chunk_size):
+            self.tasks.append(asyncio.create_task(self._connection_loop(self.symbols[i:i + chunk_size])))
+
+        logger.info(f"📚 بدء تدفق دفاتر الأوامر لـ {len(self.symbols)} رمز")
+
+    async def stop(self) -> None:
+        """إيقاف الاتصالات ومهام المزامنة"""
+        self.running = False
+        tasks = self.tasks + list(self.resync_tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self.tasks.clear()
+        self.resync_tasks.clear()
+
+    async def _connection_loop(self, symbols: List[str]) -> None:
+        """اتصال واحد مع إعادة مزامنة كل الدفاتر بعد كل اتصال جديد"""
+        url = self.adapter.build_url(symbols)
+        delay = self.book_config['reconnect_base_delay']
+
+        while self.running:
+            try:
+                async with websockets.connect(url, ping_interval=self.book_config['ping_interval']) as websocket:
+                    delay = self.book_config['reconnect_base_delay']
+                    # الفروقات تُخزن من أول رسالة ثم تُطبق فوق اللقطة
+                    for symbol in symbols:
+                        self._schedule_resync(symbol)
+                    async for raw_message in websocket:
+                        await self.handle_message(raw_message)
+
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"⚠️ انقطع تدفق دفتر الأوامر: {str(e)} - إعادة الاتصال بعد {delay:.1f}ث")
+
+            if not self.running:
+                break
+
+            for symbol in symbols:
+                book = self.books.get(self._book_key(symbol))
+                if book is not None:
+                    book.synced = False
+            self.stats['reconnects'] += 1
+            await asyncio.sleep(delay + random.uniform(0, delay / 2))
+            delay = min(delay * 2, self.book_config['reconnect_max_delay'])
+
+    # ==================== الاستعلام ====================
+
+    def get_book(self, symbol: str, max_age: Optional[float] = None) -> Optional[OrderBook]:
+        """الدفتر المتزامن والحديث للرمز - None إذا لم يكن متاحاً"""
+        book = self.books.get(self._book_key(symbol))
+        if book is None or not book.synced:
+            return None
+        max_age = self.book_config['max_age'] if max_age is None else max_age
+        if time.time() - book.updated_at > max_age:
+            return None
+        return book
+
+    def get_liquidity(self, symbol: str, bps: float = 10.0, amount: Optional[float] = None,
+                      side: str = 'sell') -> Optional[Dict[str, Any]]:
+        """ملخص السيولة: العمق والاختلال والسبريد وتقدير الانزلاق"""
+        book = self.get_book(symbol)
+        if book is None:
+            return None
+        result = {
+            'symbol': book.symbol,
+            'spread_bps': book.spread_bps(),
+            'depth': book.depth(bps),
+            'imbalance': book.imbalance(bps),
+            'bps': bps
+        }
+        if amount:
+            result['slippage'] = book.estimate_slippage(side, amount)
+        return result
+
+    def get_book_status(self) -> Dict[str, Any]:
+        """حالة الدفاتر"""
+        return {
+            'running': self.running,
+            'exchange': self.adapter.exchange,
+            'symbols': len(self.symbols),
+            'synced_books': sum(1 for book in self.books.values() if book.synced),
+            'books': {
+                book.symbol: {'levels': (len(book.bids), len(book.asks)), 'synced': book.synced,
+                              'last_update_id': book.last_update_id}
+                for book in self.books.values()
+            },
+            **self.stats
+        }
+
+
+# نسخة عالمية
+order_book_manager = OrderBookManager()
@@ -0,0 +1,403 @@
+# backend/python/services/order_pipeline.py
+"""
+📬 خط تنفيذ الأوامر غير المتزامن - طوابير لكل منصة مع معرفات عميل ودمج الاستبدال
+معرف أمر عميل لإعادة المحاولة بدون تكرار، تزامن محدود، ودمج الإلغاء-ثم-الاستبدال لنفس الرمز
+الإصدار: 3.0.0 | المطور: Akraa Trading Team
+"""
+
+import asyncio
+import logging
+import os
+import time
+import uuid
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Dict, List, Optional, Any, Callable, Awaitable, Tuple
+
+import numpy as np
+import ccxt.async_support as ccxt_async
+
+from services.resilience import backoff_delay
+
+logger = logging.getLogger(__name__)
+
+
+class OrderAction(Enum):
+    """نوع العملية"""
+    CREATE = "create"
+    CANCEL = "cancel"
+    REPLACE = "replace"
+
+
+class TicketState(Enum):
+    """حالة التذكرة في الخط"""
+    QUEUED = "queued"
+    SENT = "sent"
+    ACKED = "acked"
+    FAILED = "failed"
+    COALESCED = "coalesced"
+    CANCELLED = "cancelled"
+
+
+@dataclass
+class OrderTicket:
+    """تذكرة أمر مع الطوابع الزمنية لقياس التأخير"""
+    client_order_id: str
+    exchange: str
+    action: OrderAction
+    symbol: str
+    params: Dict[str, Any]
+    future: asyncio.Future
+    state: TicketState = TicketState.QUEUED
+    attempts: int = 0
+    queued_at: float = field(default_factory=time.time)
+    sent_at: Optional[float] = None
+    acked_at: Optional[float] = None
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    superseded_by: Optional[str] = None
+
+    @property
+    def done(self) -> bool:
+        return self.state in (TicketState.ACKED, TicketState.FAILED,
+                              TicketState.COALESCED, TicketState.CANCELLED)
+
+    def latency(self) -> Dict[str, Optional[float]]:
+        """التأخير بالملي ثانية: الانتظار في الطابور، الإرسال حتى التأكيد، والإجمالي"""
+        def ms(start, end):
+            return (end - start) * 1000 if start is not None and end is not None else None
+        return {
+            'queue_ms': ms(self.queued_at, self.sent_at),
+            'exchange_ms': ms(self.sent_at, self.acked_at),
+            'total_ms': ms(self.queued_at, self.acked_at)
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'client_order_id': self.client_order_id,
+            'exchange': self.exchange,
+            'action': self.action.value,
+            'symbol': self.symbol,
+            'state': self.state.value,
+            'attempts': self.attempts,
+            'queued_at': self.queued_at,
+            'sent_at': self.sent_at,
+            'acked_at': self.acked_at,
+            'latency': self.latency(),
+            'error': self.error,
+            'superseded_by': self.superseded_by
+        }
+
+
+# المنفذ: دالة غير متزامنة تستقبل التذكرة وتعيد نتيجة المنصة
+OrderExecutor = Callable[[OrderTicket], Awaitable[Dict[str, Any]]]
+
+
+class OrderPipeline:
+    """خط تنفيذ الأوامر - طابور وعمال لكل منصة"""
+
+    RETRYABLE_ERRORS = (ccxt_async.NetworkError, asyncio.TimeoutError, ConnectionError)
+
+    def __init__(self, max_concurrency: Optional[int] = None, max_retries: int = 3,
+                 retry_delay: float = 0.25, max_tickets: int = 10000):
+        self.pipeline_config = {
+            'max_concurrency': int(max_concurrency or os.getenv('ORDER_PIPELINE_CONCURRENCY', '4')),
+            'queue_size': int(os.getenv('ORDER_PIPELINE_QUEUE_SIZE', '1000')),
+            'max_retries': max_retries,
+            'retry_delay': retry_delay,
+            'max_tickets': max_tickets,
+        }
+
+        self.executors: Dict[str, OrderExecutor] = {}
+        self.queues: Dict[str, asyncio.Queue] = {}
+        self.workers: Dict[str, List[asyncio.Task]] = {}
+
+        # التذاكر حسب معرف العميل (للتكرار الآمن) والاستبدالات المعلقة حسب (منصة، رمز، أمر)
+        self.tickets: "OrderedDict[str, OrderTicket]" = OrderedDict()
+        self.pending_replaces: Dict[Tuple[str, str, str], OrderTicket] = {}
+
+        self.latencies: Dict[str, deque] = {}
+        self.stats = {'submitted': 0, 'acked': 0, 'failed': 0, 'retries': 0,
+                      'coalesced': 0, 'cancelled_locally': 0, 'duplicates': 0}
+
+    # ------------------------------------------------------------------
+    # التسجيل
+    # ------------------------------------------------------------------
+
+    def register_executor(self, exchange: str, executor: OrderExecutor, replace: bool = True) -> None:
+        """تسجيل منفذ المنصة (اتصال حقيقي أو محاكاة)"""
+        if not replace and exchange in self.executors:
+            return
+        self.executors[exchange] = executor
+
+    def has_executor(self, exchange: str) -> bool:
+        return exchange in self.executors
+
+    @staticmethod
+    def new_client_order_id(prefix: str = 'akr') -> str:
+        """معرف أمر عميل فريد (قصير بما يكفي لحدود المنصات)"""
+        return f"{prefix}{uuid.uuid4().hex[:24]}"
+
+    def _ensure_workers(self, exchange: str) -> asyncio.Queue:
+        """إنشاء الطابور والعمال للمنصة عند أول استخدام"""
+        queue = self.queues.get(exchange)
+        if queue is None:
+            queue = self.queues[exchange] = asyncio.Queue(maxsize=self.pipeline_config['queue_size'])
+            self.latencies[exchange] = deque(maxlen=1000)
+            self.workers[exchange] = [
+                asyncio.create_task(self._worker(exchange, queue))
+                for _ in range(self.pipeline_config['max_concurrency'])
+            ]
+        return queue
+
+    # ------------------------------------------------------------------
+    # الإرسال
+    # ------------------------------------------------------------------
+
+    async def submit(self, exchange: str, action: OrderAction, symbol: str,
+                     params: Dict[str, Any], client_order_id: Optional[str] = None) -> OrderTicket:
+        """إضافة عملية إلى طابور المنصة - نفس معرف العميل يعيد نفس التذكرة"""
+        if exchange not in self.executors:
+            raise KeyError(f"لا يوجد منفذ أوامر مسجل للمنصة: {exchange}")
+
+        if client_order_id and client_order_id in self.tickets:
+            self.stats['duplicates'] += 1
+            return self.tickets[client_order_id]
+
+        loop = asyncio.get_running_loop()
+        ticket = OrderTicket(
+            client_order_id=client_order_id or self.new_client_order_id(),
+            exchange=exchange,
+            action=action,
+            symbol=symbol,
+            params=dict(params),
+            future=loop.create_future()
+        )
+
+        if action == OrderAction.CANCEL and self._cancel_queued_create(ticket):
+            return ticket
+        if action == OrderAction.REPLACE and self._coalesce_replace(ticket):
+            return ticket
+
+        self._remember(ticket)
+        await self._ensure_workers(exchange).put(ticket)
+        self.stats['submitted'] += 1
+        return ticket
+
+    async def submit_and_wait(self, exchange: str, action: OrderAction, symbol: str,
+                              params: Dict[str, Any], client_order_id: Optional[str] = None,
+                              timeout: Optional[float] = 30.0) -> Dict[str, Any]:
+        """إرسال وانتظار تأكيد المنصة"""
+        ticket = await self.submit(exchange, action, symbol, params, client_order_id)
+        return await asyncio.wait_for(asyncio.shield(ticket.future), timeout)
+
+    async def create_order(self, exchange: str, symbol: str, side: str, order_type: str,
+                           amount: float, price: Optional[float] = None,
+                           extra: Optional[Dict[str, Any]] = None,
+                           client_order_id: Optional[str] = None) -> Dict[str, Any]:
+        """إنشاء أمر عبر الخط"""
+        return await self.submit_and_wait(exchange, OrderAction.CREATE, symbol, {
+            'side': side, 'type': order_type, 'amount': amount, 'price': price, 'extra': extra or {}
+        }, client_order_id)
+
+    async def cancel_order(self, exchange: str, symbol: str, order_id: str) -> Dict[str, Any]:
+        """إلغاء أمر عبر الخط"""
+        return await self.submit_and_wait(exchange, OrderAction.CANCEL, symbol, {'order_id': order_id})
+
+    async def replace_order(self, exchange: str, symbol: str, order_id: str, side: str,
+                            order_type: str, amount: float, price: Optional[float] = None,
+                            extra: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """إلغاء ثم استبدال - الاستبدالات المتتالية غير المرسلة لنفس الأمر تُدمج في واحد"""
+        return await self.submit_and_wait(exchange, OrderAction.REPLACE, symbol, {
+            'order_id': order_id, 'side': side, 'type': order_type,
+            'amount': amount, 'price': price, 'extra': extra or {}
+        })
+
+    # ------------------------------------------------------------------
+    # الدمج
+    # ------------------------------------------------------------------
+
+    def _coalesce_replace(self, ticket: OrderTicket) -> bool:
+        """استبدال لم يُرسل بعد لنفس الأمر يأخذ المعاملات الجديدة بدلاً من طلب ثانٍ"""
+        key = (ticket.exchange, ticket.symbol, ticket.params['order_id'])
+        pending = self.pending_replaces.get(key)
+
+        if pending is not None and pending.state == TicketState.QUEUED:
+            pending.params.update(ticket.params)
+            ticket.state = TicketState.COALESCED
+            ticket.superseded_by = pending.client_order_id
+            self._chain_future(pending, ticket)
+            self._remember(ticket)
+            self.stats['coalesced'] += 1
+            return True
+
+        self.pending_replaces[key] = ticket
+        return False
+
+    def _cancel_queued_create(self, ticket: OrderTicket) -> bool:
+        """إلغاء أمر ما زال في الطابور (بمعرف العميل) يُحذف محلياً بدون طلب شبكة"""
+        target = self.tickets.get(ticket.params.get('order_id'))
+        if target is None or target.state != TicketState.QUEUED or target.action != OrderAction.CREATE:
+            return False
+
+        target.state = TicketState.CANCELLED
+        target.future.set_result({'id': None, 'clientOrderId': target.client_order_id, 'status': 'canceled'})
+        ticket.state = TicketState.ACKED
+        ticket.sent_at = ticket.acked_at = time.time()
+        ticket.result = {'id': target.client_order_id, 'status': 'canceled', 'local': True}
+        ticket.future.set_result(ticket.result)
+        self._remember(ticket)
+        self.stats['cancelled_locally'] += 1
+        return True
+
+    @staticmethod
+    def _chain_future(source: OrderTicket, target: OrderTicket) -> None:
+        """نتيجة التذكرة المدموجة هي نتيجة التذكرة الباقية"""
+        def copy_result(future: asyncio.Future):
+            if target.future.done():
+                return
+            if future.exception() is not None:
+                target.future.set_exception(future.exception())
+            else:
+                target.future.set_result(future.result())
+        source.future.add_done_callback(copy_result)
+
+    def _remember(self, ticket: OrderTicket) -> None:
+        """حفظ التذكرة مع حد أقصى - تُحذف أقدم التذاكر المنتهية"""
+        self.tickets[ticket.client_order_id] = ticket
+        while len(self.tickets) > self.pipeline_config['max_tickets']:
+            oldest_id, oldest = next(iter(self.tickets.items()))
+            if not oldest.done:
+                break
+            self.tickets.pop(oldest_id)
+
+    # ------------------------------------------------------------------
+    # العمال
+    # ------------------------------------------------------------------
+
+    async def _worker(self, exchange: str, queue: asyncio.Queue) -> None:
+        """عامل واحد - عدد العمال هو حد التزامن للمنصة"""
+        while True:
+            ticket = await queue.get()
+            try:
+                if ticket.state == TicketState.QUEUED:
+                    await self._execute(ticket)
+            except Exception as e:
+                logger.error(f"❌ خطأ غير متوقع في عامل الأوامر {exchange}: {str(e)}")
+            finally:
+                queue.task_done()
+
+    async def _execute(self, ticket: OrderTicket) -> None:
+        """تنفيذ التذكرة مع إعادة المحاولة بنفس معرف العميل"""
+        executor = self.executors[ticket.exchange]
+        ticket.state = TicketState.SENT
+        ticket.sent_at = time.time()
+
+        if ticket.action == OrderAction.REPLACE:
+            key = (ticket.exchange, ticket.symbol, ticket.params['order_id'])
+            if self.pending_replaces.get(key) is ticket:
+                del self.pending_replaces[key]
+
+        while True:
+            ticket.attempts += 1
+            try:
+                result = await executor(ticket)
+                ticket.state = TicketState.ACKED
+                ticket.acked_at = time.time()
+                ticket.result = result
+                self.stats['acked'] += 1
+                self.latencies[ticket.exchange].append(ticket.acked_at - ticket.queued_at)
+                if not ticket.future.done():
+                    ticket.future.set_result(result)
+                return
+
+            except self.RETRYABLE_ERRORS as e:
+                if ticket.attempts > self.pipeline_config['max_retries']:
+                    self._fail(ticket, e)
+                    return
+                self.stats['retries'] += 1
+                logger.warning(f"⚠️ إعادة إرسال {ticket.client_order_id} ({ticket.attempts}): {str(e)}")
+                await asyncio.sleep(backoff_delay(ticket.attempts - 1, self.pipeline_config['retry_delay']))
+
+            except Exception as e:
+                self._fail(ticket, e)
+                return
+
+    def _fail(self, ticket: OrderTicket, error: Exception) -> None:
+        ticket.state = TicketState.FAILED
+        ticket.acked_at = time.time()
+        ticket.error = str(error)
+        self.stats['failed'] += 1
+        logger.error(f"❌ فشل الأمر {ticket.client_order_id} على {ticket.exchange}: {str(error)}")
+        if not ticket.future.done():
+            ticket.future.set_exception(error)
+
+    # ------------------------------------------------------------------
+    # الحالة
+    # ------------------------------------------------------------------
+
+    def get_ticket(self, client_order_id: str) -> Optional[OrderTicket]:
+        return self.tickets.get(client_order_id)
+
+    def get_pipeline_status(self) -> Dict[str, Any]:
+        """حالة الخط والتأخيرات لكل منصة"""
+        exchanges = {}
+        for exchange, queue in self.queues.items():
+            samples = np.array(self.latencies[exchange]) * 1000
+            exchanges[exchange] = {
+                'queued': queue.qsize(),
+                'workers': len(self.workers[exchange]),
+                'latency_p50_ms': float(np.percentile(samples, 50)) if len(samples) else None,
+                'latency_p99_ms': float(np.percentile(samples, 99)) if len(samples) else None,
+            }
+        return {
+            'config': self.pipeline_config,
+            'exchanges': exchanges,
+            'tracked_tickets': len(self.tickets),
+            **self.stats
+        }
+
+    async def close(self) -> None:
+        """إيقاف العمال"""
+        for tasks in self.workers.values():
+            for task in tasks:
+                task.cancel()
+        await asyncio.gather(*[task for tasks in self.workers.values() for task in tasks],
+                             return_exceptions=True)
+        self.workers.clear()
+        self.queues.clear()
+
+
+def ccxt_order_executor(pool, exchange: str) -> OrderExecutor:
+    """منفذ أوامر عبر مجمع ccxt - يرسل معرف العميل لتكون إعادة المحاولة آمنة"""
+    async def execute(ticket: OrderTicket) -> Dict[str, Any]:
+        params = ticket.params
+
+        if ticket.action == OrderAction.CANCEL:
+            return await pool.call(exchange, 'cancel_order', params['order_id'], ticket.symbol)
+
+        if ticket.action == OrderAction.REPLACE:
+            try:
+                await pool.call(exchange, 'cancel_order', params['order_id'], ticket.symbol)
+            except ccxt_async.OrderNotFound:
+                # الأمر الأصلي نُفذ أو أُلغي مسبقاً - نتابع بالأمر الجديد
+                pass
+
+        extra = {**params.get('extra', {}), 'clientOrderId': ticket.client_order_id}
+        try:
+            return await pool.call(
+                exchange, 'create_order', ticket.symbol, params['type'], params['side'],
+                params['amount'], params.get('price'), extra
+            )
+        except ccxt_async.DuplicateOrderId:
+            # إعادة محاولة بعد انقطاع والأمر وصل فعلاً للمنصة
+            if ticket.attempts > 1:
+                return {'id': None, 'clientOrderId': ticket.client_order_id, 'status': 'open', 'duplicate': True}
+            raise
+
+    return execute
+
+
+# نسخة عالمية
+order_pipeline = OrderPipeline()
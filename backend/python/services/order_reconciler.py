@@ -0,0 +1,423 @@
+# backend/python/services/order_reconciler.py
+"""
+🧾 محرك مطابقة الأوامر - جلب مجمع للأوامر المفتوحة والمغلقة لكل منصة ومقارنتها بالحالة المحلية
+التنفيذ الكامل والجزئي والإلغاء تُطبق كأحداث، بتكلفة O(منصات) طلبات لكل دورة بدلاً من O(أوامر)
+الإصدار: 3.0.0 | المطور: Akraa Trading Team
+"""
+
+import asyncio
+import inspect
+import logging
+import os
+import time
+from dataclasses import dataclass, field, asdict
+from enum import Enum
+from typing import Dict, List, Optional, Any, Callable, Tuple
+
+import ccxt.async_support as ccxt_async
+
+from services.async_exchange_pool import AsyncExchangePool, exchange_pool
+
+try:
+    import ccxt.pro as ccxt_pro
+except ImportError:
+    ccxt_pro = None
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_STATUSES = ('closed', 'canceled', 'expired', 'rejected')
+
+
+class OrderEventType(Enum):
+    """نوع حدث الأمر"""
+    PARTIAL_FILL = "partial_fill"
+    FILLED = "filled"
+    CANCELED = "canceled"
+    EXPIRED = "expired"
+    REJECTED = "rejected"
+
+
+@dataclass
+class TrackedOrder:
+    """الحالة المحلية لأمر مفتوح على المنصة"""
+    exchange: str
+    order_id: Optional[str]
+    symbol: str
+    side: str
+    amount: float
+    client_order_id: Optional[str] = None
+    filled: float = 0.0
+    average_price: Optional[float] = None
+    status: str = 'open'
+    created_at: float = field(default_factory=time.time)
+    updated_at: float = field(default_factory=time.time)
+    missing_cycles: int = 0
+
+    @property
+    def key(self) -> str:
+        return self.order_id or self.client_order_id
+
+
+@dataclass
+class OrderEvent:
+    """تغيير في حالة أمر اكتشفته المطابقة أو تدفق المستخدم"""
+    type: OrderEventType
+    exchange: str
+    order_id: Optional[str]
+    client_order_id: Optional[str]
+    symbol: str
+    side: str
+    amount: float
+    filled: float
+    fill_delta: float
+    average_price: Optional[float]
+    status: str
+    source: str
+    timestamp: float = field(default_factory=time.time)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {**asdict(self), 'type': self.type.value}
+
+
+class OrderReconciler:
+    """مطابقة الأوامر المحلية مع المنصة - طلبان مجمعان لكل منصة في كل دورة"""
+
+    def __init__(self, pool: AsyncExchangePool = None):
+        self.pool = pool or exchange_pool
+        self.reconciler_config = {
+            'interval': float(os.getenv('ORDER_RECONCILE_INTERVAL', '2')),
+            # طلبات المطابقة لا تتكرر لنفس المنصة أسرع من هذا حتى مع عدة مستدعين
+            'min_interval': float(os.getenv('ORDER_RECONCILE_MIN_INTERVAL', '1')),
+            # مع تدفق المستخدم النشط تكفي مطابقة REST احتياطية بطيئة
+            'stream_resync_interval': float(os.getenv('ORDER_STREAM_RESYNC_INTERVAL', '60')),
+            # أمر مفقود من الجلب المجمع يُستعلم عنه منفرداً بعد هذا العدد من الدورات
+            'missing_cycles_warning': int(os.getenv('ORDER_MISSING_CYCLES_WARNING', '5')),
+            # ثم يُنهى بحدث EXPIRED إذا بقيت حالته مجهولة (حد أقصى لتتبع أمر لم يصل المنصة)
+            'missing_cycles_expire': int(os.getenv('ORDER_MISSING_CYCLES_EXPIRE', '30')),
+            'user_stream_enabled': os.getenv('ORDER_USER_STREAM_ENABLED', 'true').lower() == 'true',
+        }
+
+        self.orders: Dict[str, Dict[str, TrackedOrder]] = {}
+        self.subscribers: List[Callable] = []
+        self.last_reconciled: Dict[str, float] = {}
+        self.symbol_required: Dict[Tuple[str, str], bool] = {}
+
+        self.stream_tasks: Dict[str, asyncio.Task] = {}
+        self.stream_clients: Dict[str, Any] = {}
+        self.stream_heartbeat: Dict[str, float] = {}
+        self.reconcile_task: Optional[asyncio.Task] = None
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self.stats = {'cycles': 0, 'requests': 0, 'events': 0, 'stream_updates': 0, 'errors': 0,
+                      'resolved_missing': 0, 'expired_missing': 0}
+
+    # ==================== الحالة المحلية ====================
+
+    def track(self, exchange: str, order_id: Optional[str], symbol: str, side: str, amount: float,
+              client_order_id: Optional[str] = None, filled: float = 0.0,
+              average_price: Optional[float] = None) -> Optional[TrackedOrder]:
+        """بدء تتبع أمر مفتوح"""
+        if not order_id and not client_order_id:
+            return None
+        order = TrackedOrder(exchange, order_id, symbol, side, float(amount), client_order_id,
+                             float(filled or 0.0), average_price)
+        self.orders.setdefault(exchange, {})[order.key] = order
+        return order
+
+    def track_order(self, exchange: str, order: Dict[str, Any]) -> Optional[TrackedOrder]:
+        """تتبع أمر من رد ccxt - الأوامر المنتهية لا تُتتبع"""
+        if order.get('status') in TERMINAL_STATUSES:
+            return None
+        return self.track(
+            exchange, order.get('id'), order.get('symbol'), order.get('side'),
+            order.get('amount') or 0.0, order.get('clientOrderId'),
+            order.get('filled') or 0.0, order.get('average')
+        )
+
+    def untrack(self, exchange: str, order_id: str) -> None:
+        """إيقاف تتبع أمر"""
+        self.orders.get(exchange, {}).pop(order_id, None)
+
+    def get_order(self, exchange: str, order_id: str) -> Optional[TrackedOrder]:
+        return self.orders.get(exchange, {}).get(order_id)
+
+    def subscribe(self, callback: Callable) -> Callable[[], None]:
+        """اشتراك بدالة (متزامنة أو غير متزامنة) في أحداث الأوامر - يعيد دالة إلغاء الاشتراك"""
+        self.subscribers.append(callback)
+
+        def unsubscribe():
+            if callback in self.subscribers:
+                self.subscribers.remove(callback)
+
+        return unsubscribe
+
+    async def _emit(self, event: OrderEvent) -> None:
+        self.stats['events'] += 1
+        for callback in list(self.subscribers):
+            try:
+                result = callback(event)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e:
+                logger.error(f"❌ خطأ في معالج أحداث الأوامر: {str(e)}")
+
+    # ==================== تطبيق حالة المنصة ====================
+
+    async def apply_remote(self, exchange: str, remote: Dict[str, Any], source: str = 'rest') -> Optional[OrderEvent]:
+        """مقارنة أمر واحد من المنصة بالحالة المحلية وإصدار الحدث المناسب"""
+        orders = self.orders.get(exchange, {})
+        local = orders.get(remote.get('id')) or orders.get(remote.get('clientOrderId'))
+        if local is None:
+            return None
+
+        local.missing_cycles = 0
+        if local.order_id is None and remote.get('id'):
+            # أمر تُتبع بمعرف العميل فقط (إعادة إرسال مكررة) - اعتماد معرف المنصة
+            orders.pop(local.key, None)
+            local.order_id = remote['id']
+            orders[local.key] = local
+
+        filled = float(remote.get('filled') or 0.0)
+        status = remote.get('status') or local.status
+        fill_delta = filled - local.filled
+
+        event_type = None
+        if status == 'closed':
+            event_type = OrderEventType.FILLED
+        elif status in ('canceled', 'expired', 'rejected'):
+            event_type = OrderEventType(status)
+        elif fill_delta > 0:
+            event_type = OrderEventType.PARTIAL_FILL
+
+        local.filled = max(local.filled, filled)
+        local.average_price = remote.get('average') or local.average_price
+        local.status = status
+        local.updated_at = time.time()
+
+        if event_type is None:
+            return None
+
+        if status in TERMINAL_STATUSES:
+            orders.pop(local.key, None)
+
+        event = OrderEvent(
+            type=event_type, exchange=exchange, order_id=local.order_id,
+            client_order_id=local.client_order_id, symbol=local.symbol, side=local.side,
+            amount=local.amount, filled=local.filled, fill_delta=max(0.0, fill_delta),
+            average_price=local.average_price, status=status, source=source
+        )
+        await self._emit(event)
+        return event
+
+    # ==================== المطابقة المجمعة ====================
+
+    async def _fetch_bulk(self, exchange: str, method: str, symbols: List[str], *args) -> List[Dict[str, Any]]:
+        """طلب واحد لكل المنصة - أو طلب لكل رمز إذا كانت المنصة تشترط الرمز"""
+        if not self.symbol_required.get((exchange, method)):
+            try:
+                self.stats['requests'] += 1
+                return await self.pool.call(exchange, method, None, *args)
+            except ccxt_async.ArgumentsRequired:
+                self.symbol_required[(exchange, method)] = True
+                logger.info(f"ℹ️ {exchange}.{method} يتطلب رمزاً - طلب لكل رمز مفتوح")
+
+        self.stats['requests'] += len(symbols)
+        results = await asyncio.gather(
+            *[self.pool.call(exchange, method, symbol, *args) for symbol in symbols],
+            return_exceptions=True
+        )
+        orders = []
+        for result in results:
+            if isinstance(result, Exception):
+                raise result
+            orders.extend(result)
+        return orders
+
+    async def reconcile_exchange(self, exchange: str, force: bool = False) -> List[OrderEvent]:
+        """مطابقة كل أوامر المنصة: أوامر مفتوحة + مغلقة منذ أقدم أمر متتبع ثم مقارنة بتمريرة واحدة"""
+        tracked = self.orders.get(exchange)
+        if not tracked:
+            return []
+
+        async with self._locks.setdefault(exchange, asyncio.Lock()):
+            now = time.time()
+            min_interval = self.reconciler_config['min_interval']
+            if self.is_stream_active(exchange):
+                min_interval = self.reconciler_config['stream_resync_interval']
+            if not force and now - self.last_reconciled.get(exchange, 0) < min_interval:
+                return []
+            self.last_reconciled[exchange] = now
+
+            snapshot = list(tracked.values())
+            symbols = sorted({order.symbol for order in snapshot})
+            since = int(min(order.created_at for order in snapshot) * 1000) - 60000
+
+            client = await self.pool.get_client(exchange)
+            requests = [self._fetch_bulk(exchange, 'fetch_open_orders', symbols)]
+            if client.has.get('fetchClosedOrders'):
+                requests.append(self._fetch_bulk(exchange, 'fetch_closed_orders', symbols, since))
+            results = await asyncio.gather(*requests)
+
+            remote_orders = [order for result in results for order in result]
+            by_key: Dict[str, Dict[str, Any]] = {}
+            for remote in remote_orders:
+                for key in (remote.get('id'), remote.get('clientOrderId')):
+                    if key:
+                        by_key[key] = remote
+
+            events, missing = [], []
+            for local in snapshot:
+                remote = by_key.get(local.order_id) or by_key.get(local.client_order_id)
+                if remote is None:
+                    local.missing_cycles += 1
+                    if local.missing_cycles == self.reconciler_config['missing_cycles_warning']:
+                        logger.warning(f"⚠️ الأمر {local.key} غير موجود في {exchange} منذ {local.missing_cycles} دورات")
+                    if local.missing_cycles >= self.reconciler_config['missing_cycles_warning']:
+                        missing.append(local)
+                    continue
+                event = await self.apply_remote(exchange, remote)
+                if event is not None:
+                    events.append(event)
+
+            if missing:
+                resolved = await asyncio.gather(
+                    *[self._resolve_missing(exchange, client, local) for local in missing]
+                )
+                events.extend(event for event in resolved if event is not None)
+
+            return events
+
+    async def _resolve_missing(self, exchange: str, client: Any, local: TrackedOrder) -> Optional[OrderEvent]:
+        """أمر غائب عن الجلب المجمع - استعلام منفرد بمعرف المنصة أو العميل ثم حدث نهائي
+
+        غير موجود في المنصة = REJECTED (لم يصل أو رُفض)، وحالة مجهولة بعد missing_cycles_expire
+        دورة = EXPIRED، حتى يحرر المشتركون ما حجزوه للأمر.
+        """
+        stub = {'id': local.order_id, 'clientOrderId': local.client_order_id, 'filled': local.filled}
+        if client.has.get('fetchOrder'):
+            params = {} if local.order_id else {'clientOrderId': local.client_order_id}
+            try:
+                self.stats['requests'] += 1
+                remote = await self.pool.call(exchange, 'fetch_order', local.order_id, local.symbol, params)
+                self.stats['resolved_missing'] += 1
+                return await self.apply_remote(exchange, remote, source='fetch_order')
+            except ccxt_async.OrderNotFound:
+                self.stats['resolved_missing'] += 1
+                logger.warning(f"⚠️ الأمر {local.key} غير موجود في {exchange} - إنهاء التتبع")
+                return await self.apply_remote(exchange, {**stub, 'status': 'rejected'}, source='missing')
+            except Exception as e:
+                logger.warning(f"⚠️ تعذر الاستعلام عن الأمر المفقود {local.key} في {exchange}: {str(e)}")
+
+        if local.missing_cycles < self.reconciler_config['missing_cycles_expire']:
+            return None
+        self.stats['expired_missing'] += 1
+        logger.warning(f"⚠️ انتهاء تتبع الأمر {local.key} في {exchange} بعد {local.missing_cycles} دورات بحالة مجهولة")
+        return await self.apply_remote(exchange, {**stub, 'status': 'expired'}, source='missing')
+
+    async def reconcile(self, force: bool = False) -> List[OrderEvent]:
+        """مطابقة كل المنصات بالتوازي"""
+        exchanges = [exchange for exchange, orders in self.orders.items() if orders]
+        results = await asyncio.gather(
+            *[self.reconcile_exchange(exchange, force) for exchange in exchanges],
+            return_exceptions=True
+        )
+        self.stats['cycles'] += 1
+
+        events = []
+        for exchange, result in zip(exchanges, results):
+            if isinstance(result, Exception):
+                self.stats['errors'] += 1
+                logger.error(f"❌ خطأ في مطابقة أوامر {exchange}: {str(result)}")
+                continue
+            events.extend(result)
+        return events
+
+    # ==================== تدفق بيانات المستخدم ====================
+
+    def is_stream_active(self, exchange: str) -> bool:
+        """هل يصل تدفق المستخدم (آخر تحديث خلال فترة المطابقة الاحتياطية)"""
+        task = self.stream_tasks.get(exchange)
+        return (task is not None and not task.done() and
+                time.time() - self.stream_heartbeat.get(exchange, 0) < self.reconciler_config['stream_resync_interval'])
+
+    def start_user_stream(self, exchange: str) -> bool:
+        """الاشتراك في تحديثات الأوامر الخاصة (watch_orders) إذا كانت ccxt.pro تدعم المنصة"""
+        if not self.reconciler_config['user_stream_enabled'] or ccxt_pro is None:
+            return False
+        if not hasattr(ccxt_pro, exchange) or not self.pool.is_registered(exchange):
+            return False
+        if exchange in self.stream_tasks and not self.stream_tasks[exchange].done():
+            return True
+
+        client = getattr(ccxt_pro, exchange)(dict(self.pool.exchange_configs[exchange]))
+        if not client.has.get('watchOrders'):
+            return False
+        self.stream_clients[exchange] = client
+
+        async def stream_loop():
+            while True:
+                try:
+                    updates = await client.watch_orders()
+                    self.stream_heartbeat[exchange] = time.time()
+                    for remote in updates:
+                        self.stats['stream_updates'] += 1
+                        await self.apply_remote(exchange, remote, source='stream')
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    # العودة إلى مطابقة REST حتى يعود التدفق
+                    self.stream_heartbeat.pop(exchange, None)
+                    logger.warning(f"⚠️ انقطع تدفق أوامر {exchange}: {str(e)}")
+                    await asyncio.sleep(5)
+
+        self.stream_tasks[exchange] = asyncio.create_task(stream_loop())
+        logger.info(f"🧾 بدء تدفق تحديثات الأوامر لـ {exchange}")
+        return True
+
+    # ==================== التشغيل الدوري ====================
+
+    def start(self) -> None:
+        """مطابقة دورية لكل المنصات"""
+        if self.reconcile_task is not None and not self.reconcile_task.done():
+            return
+
+        async def reconcile_loop():
+            while True:
+                await self.reconcile()
+                await asyncio.sleep(self.reconciler_config['interval'])
+
+        self.reconcile_task = asyncio.create_task(reconcile_loop())
+
+    async def stop(self) -> None:
+        """إيقاف المطابقة والتدفقات"""
+        tasks = [task for task in [self.reconcile_task, *self.stream_tasks.values()] if task is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self.reconcile_task = None
+        self.stream_tasks.clear()
+
+        for client in self.stream_clients.values():
+            try:
+                await client.close()
+            except Exception:
+                pass
+        self.stream_clients.clear()
+
+    def get_reconciler_status(self) -> Dict[str, Any]:
+        """حالة المطابقة"""
+        return {
+            'running': self.reconcile_task is not None and not self.reconcile_task.done(),
+            'exchanges': {
+                exchange: {
+                    'tracked_orders': len(orders),
+                    'user_stream': self.is_stream_active(exchange),
+                    'last_reconciled': self.last_reconciled.get(exchange)
+                }
+                for exchange, orders in self.orders.items()
+            },
+            **self.stats
+        }
+
+
+# نسخة عالمية
+order_reconciler = OrderReconciler()
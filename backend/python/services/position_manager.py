@@ -7,11 +7,11 @@
 import asyncio
 import logging
 import math
+import os
 import time
 import traceback
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any, Tuple
-from decimal import Decimal, ROUND_DOWN
 from enum import Enum
 import numpy as np
 import pandas as pd
@@ -19,6 +19,11 @@ import pytz
 
 # Custom Imports
 from models.trading_models import *
+from services.order_pipeline import order_pipeline
+from services.order_reconciler import order_reconciler, OrderEvent, OrderEventType
+from services.market_registry import market_registry
+from services.fixed_point import FixedPoint, Precision
+from services.fast_lane import fast_lane
 
 logger = logging.getLogger(__name__)
 
@@ -50,6 +55,12 @@ class AdvancedPositionManager:
         self.pending_orders: Dict[str, OrderResponse] = {}
         self.order_history: Dict[str, List[OrderResponse]] = {}
         
+        # الاشتراك في تدفق الأسعار
+        self._stream_unsubscribe = None
+        
+        # أحداث التنفيذ والإلغاء من مطابقة الأوامر المجمعة
+        self._orders_unsubscribe = order_reconciler.subscribe(self._on_order_event)
+        
         # إعدادات إدارة المراكز من الكود الأصلي
         self.position_config = self._load_position_config()
         
@@ -78,8 +89,13 @@ class AdvancedPositionManager:
             'auto_hedging': False,
             'position_scaling': True,
             'dynamic_sizing': True,
+            'execution_exchange': os.getenv('POSITION_EXECUTION_EXCHANGE', os.getenv('DEFAULT_EXCHANGE', 'binance')),
         }
 
+    def _precision(self, symbol: str) -> Precision:
+        """دقة الرمز في منصة التنفيذ - حساب القيم والأرباح بالنقطة الثابتة"""
+        return market_registry.get_precision(self.position_config['execution_exchange'], symbol)
+
     async def open_position(self, symbol: str, side: OrderSide, quantity: float,
                           entry_price: float, stop_loss: float, take_profit: float,
                           leverage: int = 1, timeframe: str = '1h') -> Position:
@@ -93,7 +109,7 @@ class AdvancedPositionManager:
                 quantity=quantity,
                 entry_price=entry_price,
                 current_price=entry_price,
-                current_value=quantity * entry_price,
+                current_value=self._precision(symbol).notional(quantity, entry_price).to_float(),
                 unrealized_pnl=0.0,
                 realized_pnl=0.0,
                 leverage=leverage,
@@ -126,9 +142,10 @@ class AdvancedPositionManager:
             position = self.open_positions[position_id]
             
             # تحديث السعر والقيمة
+            precision = self._precision(position.symbol)
             position.current_price = current_price
-            position.current_value = position.quantity * current_price
-            position.unrealized_pnl = (current_price - position.entry_price) * position.quantity
+            position.current_value = precision.notional(position.quantity, current_price).to_float()
+            position.unrealized_pnl = precision.pnl(position.entry_price, current_price, position.quantity).to_float()
             position.updated_at = datetime.utcnow()
             
             # التحقق من وقف الخسارة وهدف الربح
@@ -140,6 +157,35 @@ class AdvancedPositionManager:
             logger.error(f"❌ خطأ في تحديث سعر المركز {position_id}: {str(e)}")
             raise
 
+    def attach_market_stream(self, market_bus) -> None:
+        """الاشتراك في أسعار التدفق لتحديث المراكز فور وصول كل سعر"""
+        self.detach_market_stream()
+        self._stream_unsubscribe = market_bus.subscribe('tick:*', self._on_market_tick)
+        logger.info("📡 تم ربط مدير المراكز بتدفق الأسعار")
+
+    def detach_market_stream(self) -> None:
+        """إلغاء الاشتراك في تدفق الأسعار"""
+        if self._stream_unsubscribe is not None:
+            self._stream_unsubscribe()
+            self._stream_unsubscribe = None
+
+    @property
+    def is_stream_attached(self) -> bool:
+        """هل المدير مشترك في تدفق الأسعار"""
+        return self._stream_unsubscribe is not None
+
+    async def _on_market_tick(self, tick) -> None:
+        """تحديث جميع مراكز الرمز عند وصول سعر جديد من منصة التنفيذ"""
+        if tick.exchange != self.position_config['execution_exchange']:
+            return
+        for position_id, position in list(self.open_positions.items()):
+            if position.symbol != tick.symbol or position.current_price == tick.price:
+                continue
+            try:
+                await self.update_position_price(position_id, tick.price)
+            except Exception as e:
+                logger.warning(f"⚠️ تعذر تحديث المركز {position_id} من التدفق: {str(e)}")
+
     async def _check_position_triggers(self, position_id: str):
         """التحقق من محفزات المركز (وقف خسارة، هدف ربح)"""
         try:
@@ -236,6 +282,37 @@ class AdvancedPositionManager:
         except Exception as e:
             logger.error(f"❌ خطأ في الإغلاق الجزئي: {str(e)}")
 
+    async def submit_order(self, symbol: str, side: OrderSide, order_type: OrderType, quantity: float,
+                           price: Optional[float] = None, client_order_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """إرسال أمر عبر خط الأوامر - None في وضع المحاكاة (لا يوجد منفذ مسجل)"""
+        exchange = self.position_config['execution_exchange']
+        if not order_pipeline.has_executor(exchange):
+            return None
+        
+        order = await order_pipeline.create_order(
+            exchange, symbol, side.value, order_type.value, quantity, price,
+            client_order_id=client_order_id
+        )
+        
+        # التنفيذ الفوري يدخل عدادات المسار السريع، والباقي يُتتبع في المطابقة المجمعة
+        fast_lane.record_order(symbol, side.value, order)
+        if order.get('status') not in ('closed', 'canceled', 'expired', 'rejected'):
+            order_reconciler.track(
+                exchange, order.get('id'), symbol, side.value, quantity,
+                client_order_id=order.get('clientOrderId'), filled=order.get('filled') or 0.0
+            )
+        return order
+
+    async def _submit_close_order(self, position_id: str, position: Position, quantity: float) -> bool:
+        """أمر سوق معاكس لإغلاق الكمية - لا يتم تحديث المركز إذا رفضته المنصة"""
+        try:
+            close_side = OrderSide.SELL if position.side == OrderSide.BUY else OrderSide.BUY
+            await self.submit_order(position.symbol, close_side, OrderType.MARKET, quantity)
+            return True
+        except Exception as e:
+            logger.error(f"❌ فشل أمر إغلاق المركز {position_id}: {str(e)}")
+            return False
+
     async def partial_close_position(self, position_id: str, close_ratio: float) -> bool:
         """إغلاق جزئي للمركز"""
         try:
@@ -244,24 +321,30 @@ class AdvancedPositionManager:
             
             position = self.open_positions[position_id]
             
-            # حساب الكمية المطلوب إغلاقها
-            close_quantity = position.quantity * close_ratio
-            remaining_quantity = position.quantity - close_quantity
+            # حساب الكمية المطلوب إغلاقها - مقربة لخطوة اللوت والمتبقي بدقة تامة
+            precision = self._precision(position.symbol)
+            quantity = FixedPoint.of(position.quantity, precision.amount_scale)
+            close_quantity = precision.amount(position.quantity * close_ratio)
+            remaining_quantity = quantity - close_quantity
             
             if remaining_quantity <= 0:
                 await self.close_position(position_id, "full_close")
                 return True
             
+            if not await self._submit_close_order(position_id, position, close_quantity.to_float()):
+                return False
+            
             # حساب الربح المحقق
-            realized_pnl = (position.current_price - position.entry_price) * close_quantity
+            realized_pnl = precision.pnl(position.entry_price, position.current_price, close_quantity)
             
             # تحديث المركز
-            position.quantity = remaining_quantity
-            position.current_value = remaining_quantity * position.current_price
-            position.realized_pnl += realized_pnl
-            position.unrealized_pnl = (position.current_price - position.entry_price) * remaining_quantity
+            position.quantity = remaining_quantity.to_float()
+            position.current_value = precision.notional(remaining_quantity, position.current_price).to_float()
+            position.realized_pnl = (realized_pnl + position.realized_pnl).to_float()
+            position.unrealized_pnl = precision.pnl(position.entry_price, position.current_price, remaining_quantity).to_float()
+            fast_lane.risk.record_pnl(realized_pnl.to_float())
             
-            logger.info(f"📉 إغلاق جزئي لـ {position.symbol}: {close_ratio:.0%} (ربح: {realized_pnl:.2f})")
+            logger.info(f"📉 إغلاق جزئي لـ {position.symbol}: {close_ratio:.0%} (ربح: {realized_pnl.to_float():.2f})")
             
             # تحديث الإحصائيات
             await self._update_position_stats(position_id, 'partially_closed')
@@ -280,13 +363,19 @@ class AdvancedPositionManager:
             
             position = self.open_positions[position_id]
             
+            if not await self._submit_close_order(position_id, position, position.quantity):
+                return False
+            
             # حساب الربح/الخسارة النهائية
-            final_pnl = (position.current_price - position.entry_price) * position.quantity
+            final_pnl = self._precision(position.symbol).pnl(
+                position.entry_price, position.current_price, position.quantity
+            ).to_float()
             
             # تحديث المركز
-            position.realized_pnl += final_pnl
+            position.realized_pnl = (FixedPoint.of(position.realized_pnl) + final_pnl).to_float()
             position.unrealized_pnl = 0.0
             position.current_value = 0.0
+            fast_lane.risk.record_pnl(final_pnl)
             
             # نقل إلى المراكز المغلقة
             self.closed_positions[position_id] = position
@@ -442,19 +531,21 @@ class AdvancedPositionManager:
             return {}
 
     async def manage_pending_orders(self):
-        """إدارة الأوامر المعلقة"""
+        """إدارة الأوامر المعلقة - حالة أوامر المنصة تصل كأحداث من المطابقة المجمعة"""
         try:
+            exchange = self.position_config['execution_exchange']
             orders_to_remove = []
             
             for order_id, order in self.pending_orders.items():
                 try:
                     # التحقق من انتهاء صلاحية الأمر
                     if await self._is_order_expired(order):
+                        order_reconciler.untrack(exchange, order_id)
                         orders_to_remove.append(order_id)
                         continue
                     
-                    # التحقق من تنفيذ الأمر
-                    if await self._is_order_filled(order):
+                    # أوامر المحاكاة فقط - الأوامر المتتبعة تُحدّث من المنصة
+                    if order_reconciler.get_order(exchange, order_id) is None and await self._is_order_filled(order):
                         await self._process_filled_order(order)
                         orders_to_remove.append(order_id)
                         
@@ -465,10 +556,30 @@ class AdvancedPositionManager:
             # إزالة الأوامر المنتهية
             for order_id in orders_to_remove:
                 del self.pending_orders[order_id]
+            
+            # طلبان مجمعان لكل منصة بدلاً من طلب لكل أمر
+            await order_reconciler.reconcile()
                 
         except Exception as e:
             logger.error(f"❌ خطأ في إدارة الأوامر المعلقة: {str(e)}")
 
+    async def _on_order_event(self, event: OrderEvent) -> None:
+        """تطبيق تنفيذ جزئي/كامل أو إلغاء على الأمر المعلق المحلي"""
+        order_id = event.order_id if event.order_id in self.pending_orders else event.client_order_id
+        order = self.pending_orders.get(order_id)
+        if order is None:
+            return
+        
+        order.filled_quantity = event.filled
+        order.remaining_quantity = max(0.0, event.amount - event.filled)
+        order.average_price = event.average_price or order.average_price
+        order.status = event.status
+        
+        if event.type == OrderEventType.FILLED:
+            await self._process_filled_order(order)
+        if event.type != OrderEventType.PARTIAL_FILL:
+            self.pending_orders.pop(order_id, None)
+
     async def _is_order_expired(self, order: OrderResponse) -> bool:
         """التحقق من انتهاء صلاحية الأمر"""
         try:
@@ -0,0 +1,279 @@
+# backend/python/services/rate_limiter.py
+"""
+🚦 محدد معدل الطلبات - دلاء توكنات لكل منصة ولكل فئة نقاط نهاية بأوزانها الموثقة
+حالة مشتركة بين جميع الخدمات مع انتظار غير متزامن بمهلة قصوى بدلاً من رفض الطلب
+الإصدار: 3.0.0 | المطور: Akraa Trading Team
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Any, Tuple
+
+logger = logging.getLogger(__name__)
+
+# حدود المنصات الموثقة: الدلاء (الحد، النافذة بالثواني)، الدلاء لكل فئة، ووزن كل دالة ccxt
+EXCHANGE_RATE_PROFILES: Dict[str, Dict[str, Any]] = {
+    'binance': {
+        # وزن الطلبات لكل IP في الدقيقة + حد الأوامر لكل حساب كل 10 ثوانٍ
+        'buckets': {'weight': (6000, 60), 'orders': (100, 10)},
+        'classes': {'public': ['weight'], 'private': ['weight'], 'order': ['weight', 'orders']},
+        'weights': {
+            'load_markets': 20, 'fetch_ticker': 2, 'fetch_tickers': 80, 'fetch_order_book': 5,
+            'fetch_ohlcv': 2, 'fetch_trades': 25, 'fetch_balance': 20, 'fetch_order': 4,
+            'fetch_open_orders': 6, 'fetch_my_trades': 20, 'create_order': 1, 'cancel_order': 1,
+            'edit_order': 1,
+        },
+    },
+    'bybit': {
+        # 600 طلب لكل IP كل 5 ثوانٍ + 10 أوامر في الثانية
+        'buckets': {'ip': (600, 5), 'orders': (10, 1)},
+        'classes': {'public': ['ip'], 'private': ['ip'], 'order': ['ip', 'orders']},
+        'weights': {},
+    },
+    'kucoin': {
+        # مجمع عام لكل IP ومجمع خاص لكل حساب - كلاهما كل 30 ثانية
+        'buckets': {'public': (2000, 30), 'private': (4000, 30)},
+        'classes': {'public': ['public'], 'private': ['private'], 'order': ['private']},
+        'weights': {
+            'load_markets': 4, 'fetch_ticker': 2, 'fetch_tickers': 15, 'fetch_order_book': 3,
+            'fetch_ohlcv': 3, 'fetch_trades': 3, 'fetch_balance': 5, 'fetch_order': 2,
+            'fetch_open_orders': 2, 'fetch_my_trades': 10, 'create_order': 2, 'cancel_order': 3,
+        },
+    },
+    'mexc': {
+        # 500 وزن كل 10 ثوانٍ لكل IP
+        'buckets': {'weight': (500, 10), 'orders': (50, 10)},
+        'classes': {'public': ['weight'], 'private': ['weight'], 'order': ['weight', 'orders']},
+        'weights': {
+            'load_markets': 10, 'fetch_tickers': 40, 'fetch_balance': 10, 'fetch_open_orders': 3,
+            'fetch_my_trades': 10,
+        },
+    },
+    'okx': {
+        # حدود لكل نقطة نهاية كل ثانيتين
+        'buckets': {'public': (20, 2), 'private': (10, 2), 'orders': (60, 2)},
+        'classes': {'public': ['public'], 'private': ['private'], 'order': ['orders']},
+        'weights': {},
+    },
+    'gateio': {
+        'buckets': {'public': (200, 10), 'private': (200, 10), 'orders': (10, 1)},
+        'classes': {'public': ['public'], 'private': ['private'], 'order': ['orders']},
+        'weights': {},
+    },
+    'default': {
+        'buckets': {'weight': (1200, 60), 'orders': (10, 1)},
+        'classes': {'public': ['weight'], 'private': ['weight'], 'order': ['weight', 'orders']},
+        'weights': {},
+    },
+}
+
+ORDER_METHODS = ('create_', 'cancel_', 'edit_')
+PRIVATE_METHODS = ('fetch_balance', 'fetch_order', 'fetch_orders', 'fetch_open_orders',
+                   'fetch_closed_orders', 'fetch_my_trades', 'fetch_positions', 'fetch_deposit',
+                   'fetch_withdrawal', 'withdraw')
+
+
+class RateLimitTimeout(Exception):
+    """لا يمكن الحصول على توكن قبل انتهاء المهلة"""
+
+    def __init__(self, key: str, wait: float, timeout: float):
+        super().__init__(f"تجاوز حد الطلبات لـ {key}: الانتظار {wait:.2f}s أطول من المهلة {timeout:.2f}s")
+        self.key = key
+        self.wait = wait
+        self.timeout = timeout
+
+
+class TokenBucket:
+    """دلو توكنات بالحجز المسبق - الرصيد قد يصبح سالباً والمنتظرون يُخدمون بالترتيب
+
+    السعة (burst) ومعدل التعبئة يُختاران بحيث لا يتجاوز مجموع أي نافذة بطول period
+    قيمة limit، لذلك يبقى الحد صحيحاً للنوافذ الثابتة والمنزلقة معاً.
+    """
+
+    def __init__(self, limit: float, period: float, burst_fraction: float = 0.1, name: str = ''):
+        self.name = name
+        self.limit = limit
+        self.period = period
+        self.capacity = max(1.0, limit * burst_fraction)
+        self.refill_rate = max(limit - self.capacity, 1.0) / period
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        # قفل خيوط لأن المستدعين المتزامنين يشاركون نفس الحالة
+        self._lock = threading.Lock()
+        self.stats = {'granted': 0, 'rejected': 0, 'waited': 0.0}
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.refill_rate)
+        self.updated_at = now
+
+    def wait_time(self, tokens: float = 1.0) -> float:
+        """زمن الانتظار المتوقع دون حجز"""
+        with self._lock:
+            self._refill(time.monotonic())
+            return max(0.0, (tokens - self.tokens) / self.refill_rate)
+
+    def reserve(self, tokens: float = 1.0, max_wait: Optional[float] = None) -> Optional[float]:
+        """حجز التوكنات وإرجاع زمن الانتظار - None إذا تجاوز max_wait (بدون حجز)"""
+        with self._lock:
+            self._refill(time.monotonic())
+            wait = max(0.0, (tokens - self.tokens) / self.refill_rate)
+            if max_wait is not None and wait > max_wait:
+                self.stats['rejected'] += 1
+                return None
+            self.tokens -= tokens
+            self.stats['granted'] += 1
+            self.stats['waited'] += wait
+            return wait
+
+    def refund(self, tokens: float = 1.0) -> None:
+        """إرجاع توكنات محجوزة لم تُستخدم"""
+        with self._lock:
+            self.tokens = min(self.capacity, self.tokens + tokens)
+
+    def drain(self, seconds: float) -> None:
+        """إيقاف الدلو لمدة seconds (بعد رد 429 من المنصة)"""
+        with self._lock:
+            self._refill(time.monotonic())
+            self.tokens = min(self.tokens, -seconds * self.refill_rate)
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            self._refill(time.monotonic())
+            return {
+                'limit': self.limit,
+                'period': self.period,
+                'capacity': self.capacity,
+                'available': round(self.tokens, 3),
+                **self.stats
+            }
+
+
+class RateLimiter:
+    """محدد المعدل المشترك - دلو لكل (منصة، مجموعة حدود) مع أوزان نقاط النهاية"""
+
+    def __init__(self, profiles: Optional[Dict[str, Dict[str, Any]]] = None,
+                 safety_factor: Optional[float] = None, burst_fraction: Optional[float] = None,
+                 max_wait: Optional[float] = None):
+        self.profiles = profiles or EXCHANGE_RATE_PROFILES
+        self.limiter_config = {
+            # نترك هامشاً صغيراً لفروق الساعة والطلبات من خارج العملية
+            'safety_factor': float(safety_factor or os.getenv('RATE_LIMIT_SAFETY_FACTOR', '0.95')),
+            'burst_fraction': float(burst_fraction or os.getenv('RATE_LIMIT_BURST_FRACTION', '0.1')),
+            'max_wait': float(max_wait or os.getenv('RATE_LIMIT_MAX_WAIT', '30')),
+            'penalty_seconds': float(os.getenv('RATE_LIMIT_PENALTY_SECONDS', '5')),
+        }
+        self.buckets: Dict[Tuple[str, str], TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def has_profile(self, exchange: str) -> bool:
+        """هل للمنصة حدود موثقة (وليس الملف الافتراضي)"""
+        return exchange in self.profiles
+
+    def _profile(self, exchange: str) -> Dict[str, Any]:
+        return self.profiles.get(exchange) or self.profiles['default']
+
+    @staticmethod
+    def endpoint_class(method: str) -> str:
+        """فئة نقطة النهاية من اسم دالة ccxt: public أو private أو order"""
+        if method in ('public', 'private', 'order'):
+            return method
+        if method.startswith(ORDER_METHODS):
+            return 'order'
+        if method.startswith(PRIVATE_METHODS):
+            return 'private'
+        return 'public'
+
+    def get_cost(self, exchange: str, method: str, weight: Optional[float] = None) -> List[Tuple[str, float]]:
+        """الدلاء ووزن الطلب في كل منها"""
+        profile = self._profile(exchange)
+        endpoint_weight = weight if weight is not None else profile['weights'].get(method, 1)
+        cost = []
+        for bucket_name in profile['classes'][self.endpoint_class(method)]:
+            # دلاء الأوامر تحسب عدد الأوامر وليس الوزن
+            cost.append((bucket_name, 1 if bucket_name == 'orders' else endpoint_weight))
+        return cost
+
+    def get_bucket(self, exchange: str, bucket_name: str) -> TokenBucket:
+        """الحصول على الدلو المشترك (يُنشأ عند أول استخدام)"""
+        key = (exchange, bucket_name)
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            with self._lock:
+                bucket = self.buckets.get(key)
+                if bucket is None:
+                    limit, period = self._profile(exchange)['buckets'][bucket_name]
+                    bucket = self.buckets[key] = TokenBucket(
+                        limit * self.limiter_config['safety_factor'], period,
+                        self.limiter_config['burst_fraction'], name=f"{exchange}:{bucket_name}"
+                    )
+        return bucket
+
+    def _reserve(self, exchange: str, method: str, weight: Optional[float],
+                 timeout: Optional[float]) -> float:
+        """حجز ذري عبر كل الدلاء - إما الكل أو لا شيء"""
+        max_wait = self.limiter_config['max_wait'] if timeout is None else max(0.0, timeout)
+        reserved = []
+        wait = 0.0
+        for bucket_name, tokens in self.get_cost(exchange, method, weight):
+            bucket = self.get_bucket(exchange, bucket_name)
+            bucket_wait = bucket.reserve(tokens, max_wait)
+            if bucket_wait is None:
+                for reserved_bucket, reserved_tokens in reserved:
+                    reserved_bucket.refund(reserved_tokens)
+                raise RateLimitTimeout(bucket.name, bucket.wait_time(tokens), max_wait)
+            reserved.append((bucket, tokens))
+            wait = max(wait, bucket_wait)
+        return wait
+
+    async def acquire(self, exchange: str, method: str = 'public', weight: Optional[float] = None,
+                      timeout: Optional[float] = None) -> float:
+        """انتظار توكن لطلب - يرفع RateLimitTimeout إذا تجاوز الانتظار المهلة"""
+        wait = self._reserve(exchange, method, weight, timeout)
+        if wait > 0:
+            try:
+                await asyncio.sleep(wait)
+            except asyncio.CancelledError:
+                for bucket_name, tokens in self.get_cost(exchange, method, weight):
+                    self.get_bucket(exchange, bucket_name).refund(tokens)
+                raise
+        return wait
+
+    def acquire_sync(self, exchange: str, method: str = 'public', weight: Optional[float] = None,
+                     timeout: Optional[float] = None) -> float:
+        """نسخة متزامنة للخدمات غير المتزامنة (تحجب الخيط الحالي فقط)"""
+        wait = self._reserve(exchange, method, weight, timeout)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def try_acquire(self, exchange: str, method: str = 'public', weight: Optional[float] = None) -> bool:
+        """حجز فوري بدون انتظار"""
+        try:
+            self._reserve(exchange, method, weight, 0.0)
+            return True
+        except RateLimitTimeout:
+            return False
+
+    def penalize(self, exchange: str, seconds: Optional[float] = None) -> None:
+        """إيقاف جميع دلاء المنصة بعد رد 429/418"""
+        seconds = self.limiter_config['penalty_seconds'] if seconds is None else seconds
+        for bucket_name in self._profile(exchange)['buckets']:
+            self.get_bucket(exchange, bucket_name).drain(seconds)
+        logger.warning(f"⚠️ إيقاف طلبات {exchange} لمدة {seconds:.1f}s بعد تجاوز حد المنصة")
+
+    def get_limiter_status(self) -> Dict[str, Any]:
+        """حالة الدلاء"""
+        exchanges: Dict[str, Dict[str, Any]] = {}
+        for (exchange, bucket_name), bucket in list(self.buckets.items()):
+            exchanges.setdefault(exchange, {})[bucket_name] = bucket.status()
+        return {
+            'limiter_config': self.limiter_config,
+            'exchanges': exchanges
+        }
+
+
+# نسخة عالمية مشتركة بين جميع الخدمات
+rate_limiter = RateLimiter()
@@ -0,0 +1,313 @@
+# backend/python/services/resilience.py
+"""
+🛡️ طبقة المرونة لطلبات المنصات - قاطع دائرة لكل منصة، ميزانية وقت من المستدعي وطلبات تحوط
+تأخير عشوائي بين المحاولات، ولا تتجاوز أي محاولة الوقت المتبقي من مهلة المستدعي
+الإصدار: 3.0.0 | المطور: Akraa Trading Team
+"""
+
+import asyncio
+import logging
+import os
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from enum import Enum
+from typing import Dict, List, Optional, Any, Callable, Awaitable
+
+import ccxt.async_support as ccxt_async
+
+from services.rate_limiter import RateLimitTimeout
+
+logger = logging.getLogger(__name__)
+
+# أخطاء عابرة تستحق إعادة المحاولة وتُحسب على صحة المنصة
+TRANSIENT_ERRORS = (ccxt_async.NetworkError, asyncio.TimeoutError, ConnectionError)
+
+# الموعد النهائي المطلق (time.monotonic) للطلب الحالي - ينتقل تلقائياً للمهام الفرعية
+_deadline: ContextVar[Optional[float]] = ContextVar('exchange_call_deadline', default=None)
+
+
+class CircuitState(Enum):
+    """حالة قاطع الدائرة"""
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """الدائرة مفتوحة - الطلب مرفوض فوراً دون الاتصال بالمنصة"""
+
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"الدائرة مفتوحة لـ {name} - إعادة المحاولة بعد {retry_after:.1f}s")
+        self.name = name
+        self.retry_after = retry_after
+
+
+class DeadlineExceeded(asyncio.TimeoutError):
+    """انتهت ميزانية الوقت المحددة من المستدعي"""
+
+
+@contextmanager
+def deadline(seconds: float):
+    """تحديد ميزانية وقت لكل طلبات المنصات داخل الكتلة - المهل المتداخلة تأخذ الأقصر
+
+    مثال: with deadline(0.5): await exchange_pool.call('binance', 'fetch_ticker', 'BTC/USDT')
+    """
+    new_deadline = time.monotonic() + seconds
+    current = _deadline.get()
+    if current is not None:
+        new_deadline = min(new_deadline, current)
+    token = _deadline.set(new_deadline)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining_time() -> Optional[float]:
+    """الوقت المتبقي من ميزانية المستدعي - None بدون ميزانية"""
+    current = _deadline.get()
+    if current is None:
+        return None
+    return current - time.monotonic()
+
+
+def backoff_delay(attempt: int, base: float = 0.25, cap: float = 5.0) -> float:
+    """تأخير أسي بعشوائية كاملة - يمنع تزامن إعادة المحاولات بين العملاء"""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+class CircuitBreaker:
+    """قاطع دائرة بفحص نصف مفتوح
+
+    يفتح بعد failure_threshold فشلاً عابراً متتالياً، وبعد recovery_timeout
+    يسمح بعدد محدود من طلبات الفحص - نجاحها يغلق الدائرة وفشلها يعيد فتحها.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 5, recovery_timeout: float = 30.0,
+                 half_open_max_calls: int = 1):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = half_open_max_calls
+
+        self._state = CircuitState.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.half_open_in_flight = 0
+        self.stats = {'successes': 0, 'failures': 0, 'rejected': 0, 'opened': 0}
+
+    @property
+    def state(self) -> CircuitState:
+        if self._state == CircuitState.OPEN and time.monotonic() - self.opened_at >= self.recovery_timeout:
+            self._state = CircuitState.HALF_OPEN
+            self.half_open_in_flight = 0
+        return self._state
+
+    def before_call(self) -> None:
+        """السماح بالطلب أو رفع CircuitOpenError"""
+        state = self.state
+        if state == CircuitState.CLOSED:
+            return
+        if state == CircuitState.HALF_OPEN and self.half_open_in_flight < self.half_open_max_calls:
+            self.half_open_in_flight += 1
+            return
+        self.stats['rejected'] += 1
+        retry_after = max(0.0, self.recovery_timeout - (time.monotonic() - self.opened_at))
+        raise CircuitOpenError(self.name, retry_after)
+
+    def on_success(self) -> None:
+        """المنصة استجابت - حتى لو كان الرد خطأ عمل"""
+        self.stats['successes'] += 1
+        self.consecutive_failures = 0
+        if self._state == CircuitState.HALF_OPEN:
+            self._state = CircuitState.CLOSED
+            self.half_open_in_flight = 0
+            logger.info(f"✅ إغلاق دائرة {self.name} بعد نجاح الفحص")
+
+    def on_failure(self) -> None:
+        """فشل عابر (شبكة/مهلة)"""
+        self.stats['failures'] += 1
+        self.consecutive_failures += 1
+        if self._state == CircuitState.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            if self._state != CircuitState.OPEN:
+                self.stats['opened'] += 1
+                logger.warning(f"⚠️ فتح دائرة {self.name} بعد {self.consecutive_failures} فشل متتالٍ")
+            self._state = CircuitState.OPEN
+            self.opened_at = time.monotonic()
+            self.half_open_in_flight = 0
+
+    def release(self) -> None:
+        """طلب أُلغي قبل معرفة النتيجة - تحرير خانة الفحص فقط"""
+        if self._state == CircuitState.HALF_OPEN and self.half_open_in_flight > 0:
+            self.half_open_in_flight -= 1
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            'state': self.state.value,
+            'consecutive_failures': self.consecutive_failures,
+            'retry_after': max(0.0, self.recovery_timeout - (time.monotonic() - self.opened_at))
+            if self._state == CircuitState.OPEN else 0.0,
+            **self.stats
+        }
+
+
+async def hedged(factory: Callable[[], Awaitable[Any]], hedge_delay: float, max_hedges: int = 1,
+                 hedge_factory: Optional[Callable[[], Awaitable[Any]]] = None) -> Any:
+    """طلب تحوط: إرسال نسخة إضافية إذا لم يصل الرد خلال hedge_delay وإرجاع أول نجاح
+
+    للطلبات المتكررة بأمان فقط (قراءة الأسعار مثلاً) - النسخ المتأخرة تُلغى.
+    hedge_factory ينشئ نسخ التحوط (مع انتظار توكنها مثلاً) - الافتراضي factory.
+    """
+    hedge_factory = hedge_factory or factory
+    tasks: List[asyncio.Task] = [asyncio.ensure_future(factory())]
+    hedges_left = max_hedges
+    last_error: Optional[BaseException] = None
+
+    try:
+        while tasks:
+            done, _ = await asyncio.wait(
+                tasks, timeout=hedge_delay if hedges_left else None,
+                return_when=asyncio.FIRST_COMPLETED
+            )
+
+            for task in done:
+                tasks.remove(task)
+                if task.exception() is None:
+                    return task.result()
+                last_error = task.exception()
+
+            # تأخر الرد أو فشلت كل النسخ الجارية - إرسال نسخة تحوط
+            if hedges_left and (not done or not tasks):
+                hedges_left -= 1
+                tasks.append(asyncio.ensure_future(hedge_factory()))
+
+        raise last_error
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+async def _after(acquire: Callable[[], Awaitable[Any]], factory: Callable[[], Awaitable[Any]]) -> Any:
+    """نسخة تحوط تنتظر توكنها قبل الإرسال"""
+    await acquire()
+    return await factory()
+
+
+class ResilienceManager:
+    """قواطع الدوائر المشتركة لكل منصة مع منطق المحاولة والمهلة والتحوط"""
+
+    def __init__(self):
+        self.resilience_config = {
+            'failure_threshold': int(os.getenv('CIRCUIT_FAILURE_THRESHOLD', '5')),
+            'recovery_timeout': float(os.getenv('CIRCUIT_RECOVERY_TIMEOUT', '30')),
+            'half_open_max_calls': int(os.getenv('CIRCUIT_HALF_OPEN_CALLS', '1')),
+            'max_retries': int(os.getenv('EXCHANGE_MAX_RETRIES', '2')),
+            'backoff_base': float(os.getenv('EXCHANGE_BACKOFF_BASE', '0.25')),
+            'backoff_cap': float(os.getenv('EXCHANGE_BACKOFF_CAP', '5')),
+            'attempt_timeout': float(os.getenv('EXCHANGE_ATTEMPT_TIMEOUT', '10')),
+            'hedge_delay': float(os.getenv('EXCHANGE_HEDGE_DELAY', '0.3')),
+        }
+        self.breakers: Dict[str, CircuitBreaker] = {}
+        self.stats = {'retries': 0, 'deadline_exceeded': 0, 'hedged_calls': 0}
+
+    def get_breaker(self, name: str) -> CircuitBreaker:
+        """قاطع الدائرة الخاص بالمنصة (يُنشأ عند أول استخدام)"""
+        breaker = self.breakers.get(name)
+        if breaker is None:
+            breaker = self.breakers[name] = CircuitBreaker(
+                name,
+                self.resilience_config['failure_threshold'],
+                self.resilience_config['recovery_timeout'],
+                self.resilience_config['half_open_max_calls']
+            )
+        return breaker
+
+    def is_available(self, name: str) -> bool:
+        """هل تقبل المنصة طلبات الآن"""
+        return self.get_breaker(name).state != CircuitState.OPEN
+
+    async def call(self, name: str, factory: Callable[[], Awaitable[Any]], idempotent: bool = False,
+                   retries: Optional[int] = None, hedge_delay: Optional[float] = None,
+                   attempt_timeout: Optional[float] = None,
+                   acquire: Optional[Callable[[], Awaitable[Any]]] = None) -> Any:
+        """تنفيذ طلب عبر قاطع الدائرة ضمن ميزانية المستدعي
+
+        الطلبات غير المتكررة بأمان (الأوامر) تُرسل مرة واحدة - إعادة محاولتها مسؤولية خط الأوامر.
+        acquire ينتظر توكن حد المعدل قبل كل محاولة خارج مهلة المحاولة، فطابور التوكنات
+        لا يُحسب كبطء من المنصة ولا يفتح الدائرة.
+        """
+        breaker = self.get_breaker(name)
+        retries = (self.resilience_config['max_retries'] if retries is None else retries) if idempotent else 0
+        attempt_timeout = attempt_timeout or self.resilience_config['attempt_timeout']
+        attempt = 0
+
+        while True:
+            remaining = remaining_time()
+            if remaining is not None and remaining <= 0:
+                self.stats['deadline_exceeded'] += 1
+                raise DeadlineExceeded(f"انتهت ميزانية الوقت قبل طلب {name}")
+
+            if acquire is not None:
+                # RateLimitTimeout من هنا لا يمس القاطع - الطلب لم يُرسل
+                await acquire()
+                remaining = remaining_time()
+
+            breaker.before_call()
+            timeout = attempt_timeout if remaining is None else min(attempt_timeout, remaining)
+            if idempotent and hedge_delay:
+                self.stats['hedged_calls'] += 1
+                operation = hedged(factory, hedge_delay,
+                                   hedge_factory=None if acquire is None else lambda: _after(acquire, factory))
+            else:
+                operation = factory()
+
+            try:
+                result = await asyncio.wait_for(operation, timeout)
+
+            except (asyncio.CancelledError, RateLimitTimeout):
+                # لم يصل الطلب إلى المنصة
+                breaker.release()
+                raise
+
+            except TRANSIENT_ERRORS as e:
+                budget_left = remaining_time()
+                if budget_left is not None and budget_left <= 0:
+                    # المهلة من المستدعي وليست دليلاً على تعطل المنصة
+                    breaker.release()
+                    self.stats['deadline_exceeded'] += 1
+                    raise DeadlineExceeded(f"انتهت ميزانية الوقت أثناء طلب {name}") from e
+
+                breaker.on_failure()
+                if attempt >= retries or breaker.state == CircuitState.OPEN:
+                    raise
+
+                delay = backoff_delay(attempt, self.resilience_config['backoff_base'],
+                                      self.resilience_config['backoff_cap'])
+                if budget_left is not None and delay >= budget_left:
+                    raise
+                attempt += 1
+                self.stats['retries'] += 1
+                logger.warning(f"⚠️ المحاولة {attempt}/{retries} لـ {name} بعد {delay:.2f}s: {str(e)}")
+                await asyncio.sleep(delay)
+
+            except Exception:
+                breaker.on_success()
+                raise
+
+            else:
+                breaker.on_success()
+                return result
+
+    def get_resilience_status(self) -> Dict[str, Any]:
+        """حالة القواطع لنقطة فحص الصحة"""
+        return {
+            'circuit_breakers': {name: breaker.status() for name, breaker in self.breakers.items()},
+            'resilience_config': self.resilience_config,
+            **self.stats
+        }
+
+
+# نسخة عالمية مشتركة بين جميع الخدمات
+resilience = ResilienceManager()
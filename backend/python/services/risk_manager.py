@@ -20,6 +20,7 @@ from scipy import stats
 
 # Custom Imports
 from models.trading_models import *
+from services.order_book import order_book_manager
 
 logger = logging.getLogger(__name__)
 
@@ -100,6 +101,7 @@ class AdvancedRiskManager:
             'dynamic_position_sizing': True,
             'emergency_stop_loss': 0.05,        # 5% وقف خسارة طارئ
             'min_risk_reward_ratio': 2.0,       # أقل نسبة مخاطرة/عائد
+            'max_exit_slippage_bps': 50.0,      # انزلاق إغلاق المركز الذي يعني مخاطرة سيولة كاملة
         }
 
     async def assess_position_risk(self, position: Position, market_data: MarketData) -> Dict[str, Any]:
@@ -191,9 +193,18 @@ class AdvancedRiskManager:
             return 0.5
 
     async def _assess_liquidity_risk(self, position: Position, market_data: MarketData) -> float:
-        """تقييم مخاطرة السيولة"""
+        """تقييم مخاطرة السيولة - انزلاق إغلاق المركز من دفتر الأوامر، والسبريد كبديل"""
         try:
-            # استخدام السبريد كمؤشر للسيولة
+            book = order_book_manager.get_book(position.symbol)
+            if book is not None:
+                close_side = 'sell' if position.side == OrderSide.BUY else 'buy'
+                slippage = book.estimate_slippage(close_side, float(position.quantity))
+                if not slippage['fully_filled']:
+                    # الدفتر المتاح لا يغطي كمية المركز
+                    return 1.0
+                return min(slippage['slippage_bps'] / self.risk_config['max_exit_slippage_bps'], 1.0)
+            
+            # بدون دفتر متزامن: السبريد كمؤشر للسيولة
             spread_pct = market_data.spread
             
             if spread_pct < 0.01:  # سبريد منخفض - سيولة عالية
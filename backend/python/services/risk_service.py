@@ -9,13 +9,16 @@ import asyncio
 import json
 import time
 from typing import Dict, List, Optional, Any, Tuple
-from decimal import Decimal, ROUND_DOWN
 from datetime import datetime, timedelta
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 from enum import Enum
 import statistics
 from functools import wraps
 import cachetools
+import numpy as np
+
+from services.fixed_point import FixedPoint, to_units, multiply_units
+from services.market_registry import market_registry
 
 # إعداد المسجل المتقدم
 logger = logging.getLogger(__name__)
@@ -38,14 +41,14 @@ class AlertType(Enum):
 @dataclass
 class RiskMetrics:
     """مقاييس المخاطر الشاملة"""
-    total_exposure: Decimal
-    max_position_size: Decimal
-    current_leverage: Decimal
-    daily_pnl: Decimal
-    max_drawdown: Decimal
-    volatility_score: Decimal
-    risk_score: Decimal
-    portfolio_beta: Decimal
+    total_exposure: FixedPoint
+    max_position_size: FixedPoint
+    current_leverage: float
+    daily_pnl: FixedPoint
+    max_drawdown: float
+    volatility_score: float
+    risk_score: float
+    portfolio_beta: float
 
 @dataclass
 class RiskAlert:
@@ -83,142 +86,133 @@ class RiskCacheManager:
         return self.risk_cache.get(portfolio_id)
 
 class RiskAnalyzer:
-    """محلل المخاطر المتقدم"""
+    """محلل المخاطر المتقدم - القيم النقدية بالنقطة الثابتة بدقة الرمز والنسب كأرقام عشرية"""
     
     def __init__(self):
         self.risk_history = []
         self.volatility_window = 20  # نافذة التقلب
+        self.default_exchange = os.getenv('DEFAULT_EXCHANGE', 'binance')
+    
+    def _position_risk_arrays(self, positions: List[Dict], market_data: Dict) -> Dict[str, Any]:
+        """حساب مخاطر جميع المراكز دفعة واحدة - الكميات والأسعار وحدات int64 بدقة الرمز من بيانات السوق"""
+        precisions = [
+            market_registry.get_precision(position.get('exchange') or self.default_exchange,
+                                          position.get('symbol', ''))
+            for position in positions
+        ]
+        amount_scale = max(precision.amount_scale for precision in precisions)
+        price_scale = max(precision.price_scale for precision in precisions)
+        
+        sizes = to_units([float(position.get('size', 0)) for position in positions], amount_scale)
+        entry_prices = to_units([float(position.get('entry_price', 0)) for position in positions], price_scale)
+        current_prices = np.full(len(positions), to_units([float(market_data.get('price', 0))], price_scale)[0])
+        leverage = np.array([float(position.get('leverage', 1)) for position in positions])
+        is_short = np.array([position.get('side', 'long').lower() == 'short' for position in positions])
+        
+        # القيم النقدية بدقة تامة بمنازل السعر
+        current_value = multiply_units(sizes, current_prices, amount_scale, price_scale, price_scale)
+        entry_value = multiply_units(sizes, entry_prices, amount_scale, price_scale, price_scale)
+        unrealized_pnl = multiply_units(sizes, current_prices - entry_prices, amount_scale, price_scale, price_scale)
+        unrealized_pnl = np.where(is_short, -unrealized_pnl, unrealized_pnl)
+        
+        # النسب - أصفار عند القيم الصفرية بدلاً من أخطاء القسمة
+        entry_float = entry_prices.astype(np.float64)
+        current_float = current_prices.astype(np.float64)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            pnl_percentage = np.where(entry_value != 0, unrealized_pnl / entry_value * 100, 0.0)
+            
+            liquidation_price = np.where(is_short, entry_float * (1 + 1 / leverage), entry_float * (1 - 1 / leverage))
+            distance = np.where(is_short, liquidation_price - current_float, current_float - liquidation_price)
+            liquidation_distance = np.where(
+                (current_float != 0) & (leverage != 0), np.maximum(distance / current_float * 100, 0.0), 0.0
+            )
+            
+            margin_usage = np.where(entry_value != 0, current_value * leverage / entry_value * 100, 0.0)
+        
+        risk_score = self._calculate_position_risk_score(
+            sizes / float(10 ** amount_scale), leverage, pnl_percentage, liquidation_distance
+        )
+        
+        return {
+            'value_scale': price_scale,
+            'current_value': current_value,
+            'unrealized_pnl': unrealized_pnl,
+            'pnl_percentage': pnl_percentage,
+            'liquidation_distance': liquidation_distance,
+            'risk_score': risk_score,
+            'leverage': leverage,
+            'margin_usage': margin_usage
+        }
+    
+    def _position_risk_dict(self, position: Dict, arrays: Dict[str, Any], index: int) -> Dict[str, Any]:
+        """نتيجة مركز واحد من مصفوفات المخاطر"""
+        value_scale = arrays['value_scale']
+        return {
+            'position_id': position.get('id'),
+            'symbol': position.get('symbol'),
+            'current_value': FixedPoint(int(arrays['current_value'][index]), value_scale).to_float(),
+            'unrealized_pnl': FixedPoint(int(arrays['unrealized_pnl'][index]), value_scale).to_float(),
+            'pnl_percentage': float(arrays['pnl_percentage'][index]),
+            'liquidation_distance': float(arrays['liquidation_distance'][index]),
+            'risk_score': float(arrays['risk_score'][index]),
+            'leverage': float(arrays['leverage'][index]),
+            'margin_usage': float(arrays['margin_usage'][index]),
+            'timestamp': datetime.now().isoformat()
+        }
     
     def calculate_position_risk(self, position: Dict, market_data: Dict) -> Dict[str, Any]:
         """حساب مخاطر المركز الفردي"""
         try:
-            position_size = Decimal(str(position.get('size', 0)))
-            entry_price = Decimal(str(position.get('entry_price', 0)))
-            current_price = Decimal(str(market_data.get('price', 0)))
-            leverage = Decimal(str(position.get('leverage', 1)))
-            
-            # حساب القيمة الحالية
-            current_value = position_size * current_price
-            
-            # حساب الربح/الخسارة
-            unrealized_pnl = (current_price - entry_price) * position_size
-            if position.get('side', 'long').lower() == 'short':
-                unrealized_pnl = -unrealized_pnl
-            
-            # حساب نسبة الربح/الخسارة
-            pnl_percentage = (unrealized_pnl / (position_size * entry_price)) * 100
-            
-            # حساب مسافة التصفية
-            liquidation_distance = self._calculate_liquidation_distance(
-                position, current_price, leverage
-            )
-            
-            # حساب درجة المخاطرة
-            risk_score = self._calculate_position_risk_score(
-                position_size, leverage, pnl_percentage, liquidation_distance
-            )
-            
-            return {
-                'position_id': position.get('id'),
-                'symbol': position.get('symbol'),
-                'current_value': float(current_value),
-                'unrealized_pnl': float(unrealized_pnl),
-                'pnl_percentage': float(pnl_percentage),
-                'liquidation_distance': float(liquidation_distance),
-                'risk_score': float(risk_score),
-                'leverage': float(leverage),
-                'margin_usage': float(self._calculate_margin_usage(position, current_value)),
-                'timestamp': datetime.now().isoformat()
-            }
+            arrays = self._position_risk_arrays([position], market_data)
+            return self._position_risk_dict(position, arrays, 0)
             
         except Exception as e:
             logger.error(f"خطأ في حساب مخاطر المركز: {e}")
             return {}
     
-    def _calculate_liquidation_distance(self, position: Dict, current_price: Decimal, 
-                                      leverage: Decimal) -> Decimal:
-        """حساب مسافة سعر التصفية"""
-        try:
-            entry_price = Decimal(str(position.get('entry_price', 0)))
-            side = position.get('side', 'long').lower()
-            
-            if side == 'long':
-                liquidation_price = entry_price * (1 - 1/leverage)
-                distance = ((current_price - liquidation_price) / current_price) * 100
-            else:
-                liquidation_price = entry_price * (1 + 1/leverage)
-                distance = ((liquidation_price - current_price) / current_price) * 100
-            
-            return max(distance, Decimal('0'))
-        except:
-            return Decimal('0')
-    
-    def _calculate_margin_usage(self, position: Dict, current_value: Decimal) -> Decimal:
-        """حساب استخدام الهامش"""
-        try:
-            position_size = Decimal(str(position.get('size', 0)))
-            entry_price = Decimal(str(position.get('entry_price', 0)))
-            leverage = Decimal(str(position.get('leverage', 1)))
-            
-            initial_margin = (position_size * entry_price) / leverage
-            margin_usage = (current_value / initial_margin) * 100
-            
-            return margin_usage
-        except:
-            return Decimal('0')
-    
-    def _calculate_position_risk_score(self, position_size: Decimal, leverage: Decimal,
-                                     pnl_percentage: Decimal, liquidation_distance: Decimal) -> Decimal:
-        """حساب درجة مخاطر المركز"""
-        try:
-            # عوامل المخاطرة (0-1)
-            size_factor = min(position_size / Decimal('100000'), Decimal('1'))  # حجم المركز
-            leverage_factor = min(leverage / Decimal('20'), Decimal('1'))  # الرافعة
-            pnl_factor = min(abs(pnl_percentage) / Decimal('50'), Decimal('1'))  # الربح/الخسارة
-            liquidation_factor = max(Decimal('1') - (liquidation_distance / Decimal('50')), Decimal('0'))  # مسافة التصفية
-            
-            # وزن العوامل
-            weights = {
-                'size': Decimal('0.3'),
-                'leverage': Decimal('0.3'),
-                'pnl': Decimal('0.2'),
-                'liquidation': Decimal('0.2')
-            }
-            
-            # حساب الدرجة النهائية (0-100)
-            risk_score = (
-                size_factor * weights['size'] +
-                leverage_factor * weights['leverage'] +
-                pnl_factor * weights['pnl'] +
-                liquidation_factor * weights['liquidation']
-            ) * 100
-            
-            return min(risk_score, Decimal('100'))
-        except:
-            return Decimal('0')
+    def _calculate_position_risk_score(self, position_size: np.ndarray, leverage: np.ndarray,
+                                     pnl_percentage: np.ndarray, liquidation_distance: np.ndarray) -> np.ndarray:
+        """حساب درجة مخاطر المراكز (0-100)"""
+        # عوامل المخاطرة (0-1)
+        size_factor = np.minimum(position_size / 100000, 1.0)  # حجم المركز
+        leverage_factor = np.minimum(leverage / 20, 1.0)  # الرافعة
+        pnl_factor = np.minimum(np.abs(pnl_percentage) / 50, 1.0)  # الربح/الخسارة
+        liquidation_factor = np.maximum(1.0 - liquidation_distance / 50, 0.0)  # مسافة التصفية
+        
+        # وزن العوامل
+        weights = {
+            'size': 0.3,
+            'leverage': 0.3,
+            'pnl': 0.2,
+            'liquidation': 0.2
+        }
+        
+        risk_score = (
+            size_factor * weights['size'] +
+            leverage_factor * weights['leverage'] +
+            pnl_factor * weights['pnl'] +
+            liquidation_factor * weights['liquidation']
+        ) * 100
+        
+        return np.minimum(risk_score, 100.0)
     
     def analyze_portfolio_risk(self, positions: List[Dict], 
                              market_data: Dict) -> RiskMetrics:
         """تحليل مخاطر المحفظة الشاملة"""
         try:
-            total_exposure = Decimal('0')
-            max_position_size = Decimal('0')
-            total_leverage = Decimal('0')
-            daily_pnl = Decimal('0')
-            position_risks = []
+            if not positions:
+                return replace(self._empty_metrics(), portfolio_beta=1.0)
             
-            for position in positions:
-                position_risk = self.calculate_position_risk(position, market_data)
-                position_value = Decimal(str(position_risk.get('current_value', 0)))
-                
-                total_exposure += position_value
-                max_position_size = max(max_position_size, position_value)
-                total_leverage += Decimal(str(position_risk.get('leverage', 0)))
-                daily_pnl += Decimal(str(position_risk.get('unrealized_pnl', 0)))
-                position_risks.append(position_risk.get('risk_score', 0))
+            arrays = self._position_risk_arrays(positions, market_data)
+            value_scale = arrays['value_scale']
+            
+            total_exposure = FixedPoint(int(arrays['current_value'].sum()), value_scale)
+            max_position_size = FixedPoint(int(arrays['current_value'].max()), value_scale)
+            daily_pnl = FixedPoint(int(arrays['unrealized_pnl'].sum()), value_scale)
+            position_risks = arrays['risk_score'].tolist()
             
             # حساب متوسط الرافعة
-            avg_leverage = total_leverage / len(positions) if positions else Decimal('0')
+            avg_leverage = float(arrays['leverage'].mean())
             
             # حساب أقصى انخفاض
             max_drawdown = self._calculate_max_drawdown(position_risks)
@@ -228,7 +222,7 @@ class RiskAnalyzer:
             
             # حساب درجة المخاطرة الإجمالية
             overall_risk_score = self._calculate_overall_risk_score(
-                total_exposure, avg_leverage, max_drawdown, volatility_score
+                total_exposure.to_float(), avg_leverage, max_drawdown, volatility_score
             )
             
             # حساب بيتا المحفظة (التزامن مع السوق)
@@ -247,63 +241,66 @@ class RiskAnalyzer:
             
         except Exception as e:
             logger.error(f"خطأ في تحليل مخاطر المحفظة: {e}")
-            return RiskMetrics(
-                total_exposure=Decimal('0'),
-                max_position_size=Decimal('0'),
-                current_leverage=Decimal('0'),
-                daily_pnl=Decimal('0'),
-                max_drawdown=Decimal('0'),
-                volatility_score=Decimal('0'),
-                risk_score=Decimal('0'),
-                portfolio_beta=Decimal('0')
-            )
+            return self._empty_metrics()
+    
+    @staticmethod
+    def _empty_metrics() -> RiskMetrics:
+        return RiskMetrics(
+            total_exposure=FixedPoint(0),
+            max_position_size=FixedPoint(0),
+            current_leverage=0.0,
+            daily_pnl=FixedPoint(0),
+            max_drawdown=0.0,
+            volatility_score=0.0,
+            risk_score=0.0,
+            portfolio_beta=0.0
+        )
     
-    def _calculate_max_drawdown(self, risk_scores: List[float]) -> Decimal:
+    def _calculate_max_drawdown(self, risk_scores: List[float]) -> float:
         """حساب أقصى انخفاض"""
         try:
             if len(risk_scores) < 2:
-                return Decimal('0')
+                return 0.0
             
             peak = risk_scores[0]
-            max_dd = Decimal('0')
+            max_dd = 0.0
             
             for score in risk_scores[1:]:
                 if score > peak:
                     peak = score
                 dd = (peak - score) / peak
-                max_dd = max(max_dd, Decimal(str(dd)))
+                max_dd = max(max_dd, dd)
             
             return max_dd * 100  # كنسبة مئوية
         except:
-            return Decimal('0')
+            return 0.0
     
-    def _calculate_volatility_score(self, risk_scores: List[float]) -> Decimal:
+    def _calculate_volatility_score(self, risk_scores: List[float]) -> float:
         """حساب درجة التقلب"""
         try:
             if len(risk_scores) < 2:
-                return Decimal('0')
+                return 0.0
             
-            volatility = statistics.stdev(risk_scores)
-            return Decimal(str(volatility))
+            return statistics.stdev(risk_scores)
         except:
-            return Decimal('0')
+            return 0.0
     
-    def _calculate_overall_risk_score(self, exposure: Decimal, leverage: Decimal,
-                                   drawdown: Decimal, volatility: Decimal) -> Decimal:
+    def _calculate_overall_risk_score(self, exposure: float, leverage: float,
+                                   drawdown: float, volatility: float) -> float:
         """حساب درجة المخاطرة الإجمالية"""
         try:
             # تطبيع القيم
-            exposure_score = min(exposure / Decimal('1000000'), Decimal('1'))
-            leverage_score = min(leverage / Decimal('10'), Decimal('1'))
-            drawdown_score = min(drawdown / Decimal('50'), Decimal('1'))
-            volatility_score = min(volatility / Decimal('20'), Decimal('1'))
+            exposure_score = min(exposure / 1000000, 1.0)
+            leverage_score = min(leverage / 10, 1.0)
+            drawdown_score = min(drawdown / 50, 1.0)
+            volatility_score = min(volatility / 20, 1.0)
             
             # الأوزان
             weights = {
-                'exposure': Decimal('0.4'),
-                'leverage': Decimal('0.3'),
-                'drawdown': Decimal('0.2'),
-                'volatility': Decimal('0.1')
+                'exposure': 0.4,
+                'leverage': 0.3,
+                'drawdown': 0.2,
+                'volatility': 0.1
             }
             
             overall_score = (
@@ -313,34 +310,34 @@ class RiskAnalyzer:
                 volatility_score * weights['volatility']
             ) * 100
             
-            return min(overall_score, Decimal('100'))
+            return min(overall_score, 100.0)
         except:
-            return Decimal('0')
+            return 0.0
     
     def _calculate_portfolio_beta(self, positions: List[Dict], 
-                                market_data: Dict) -> Decimal:
+                                market_data: Dict) -> float:
         """حساب بيتا المحفظة (حساسية اتجاه السوق)"""
         # تنفيذ مبسط - في الواقع يحتاج بيانات السوق التاريخية
         try:
             if not positions:
-                return Decimal('1')
+                return 1.0
             
-            total_beta = Decimal('0')
+            total_beta = 0.0
             for position in positions:
                 # بيتا تقريبية بناءً على نوع الأصل
                 symbol = position.get('symbol', '').upper()
                 if 'BTC' in symbol:
-                    beta = Decimal('1.2')
+                    beta = 1.2
                 elif 'ETH' in symbol:
-                    beta = Decimal('1.1')
+                    beta = 1.1
                 else:
-                    beta = Decimal('1.0')
+                    beta = 1.0
                 
                 total_beta += beta
             
             return total_beta / len(positions)
         except:
-            return Decimal('1')
+            return 1.0
 
 class RiskMonitor:
     """مراقب المخاطر الآني"""
@@ -402,23 +399,23 @@ class RiskMonitor:
     
     def _check_position_size_risk(self, position: Dict, risk_data: Dict) -> bool:
         """فحص مخاطر حجم المركز"""
-        position_size = Decimal(str(risk_data.get('current_value', 0)))
-        max_allowed = Decimal(os.getenv('MAX_POSITION_SIZE', '10000'))
+        position_size = FixedPoint.of(risk_data.get('current_value', 0))
+        max_allowed = FixedPoint.parse(os.getenv('MAX_POSITION_SIZE', '10000'))
         
         return position_size > max_allowed
     
     def _check_leverage_risk(self, position: Dict, risk_data: Dict) -> bool:
         """فحص مخاطر الرافعة المالية"""
-        leverage = Decimal(str(risk_data.get('leverage', 1)))
-        max_leverage = Decimal(os.getenv('MAX_LEVERAGE', '10'))
+        leverage = float(risk_data.get('leverage', 1))
+        max_leverage = float(os.getenv('MAX_LEVERAGE', '10'))
         
         return leverage > max_leverage
     
     def _check_liquidation_risk(self, risk_data: Dict) -> bool:
         """فحص مخاطر التصفية الوشيكة"""
-        liquidation_distance = Decimal(str(risk_data.get('liquidation_distance', 100)))
+        liquidation_distance = float(risk_data.get('liquidation_distance', 100))
         
-        return liquidation_distance < Decimal('5')  # أقل من 5%
+        return liquidation_distance < 5  # أقل من 5%
     
     def _create_alert(self, alert_type: AlertType, level: RiskLevel, 
                      message: str, data: Dict) -> RiskAlert:
@@ -460,9 +457,9 @@ class AdvancedRiskService:
     def setup_risk_config(self):
         """إعداد التكوين الآمن للمخاطر"""
         self.risk_config = {
-            'max_position_size': Decimal(os.getenv('MAX_POSITION_SIZE', '10000')),
-            'max_leverage': Decimal(os.getenv('MAX_LEVERAGE', '10')),
-            'daily_loss_limit': Decimal(os.getenv('DAILY_LOSS_LIMIT', '1000')),
+            'max_position_size': FixedPoint.parse(os.getenv('MAX_POSITION_SIZE', '10000')),
+            'max_leverage': float(os.getenv('MAX_LEVERAGE', '10')),
+            'daily_loss_limit': FixedPoint.parse(os.getenv('DAILY_LOSS_LIMIT', '1000')),
             'risk_check_interval': int(os.getenv('RISK_CHECK_INTERVAL', '60')),
             'enable_real_time_monitoring': os.getenv('ENABLE_RISK_MONITORING', 'true').lower() == 'true',
             'auto_risk_management': os.getenv('AUTO_RISK_MANAGEMENT', 'true').lower() == 'true'
@@ -509,15 +506,15 @@ class AdvancedRiskService:
         }
         
         # فحص حجم المركز
-        position_size = Decimal(str(risk_data.get('current_value', 0)))
+        position_size = FixedPoint.of(risk_data.get('current_value', 0))
         if position_size > self.risk_config['max_position_size']:
             checks['position_size'] = {
                 'passed': False,
-                'message': f"حجم المركز ({position_size}) يتجاوز الحد المسموح ({self.risk_config['max_position_size']})"
+                'message': f"حجم المركز ({position_size.normalize()}) يتجاوز الحد المسموح ({self.risk_config['max_position_size']})"
             }
         
         # فحص الرافعة المالية
-        leverage = Decimal(str(risk_data.get('leverage', 1)))
+        leverage = float(risk_data.get('leverage', 1))
         if leverage > self.risk_config['max_leverage']:
             checks['leverage'] = {
                 'passed': False,
@@ -525,16 +522,16 @@ class AdvancedRiskService:
             }
         
         # فحص مخاطر التصفية
-        liquidation_distance = Decimal(str(risk_data.get('liquidation_distance', 100)))
-        if liquidation_distance < Decimal('10'):
+        liquidation_distance = float(risk_data.get('liquidation_distance', 100))
+        if liquidation_distance < 10:
             checks['liquidation_risk'] = {
                 'passed': False,
                 'message': f"مسافة التصفية قريبة ({liquidation_distance}%)"
             }
         
         # فحص استخدام الهامش
-        margin_usage = Decimal(str(risk_data.get('margin_usage', 0)))
-        if margin_usage > Decimal('80'):
+        margin_usage = float(risk_data.get('margin_usage', 0))
+        if margin_usage > 80:
             checks['margin_usage'] = {
                 'passed': False,
                 'message': f"استخدام الهامش مرتفع ({margin_usage}%)"
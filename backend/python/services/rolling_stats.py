@@ -0,0 +1,153 @@
+# backend/python/services/rolling_stats.py
+"""
+📐 إحصاءات متحركة متجهة - الالتواء والتفرطح والارتباط الذاتي وأس هيرست على المصفوفة كاملة دفعة واحدة
+مبنية على sliding_window_view ومتطابقات المجموع التراكمي بدلاً من rolling().apply لكل صف
+الإصدار: 3.0.0 | المطور: Akraa Trading Team
+"""
+
+from typing import Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# دلالات pandas: النتيجة NaN حتى تكتمل النافذة، وأي NaN داخل النافذة يجعلها NaN
+
+
+def _valid_windows(values: np.ndarray, window: int) -> np.ndarray:
+    """قناع النهايات التي تسبقها نافذة كاملة بلا NaN"""
+    valid = np.zeros(len(values), dtype=bool)
+    if 0 < window <= len(values):
+        missing = np.concatenate(([0], np.cumsum(np.isnan(values))))
+        valid[window - 1:] = missing[window:] == missing[:-window]
+    return valid
+
+
+def _centered(values) -> np.ndarray:
+    """طرح المتوسط العام قبل المجاميع التراكمية للحد من فقدان الدقة"""
+    values = np.asarray(values, dtype=np.float64)
+    finite = values[np.isfinite(values)]
+    return values - finite.mean() if len(finite) else values
+
+
+def _constant_windows(values: np.ndarray, window: int) -> np.ndarray:
+    """قناع النوافذ الثابتة (بلا أي تغير بين قيمتين متتاليتين) لكل نهاية نافذة كاملة"""
+    changes = np.concatenate(([0], np.cumsum(values[1:] != values[:-1])))
+    return changes[window - 1:] == changes[:len(values) - window + 1]
+
+
+def rolling_sum(values, window: int) -> np.ndarray:
+    """مجموع متحرك بفرق مجموعين تراكميين - O(n)"""
+    values = np.asarray(values, dtype=np.float64)
+    result = np.full(len(values), np.nan)
+    valid = _valid_windows(values, window)
+    if valid.any():
+        totals = np.concatenate(([0.0], np.cumsum(np.where(np.isnan(values), 0.0, values))))
+        result[window - 1:] = totals[window:] - totals[:-window]
+        result[~valid] = np.nan
+    return result
+
+
+def rolling_variance(values, window: int, ddof: int = 1) -> np.ndarray:
+    """تباين متحرك من مجموعي القيم ومربعاتها"""
+    centered = _centered(values)
+    first = rolling_sum(centered, window)
+    second = rolling_sum(centered * centered, window)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        variance = np.maximum((second - first * first / window) / (window - ddof), 0.0)
+    # النوافذ الثابتة تباينها صفر تماماً وليس بقايا فرق المجاميع
+    if len(centered) >= window:
+        variance[window - 1:][_constant_windows(centered, window) & ~np.isnan(variance[window - 1:])] = 0.0
+    return variance
+
+
+def _window_moments(values, window: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """انحرافات كل نافذة عن متوسطها - (الانحرافات، قناع النوافذ الثابتة، فهرس البداية)"""
+    values = np.asarray(values, dtype=np.float64)
+    windows = sliding_window_view(values, window)
+    deviations = windows - windows.mean(axis=1, keepdims=True)
+    constant = np.ptp(windows, axis=1) == 0
+    return deviations, constant, window - 1
+
+
+def rolling_skew(values, window: int) -> np.ndarray:
+    """الالتواء المصحح (G1) كما في pandas rolling().skew()"""
+    values = np.asarray(values, dtype=np.float64)
+    result = np.full(len(values), np.nan)
+    if window < 3 or len(values) < window:
+        return result
+    deviations, constant, start = _window_moments(values, window)
+    second = (deviations ** 2).mean(axis=1)
+    third = (deviations ** 3).mean(axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        skew = np.sqrt(window * (window - 1.0)) * third / ((window - 2) * second ** 1.5)
+    skew = np.where(second <= 1e-14, np.nan, skew)
+    result[start:] = np.where(constant, 0.0, skew)
+    result[~_valid_windows(values, window)] = np.nan
+    return result
+
+
+def rolling_kurt(values, window: int) -> np.ndarray:
+    """التفرطح الزائد المصحح (G2) كما في pandas rolling().kurt()"""
+    values = np.asarray(values, dtype=np.float64)
+    result = np.full(len(values), np.nan)
+    if window < 4 or len(values) < window:
+        return result
+    deviations, constant, start = _window_moments(values, window)
+    squared = deviations ** 2
+    second = squared.mean(axis=1)
+    fourth = (squared ** 2).mean(axis=1)
+    n = float(window)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        kurt = ((n * n - 1.0) * fourth / (second * second) - 3 * (n - 1.0) ** 2) / ((n - 2.0) * (n - 3.0))
+    kurt = np.where(second <= 1e-14, np.nan, kurt)
+    result[start:] = np.where(constant, -3.0, kurt)
+    result[~_valid_windows(values, window)] = np.nan
+    return result
+
+
+def rolling_autocorr(values, window: int, lag: int = 1) -> np.ndarray:
+    """الارتباط الذاتي بفجوة lag داخل كل نافذة (Series.autocorr) - مجاميع الأزواج بالمجموع التراكمي"""
+    values = np.asarray(values, dtype=np.float64)
+    result = np.full(len(values), np.nan)
+    pairs = window - lag
+    if lag < 1 or pairs < 2 or len(values) < window:
+        return result
+    centered = _centered(values)
+    current, lagged = centered[lag:], centered[:-lag]
+    sum_current = rolling_sum(current, pairs)
+    sum_lagged = rolling_sum(lagged, pairs)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        covariance = rolling_sum(current * lagged, pairs) / pairs - sum_current * sum_lagged / pairs ** 2
+        variance_current = rolling_sum(current * current, pairs) / pairs - (sum_current / pairs) ** 2
+        variance_lagged = rolling_sum(lagged * lagged, pairs) / pairs - (sum_lagged / pairs) ** 2
+        denominator = np.sqrt(np.maximum(variance_current, 0.0) * np.maximum(variance_lagged, 0.0))
+        result[lag:] = covariance / denominator
+    # جانب ثابت يعطي NaN كما في pandas - يُكشف بدقة لأن تباين المجاميع لا يكون صفراً تماماً
+    result[window - 1:][_constant_windows(values[lag:], pairs) | _constant_windows(values[:-lag], pairs)] = np.nan
+    result[~_valid_windows(values, window)] = np.nan
+    return result
+
+
+def rolling_hurst(values, window: int = 100, max_lag: int = 20) -> np.ndarray:
+    """أس هيرست التقريبي لكل نافذة: ميل log(std(x[t] - x[t-lag])) على log(lag) للفجوات 2..max_lag-1
+
+    الانحراف لكل فجوة تباين متحرك لسلسلة الفروق بنافذة window-lag، والميل مربعات صغرى
+    مغلقة الشكل على كل النوافذ معاً. النوافذ ذات انحراف صفري تعطي NaN كما في np.polyfit.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    result = np.full(len(values), np.nan)
+    lags = np.arange(2, min(max_lag, window))
+    if len(lags) < 2 or len(values) < window:
+        return result
+    log_lags = np.log(lags)
+    weights = (log_lags - log_lags.mean()) / ((log_lags - log_lags.mean()) ** 2).sum()
+
+    slope = np.zeros(len(values))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        for weight, lag in zip(weights, lags):
+            differences = np.full(len(values), np.nan)
+            differences[lag:] = values[lag:] - values[:-lag]
+            slope += weight * 0.5 * np.log(rolling_variance(differences, window - lag, ddof=0))
+    valid = _valid_windows(values, window)
+    result[valid] = np.where(np.isfinite(slope[valid]), slope[valid], np.nan)
+    return result
@@ -0,0 +1,193 @@
+# backend/python/services/screener_index.py
+"""
+🔎 فهرس الفرز - ترتيب تزايدي لكل رموز الكون حسب التغير اليومي والحجم والفارق والتذبذب
+يُحدث مع كل تيك، واستعلام أعلى N لا يعتمد على حجم الكون
+الإصدار: 3.0.0 | المطور: Akraa Trading Team
+"""
+
+import logging
+import math
+import os
+import time
+from bisect import bisect_left, insort
+from typing import Dict, List, Optional, Any, Callable, Tuple
+
+logger = logging.getLogger(__name__)
+
+METRICS = ('change_24h', 'volume', 'spread', 'volatility')
+
+
+class SortedView:
+    """ترتيب مقياس واحد - مفاتيح (القيمة، الرمز) في قائمة مرتبة تصاعدياً
+
+    التحديث بحث ثنائي عن المفتاح القديم وإدراج الجديد O(log n) (مع إزاحة ذاكرة متصلة)،
+    وأعلى N هو شريحة من طرف القائمة.
+    """
+
+    def __init__(self, metric: str):
+        self.metric = metric
+        self.keys: List[Tuple[float, str]] = []
+        self.values: Dict[str, float] = {}
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def update(self, symbol: str, value: Optional[float]) -> None:
+        old = self.values.get(symbol)
+        if old == value:
+            return
+        if old is not None:
+            del self.keys[bisect_left(self.keys, (old, symbol))]
+        if value is None or not math.isfinite(value):
+            self.values.pop(symbol, None)
+            return
+        insort(self.keys, (value, symbol))
+        self.values[symbol] = value
+
+    def remove(self, symbol: str) -> None:
+        self.update(symbol, None)
+
+    def iter_ranked(self, ascending: bool = False):
+        """المفاتيح من الأعلى (أو الأدنى) دون نسخ القائمة"""
+        keys = self.keys
+        indices = range(len(keys)) if ascending else range(len(keys) - 1, -1, -1)
+        for i in indices:
+            yield keys[i]
+
+    def rank(self, symbol: str, ascending: bool = False) -> Optional[int]:
+        value = self.values.get(symbol)
+        if value is None:
+            return None
+        position = bisect_left(self.keys, (value, symbol))
+        return position if ascending else len(self.keys) - 1 - position
+
+
+class ScreenerIndex:
+    """فهرس الفرز لكل رموز الكون - صف آخر قيم لكل رمز وترتيب مستقل لكل مقياس"""
+
+    def __init__(self):
+        self.screener_config = {
+            'max_age': float(os.getenv('SCREENER_MAX_AGE', '300')),
+            'default_limit': int(os.getenv('SCREENER_DEFAULT_LIMIT', '10')),
+            'max_limit': int(os.getenv('SCREENER_MAX_LIMIT', '100')),
+        }
+        self.views: Dict[str, SortedView] = {metric: SortedView(metric) for metric in METRICS}
+        self.rows: Dict[str, Dict[str, Any]] = {}
+        self.stats = {'updates': 0, 'queries': 0, 'pruned': 0}
+
+    # ==================== التحديث ====================
+
+    def update(self, symbol: str, price: float, bid: Optional[float] = None, ask: Optional[float] = None,
+               high: Optional[float] = None, low: Optional[float] = None,
+               change_24h: Optional[float] = None, quote_volume: Optional[float] = None,
+               timestamp: Optional[float] = None, source: str = 'stream') -> None:
+        """تحديث صف الرمز ومواضعه في كل ترتيب"""
+        if not price or price <= 0:
+            return
+        spread = (ask - bid) / ((ask + bid) / 2) * 10000 if bid and ask and ask >= bid > 0 else None
+        volatility = math.log(high / low) * 100 if high and low and high >= low > 0 else None
+
+        row = self.rows.get(symbol)
+        if row is None:
+            row = self.rows[symbol] = {'symbol': symbol}
+        row.update({
+            'price': price,
+            'change_24h': change_24h,
+            'volume': quote_volume,
+            'spread': spread,
+            'volatility': volatility,
+            'updated_at': timestamp or time.time(),
+            'source': source,
+        })
+        for metric, view in self.views.items():
+            view.update(symbol, row[metric])
+        self.stats['updates'] += 1
+
+    def on_tick(self, tick) -> None:
+        """مستهلك لحافلة التدفق"""
+        self.update(tick.symbol, tick.price, tick.bid, tick.ask, tick.high_24h, tick.low_24h,
+                    tick.change_24h, tick.quote_volume, tick.timestamp / 1000)
+
+    def attach(self, bus) -> Callable[[], None]:
+        """الاشتراك في تيكات ناقل السوق"""
+        return bus.subscribe('tick:*', self.on_tick)
+
+    def update_market_data(self, data) -> None:
+        """تحديث من نموذج MarketData (لقطات REST)"""
+        self.update(data.symbol, data.price, data.bid, data.ask, data.high_24h, data.low_24h,
+                    data.change_24h, data.quote_volume, data.timestamp.timestamp(), source='rest')
+
+    def update_ticker(self, symbol: str, ticker: Dict[str, Any]) -> None:
+        """تحديث من تيكر ccxt (لقطة الأسعار المجمعة لفرز الكون)"""
+        timestamp = ticker.get('timestamp')
+        self.update(symbol, ticker.get('last'), ticker.get('bid'), ticker.get('ask'),
+                    ticker.get('high'), ticker.get('low'), ticker.get('percentage'),
+                    ticker.get('quoteVolume'), timestamp / 1000 if timestamp else None, source='ticker')
+
+    def remove(self, symbol: str) -> None:
+        if self.rows.pop(symbol, None) is not None:
+            for view in self.views.values():
+                view.remove(symbol)
+
+    def prune(self, max_age: Optional[float] = None) -> int:
+        """إزالة الرموز التي لم تُحدث خلال max_age ثانية"""
+        cutoff = time.time() - (max_age or self.screener_config['max_age'])
+        stale = [symbol for symbol, row in self.rows.items() if row['updated_at'] < cutoff]
+        for symbol in stale:
+            self.remove(symbol)
+        self.stats['pruned'] += len(stale)
+        return len(stale)
+
+    # ==================== الاستعلام ====================
+
+    def top(self, metric: str, limit: Optional[int] = None, ascending: bool = False,
+            min_volume: Optional[float] = None, max_age: Optional[float] = None) -> List[Dict[str, Any]]:
+        """أعلى (أو أدنى) N رمز حسب المقياس - الصفوف المتقادمة أو دون حد الحجم تُتخطى"""
+        view = self.views.get(metric)
+        if view is None:
+            raise ValueError(f"مقياس غير مدعوم: {metric} (المتاح: {', '.join(METRICS)})")
+        limit = min(limit or self.screener_config['default_limit'], self.screener_config['max_limit'])
+        cutoff = time.time() - (max_age or self.screener_config['max_age'])
+        self.stats['queries'] += 1
+
+        result = []
+        for value, symbol in view.iter_ranked(ascending):
+            row = self.rows[symbol]
+            if row['updated_at'] < cutoff:
+                continue
+            if min_volume and (row['volume'] or 0.0) < min_volume:
+                continue
+            result.append(dict(row))
+            if len(result) >= limit:
+                break
+        return result
+
+    def get_row(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """صف الرمز مع ترتيبه في كل مقياس (الأعلى = 0)"""
+        row = self.rows.get(symbol)
+        if row is None:
+            return None
+        return {**row, 'ranks': {metric: view.rank(symbol) for metric, view in self.views.items()}}
+
+    def get_movers(self, limit: Optional[int] = None, min_volume: Optional[float] = None) -> Dict[str, Any]:
+        """ملخص لوحة المتابعة: الرابحون والخاسرون والأعلى حجماً والأوسع فارقاً والأكثر تذبذباً"""
+        return {
+            'gainers': self.top('change_24h', limit, min_volume=min_volume),
+            'losers': self.top('change_24h', limit, ascending=True, min_volume=min_volume),
+            'volume': self.top('volume', limit),
+            'widest_spreads': self.top('spread', limit, min_volume=min_volume),
+            'volatility': self.top('volatility', limit, min_volume=min_volume),
+        }
+
+    def get_screener_status(self) -> Dict[str, Any]:
+        """حالة فهرس الفرز"""
+        return {
+            'symbols': len(self.rows),
+            'metrics': {metric: len(view) for metric, view in self.views.items()},
+            'config': self.screener_config,
+            **self.stats
+        }
+
+
+# نسخة عالمية
+screener_index = ScreenerIndex()
@@ -0,0 +1,380 @@
+# backend/python/services/trade_tape.py
+"""
+🧾 مجمّع شريط الصفقات - VWAP متدحرج وحجم المبادرين بالشراء/البيع وشموع الحجم/القيمة
+يستهلك الصفقات العامة لكل رمز ويحدّث المقاييس تدريجياً بذاكرة ثابتة لاستعلامات فورية من الإستراتيجيات
+الإصدار: 3.0.0 | المطور: Akraa Trading Team
+"""
+
+import inspect
+import logging
+import os
+import time
+from collections import deque
+from dataclasses import dataclass, asdict
+from typing import Dict, List, Optional, Any, Callable, Tuple
+
+from services.market_registry import MarketRegistry
+from services.market_stream import Trade, MarketDataBus
+
+logger = logging.getLogger(__name__)
+
+BAR_KINDS = ('volume', 'dollar')
+
+
+@dataclass
+class Bar:
+    """شمعة حجم أو قيمة - تُغلق عند بلوغ الحد بدلاً من مرور الوقت"""
+    symbol: str
+    kind: str
+    open_time: int  # ms
+    close_time: int  # ms
+    open: float
+    high: float
+    low: float
+    close: float
+    volume: float
+    quote_volume: float
+    buy_volume: float
+    sell_volume: float
+    trades: int
+
+    @property
+    def vwap(self) -> float:
+        return self.quote_volume / self.volume if self.volume else self.close
+
+    def to_ohlcv(self) -> List[float]:
+        """تحويل إلى صف OHLCV بصيغة ccxt"""
+        return [self.open_time, self.open, self.high, self.low, self.close, self.volume]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {**asdict(self), 'vwap': self.vwap}
+
+
+class BarBuilder:
+    """بناء شموع الحجم/القيمة - الصفقة التي تتجاوز الحد تُقسم على الشموع المتتالية"""
+
+    def __init__(self, symbol: str, kind: str, threshold: float, max_bars: int):
+        if kind not in BAR_KINDS:
+            raise ValueError(f"نوع شمعة غير مدعوم: {kind}")
+        if threshold <= 0:
+            raise ValueError("حد الشمعة يجب أن يكون موجباً")
+
+        self.symbol = symbol
+        self.kind = kind
+        self.threshold = threshold
+        self.bars: deque = deque(maxlen=max_bars)
+        self.current: Optional[Bar] = None
+        self.filled = 0.0
+
+    def add(self, trade: Trade) -> List[Bar]:
+        """إضافة صفقة - يعيد الشموع التي اكتملت"""
+        completed = []
+        amount = trade.amount
+
+        while amount > 0:
+            if self.current is None:
+                self.current = Bar(self.symbol, self.kind, trade.timestamp, trade.timestamp,
+                                   trade.price, trade.price, trade.price, trade.price,
+                                   0.0, 0.0, 0.0, 0.0, 0)
+                self.filled = 0.0
+
+            unit = 1.0 if self.kind == 'volume' else trade.price
+            take = min(amount, (self.threshold - self.filled) / unit)
+
+            bar = self.current
+            bar.close_time = trade.timestamp
+            bar.high = max(bar.high, trade.price)
+            bar.low = min(bar.low, trade.price)
+            bar.close = trade.price
+            bar.volume += take
+            bar.quote_volume += take * trade.price
+            if trade.is_buyer_maker:
+                bar.sell_volume += take
+            else:
+                bar.buy_volume += take
+            bar.trades += 1
+            self.filled += take * unit
+            amount -= take
+
+            # هامش نسبي صغير حتى لا تبقى شمعة مفتوحة ببقايا التقريب
+            if self.filled >= self.threshold * (1 - 1e-12):
+                self.bars.append(bar)
+                completed.append(bar)
+                self.current = None
+
+            if take <= 0:
+                break
+
+        return completed
+
+
+class RollingWindow:
+    """مجاميع متدحرجة لنافذة زمنية واحدة فوق المخزن الحلقي للشريط"""
+
+    __slots__ = ('seconds', 'start', 'volume', 'quote_volume', 'buy_volume', 'sell_volume')
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self.start = 0  # فهرس مطلق لأقدم صفقة داخل النافذة
+        self.volume = 0.0
+        self.quote_volume = 0.0
+        self.buy_volume = 0.0
+        self.sell_volume = 0.0
+
+    def add(self, price: float, amount: float, is_buyer_maker: bool) -> None:
+        self.volume += amount
+        self.quote_volume += price * amount
+        if is_buyer_maker:
+            self.sell_volume += amount
+        else:
+            self.buy_volume += amount
+
+    def remove(self, price: float, amount: float, is_buyer_maker: bool) -> None:
+        self.volume -= amount
+        self.quote_volume -= price * amount
+        if is_buyer_maker:
+            self.sell_volume -= amount
+        else:
+            self.buy_volume -= amount
+
+    def reset(self) -> None:
+        self.volume = self.quote_volume = self.buy_volume = self.sell_volume = 0.0
+
+
+class TradeTape:
+    """شريط صفقات رمز واحد - مخزن حلقي بسعة ثابتة ونوافذ متدحرجة O(1) لكل صفقة"""
+
+    def __init__(self, symbol: str, windows: Tuple[float, ...], capacity: int,
+                 bar_kind: str, bar_threshold: float, max_bars: int):
+        self.symbol = symbol
+        self.capacity = capacity
+        self.timestamps: List[int] = [0] * capacity
+        self.prices: List[float] = [0.0] * capacity
+        self.amounts: List[float] = [0.0] * capacity
+        self.buyer_maker: List[bool] = [False] * capacity
+        self.count = 0  # عدد الصفقات المضافة منذ البداية (فهرس مطلق)
+
+        self.windows: Dict[float, RollingWindow] = {seconds: RollingWindow(seconds) for seconds in sorted(windows)}
+        self.bars = BarBuilder(symbol, bar_kind, bar_threshold, max_bars)
+        self.last_trade: Optional[Trade] = None
+        self.truncated = 0  # صفقات خرجت من المخزن قبل انتهاء نافذتها
+
+    def _evict(self, window: RollingWindow, cutoff: float, oldest_kept: int) -> None:
+        """إخراج الصفقات الأقدم من حد النافذة أو السابقة لأقدم خانة محفوظة في المخزن"""
+        while window.start < self.count:
+            index = window.start % self.capacity
+            expired = self.timestamps[index] < cutoff
+            if not expired and window.start >= oldest_kept:
+                break
+            if not expired:
+                self.truncated += 1
+            window.remove(self.prices[index], self.amounts[index], self.buyer_maker[index])
+            window.start += 1
+
+        if window.start == self.count:
+            # نافذة فارغة - تصفير انجراف الفاصلة العائمة
+            window.reset()
+
+    def add(self, trade: Trade) -> List[Bar]:
+        """إضافة صفقة وتحديث النوافذ والشموع"""
+        # أي نافذة ما زالت تحتوي الصفقة التي ستُستبدل خانتها تُخرجها أولاً
+        oldest_kept = self.count + 1 - self.capacity
+        for window in self.windows.values():
+            self._evict(window, trade.timestamp - window.seconds * 1000, oldest_kept)
+
+        index = self.count % self.capacity
+        self.timestamps[index] = trade.timestamp
+        self.prices[index] = trade.price
+        self.amounts[index] = trade.amount
+        self.buyer_maker[index] = trade.is_buyer_maker
+        self.count += 1
+
+        for window in self.windows.values():
+            window.add(trade.price, trade.amount, trade.is_buyer_maker)
+
+        self.last_trade = trade
+        return self.bars.add(trade)
+
+    def _window(self, seconds: Optional[float]) -> RollingWindow:
+        if seconds is None:
+            return next(iter(self.windows.values()))
+        window = self.windows.get(seconds)
+        if window is None:
+            raise ValueError(f"نافذة غير مُعرّفة: {seconds}ث (المتاح: {list(self.windows)})")
+        return window
+
+    def metrics(self, seconds: Optional[float] = None, now: Optional[float] = None) -> Dict[str, Any]:
+        """مقاييس النافذة: VWAP، الحجم، حجم المبادرين وصافي التدفق"""
+        window = self._window(seconds)
+        now_ms = (time.time() if now is None else now) * 1000
+        self._evict(window, now_ms - window.seconds * 1000, self.count - self.capacity)
+
+        trades = self.count - window.start
+        volume = max(window.volume, 0.0)
+        buy_volume = max(window.buy_volume, 0.0)
+        sell_volume = max(window.sell_volume, 0.0)
+        aggressor_volume = buy_volume + sell_volume
+
+        return {
+            'symbol': self.symbol,
+            'window': window.seconds,
+            'trades': trades,
+            'volume': volume,
+            'quote_volume': max(window.quote_volume, 0.0),
+            'vwap': window.quote_volume / volume if volume > 0 else None,
+            'buy_volume': buy_volume,
+            'sell_volume': sell_volume,
+            'delta': buy_volume - sell_volume,
+            'flow_imbalance': (buy_volume - sell_volume) / aggressor_volume if aggressor_volume > 0 else 0.0,
+            'volume_rate': volume / window.seconds,
+            'last_price': self.last_trade.price if self.last_trade else None
+        }
+
+
+class TradeTapeAggregator:
+    """مجمّع أشرطة الصفقات لكل الرموز مع اشتراك في شموع الحجم/القيمة المكتملة"""
+
+    def __init__(self):
+        self.tape_config = {
+            'windows': tuple(float(w) for w in os.getenv('TRADE_TAPE_WINDOWS', '60,300,900').split(',') if w.strip()),
+            'max_trades': int(os.getenv('TRADE_TAPE_MAX_TRADES', '20000')),
+            'bar_kind': os.getenv('TRADE_TAPE_BAR_KIND', 'dollar'),
+            'bar_threshold': float(os.getenv('TRADE_TAPE_BAR_THRESHOLD', '100000')),
+            'max_bars': int(os.getenv('TRADE_TAPE_MAX_BARS', '500')),
+            'max_age': 60.0,  # أقصى عمر لآخر صفقة حتى يُعتبر الشريط حياً
+        }
+
+        self.tapes: Dict[str, TradeTape] = {}
+        self.bar_overrides: Dict[str, Tuple[str, float]] = {}
+        self.subscribers: List[Callable] = []
+        self.stats = {
+            'trades': 0,
+            'bars': 0,
+            'out_of_order': 0,
+            'last_trade_at': None
+        }
+
+    @staticmethod
+    def _key(symbol: str) -> str:
+        return MarketRegistry.normalize_key(symbol)
+
+    def set_bar_threshold(self, symbol: str, kind: str, threshold: float) -> None:
+        """حد شموع خاص برمز - يعيد بناء الشموع من الصفقة التالية"""
+        key = self._key(symbol)
+        self.bar_overrides[key] = (kind, threshold)
+        tape = self.tapes.get(key)
+        if tape is not None:
+            tape.bars = BarBuilder(tape.symbol, kind, threshold, self.tape_config['max_bars'])
+
+    def _get_or_create(self, symbol: str) -> TradeTape:
+        key = self._key(symbol)
+        tape = self.tapes.get(key)
+        if tape is None:
+            kind, threshold = self.bar_overrides.get(
+                key, (self.tape_config['bar_kind'], self.tape_config['bar_threshold'])
+            )
+            tape = TradeTape(symbol, self.tape_config['windows'], self.tape_config['max_trades'],
+                             kind, threshold, self.tape_config['max_bars'])
+            self.tapes[key] = tape
+        return tape
+
+    def subscribe(self, callback: Callable) -> Callable[[], None]:
+        """اشتراك في الشموع المكتملة (دالة متزامنة أو غير متزامنة) - يعيد دالة إلغاء الاشتراك"""
+        self.subscribers.append(callback)
+
+        def unsubscribe():
+            if callback in self.subscribers:
+                self.subscribers.remove(callback)
+
+        return unsubscribe
+
+    def attach(self, bus: MarketDataBus) -> Callable[[], None]:
+        """الاشتراك في صفقات ناقل السوق"""
+        return bus.subscribe('trade:*', self.on_trade)
+
+    def add_trade(self, trade: Trade) -> List[Bar]:
+        """إضافة صفقة متزامنة - يعيد الشموع المكتملة"""
+        tape = self._get_or_create(trade.symbol)
+        if tape.last_trade is not None and trade.timestamp < tape.last_trade.timestamp:
+            # النوافذ تفترض ترتيباً زمنياً - الصفقة المتأخرة تُحسب بوقت آخر صفقة
+            self.stats['out_of_order'] += 1
+            trade = Trade(trade.exchange, trade.symbol, trade.trade_id, trade.price, trade.amount,
+                          trade.is_buyer_maker, tape.last_trade.timestamp)
+
+        bars = tape.add(trade)
+        self.stats['trades'] += 1
+        self.stats['bars'] += len(bars)
+        self.stats['last_trade_at'] = time.time()
+        return bars
+
+    async def on_trade(self, trade: Trade) -> None:
+        """معالج صفقات الناقل - ينشر الشموع المكتملة للمشتركين"""
+        for bar in self.add_trade(trade):
+            for callback in list(self.subscribers):
+                try:
+                    result = callback(bar)
+                    if inspect.isawaitable(result):
+                        await result
+                except Exception as e:
+                    logger.warning(f"⚠️ خطأ في مشترك شموع الشريط: {str(e)}")
+
+    # ==================== الاستعلامات ====================
+
+    def get_tape(self, symbol: str, max_age: Optional[float] = None) -> Optional[TradeTape]:
+        """شريط الرمز إذا وصلته صفقات حديثة - None إذا لم يكن متاحاً"""
+        tape = self.tapes.get(self._key(symbol))
+        if tape is None or tape.last_trade is None:
+            return None
+        max_age = self.tape_config['max_age'] if max_age is None else max_age
+        if time.time() - tape.last_trade.timestamp / 1000 > max_age:
+            return None
+        return tape
+
+    def get_metrics(self, symbol: str, window: Optional[float] = None,
+                    now: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """مقاييس تدفق الصفقات للرمز ضمن نافذة"""
+        tape = self.tapes.get(self._key(symbol))
+        if tape is None:
+            return None
+        return tape.metrics(window, now)
+
+    def get_vwap(self, symbol: str, window: Optional[float] = None) -> Optional[float]:
+        """VWAP المتدحرج للرمز"""
+        metrics = self.get_metrics(symbol, window)
+        return metrics['vwap'] if metrics else None
+
+    def get_volume_surge(self, symbol: str, short_window: Optional[float] = None,
+                         long_window: Optional[float] = None, now: Optional[float] = None) -> Optional[float]:
+        """نسبة معدل الحجم في النافذة القصيرة إلى الطويلة"""
+        tape = self.tapes.get(self._key(symbol))
+        if tape is None:
+            return None
+        windows = list(tape.windows)
+        short = tape.metrics(short_window or windows[0], now)
+        long = tape.metrics(long_window or windows[-1], now)
+        if long['volume_rate'] <= 0:
+            return None
+        return short['volume_rate'] / long['volume_rate']
+
+    def get_bars(self, symbol: str, count: Optional[int] = None) -> List[Bar]:
+        """آخر شموع الحجم/القيمة المكتملة"""
+        tape = self.tapes.get(self._key(symbol))
+        if tape is None:
+            return []
+        bars = list(tape.bars.bars)
+        return bars[-count:] if count else bars
+
+    def get_tape_status(self) -> Dict[str, Any]:
+        """حالة المجمّع"""
+        return {
+            'symbols': len(self.tapes),
+            'windows': list(self.tape_config['windows']),
+            'bar_kind': self.tape_config['bar_kind'],
+            'bar_threshold': self.tape_config['bar_threshold'],
+            'truncated': sum(tape.truncated for tape in self.tapes.values()),
+            **self.stats
+        }
+
+
+# نسخة عالمية
+trade_tape = TradeTapeAggregator()
@@ -5,12 +5,13 @@
 """
 
 import asyncio
+import inspect
 import logging
 import math
 import time
 import traceback
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any, Tuple
+from typing import Dict, List, Optional, Any, Tuple, Callable
 from decimal import Decimal, ROUND_DOWN
 from enum import Enum
 import numpy as np
@@ -24,6 +25,9 @@ import pandas_ta as ta
 
 # Custom Imports
 from models.trading_models import *
+from services.candle_store import candle_store, OHLCV_COLUMNS
+from services.order_book import order_book_manager
+from services.trade_tape import trade_tape
 
 logger = logging.getLogger(__name__)
 
@@ -66,15 +70,46 @@ class AdvancedTradingStrategies:
         self.golden_opportunity_config = {
             'min_opportunity_score': 60,
             'confidence_boost_threshold': 0.15,
-            'volume_multiplier_threshold': 2.5
+            'volume_multiplier_threshold': 2.5,
+            'book_depth_bps': 25.0,          # نطاق العمق لقياس اختلال الدفتر
+            'book_imbalance_threshold': 0.3,  # اختلال طلبات الشراء الدال على ضغط مؤسسي
+            'flow_window': 300.0,             # نافذة تدفق الصفقات (ث) من شريط الصفقات
+            'flow_imbalance_threshold': 0.3   # صافي حجم المبادرين بالشراء الدال على ضغط مؤسسي
         }
         
         # تتبع الإشارات
         self.signal_history: Dict[str, List] = {}
         self.strategy_performance: Dict[str, Dict] = {}
         
+        # مستهلكو الإشارات الشاملة (مثل المسار السريع للتنفيذ)
+        self.signal_subscribers: List[Callable] = []
+        
         logger.info("🎯 تم تهيئة إستراتيجيات التداول المتقدمة")
 
+    def subscribe(self, callback: Callable) -> Callable[[], None]:
+        """اشتراك بدالة (signal, signal_ts) في الإشارات الشاملة - signal_ts بتوقيت perf_counter_ns"""
+        self.signal_subscribers.append(callback)
+
+        def unsubscribe():
+            if callback in self.signal_subscribers:
+                self.signal_subscribers.remove(callback)
+
+        return unsubscribe
+
+    async def _publish_signal(self, signal: TradingSignal, signal_ts: int) -> None:
+        for callback in list(self.signal_subscribers):
+            try:
+                result = callback(signal, signal_ts)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e:
+                logger.error(f"❌ خطأ في مستهلك إشارة {signal.symbol}: {str(e)}")
+
+    @staticmethod
+    def _to_frame(ohlcv_data) -> pd.DataFrame:
+        """تحويل الشموع إلى DataFrame - عروض المخزن الحلقي تُغلّف بدون نسخ"""
+        return pd.DataFrame(ohlcv_data, columns=OHLCV_COLUMNS)
+
     async def analyze_strong_akraa_ict(self, symbol: str, ohlcv_data: List[List[float]], 
                                      timeframe: str = '1h') -> Optional[TradingSignal]:
         """
@@ -88,7 +123,7 @@ class AdvancedTradingStrategies:
             ict_config = self.ict_settings.get(timeframe, self.ict_settings['1h'])
             
             # تحويل البيانات إلى DataFrame
-            df = pd.DataFrame(ohlcv_data, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
+            df = self._to_frame(ohlcv_data)
             
             # حساب مؤشرات ICT
             ict_analysis = await self._calculate_ict_indicators(df, ict_config, symbol)
@@ -300,7 +335,7 @@ class AdvancedTradingStrategies:
             if len(ohlcv_data) < 100:
                 return {'is_golden_opportunity': False, 'opportunity_score': 0}
             
-            df = pd.DataFrame(ohlcv_data, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
+            df = self._to_frame(ohlcv_data)
             
             opportunity_score = 0
             opportunity_signals = []
@@ -321,14 +356,14 @@ class AdvancedTradingStrategies:
                 opportunity_signals.append(f"📈 ابتلاع صاعد قوي (قوة: {bullish_engulfing['strength']:.1%})")
             
             # 3. تحليل كثافة الشراء المؤسسي
-            institutional_buying = await self._analyze_institutional_buying_pressure(df)
+            institutional_buying = await self._analyze_institutional_buying_pressure(df, symbol)
             if institutional_buying['detected']:
                 opportunity_score += 30
                 confidence_boost += 0.18
                 opportunity_signals.append("🏛 ضغط شراء مؤسسي")
             
             # 4. كشف الاختراق الحجمي
-            volume_breakout = await self._detect_volume_breakout(df)
+            volume_breakout = await self._detect_volume_breakout(df, symbol)
             if volume_breakout['detected']:
                 opportunity_score += 20
                 confidence_boost += 0.10
@@ -461,13 +496,35 @@ class AdvancedTradingStrategies:
             logger.error(f"❌ خطأ في كشف الابتلاع: {str(e)}")
             return {'detected': False, 'strength': 0.0}
 
-    async def _analyze_institutional_buying_pressure(self, df: pd.DataFrame) -> Dict[str, Any]:
-        """تحليل ضغط الشراء المؤسسي (محاكاة)"""
+    async def _analyze_institutional_buying_pressure(self, df: pd.DataFrame, symbol: Optional[str] = None) -> Dict[str, Any]:
+        """تحليل ضغط الشراء المؤسسي من اختلال دفتر الأوامر - تحليل الحجم والسعر كبديل"""
         try:
-            # في التطبيق الحقيقي، سيتم جلب بيانات العمق من المنصة
-            # هذه محاكاة بناء على تحليل الحجم والسعر
+            volume_surge = bool(df['volume'].iloc[-1] > df['volume'].iloc[-20:].mean() * 2)
+            
+            book = order_book_manager.get_book(symbol) if symbol else None
+            if book is not None:
+                imbalance = book.imbalance(self.golden_opportunity_config['book_depth_bps'])
+                return {
+                    'detected': imbalance >= self.golden_opportunity_config['book_imbalance_threshold'],
+                    'pressure_score': (imbalance + 1) / 2,
+                    'volume_surge': volume_surge,
+                    'book_imbalance': imbalance,
+                    'source': 'order_book'
+                }
+            
+            # بدون دفتر: صافي تدفق المبادرين من شريط الصفقات
+            if symbol and trade_tape.get_tape(symbol) is not None:
+                flow = trade_tape.get_metrics(symbol, self.golden_opportunity_config['flow_window'])
+                if flow['trades'] > 0:
+                    return {
+                        'detected': flow['flow_imbalance'] >= self.golden_opportunity_config['flow_imbalance_threshold'],
+                        'pressure_score': (flow['flow_imbalance'] + 1) / 2,
+                        'volume_surge': volume_surge,
+                        'flow_imbalance': flow['flow_imbalance'],
+                        'vwap': flow['vwap'],
+                        'source': 'trade_tape'
+                    }
             
-            volume_surge = df['volume'].iloc[-1] > df['volume'].iloc[-20:].mean() * 2
             price_strength = (df['close'].iloc[-1] - df['open'].iloc[-1]) / df['open'].iloc[-1] > 0.01
             low_volatility = (df['high'].iloc[-1] - df['low'].iloc[-1]) / df['close'].iloc[-1] < 0.02
             
@@ -483,9 +540,17 @@ class AdvancedTradingStrategies:
             logger.error(f"❌ خطأ في تحليل الضغط المؤسسي: {str(e)}")
             return {'detected': False, 'pressure_score': 0.0}
 
-    async def _detect_volume_breakout(self, df: pd.DataFrame) -> Dict[str, Any]:
-        """كشف الاختراق الحجمي المتقدم"""
+    async def _detect_volume_breakout(self, df: pd.DataFrame, symbol: Optional[str] = None) -> Dict[str, Any]:
+        """كشف الاختراق الحجمي المتقدم - معدل الحجم اللحظي من شريط الصفقات أولاً ثم حجم الشموع"""
         try:
+            surge = trade_tape.get_volume_surge(symbol) if symbol and trade_tape.get_tape(symbol) else None
+            if surge is not None:
+                return {
+                    'detected': surge > self.golden_opportunity_config['volume_multiplier_threshold'],
+                    'multiplier': surge,
+                    'source': 'trade_tape'
+                }
+            
             current_volume = df['volume'].iloc[-1]
             avg_volume_20 = df['volume'].iloc[-20:].mean()
             avg_volume_50 = df['volume'].iloc[-50:].mean()
@@ -621,13 +686,17 @@ class AdvancedTradingStrategies:
             logger.error(f"❌ خطأ في تحليل التوقيت الذكي: {str(e)}")
             return {'optimal': False, 'reason': 'خطأ في التحليل', 'current_hour': datetime.now().hour}
 
-    async def generate_comprehensive_signal(self, symbol: str, ohlcv_data: List[List[float]], 
+    async def generate_comprehensive_signal(self, symbol: str, ohlcv_data: Optional[List[List[float]]] = None, 
                                          ai_prediction: Optional[AIPrediction] = None,
                                          timeframe: str = '1h') -> Optional[TradingSignal]:
         """
         توليد إشارة تداول شاملة تجمع بين جميع الإستراتيجيات
         """
         try:
+            # القراءة من مخزن الشموع إذا لم تمرر البيانات
+            if ohlcv_data is None:
+                ohlcv_data = candle_store.view(symbol, timeframe, 500)
+            
             signals = []
             confidences = []
             reasoning = []
@@ -643,7 +712,7 @@ class AdvancedTradingStrategies:
             golden_opportunity = await self.detect_golden_opportunities(symbol, ohlcv_data)
             if golden_opportunity['is_golden_opportunity']:
                 # إنشاء إشارة من الفرصة الذهبية
-                df = pd.DataFrame(ohlcv_data, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
+                df = self._to_frame(ohlcv_data)
                 golden_signal = await self._create_golden_opportunity_signal(symbol, df, golden_opportunity)
                 if golden_signal:
                     signals.append(golden_signal)
@@ -688,6 +757,10 @@ class AdvancedTradingStrategies:
                 reasoning=reasoning
             )
             
+            # لحظة توليد الإشارة - المستهلكون قبل التسجيل حتى يُقاس زمن الإشارة حتى الإرسال منها
+            signal_ts = time.perf_counter_ns()
+            await self._publish_signal(comprehensive_signal, signal_ts)
+            
             await self._record_signal(symbol, comprehensive_signal, StrategyType.AI_ENHANCED)
             
             logger.info(f"🎯 إشارة شاملة لـ {symbol}: ثقة {avg_confidence:.2f}, {len(signals)} إستراتيجية")
@@ -770,7 +843,7 @@ class AdvancedTradingStrategies:
             if len(ohlcv_data) < 200:
                 return {'optimized': False, 'reason': 'بيانات غير كافية'}
             
-            df = pd.DataFrame(ohlcv_data, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
+            df = self._to_frame(ohlcv_data)
             
             # تحليل التقلبات التاريخية
             volatility = df['close'].pct_change().std()
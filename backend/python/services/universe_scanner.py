@@ -0,0 +1,403 @@
+# backend/python/services/universe_scanner.py
+"""
+🌐 ماسح الكون المتدرج - مئات الرموز في ثلاث طبقات: باردة (فرز مجمع بطلب أسعار واحد)،
+دافئة (شموع ومؤشرات)، وساخنة (تحليل ذكاء اصطناعي واستراتيجيات كامل)، مع ترقية وتخفيض حسب الحجم والتذبذب
+الإصدار: 3.0.0 | المطور: Akraa Trading Team
+"""
+
+import asyncio
+import inspect
+import logging
+import math
+import os
+import time
+from dataclasses import dataclass, asdict
+from enum import Enum
+from typing import Dict, List, Optional, Any, Callable, Iterable
+
+import numpy as np
+
+from services.async_exchange_pool import AsyncExchangePool, exchange_pool
+from services.candle_store import CandleStore, candle_store
+from services.market_registry import MarketRegistry, market_registry
+from services.screener_index import screener_index
+
+logger = logging.getLogger(__name__)
+
+
+class Tier(Enum):
+    """طبقة الرمز في الكون"""
+    HOT = "hot"
+    WARM = "warm"
+    COLD = "cold"
+
+
+@dataclass
+class SymbolProfile:
+    """مقاييس رمز واحد من الفرز البارد والمؤشرات الدافئة"""
+    symbol: str
+    tier: Tier = Tier.COLD
+    tier_since: float = 0.0
+    price: float = 0.0
+    quote_volume: float = 0.0
+    change_24h: float = 0.0
+    range_volatility: float = 0.0   # ln(high/low) لآخر 24 ساعة
+    spread_bps: float = 0.0
+    cold_score: float = 0.0
+    realized_volatility: Optional[float] = None  # من الشموع الدافئة
+    volume_surge: Optional[float] = None         # حجم آخر الشموع مقابل المتوسط
+    trend: Optional[float] = None                # ميل المتوسط الأسي النسبي
+    warm_score: Optional[float] = None
+    warm_updated_at: float = 0.0
+    pinned: bool = False
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {**asdict(self), 'tier': self.tier.value}
+
+
+def _zscore(values: np.ndarray) -> np.ndarray:
+    """درجة معيارية متينة (وسيط وانحراف مطلق) - صفر إذا كانت القيم متساوية"""
+    median = np.nanmedian(values)
+    mad = np.nanmedian(np.abs(values - median)) * 1.4826
+    if not np.isfinite(mad) or mad == 0:
+        return np.zeros_like(values)
+    return np.nan_to_num((values - median) / mad)
+
+
+def warm_indicators(ohlcv: np.ndarray, surge_bars: int = 4) -> Dict[str, float]:
+    """مؤشرات الطبقة الدافئة من مصفوفة OHLCV: التذبذب المحقق وارتفاع الحجم والاتجاه"""
+    close = ohlcv[:, 4]
+    volume = ohlcv[:, 5]
+    returns = np.diff(np.log(close))
+    baseline = volume[:-surge_bars].mean() if len(volume) > surge_bars else 0.0
+    span = min(20, len(close))
+    # np.convolve يعكس النواة: الوزن الأول (الأكبر) يقع على أحدث سعر
+    weights = (1 - 2 / (span + 1)) ** np.arange(span)
+    ema = np.convolve(close, weights / weights.sum(), mode='valid')
+    return {
+        'realized_volatility': float(returns.std() * math.sqrt(len(returns))) if len(returns) > 1 else 0.0,
+        'volume_surge': float(volume[-surge_bars:].mean() / baseline) if baseline > 0 else 1.0,
+        'trend': float(ema[-1] / ema[-min(len(ema), surge_bars + 1)] - 1) if len(ema) > 1 else 0.0,
+    }
+
+
+class UniverseScanner:
+    """ماسح الكون - الطبقة الباردة بطلب fetch_tickers واحد، والدافئة بشموع تزايدية، والساخنة للمستهلكين"""
+
+    def __init__(self, pool: AsyncExchangePool = None, registry: Optional[MarketRegistry] = None,
+                 candles: Optional[CandleStore] = None):
+        self.pool = pool or exchange_pool
+        self.registry = registry or market_registry
+        self.candles = candles or candle_store
+        self.universe_config = {
+            'quote': os.getenv('UNIVERSE_QUOTE', 'USDT'),
+            'max_symbols': int(os.getenv('UNIVERSE_MAX_SYMBOLS', '500')),
+            'hot_size': int(os.getenv('UNIVERSE_HOT_SIZE', '15')),
+            'warm_size': int(os.getenv('UNIVERSE_WARM_SIZE', '60')),
+            'min_quote_volume': float(os.getenv('UNIVERSE_MIN_QUOTE_VOLUME', '1000000')),
+            'max_spread_bps': float(os.getenv('UNIVERSE_MAX_SPREAD_BPS', '50')),
+            'cold_interval': float(os.getenv('UNIVERSE_COLD_INTERVAL', '60')),
+            'warm_interval': float(os.getenv('UNIVERSE_WARM_INTERVAL', '300')),
+            'warm_timeframe': os.getenv('UNIVERSE_WARM_TIMEFRAME', '15m'),
+            'warm_candles': int(os.getenv('UNIVERSE_WARM_CANDLES', '96')),
+            'warm_concurrency': int(os.getenv('UNIVERSE_WARM_CONCURRENCY', '4')),
+            # الرمز لا يُخفض قبل أن تتجاوز رتبته الحجم بهذه النسبة ويمضي الحد الأدنى في طبقته
+            'demotion_hysteresis': float(os.getenv('UNIVERSE_DEMOTION_HYSTERESIS', '0.5')),
+            'min_tier_seconds': float(os.getenv('UNIVERSE_MIN_TIER_SECONDS', '900')),
+            'weights': {'volume': 1.0, 'volatility': 1.0, 'surge': 0.5},
+        }
+        self.exchange: Optional[str] = None
+        self.profiles: Dict[str, SymbolProfile] = {}
+        self.subscribers: List[Callable] = []
+        self.scan_task: Optional[asyncio.Task] = None
+        self.last_cold_scan = 0.0
+        self.stats = {'cold_scans': 0, 'warm_updates': 0, 'promotions': 0, 'demotions': 0,
+                      'errors': 0, 'requests': 0, 'last_cold_scan_ms': 0.0}
+
+    # ==================== الاستعلام ====================
+
+    @property
+    def ranked(self) -> bool:
+        """هل اكتمل فرز واحد على الأقل"""
+        return self.stats['cold_scans'] > 0
+
+    def symbols(self, *tiers: Tier) -> List[str]:
+        """رموز الطبقات المطلوبة مرتبة حسب الدرجة (الساخنة والدافئة افتراضياً)"""
+        tiers = tiers or (Tier.HOT, Tier.WARM)
+        order = {tier: i for i, tier in enumerate(tiers)}
+        selected = [profile for profile in self.profiles.values() if profile.tier in order]
+        selected.sort(key=lambda profile: (order[profile.tier], -self._score(profile)))
+        return [profile.symbol for profile in selected]
+
+    def get_tier(self, symbol: str) -> Tier:
+        profile = self.profiles.get(symbol)
+        return profile.tier if profile else Tier.COLD
+
+    def get_profile(self, symbol: str) -> Optional[SymbolProfile]:
+        return self.profiles.get(symbol)
+
+    def pin(self, symbols: Iterable[str]) -> None:
+        """تثبيت رموز في الطبقة الساخنة (المراكز المفتوحة مثلاً) - الباقي يُلغى تثبيته"""
+        pinned = set(symbols)
+        for symbol in pinned:
+            if symbol not in self.profiles:
+                self.profiles[symbol] = SymbolProfile(symbol, tier_since=time.time())
+        for profile in self.profiles.values():
+            profile.pinned = profile.symbol in pinned
+
+    def subscribe(self, callback: Callable) -> Callable[[], None]:
+        """اشتراك في تغييرات الطبقات: callback(symbol, old_tier, new_tier)"""
+        self.subscribers.append(callback)
+
+        def unsubscribe():
+            if callback in self.subscribers:
+                self.subscribers.remove(callback)
+
+        return unsubscribe
+
+    # ==================== الطبقة الباردة ====================
+
+    def _universe(self, exchange: str) -> List[str]:
+        return self.registry.active_symbols(exchange, quote=self.universe_config['quote'])
+
+    async def _fetch_all_tickers(self, exchange: str, universe: List[str]) -> Dict[str, Dict[str, Any]]:
+        """كل الأسعار بطلب واحد إن دعمت المنصة ذلك، وإلا أول max_symbols رمز"""
+        client = await self.pool.get_client(exchange)
+        self.stats['requests'] += 1
+        if client.has.get('fetchTickers'):
+            return await self.pool.call(exchange, 'fetch_tickers')
+        return await self.pool.fetch_tickers(exchange, universe[:self.universe_config['max_symbols']])
+
+    async def scan_cold(self, exchange: Optional[str] = None) -> int:
+        """فرز بارد: مقاييس الحجم والتذبذب والفارق لكل رموز الكون من لقطة أسعار واحدة"""
+        exchange = exchange or self.exchange
+        started = time.perf_counter()
+        await self.registry.ensure_loaded(exchange)
+        universe = self._universe(exchange)
+        tickers = await self._fetch_all_tickers(exchange, universe)
+
+        symbols = [symbol for symbol in universe if symbol in tickers]
+        if not symbols:
+            return 0
+        for symbol in symbols:
+            screener_index.update_ticker(symbol, tickers[symbol])
+        screener_index.prune()
+        rows = np.array([[
+            tickers[symbol].get('last') or 0.0,
+            tickers[symbol].get('quoteVolume') or 0.0,
+            tickers[symbol].get('percentage') or 0.0,
+            tickers[symbol].get('high') or 0.0,
+            tickers[symbol].get('low') or 0.0,
+            tickers[symbol].get('bid') or 0.0,
+            tickers[symbol].get('ask') or 0.0,
+        ] for symbol in symbols], dtype=np.float64)
+        # الكون محدود بأعلى max_symbols رمز من حيث حجم التداول
+        keep = np.argsort(-rows[:, 1], kind='stable')[:self.universe_config['max_symbols']]
+        symbols = [symbols[i] for i in keep]
+        price, quote_volume, change, high, low, bid, ask = rows[keep].T
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            range_volatility = np.where((high > 0) & (low > 0), np.log(high / low), 0.0)
+            spread_bps = np.where((bid > 0) & (ask > 0), (ask - bid) / ((ask + bid) / 2) * 10000, np.inf)
+
+        weights = self.universe_config['weights']
+        score = weights['volume'] * _zscore(np.log1p(quote_volume)) + \
+            weights['volatility'] * _zscore(range_volatility)
+        eligible = (quote_volume >= self.universe_config['min_quote_volume']) & \
+            (spread_bps <= self.universe_config['max_spread_bps'])
+        score = np.where(eligible, score, -np.inf)
+
+        now = time.time()
+        for i, symbol in enumerate(symbols):
+            profile = self.profiles.get(symbol)
+            if profile is None:
+                profile = self.profiles[symbol] = SymbolProfile(symbol, tier_since=now)
+            profile.price = float(price[i])
+            profile.quote_volume = float(quote_volume[i])
+            profile.change_24h = float(change[i])
+            profile.range_volatility = float(range_volatility[i])
+            profile.spread_bps = float(spread_bps[i])
+            profile.cold_score = float(score[i])
+
+        # الرموز التي خرجت من الكون أو من لقطة الأسعار تُزال ما لم تكن في طبقة أعلى أو مثبتة
+        listed = set(symbols)
+        for symbol, profile in list(self.profiles.items()):
+            if symbol in listed or profile.pinned:
+                continue
+            if profile.tier == Tier.COLD:
+                del self.profiles[symbol]
+            else:
+                profile.cold_score = -math.inf
+                profile.warm_score = None
+
+        self.last_cold_scan = now
+        self.stats['cold_scans'] += 1
+        self.stats['last_cold_scan_ms'] = (time.perf_counter() - started) * 1000
+        return len(symbols)
+
+    # ==================== الطبقة الدافئة ====================
+
+    async def _update_warm(self, profile: SymbolProfile, semaphore: asyncio.Semaphore) -> None:
+        async with semaphore:
+            try:
+                ohlcv = await self.candles.get_ohlcv(
+                    profile.symbol, self.universe_config['warm_timeframe'],
+                    self.universe_config['warm_candles'], self.exchange
+                )
+                self.stats['requests'] += 1
+            except Exception as e:
+                self.stats['errors'] += 1
+                logger.debug(f"تعذر جلب شموع {profile.symbol}: {str(e)}")
+                return
+        if len(ohlcv) < 10:
+            return
+        indicators = warm_indicators(ohlcv)
+        profile.realized_volatility = indicators['realized_volatility']
+        profile.volume_surge = indicators['volume_surge']
+        profile.trend = indicators['trend']
+        profile.warm_updated_at = time.time()
+        self.stats['warm_updates'] += 1
+
+    async def scan_warm(self, force: bool = False) -> int:
+        """تحديث مؤشرات الرموز الدافئة والساخنة التي انتهت صلاحية مؤشراتها"""
+        now = time.time()
+        stale = [
+            profile for profile in self.profiles.values()
+            if profile.tier != Tier.COLD and
+            (force or now - profile.warm_updated_at >= self.universe_config['warm_interval'])
+        ]
+        if not stale:
+            return 0
+        semaphore = asyncio.Semaphore(self.universe_config['warm_concurrency'])
+        await asyncio.gather(*[self._update_warm(profile, semaphore) for profile in stale])
+
+        # درجة دافئة نسبية بين الرموز التي لها مؤشرات
+        measured = [profile for profile in self.profiles.values() if profile.realized_volatility is not None]
+        if measured:
+            weights = self.universe_config['weights']
+            volatility = _zscore(np.array([profile.realized_volatility for profile in measured]))
+            surge = _zscore(np.log(np.maximum([profile.volume_surge for profile in measured], 1e-9)))
+            for profile, v, s in zip(measured, volatility, surge):
+                profile.warm_score = profile.cold_score + weights['volatility'] * float(v) + weights['surge'] * float(s)
+        return len(stale)
+
+    # ==================== الترقية والتخفيض ====================
+
+    def _score(self, profile: SymbolProfile) -> float:
+        return profile.warm_score if profile.warm_score is not None else profile.cold_score
+
+    def _assign(self, candidates: List[SymbolProfile], size: int, tier: Tier,
+                now: float) -> List[SymbolProfile]:
+        """اختيار أفضل size رمز للطبقة مع إبقاء الحاليين ضمن هامش التخفيض"""
+        config = self.universe_config
+        keep_rank = int(size * (1 + config['demotion_hysteresis']))
+        ranked = sorted(candidates, key=self._score, reverse=True)
+        rank = {profile.symbol: i for i, profile in enumerate(ranked)}
+
+        selected = [profile for profile in ranked if profile.pinned]
+        for profile in ranked:
+            if profile.pinned or not math.isfinite(self._score(profile)):
+                continue
+            incumbent = profile.tier == tier or (tier == Tier.WARM and profile.tier == Tier.HOT)
+            settled = now - profile.tier_since >= config['min_tier_seconds']
+            if rank[profile.symbol] < size or (incumbent and (rank[profile.symbol] < keep_rank or not settled)):
+                selected.append(profile)
+
+        # الحاليون المحتفظ بهم قد يزيدون العدد - الأفضل درجة يبقون
+        pinned = [profile for profile in selected if profile.pinned]
+        others = sorted((profile for profile in selected if not profile.pinned), key=self._score, reverse=True)
+        return pinned + others[:max(0, keep_rank - len(pinned))]
+
+    async def rebalance(self, assign_hot: bool = True) -> Dict[str, int]:
+        """إعادة توزيع الطبقات ونشر التغييرات - بدون assign_hot تبقى الطبقة الساخنة كما هي"""
+        now = time.time()
+        profiles = list(self.profiles.values())
+        warm = self._assign(profiles, self.universe_config['warm_size'] + self.universe_config['hot_size'],
+                            Tier.WARM, now)
+        if assign_hot:
+            hot = self._assign(warm, self.universe_config['hot_size'], Tier.HOT, now)
+        else:
+            hot = [profile for profile in warm if profile.tier == Tier.HOT]
+
+        target = {profile.symbol: Tier.WARM for profile in warm}
+        target.update({profile.symbol: Tier.HOT for profile in hot})
+
+        changes = []
+        for profile in profiles:
+            new_tier = target.get(profile.symbol, Tier.COLD)
+            if new_tier != profile.tier:
+                promoted = list(Tier).index(new_tier) < list(Tier).index(profile.tier)
+                self.stats['promotions' if promoted else 'demotions'] += 1
+                changes.append((profile.symbol, profile.tier, new_tier))
+                profile.tier = new_tier
+                profile.tier_since = now
+
+        for change in changes:
+            for callback in list(self.subscribers):
+                try:
+                    result = callback(*change)
+                    if inspect.isawaitable(result):
+                        await result
+                except Exception as e:
+                    logger.error(f"❌ خطأ في مشترك طبقات الكون: {str(e)}")
+
+        if changes:
+            logger.info(f"🌐 تحديث طبقات الكون: {len(changes)} تغيير")
+        return {tier.value: sum(1 for p in profiles if p.tier == tier) for tier in Tier}
+
+    # ==================== الدورة ====================
+
+    async def scan(self, exchange: Optional[str] = None) -> Dict[str, int]:
+        """دورة كاملة: فرز بارد عند الاستحقاق ثم مؤشرات دافئة ثم إعادة توزيع"""
+        self.exchange = exchange or self.exchange
+        try:
+            if time.time() - self.last_cold_scan >= self.universe_config['cold_interval']:
+                await self.scan_cold()
+            # الترقية من الباردة أولاً ثم تحديث مؤشرات الدافئة ثم اختيار الساخنة بها
+            await self.rebalance(assign_hot=False)
+            await self.scan_warm()
+            return await self.rebalance()
+        except Exception as e:
+            self.stats['errors'] += 1
+            logger.error(f"❌ خطأ في مسح الكون على {self.exchange}: {str(e)}")
+            return {}
+
+    def start(self, exchange: str) -> None:
+        """مسح دوري للكون على منصة واحدة"""
+        self.exchange = exchange
+        if self.scan_task is not None and not self.scan_task.done():
+            return
+
+        async def scan_loop():
+            interval = min(self.universe_config['cold_interval'], self.universe_config['warm_interval'])
+            while True:
+                started = time.monotonic()
+                await self.scan()
+                await asyncio.sleep(max(1.0, interval - (time.monotonic() - started)))
+
+        self.scan_task = asyncio.create_task(scan_loop())
+        logger.info(f"🌐 بدء ماسح الكون على {exchange}")
+
+    async def stop(self) -> None:
+        """إيقاف المسح الدوري"""
+        if self.scan_task is not None:
+            self.scan_task.cancel()
+            await asyncio.gather(self.scan_task, return_exceptions=True)
+            self.scan_task = None
+
+    def get_universe_status(self) -> Dict[str, Any]:
+        """حالة الكون والطبقات"""
+        return {
+            'running': self.scan_task is not None and not self.scan_task.done(),
+            'exchange': self.exchange,
+            'symbols': len(self.profiles),
+            'tiers': {tier.value: len(self.symbols(tier)) for tier in Tier},
+            'hot': [self.profiles[symbol].to_dict() for symbol in self.symbols(Tier.HOT)],
+            'warm': self.symbols(Tier.WARM),
+            'last_cold_scan': self.last_cold_scan,
+            **self.stats
+        }
+
+
+# نسخة عالمية
+universe_scanner = UniverseScanner()
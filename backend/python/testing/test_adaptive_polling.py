@@ -0,0 +1,129 @@
+# backend/python/testing/test_adaptive_polling.py
+"""
+🧪 اختبار الاستطلاع التكيفي - الفترة حسب التذبذب والتفعيلات والتعرض، تمديد الميزانية، الرموز المتدفقة
+"""
+
+import math
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.adaptive_polling import AdaptivePoller, SECONDS_PER_DAY
+
+
+def make_poller(budget: float = 600.0) -> AdaptivePoller:
+    poller = AdaptivePoller(budget_per_minute=budget)
+    poller.polling_config.update({'min_interval': 1.0, 'max_interval': 60.0, 'material_move_bps': 25.0,
+                                  'confidence_sigmas': 3.0, 'exposure_scale': 1000.0, 'stream_max_age': 5.0})
+    return poller
+
+
+def tick(symbol: str, price: float, high=None, low=None):
+    return SimpleNamespace(symbol=symbol, price=price, high_24h=high, low_24h=low)
+
+
+def test_interval_from_volatility_triggers_and_exposure():
+    """الفترة (d / zσ)² - تقصر مع التذبذب والقرب من الوقف وحجم التعرض"""
+    poller = make_poller()
+    poller.observe('BTC/USDT', 100.0, timestamp=1000.0)
+    state = poller.states['BTC/USDT']
+    assert math.isclose(state.variance_rate, 0.03 ** 2 / SECONDS_PER_DAY)
+
+    expected = (0.0025 / (3 * state.volatility)) ** 2
+    assert math.isclose(poller._raw_interval(state), min(expected, 60.0))
+
+    poller.observe('ETH/USDT', 100.0, timestamp=1000.0, high=120.0, low=80.0)
+    assert poller._raw_interval(poller.states['ETH/USDT']) < poller._raw_interval(state)
+
+    poller.set_position('BTC/USDT', 0.0, [100.1, None])
+    near_stop = poller._raw_interval(state)
+    assert math.isclose(near_stop, max((0.001 / (3 * state.volatility)) ** 2, 1.0))
+    poller.set_position('BTC/USDT', 3000.0, [100.1])
+    assert poller._raw_interval(state) == max(near_stop / 16, 1.0)
+
+
+def test_volatility_tracks_observed_moves():
+    """تحرك السعر يرفع التذبذب المقدر بمتوسط أسي حسب الزمن، والسعر الصفري يُتجاهل"""
+    poller = make_poller()
+    poller.observe('BTC/USDT', 100.0, timestamp=1000.0)
+    seeded = poller.states['BTC/USDT'].variance_rate
+    for step in range(1, 30):
+        poller.observe('BTC/USDT', 100.0 * (1.01 if step % 2 else 1.0), timestamp=1000.0 + step * 10)
+    assert poller.states['BTC/USDT'].variance_rate > 10 * seeded
+
+    poller.observe('BTC/USDT', 0.0, timestamp=2000.0)
+    assert poller.stats['observations'] == 30
+
+
+def test_budget_stretches_intervals():
+    """مجموع المعدلات فوق الميزانية يمدد كل الفترات بنفس النسبة"""
+    poller = make_poller(budget=60.0)
+    symbols = [f"S{i}/USDT" for i in range(10)]
+    poller.track(symbols)
+    # بدون تذبذب كل رمز بالحد الأدنى (ثانية) -> 600 طلب بالدقيقة مقابل ميزانية 60
+    assert math.isclose(poller.scale, 10.0)
+    assert all(math.isclose(poller.states[symbol].interval, 10.0) for symbol in symbols)
+
+    poller.track(symbols[:2])
+    assert math.isclose(poller.scale, 2.0) and set(poller.states) == set(symbols[:2])
+
+
+def test_due_order_and_budget_tokens():
+    """الأكثر تأخراً أولاً، والرموز الزائدة عن توكنات الميزانية تؤجل"""
+    poller = make_poller(budget=8.0)
+    poller.track(['A/USDT', 'B/USDT', 'C/USDT'])
+    now = time.time()
+    for symbol, late in (('A/USDT', 1.0), ('B/USDT', 5.0), ('C/USDT', 3.0)):
+        state = poller.states[symbol]
+        state.interval = 10.0
+        state.next_due = now - late
+
+    assert poller.due(now=now) == ['B/USDT', 'C/USDT']
+    assert poller.stats['deferred'] == 1
+    assert poller.due(symbols=['A/USDT'], exclude=['A/USDT'], now=now) == []
+
+    poller.record('B/USDT', price=100.0, data={'last': 100.0}, now=now)
+    assert poller.get_cached('B/USDT', now=now) == {'last': 100.0}
+    assert poller.get_cached('B/USDT', now=poller.states['B/USDT'].next_due) is None
+
+
+def test_streamed_symbols_skip_polling_and_budget():
+    """التيكات تؤجل الاستطلاع ولا تُحسب في الطلب على الميزانية، والتيك بلا سعر لرمز جديد لا يفشل"""
+    poller = make_poller(budget=60.0)
+    poller.track(['BTC/USDT', 'ETH/USDT'])
+    poller.on_tick(tick('BTC/USDT', 100.0, 105.0, 95.0))
+    state = poller.states['BTC/USDT']
+    assert poller.is_streamed(state, time.time())
+    assert state.next_due >= time.time() + 4.0
+    assert 'BTC/USDT' not in poller.due()
+
+    poller._reschedule()
+    assert poller.scale == 1.0
+    assert poller.get_polling_status()['streamed'] == 1
+
+    poller.on_tick(tick('SOL/USDT', 0.0))
+    poller.on_tick(tick('SOL/USDT', None))
+    assert 'SOL/USDT' not in poller.states
+
+
+def test_sync_positions_sets_and_clears_exposure():
+    """المراكز المفتوحة تحدد التعرض والتفعيلات، والمغلقة تُصفر"""
+    poller = make_poller()
+    poller.track(['BTC/USDT'])
+    position = SimpleNamespace(symbol='ETH/USDT', current_value=-500.0, stop_loss=95.0, take_profit=None)
+    poller.sync_positions([position, position])
+    state = poller.states['ETH/USDT']
+    assert state.exposure == 1000.0 and state.triggers == [95.0, 95.0]
+
+    poller.sync_positions([])
+    assert state.exposure == 0.0 and state.triggers == []
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+            print(f"✅ {name}")
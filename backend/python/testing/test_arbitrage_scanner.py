@@ -0,0 +1,136 @@
+# backend/python/testing/test_arbitrage_scanner.py
+"""
+🧪 اختبار ماسح المراجحة - الفروق الصافية بعد الرسوم، حد الفرق الأدنى، الأسعار القديمة وإشارات ARBITRAGE
+"""
+
+import asyncio
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from services.arbitrage_scanner import ArbitrageScanner, QuoteMatrix, compute_opportunities
+
+EXCHANGES = ['binance', 'kucoin', 'mexc']
+
+
+def make_matrix(bids, asks, sizes=None) -> QuoteMatrix:
+    """مصفوفة (رموز × منصات) من قوائم أسعار - NaN سعر غير متوفر"""
+    symbols = [f"SYM{i}/USDT" for i in range(len(bids))]
+    matrix = QuoteMatrix.empty(symbols, EXCHANGES)
+    matrix.bid[:] = np.array(bids, dtype=float)
+    matrix.ask[:] = np.array(asks, dtype=float)
+    if sizes is not None:
+        matrix.bid_size[:] = sizes
+        matrix.ask_size[:] = sizes
+    return matrix
+
+
+class FakePool:
+    """مجمع منصات بأسعار ثابتة لكل منصة - المنصة في failing ترفع خطأ"""
+
+    def __init__(self, tickers, failing=()):
+        self.tickers = tickers
+        self.failing = set(failing)
+        self.registered_exchanges = list(tickers)
+
+    def is_registered(self, exchange):
+        return exchange in self.tickers
+
+    async def fetch_tickers(self, exchange, symbols):
+        if exchange in self.failing:
+            raise ConnectionError("timeout")
+        return {symbol: ticker for symbol, ticker in self.tickers[exchange].items() if symbol in symbols}
+
+
+def make_scanner(tickers, failing=()) -> ArbitrageScanner:
+    registry = SimpleNamespace(is_loaded=lambda exchange: False)
+    return ArbitrageScanner(pool=FakePool(tickers, failing), registry=registry)
+
+
+def test_net_spread_after_fees():
+    """الشراء بالطلب الأرخص والبيع بالعرض الأعلى، والفرق الصافي بعد رسوم المستلم على الجانبين"""
+    matrix = make_matrix([[100.0, 101.5, 100.2]], [[100.1, 101.6, 100.3]], sizes=[[2.0, 0.5, 1.0]])
+    fees = np.array([0.001, 0.002, 0.0005])
+    (opportunity,) = compute_opportunities(matrix, fees)
+
+    assert (opportunity.buy_exchange, opportunity.sell_exchange) == ('binance', 'kucoin')
+    assert opportunity.buy_price == 100.1 and opportunity.sell_price == 101.5
+    assert np.isclose(opportunity.gross_spread, 101.5 / 100.1 - 1)
+    assert np.isclose(opportunity.net_spread, (101.5 * 0.998) / (100.1 * 1.001) - 1)
+    assert opportunity.max_amount == 0.5
+
+
+def test_min_spread_filter_and_fee_erosion():
+    """الفرص دون الحد تُستبعد، والرسوم قد تحول فرقاً إجمالياً موجباً إلى خسارة"""
+    bids = [[100.0, 100.15, np.nan], [50.0, 51.0, 50.0]]
+    asks = [[100.05, 100.2, np.nan], [50.05, 51.05, 50.05]]
+    fees = np.full(3, 0.001)
+
+    opportunities = compute_opportunities(make_matrix(bids, asks), fees)
+    assert [opportunity.symbol for opportunity in opportunities] == ['SYM1/USDT']
+    assert compute_opportunities(make_matrix(bids, asks), np.zeros(3))[-1].symbol == 'SYM0/USDT'
+    assert compute_opportunities(make_matrix(bids, asks), fees, min_net_spread=0.05) == []
+
+
+def test_missing_quotes_and_single_exchange():
+    """الأسعار غير المتوفرة لا تنتج فرصاً، ولا مراجحة داخل المنصة نفسها، ومنصة واحدة لا تكفي"""
+    matrix = make_matrix([[np.nan, 101.0, np.nan]], [[np.nan, 100.0, np.nan]])
+    assert compute_opportunities(matrix, np.zeros(3)) == []
+    matrix.ask[0, 0] = 100.0
+    assert [(o.buy_exchange, o.sell_exchange) for o in compute_opportunities(matrix, np.zeros(3))] == \
+        [('binance', 'kucoin')]
+
+    single = QuoteMatrix.empty(['BTC/USDT'], ['binance'])
+    assert compute_opportunities(single, np.zeros(1)) == []
+
+
+def test_stale_and_failed_quotes_are_dropped():
+    """أسعار أقدم من max_quote_age ومنصة فاشلة لا تدخل المصفوفة"""
+    now_ms = time.time() * 1000
+    tickers = {
+        'binance': {'BTC/USDT': {'bid': 100.0, 'ask': 100.1, 'timestamp': now_ms}},
+        'kucoin': {'BTC/USDT': {'bid': 105.0, 'ask': 105.1, 'timestamp': now_ms - 60_000}},
+        'mexc': {'BTC/USDT': {'bid': 104.0, 'ask': 104.1, 'timestamp': now_ms}},
+    }
+    scanner = make_scanner(tickers, failing=['mexc'])
+    matrix = asyncio.run(scanner.fetch_quotes(['BTC/USDT']))
+
+    assert matrix.exchanges == EXCHANGES
+    assert matrix.bid[0, 0] == 100.0
+    assert np.isnan(matrix.bid[0, 1]) and np.isnan(matrix.ask[0, 1])
+    assert np.isnan(matrix.bid[0, 2]) and scanner.stats['exchange_failures'] == 1
+    assert asyncio.run(scanner.scan(['BTC/USDT'])) == []
+
+
+def test_signals_are_arbitrage_with_both_legs():
+    """الفرصة إشارة ARBITRAGE بساق شراء وساق بيع وليست BUY"""
+    now_ms = time.time() * 1000
+    tickers = {
+        'binance': {'BTC/USDT': {'bid': 100.0, 'ask': 100.1, 'timestamp': now_ms}},
+        'kucoin': {'BTC/USDT': {'bid': 102.0, 'ask': 102.1, 'timestamp': now_ms}},
+    }
+    scanner = make_scanner(tickers)
+    scanner.set_taker_fee('binance', 0.001)
+    scanner.set_taker_fee('kucoin', 0.001)
+    assert len(asyncio.run(scanner.scan(['BTC/USDT']))) == 1
+
+    (signal,) = scanner.get_signals('BTCUSDT')
+    assert signal['signal'] == 'ARBITRAGE' and signal['symbol'] == 'BTC/USDT'
+    assert signal['legs'] == [
+        {'side': 'BUY', 'exchange': 'binance', 'price': 100.1},
+        {'side': 'SELL', 'exchange': 'kucoin', 'price': 102.0},
+    ]
+    assert 0 < signal['confidence'] <= 0.9
+    assert scanner.get_signals('ETH/USDT') == []
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+            print(f"✅ {name}")
@@ -0,0 +1,116 @@
+# backend/python/testing/test_async_exchange_pool.py
+"""
+🧪 اختبار مجمع المنصات غير المتزامن - انتظار توكن حد المعدل خارج مهلة المحاولة وقاطع الدائرة
+"""
+
+import asyncio
+import os
+import sys
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.async_exchange_pool import AsyncExchangePool
+from services.rate_limiter import RateLimiter, RateLimitTimeout
+from services.resilience import ResilienceManager, deadline
+
+# دلو بتوكن واحد يمتلئ كل ~0.12 ثانية
+PROFILES = {'default': {'buckets': {'weight': (10, 1)},
+                        'classes': {'public': ['weight'], 'private': ['weight'], 'order': ['weight']},
+                        'weights': {}}}
+
+
+class FakeClient:
+    """عميل ccxt يرد بعد latency ثانية - يسجل الطلبات"""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.calls = 0
+
+    async def fetch_ticker(self, symbol):
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        return {'symbol': symbol, 'last': 100.0}
+
+
+def make_pool(client: FakeClient, attempt_timeout: float = 0.05, hedge_delay: float = 0.3) -> AsyncExchangePool:
+    resilience = ResilienceManager()
+    resilience.resilience_config.update({'attempt_timeout': attempt_timeout, 'hedge_delay': hedge_delay,
+                                         'failure_threshold': 2, 'backoff_base': 0.0})
+    pool = AsyncExchangePool(rate_limiter=RateLimiter(profiles=PROFILES), resilience=resilience,
+                             http_client=SimpleNamespace())
+    pool.register_exchange('binance', {})
+    pool.clients['binance'] = client
+    return pool
+
+
+def test_token_wait_does_not_count_against_attempt_timeout():
+    """طلبات تنتظر التوكن أطول من مهلة المحاولة تنجح دون فشل على القاطع"""
+    client = FakeClient()
+    pool = make_pool(client)
+
+    async def run():
+        return await asyncio.gather(*[pool.call('binance', 'fetch_ticker', 'BTC/USDT') for _ in range(4)])
+
+    results = asyncio.run(run())
+    assert [result['last'] for result in results] == [100.0] * 4 and client.calls == 4
+    breaker = pool.resilience.get_breaker('binance').status()
+    assert breaker['state'] == 'closed' and breaker['failures'] == 0
+    assert pool.resilience.stats['retries'] == 0
+
+
+def test_slow_exchange_still_trips_breaker():
+    """بطء المنصة نفسها يتجاوز مهلة المحاولة ويُحسب فشلاً ويفتح الدائرة"""
+    client = FakeClient(latency=0.2)
+    pool = make_pool(client)
+
+    async def run():
+        await pool.call('binance', 'fetch_ticker', 'BTC/USDT')
+
+    try:
+        asyncio.run(run())
+        assert False, "المحاولة البطيئة يجب أن تنتهي بمهلة"
+    except asyncio.TimeoutError:
+        pass
+    breaker = pool.resilience.get_breaker('binance').status()
+    assert breaker['state'] == 'open' and breaker['failures'] == 2 and client.calls == 2
+
+
+def test_rate_limit_timeout_leaves_breaker_untouched():
+    """انتظار توكن أطول من ميزانية المستدعي يرفع RateLimitTimeout دون إرسال أو فشل"""
+    client = FakeClient()
+    pool = make_pool(client)
+
+    async def run():
+        with deadline(0.05):
+            await pool.call('binance', 'fetch_ticker', 'BTC/USDT')
+            await pool.call('binance', 'fetch_ticker', 'BTC/USDT')
+
+    try:
+        asyncio.run(run())
+        assert False, "الطلب الثاني يجب أن يرفض قبل الإرسال"
+    except RateLimitTimeout:
+        pass
+    breaker = pool.resilience.get_breaker('binance').status()
+    assert client.calls == 1 and breaker['failures'] == 0 and breaker['successes'] == 1
+
+
+def test_hedge_copy_takes_its_own_token():
+    """نسخة التحوط تنتظر توكنها ولا تتجاوز حد المعدل"""
+    client = FakeClient(latency=0.3)
+    pool = make_pool(client, attempt_timeout=1.0, hedge_delay=0.01)
+
+    async def run():
+        return await pool.call('binance', 'fetch_ticker', 'BTC/USDT')
+
+    assert asyncio.run(run())['last'] == 100.0
+    assert client.calls == 2 and pool.resilience.stats['hedged_calls'] == 1
+    bucket = pool.rate_limiter.get_bucket('binance', 'weight').status()
+    assert bucket['granted'] == 2 and bucket['waited'] > 0.1
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+            print(f"✅ {name}")
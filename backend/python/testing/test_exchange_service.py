@@ -0,0 +1,111 @@
+# backend/python/testing/test_exchange_service.py
+"""
+🧪 اختبار خدمة المنصات - الأخطاء العابرة تصل لمصحح resilient فيعيد المحاولة ويحسبها على القاطع
+"""
+
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.exchange_service import AdvancedExchangeService, SecurityManager, resilient
+from services.rate_limiter import RateLimiter
+from services.resilience import resilience
+
+# دلو بتوكن واحد يمتلئ كل ~0.12 ثانية
+PROFILES = {'default': {'buckets': {'weight': (10, 1)},
+                        'classes': {'public': ['weight'], 'private': ['weight'], 'order': ['weight']},
+                        'weights': {}}}
+
+
+class FlakyService:
+    """خدمة بدالة منصة تفشل failures مرة بخطأ error ثم تنجح"""
+
+    def __init__(self, failures: int, error: Exception = ConnectionError("reset"), rate_timeout: float = 10.0):
+        self.failures = failures
+        self.error = error
+        self.calls = 0
+        self.security_config = {'rate_limit_timeout': rate_timeout}
+        self.security_manager = SecurityManager()
+        self.security_manager.rate_limiter = RateLimiter(profiles=PROFILES)
+
+    @resilient(retries=2, rate_method='fetch_balance')
+    async def fetch(self, exchange: str):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise self.error
+        return {'exchange': exchange, 'success': True}
+
+
+def breaker_status(exchange: str):
+    return resilience.get_breaker(exchange).status()
+
+
+def test_transient_errors_are_retried():
+    """خطأ شبكة عابر يُعاد ويُحسب فشلاً على القاطع ثم ينجح"""
+    service = FlakyService(failures=2)
+    result = asyncio.run(service.fetch('flaky-retry'))
+    assert result == {'exchange': 'flaky-retry', 'success': True} and service.calls == 3
+    status = breaker_status('flaky-retry')
+    assert status['failures'] == 2 and status['successes'] == 1 and status['consecutive_failures'] == 0
+
+
+def test_exhausted_retries_return_error_dict():
+    """بعد استنفاد المحاولات يعود قاموس خطأ بحالة القاطع بدل الاستثناء"""
+    service = FlakyService(failures=10)
+    result = asyncio.run(service.fetch('flaky-down'))
+    assert result['success'] is False and result['error'] == 'reset' and result['circuit_state'] == 'closed'
+    assert service.calls == 3 and breaker_status('flaky-down')['failures'] == 3
+
+
+def test_business_errors_are_not_retried():
+    """خطأ غير عابر يصل للمستدعي دون إعادة ودون فشل على القاطع"""
+    service = FlakyService(failures=1, error=ValueError("bad symbol"))
+    try:
+        asyncio.run(service.fetch('flaky-value'))
+        assert False, "ValueError يجب أن يصل للمستدعي"
+    except ValueError:
+        pass
+    assert service.calls == 1 and breaker_status('flaky-value')['failures'] == 0
+
+
+def test_rate_limit_timeout_returns_error_before_sending():
+    """انتظار توكن أطول من المهلة يعيد خطأ حد الطلبات دون إرسال الطلب"""
+    service = FlakyService(failures=0, rate_timeout=0.01)
+
+    async def run():
+        return [await service.fetch('flaky-limited') for _ in range(2)]
+
+    first, second = asyncio.run(run())
+    assert first['success'] and second['success'] is False and second['retry_after'] > 0.01
+    assert service.calls == 1 and breaker_status('flaky-limited')['failures'] == 0
+
+
+def test_get_balance_caches_only_success():
+    """الرصيد الناجح يُخزن مؤقتاً، وفشل المنصة يعود خطأ دون تخزين"""
+    service = AdvancedExchangeService()
+    service.security_config['enable_caching'] = True
+
+    async def down(exchange):
+        return {'exchange': exchange, 'error': 'reset', 'success': False}
+
+    service._fetch_balance = down
+    assert asyncio.run(service.get_balance('binance'))['success'] is False
+    assert service.performance_cache.get_cached_balance('binance') is None
+
+    del service._fetch_balance
+    balance = asyncio.run(service.get_balance('binance'))
+    assert balance['success'] and balance['total_balance'] == '1000.00'
+    assert asyncio.run(service.get_balance('binance'))['cached'] is True
+
+    price = asyncio.run(service.get_ticker_price('binance', 'BTCUSDT'))
+    cached = asyncio.run(service.get_ticker_price('binance', 'BTCUSDT'))
+    assert cached['cached'] and cached['price'] == price['price']
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+            print(f"✅ {name}")
@@ -0,0 +1,135 @@
+# backend/python/testing/test_exchange_simulator.py
+"""
+🧪 اختبار محرك مطابقة المنصة المحاكاة - أولوية السعر ثم الزمن، التنفيذ الجزئي، IOC/FOK والأرصدة
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.exchange_simulator import (
+    ExchangeSimulator, SimAccount, SimMarket, SimulatorError, _units
+)
+
+
+def make_simulator():
+    """محاكاة بدفتر فارغ (بدون مزود سيولة) وحسابين بأرصدة معروفة"""
+    market = SimMarket.create('BTC/USDT', 100.0, tick=0.01, step=0.001, min_notional=1.0)
+    simulator = ExchangeSimulator(markets=[market], liquidity_levels=0, maker_fee_bps=0, taker_fee_bps=0)
+    for api_key in ('maker', 'taker'):
+        simulator.accounts[api_key] = SimAccount(api_key, {'USDT': 100000.0, 'BTC': 100.0})
+    return simulator, market, simulator.engines[market.market_id]
+
+
+def submit(simulator, market, api_key, side, order_type, quantity, price=0.0, time_in_force='GTC'):
+    return simulator.submit_order(simulator.accounts[api_key], market, side, order_type,
+                                  _units(quantity), _units(price), time_in_force)
+
+
+def test_price_then_time_priority():
+    """الأفضل سعراً أولاً، ثم الأقدم داخل نفس المستوى"""
+    simulator, market, engine = make_simulator()
+    first, _ = submit(simulator, market, 'maker', 'SELL', 'LIMIT', 1, 101.0)
+    second, _ = submit(simulator, market, 'maker', 'SELL', 'LIMIT', 1, 101.0)
+    best, _ = submit(simulator, market, 'maker', 'SELL', 'LIMIT', 1, 100.5)
+
+    taker, fills = submit(simulator, market, 'taker', 'BUY', 'MARKET', 2.5)
+    assert [(fill.maker.order_id, fill.price, fill.qty) for fill in fills] == [
+        (best.order_id, _units(100.5), _units(1)),
+        (first.order_id, _units(101.0), _units(1)),
+        (second.order_id, _units(101.0), _units(0.5)),
+    ]
+    assert taker.status == 'FILLED'
+    assert (best.status, first.status, second.status) == ('FILLED', 'FILLED', 'PARTIALLY_FILLED')
+    assert engine.best('SELL') == _units(101.0)
+    assert engine.level_qty['SELL'][_units(101.0)] == _units(0.5)
+
+
+def test_limit_remainder_rests_and_depth_diff():
+    """المتبقي من أمر محدد يدخل الدفتر، والفروقات تُبث بصيغة depthUpdate"""
+    simulator, market, engine = make_simulator()
+    submit(simulator, market, 'maker', 'SELL', 'LIMIT', 1, 100.0)
+    engine.take_changes()
+
+    order, fills = submit(simulator, market, 'taker', 'BUY', 'LIMIT', 3, 100.0)
+    assert len(fills) == 1 and order.status == 'PARTIALLY_FILLED'
+    assert engine.best('BUY') == _units(100.0)
+    assert engine.depth(5) == ([['100.00000000', '2.00000000']], [])
+
+    diff = engine.take_changes()
+    assert diff['b'] == [['100.00000000', '2.00000000']] and diff['a'] == [['100.00000000', '0.00000000']]
+    assert diff['U'] <= diff['u']
+    assert engine.take_changes() is None
+
+
+def test_ioc_and_fok():
+    """IOC ينفذ المتاح وينتهي، FOK لا ينفذ شيئاً إذا لم تكفِ السيولة"""
+    simulator, market, engine = make_simulator()
+    submit(simulator, market, 'maker', 'SELL', 'LIMIT', 1, 100.0)
+
+    order, fills = submit(simulator, market, 'taker', 'BUY', 'LIMIT', 2, 100.0, 'FOK')
+    assert order.status == 'EXPIRED' and fills == []
+    assert engine.level_qty['SELL'][_units(100.0)] == _units(1)
+
+    order, fills = submit(simulator, market, 'taker', 'BUY', 'LIMIT', 2, 100.0, 'IOC')
+    assert order.status == 'EXPIRED' and order.filled == _units(1) and len(fills) == 1
+    assert engine.best('SELL') is None and engine.best('BUY') is None
+
+
+def test_limit_maker_and_filters():
+    """LIMIT_MAKER المتقاطع يُرفض، والكميات والأسعار خارج الخطوة تُرفض"""
+    simulator, market, _ = make_simulator()
+    submit(simulator, market, 'maker', 'SELL', 'LIMIT', 1, 100.0)
+
+    for args in (('BUY', 'LIMIT_MAKER', 1, 100.0), ('BUY', 'LIMIT', 1.0005, 99.0), ('BUY', 'LIMIT', 1, 99.005)):
+        try:
+            submit(simulator, market, 'taker', *args)
+        except SimulatorError as e:
+            assert e.code in (-2010, -1013)
+        else:
+            raise AssertionError(f"order {args} was accepted")
+
+
+def test_balances_reservation_and_cancel():
+    """الشراء بسعر أعلى من الأفضل يعيد الفرق، والإلغاء يعيد الحجز"""
+    simulator, market, _ = make_simulator()
+    taker = simulator.accounts['taker']
+    submit(simulator, market, 'maker', 'SELL', 'LIMIT', 1, 100.0)
+
+    order, _ = submit(simulator, market, 'taker', 'BUY', 'LIMIT', 2, 110.0)
+    # نُفذ 1 بسعر 100، والمتبقي 1 محجوز بسعر الحد 110
+    assert taker.free['BTC'] == _units(101)
+    assert taker.locked['USDT'] == _units(110)
+    assert taker.free['USDT'] == _units(100000 - 100 - 110)
+
+    simulator.cancel(order)
+    assert order.status == 'CANCELED'
+    assert taker.locked['USDT'] == 0
+    assert taker.free['USDT'] == _units(100000 - 100)
+    try:
+        simulator.cancel(order)
+    except SimulatorError as e:
+        assert e.code == -2011
+    else:
+        raise AssertionError("canceled order was canceled twice")
+
+
+def test_fees_are_charged_in_received_asset():
+    """العمولة تُخصم من الأصل المستلم لكل طرف"""
+    simulator, market, _ = make_simulator()
+    simulator.sim_config.update({'maker_fee_bps': 10, 'taker_fee_bps': 20})
+    submit(simulator, market, 'maker', 'BUY', 'LIMIT', 1, 100.0)
+    _, fills = submit(simulator, market, 'taker', 'SELL', 'MARKET', 1)
+
+    maker_order, taker_order = fills[0].maker, fills[0].taker
+    assert fills[0].commissions[maker_order.order_id] == (_units(0.001), 'BTC')
+    assert fills[0].commissions[taker_order.order_id] == (_units(0.2), 'USDT')
+    assert simulator.accounts['taker'].free['USDT'] == _units(100000 + 100 - 0.2)
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+            print(f"✅ {name}")
@@ -0,0 +1,234 @@
+# backend/python/testing/test_fast_lane.py
+"""
+🧪 اختبار المسار السريع - بناء القوالب لكل منصة، فحوص العدادات، حجز التعرض وتحريره، وربط الإشارات
+"""
+
+import asyncio
+import hashlib
+import hmac
+import os
+import sys
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import aiohttp
+
+from services import fast_lane as fast_lane_module
+from services.fast_lane import WIRE_FORMATS, FastLane, OrderTemplate, RiskCounters, get_signer
+from services.fixed_point import Precision
+from services.market_registry import MarketInfo
+from services.order_reconciler import OrderEvent, OrderEventType
+
+
+class FailingSession:
+    """جلسة HTTP يفشل إرسالها قبل وصول أي رد"""
+
+    def post(self, *args, **kwargs):
+        raise aiohttp.ClientConnectionError("connection reset")
+
+
+def make_lane(exchange='binance', symbol='BTC/USDT') -> FastLane:
+    lane = FastLane(pool=SimpleNamespace(exchange_configs={}))
+    lane.templates[(exchange, symbol)] = OrderTemplate(
+        exchange, symbol, symbol.replace('/', ''), 'https://api.example.com/api/v3/order', {},
+        get_signer('secret'), Precision.from_steps(0.01, 0.0001)
+    )
+    return lane
+
+
+def submit_with_network_error(lane: FastLane, amount: float = 0.01, price: float = 100.0) -> str:
+    """أمر محدد يفشل إرساله - يعيد معرف العميل المحجوز"""
+    original = fast_lane_module.http_client
+    fast_lane_module.http_client = SimpleNamespace(get_session=FailingSession)
+    try:
+        asyncio.run(lane.submit('binance', 'BTC/USDT', 'buy', amount, price, 'limit'))
+    except aiohttp.ClientConnectionError:
+        pass
+    else:
+        raise AssertionError("network error was swallowed")
+    finally:
+        fast_lane_module.http_client = original
+    (client_order_id,) = lane.unresolved
+    return client_order_id
+
+
+def terminal_event(client_order_id: str, event_type=OrderEventType.REJECTED) -> OrderEvent:
+    return OrderEvent(event_type, 'binance', None, client_order_id, 'BTC/USDT', 'buy', 0.01, 0.0, 0.0,
+                      None, event_type.value, 'missing')
+
+
+def parse_query(body: str) -> dict:
+    return dict(part.split('=', 1) for part in body.split('&'))
+
+
+def test_binance_template_build_and_signature():
+    """الكمية تُقرب للأسفل على خطوة اللوت، السعر لأقرب تيك، والتوقيع HMAC-SHA256 لجسم الطلب"""
+    template = OrderTemplate('binance', 'BTC/USDT', 'BTCUSDT', 'https://api.example.com/api/v3/order', {},
+                             get_signer('secret'), Precision.from_steps(0.01, 0.0001))
+    body = template.build('buy', 'limit', 0.12349, 100.456, 'fl-1')
+    query, signature = body.rsplit('&signature=', 1)
+    params = parse_query(query)
+
+    assert query.startswith('symbol=BTCUSDT&side=BUY&type=LIMIT&timeInForce=GTC')
+    assert params['quantity'] == '0.1234' and params['price'] == '100.46'
+    assert params['newClientOrderId'] == 'fl-1' and params['newOrderRespType'] == 'ACK'
+    assert signature == hmac.new(b'secret', query.encode(), hashlib.sha256).hexdigest()
+
+    market = parse_query(template.build('sell', 'market', 1.0, None, 'fl-2').rsplit('&signature=', 1)[0])
+    assert market['type'] == 'MARKET' and 'price' not in market and 'timeInForce' not in market
+
+
+def test_mexc_template_prepared_from_registry():
+    """قوالب mexc بعنوان ورأس المفتاح الخاصين بها وبدون timeInForce و newOrderRespType"""
+    market = MarketInfo('mexc', 'BTC/USDT', 'BTCUSDT', 'BTC', 'USDT', 'spot', True, 0.01, 0.0001,
+                        0.0001, None, None, None, 5.0, None)
+    pool = SimpleNamespace(exchange_configs={'mexc': {'apiKey': 'key', 'secret': 'secret'}})
+    lane = FastLane(pool=pool)
+    original = fast_lane_module.market_registry
+    fast_lane_module.market_registry = SimpleNamespace(
+        is_loaded=lambda exchange: True,
+        get_market=lambda exchange, symbol: market if symbol == 'BTC/USDT' else None,
+    )
+    try:
+        assert lane.prepare('mexc', ['BTC/USDT', 'DOGE/USDT']) == 1
+    finally:
+        fast_lane_module.market_registry = original
+
+    template = lane.templates[('mexc', 'BTC/USDT')]
+    assert template.url == WIRE_FORMATS['mexc']['base_url'] + '/order'
+    assert template.headers['X-MEXC-APIKEY'] == 'key'
+    assert lane.symbol_exchanges == {'BTC/USDT': 'mexc'}
+    body = template.build('buy', 'limit', 0.5, 100.0, 'fl-1')
+    assert 'timeInForce' not in body and 'newOrderRespType' not in body
+
+
+def test_risk_counter_checks():
+    """حد الصفقة، حد التعرض مع الحجوزات، وإيقاف المسار عند بلوغ الخسارة اليومية"""
+    risk = RiskCounters(account_balance=1000.0, max_risk_per_trade=0.1, max_portfolio_risk=0.25,
+                        max_daily_loss=50.0)
+    assert risk.max_order_notional == 100.0 and risk.max_exposure == 250.0
+    assert risk.check(101.0) == 'order_notional'
+
+    risk.record_fill('BTC/USDT', 100.0, opening=True)
+    risk.reserve(100.0)
+    assert risk.check(60.0, symbol='ETH/USDT') == 'portfolio_exposure'
+    assert risk.check(60.0, opening=False, symbol='BTC/USDT') is None
+    risk.release(100.0)
+    assert risk.check(60.0, symbol='ETH/USDT') is None
+
+    risk.record_pnl(-30.0)
+    assert risk.check(10.0) is None
+    risk.record_pnl(-20.0)
+    assert risk.halted and risk.check(10.0, opening=False) == 'daily_loss'
+
+
+def test_signal_submits_with_generation_timestamp():
+    """الإشارة الشاملة تُرسل بحد الصفقة وبزمن توليدها، وHOLD أو الثقة المنخفضة تُتجاهل"""
+    lane = make_lane()
+    lane.symbol_exchanges['BTC/USDT'] = 'binance'
+    lane.risk.set_balance(1000.0)
+    submitted = []
+
+    async def submit(exchange, symbol, side, amount, price=None, order_type='market', signal_ts=None):
+        submitted.append((exchange, symbol, side, amount, signal_ts))
+        return {'clientOrderId': 'fl-1'}
+
+    lane.submit = submit
+    original = fast_lane_module.market_stream
+    fast_lane_module.market_stream = SimpleNamespace(
+        store=SimpleNamespace(get_price=lambda symbol, exchange, max_age=None: 100.0))
+    try:
+        def signal(kind, confidence=0.9):
+            return SimpleNamespace(symbol='BTC/USDT', signal=SimpleNamespace(value=kind), confidence=confidence)
+
+        assert asyncio.run(lane.on_signal(signal('HOLD'), 1)) is None
+        assert asyncio.run(lane.on_signal(signal('BUY', confidence=0.3), 2)) is None
+        assert asyncio.run(lane.on_signal(signal('BUY'), 3)) == {'clientOrderId': 'fl-1'}
+        assert asyncio.run(lane.on_signal(signal('SELL'), 4)) is None
+    finally:
+        fast_lane_module.market_stream = original
+    assert submitted == [('binance', 'BTC/USDT', 'buy', lane.risk.max_order_notional / 100.0, 3)]
+
+
+def test_network_error_reservation_released_by_reconciler_event():
+    """خطأ شبكة يبقي الحجز حتى يصل الحدث النهائي من المطابقة"""
+    lane = make_lane()
+    client_order_id = submit_with_network_error(lane)
+    assert lane.risk.pending == 1.0 and client_order_id in lane.inflight
+
+    asyncio.run(lane.on_order_event(terminal_event(client_order_id)))
+    assert lane.risk.pending == 0.0
+    assert lane.inflight == {} and lane.unresolved == {}
+
+
+def test_unresolved_reservation_expires_after_ttl():
+    """بدون حدث من المطابقة يُحرر الحجز بعد unresolved_ttl"""
+    lane = make_lane()
+    client_order_id = submit_with_network_error(lane)
+    deadline = lane.unresolved[client_order_id]
+
+    assert lane.expire_unresolved(deadline - 1) == 0 and lane.risk.pending == 1.0
+    assert lane.expire_unresolved(deadline) == 1
+    assert lane.risk.pending == 0.0 and lane.inflight == {}
+    assert lane.stats['expired'] == 1
+
+
+def test_seed_risk_from_manager_and_positions():
+    """حدود مدير المخاطر والمراكز المفتوحة تدخل العدادات، والحجوزات الجارية تبقى"""
+    lane = make_lane()
+    lane.risk.reserve(5.0)
+    manager = SimpleNamespace(
+        risk_limits={'max_position_size': 300.0, 'max_portfolio_risk': 0.5, 'max_open_positions': 2,
+                     'max_daily_loss': 100.0},
+        risk_config={'max_risk_per_trade': 0.05},
+    )
+    lane.seed_risk(manager, [('ETH/USDT', 150.0), ('SOL/USDT', 50.0)], account_balance=1000.0)
+
+    assert lane.risk.max_order_notional == 50.0 and lane.risk.max_exposure == 500.0
+    assert lane.risk.exposure == 200.0 and lane.risk.pending == 5.0
+    assert lane.risk.check(10.0, True, 'BTC/USDT') == 'open_positions'
+    assert lane.risk.check(10.0, True, 'ETH/USDT') is None
+
+
+def test_fills_from_other_paths_update_exposure():
+    """التنفيذ الفوري من خط الأوامر وأحداث المطابقة لأوامر الغير تدخل التعرض"""
+    lane = make_lane()
+    lane.record_order('ETH/USDT', 'buy', {'filled': 0.5, 'average': 200.0, 'status': 'open'})
+    assert lane.risk.symbol_exposure == {'ETH/USDT': 100.0}
+
+    fill = OrderEvent(OrderEventType.FILLED, 'binance', '7', 'other', 'ETH/USDT', 'buy', 1.0, 1.0, 0.5,
+                      200.0, 'closed', 'rest')
+    asyncio.run(lane.on_order_event(fill))
+    assert lane.risk.exposure == 200.0
+
+    sell = OrderEvent(OrderEventType.FILLED, 'binance', '8', 'other-2', 'ETH/USDT', 'sell', 1.0, 1.0, 1.0,
+                      200.0, 'closed', 'rest')
+    asyncio.run(lane.on_order_event(sell))
+    assert lane.risk.exposure == 0.0 and lane.risk.open_positions == 0
+
+
+def test_refresh_balance_from_exchange():
+    """رصيد عملة التسعير يعيد حساب العتبات، وفشل الجلب يبقي الرصيد الحالي"""
+    class Pool:
+        exchange_configs = {}
+        balance = {'total': {'USDT': 2000.0, 'BTC': 1.0}}
+
+        async def call(self, exchange, method):
+            if self.balance is None:
+                raise ConnectionError("down")
+            return self.balance
+
+    pool = Pool()
+    lane = FastLane(pool=pool)
+    assert asyncio.run(lane.refresh_balance('binance')) == 2000.0
+    assert lane.risk.max_order_notional == 20.0
+    pool.balance = None
+    assert asyncio.run(lane.refresh_balance('binance')) == 2000.0
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+            print(f"✅ {name}")
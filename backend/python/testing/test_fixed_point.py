@@ -0,0 +1,86 @@
+# backend/python/testing/test_fixed_point.py
+"""
+🧪 اختبار النقطة الثابتة - from_float و to_units يطابقان Decimal(str(value)) في كل أوضاع التقريب
+"""
+
+import os
+import random
+import sys
+from decimal import Decimal
+import decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from services.fixed_point import (
+    FixedPoint, to_units, ROUND_DOWN, ROUND_UP, ROUND_HALF_UP, ROUND_FLOOR, ROUND_CEILING
+)
+
+DECIMAL_ROUNDING = {
+    ROUND_DOWN: decimal.ROUND_DOWN,
+    ROUND_UP: decimal.ROUND_UP,
+    ROUND_HALF_UP: decimal.ROUND_HALF_UP,
+    ROUND_FLOOR: decimal.ROUND_FLOOR,
+    ROUND_CEILING: decimal.ROUND_CEILING,
+}
+
+
+def expected_units(value: float, scale: int, rounding: str) -> int:
+    return int(Decimal(str(value)).scaleb(scale).quantize(Decimal(1), rounding=DECIMAL_ROUNDING[rounding]))
+
+
+def fuzz_values(count: int, seed: int = 7):
+    """قيم عشوائية وقيم مقربة وقيم على حدود التقريب بأخطاء ULP قليلة"""
+    rng = random.Random(seed)
+    values = []
+    while len(values) < count:
+        scale = rng.randint(0, 10)
+        magnitude = 10 ** rng.uniform(-6, 6)
+        value = rng.uniform(-magnitude, magnitude)
+        kind = rng.random()
+        if kind < 0.3:
+            value = round(value, rng.randint(0, 12))
+        elif kind < 0.6:
+            value = round(value, scale) + rng.choice([-1, 1]) * rng.randint(1, 4) * abs(value) * 2 ** -52
+        elif kind < 0.8:
+            value = round(value, scale) + rng.choice([-0.5, 0.5]) * 10 ** -scale
+        if abs(value) * 10 ** scale < 9e15:
+            values.append((value, scale))
+    return values
+
+
+def test_from_float_matches_decimal():
+    """from_float بكل أوضاع التقريب = Decimal(str(value)) مقرباً"""
+    for value, scale in fuzz_values(20000):
+        for rounding in DECIMAL_ROUNDING:
+            assert FixedPoint.from_float(value, scale, rounding).units == expected_units(value, scale, rounding), \
+                (value, scale, rounding)
+
+
+def test_to_units_matches_decimal():
+    """النسخة المتجهة تعطي نفس الوحدات"""
+    samples = fuzz_values(20000, seed=11)
+    for scale in range(11):
+        values = np.array([value for value, value_scale in samples if value_scale == scale])
+        for rounding in DECIMAL_ROUNDING:
+            expected = [expected_units(value, scale, rounding) for value in values]
+            assert to_units(values, scale, rounding).tolist() == expected, (scale, rounding)
+
+
+def test_directional_rounding_does_not_snap():
+    """القيم القريبة جداً من وحدة لا تُقرب في الاتجاه الخطأ"""
+    assert FixedPoint.from_float(210.79999999999993, 1, ROUND_DOWN).units == 2107
+    assert FixedPoint.from_float(64518.05200000003, 3, ROUND_CEILING).units == 64518053
+    assert FixedPoint.from_float(-24.082066999999988, 6, ROUND_DOWN).units == -24082066
+    # القيم الممثلة بالضبط عند الدقة تبقى كما هي
+    assert FixedPoint.from_float(0.29, 2, ROUND_DOWN).units == 29
+    assert FixedPoint.from_float(0.1 + 0.2, 1, ROUND_DOWN).units == 3
+    assert to_units(np.array([[0.29, 1.005]]), 2, ROUND_DOWN).tolist() == [[29, 100]]
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+            print(f"✅ {name}")
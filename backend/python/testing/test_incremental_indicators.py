@@ -0,0 +1,115 @@
+# backend/python/testing/test_incremental_indicators.py
+"""
+🧪 اختبار محرك المؤشرات التزايدي - تطابق النوافذ المتحركة مع الحساب من بداية النافذة (المسار الدفعي)
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import talib
+
+from services.incremental_indicators import (
+    IndicatorEngine, FeatureState, FEATURE_COLUMNS, COLUMN_INDEX, CANDLE_PATTERNS, window_seeded
+)
+
+WINDOW = 200
+
+
+def make_candles(count: int, seed: int = 3):
+    rng = np.random.default_rng(seed)
+    closes = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, count)))
+    opens = closes * (1 + rng.normal(0, 0.002, count))
+    highs = np.maximum(opens, closes) * (1 + np.abs(rng.normal(0, 0.003, count)))
+    lows = np.minimum(opens, closes) * (1 - np.abs(rng.normal(0, 0.003, count)))
+    volumes = rng.lognormal(3, 1, count)
+    timestamps = 1_700_000_000_000 + np.arange(count) * 3_600_000
+    return [list(candle) for candle in zip(timestamps, opens, highs, lows, closes, volumes)]
+
+
+def fresh_window(candles) -> FeatureState:
+    """حالة جديدة تبدأ من أول شمعة في النافذة - نفس بداية المسار الدفعي"""
+    state = FeatureState(len(candles))
+    for candle in candles:
+        state.update(candle)
+    return state
+
+
+def assert_close(actual, expected, name):
+    assert np.allclose(actual, expected, rtol=1e-7, atol=1e-9, equal_nan=True), name
+
+
+def test_rolling_windows_match_window_start():
+    """حالة طويلة العمر على نوافذ متحركة = حساب جديد من أول كل نافذة (OBV وEMA100 وWilder دون انحراف)"""
+    candles = make_candles(600)
+    engine = IndicatorEngine(history=WINDOW)
+    for end in range(WINDOW, len(candles) + 1, 13):
+        window = candles[end - WINDOW:end]
+        features = engine.features('BTC/USDT', '1h', window)
+        reference = fresh_window(window)
+        assert engine.stats['rebuilds'] == 1
+        for index, name in enumerate(FEATURE_COLUMNS):
+            assert_close(features[:, index], reference.finalized()[:, index], f"{name} @ {end}")
+
+
+def test_window_seeded_columns_match_talib():
+    """الأعمدة المعاد بذرها تساوي talib على شموع النافذة فقط"""
+    candles = make_candles(500, seed=5)
+    engine = IndicatorEngine(history=WINDOW)
+    engine.sync('ETH/USDT', '1h', candles[:300])
+    window = candles[300 - WINDOW:300]
+    rows = engine.sync('ETH/USDT', '1h', window).window(WINDOW)
+
+    opens, highs, lows, closes, volumes = (np.array([candle[i] for candle in window]) for i in range(1, 6))
+    assert_close(rows[:, COLUMN_INDEX['obv']], talib.OBV(closes, volumes), 'obv')
+    assert_close(rows[:, COLUMN_INDEX['ema_100']], talib.EMA(closes, timeperiod=100), 'ema_100')
+    assert_close(rows[:, COLUMN_INDEX['rsi_21']], talib.RSI(closes, timeperiod=21), 'rsi_21')
+    assert_close(rows[:, COLUMN_INDEX['adx']], talib.ADX(highs, lows, closes, timeperiod=14), 'adx')
+    assert_close(rows[:, COLUMN_INDEX['trix']], talib.TRIX(closes), 'trix')
+    assert_close(rows[:, COLUMN_INDEX['adosc']], talib.ADOSC(highs, lows, closes, volumes), 'adosc')
+    for pattern in CANDLE_PATTERNS:
+        assert_close(rows[:, COLUMN_INDEX[pattern.lower()]], getattr(talib, pattern)(opens, highs, lows, closes),
+                     pattern)
+    # تاريخ الحالة الكامل ما زال في matrix
+    assert np.isnan(rows[0, COLUMN_INDEX['sma_100']])
+    assert not np.isnan(engine.states[('ETH/USDT', '1h')].matrix(WINDOW)[0, COLUMN_INDEX['sma_100']])
+
+
+def test_fresh_state_matches_talib():
+    """المؤشرات التزايدية من البداية = talib على نفس الشموع، وأعمدة window_seeded لا تُحسب في الحالة"""
+    candles = make_candles(300, seed=9)
+    rows = fresh_window(candles).matrix()
+    opens, highs, lows, closes, volumes = (np.array([candle[i] for candle in candles]) for i in range(1, 6))
+    stoch_k, stoch_d = talib.STOCH(highs, lows, closes)
+    expected = {
+        'sma_50': talib.SMA(closes, timeperiod=50), 'stoch_k': stoch_k, 'stoch_d': stoch_d,
+        'cci': talib.CCI(highs, lows, closes), 'williams_r': talib.WILLR(highs, lows, closes),
+        'uo': talib.ULTOSC(highs, lows, closes), 'mfi': talib.MFI(highs, lows, closes, volumes),
+    }
+    for name, values in expected.items():
+        assert_close(rows[:, COLUMN_INDEX[name]], values, name)
+    for name in window_seeded(opens, highs, lows, closes, volumes):
+        assert np.isnan(rows[:, COLUMN_INDEX[name]]).all(), name
+
+
+def test_replaced_candle_matches_final():
+    """تحديثات جزئية للشمعة الأخيرة ثم قيمتها النهائية = تغذية القيمة النهائية مرة واحدة"""
+    candles = make_candles(250, seed=11)
+    rng = np.random.default_rng(0)
+    engine = IndicatorEngine(history=WINDOW)
+    for candle in candles:
+        for _ in range(2):
+            engine.update('SOL/USDT', '1h', [candle[0]] + [value * (1 + rng.normal(0, 0.001)) for value in candle[1:]])
+        engine.update('SOL/USDT', '1h', candle)
+
+    reference = fresh_window(candles).matrix(WINDOW)
+    assert_close(engine.states[('SOL/USDT', '1h')].matrix(WINDOW), reference, 'replaced')
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+            print(f"✅ {name}")
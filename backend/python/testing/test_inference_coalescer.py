@@ -0,0 +1,98 @@
+# backend/python/testing/test_inference_coalescer.py
+"""
+🧪 اختبار دمج طلبات الاستدلال - تمريرة واحدة لكل نموذج، خارج حلقة الأحداث
+"""
+
+import asyncio
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from services.inference_coalescer import InferenceCoalescer
+
+
+class RecordingRunner:
+    """منفذ يسجل أحجام الدفعات والخيط الذي نُفذ فيه"""
+
+    def __init__(self, offset: float = 0.0):
+        self.offset = offset
+        self.batches = []
+        self.threads = set()
+
+    def __call__(self, windows: np.ndarray) -> np.ndarray:
+        self.batches.append(len(windows))
+        self.threads.add(threading.get_ident())
+        return windows.sum(axis=(1, 2))[:, None] + self.offset
+
+
+def test_same_model_requests_share_one_pass():
+    """طلبات متزامنة لنفس النموذج = تمريرة واحدة بصفوف بنفس ترتيب الطلبات"""
+    coalescer = InferenceCoalescer(max_delay_ms=5, max_batch=64)
+    runner = RecordingRunner()
+    windows = [np.full((4, 3), float(i)) for i in range(10)]
+
+    async def main():
+        return await asyncio.gather(*[coalescer.infer(('BTC/USDT', 0, (4, 3)), runner, w) for w in windows])
+
+    outputs = asyncio.run(main())
+    assert runner.batches == [10]
+    assert [float(output[0]) for output in outputs] == [12.0 * i for i in range(10)]
+    assert threading.get_ident() not in runner.threads
+    assert coalescer.get_coalescer_status()['largest_batch'] == 10
+
+
+def test_different_models_are_not_merged():
+    """نموذجان مختلفان لا يُدمجان - كل مفتاح بمنفذه"""
+    coalescer = InferenceCoalescer(max_delay_ms=5)
+    btc, eth = RecordingRunner(), RecordingRunner(offset=1000.0)
+    window = np.ones((4, 3))
+
+    async def main():
+        return await asyncio.gather(
+            coalescer.infer(('BTC/USDT', 0, (4, 3)), btc, window),
+            coalescer.infer(('ETH/USDT', 0, (4, 3)), eth, window),
+            coalescer.infer(('BTC/USDT', 0, (4, 3)), btc, window),
+        )
+
+    outputs = asyncio.run(main())
+    assert btc.batches == [2] and eth.batches == [1]
+    assert [float(output[0]) for output in outputs] == [12.0, 1012.0, 12.0]
+
+
+def test_full_batch_runs_without_waiting():
+    """امتلاء الدفعة ينفذها فوراً والباقي ينتظر المهلة"""
+    coalescer = InferenceCoalescer(max_delay_ms=5, max_batch=4)
+    runner = RecordingRunner()
+
+    async def main():
+        return await asyncio.gather(*[coalescer.infer('model', runner, np.ones((2, 2))) for _ in range(6)])
+
+    assert len(asyncio.run(main())) == 6
+    assert runner.batches == [4, 2]
+
+
+def test_runner_error_reaches_every_caller():
+    """خطأ التمريرة يصل لكل المنتظرين"""
+    coalescer = InferenceCoalescer(max_delay_ms=5)
+
+    def failing(windows):
+        raise RuntimeError("model failed")
+
+    async def main():
+        return await asyncio.gather(*[coalescer.infer('model', failing, np.ones((2, 2))) for _ in range(3)],
+                                    return_exceptions=True)
+
+    results = asyncio.run(main())
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert coalescer.stats['errors'] == 1
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+            print(f"✅ {name}")
@@ -0,0 +1,113 @@
+# backend/python/testing/test_lite_inference.py
+"""
+🧪 اختبار الاستدلال الخفيف - استدعاء واحد للمفسر لكل دفعة، والرجوع لنافذة بنافذة للنماذج بدفعة ثابتة
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from services import lite_inference
+from services.lite_inference import LiteModel, measure_drift
+
+
+class FakeInterpreter:
+    """مفسر بنفس واجهة TFLite - المخرج مجموع النافذة، والتحجيم يفشل للنماذج بدفعة ثابتة"""
+
+    def __init__(self, model_path: str, num_threads: int = 1, resizable: bool = True):
+        self.resizable = resizable
+        self.shape = [1, 4, 3]
+        self.invoked = []
+        self.resets = 0
+
+    def allocate_tensors(self):
+        if self.shape[0] != 1 and not self.resizable:
+            raise RuntimeError("fused LSTM state has a fixed batch")
+
+    def get_input_details(self):
+        return [{'index': 0, 'shape': np.array(self.shape), 'dtype': np.float32}]
+
+    def get_output_details(self):
+        return [{'index': 1, 'shape': np.array([self.shape[0], 1]), 'dtype': np.float32}]
+
+    def resize_tensor_input(self, index, shape):
+        self.shape = list(shape)
+
+    def reset_all_variables(self):
+        self.resets += 1
+
+    def set_tensor(self, index, value):
+        assert list(value.shape) == self.shape
+        self.value = value
+
+    def invoke(self):
+        self.invoked.append(len(self.value))
+
+    def get_tensor(self, index):
+        return self.value.sum(axis=(1, 2))[:, None]
+
+
+def make_model(resizable: bool) -> LiteModel:
+    original = lite_inference.Interpreter
+    lite_inference.Interpreter = lambda model_path, num_threads: FakeInterpreter(model_path, num_threads, resizable)
+    try:
+        return LiteModel('model.tflite')
+    finally:
+        lite_inference.Interpreter = original
+
+
+def test_batch_runs_in_one_invoke():
+    """الدفعة كلها باستدعاء واحد، والتحجيم فقط عند تغير حجمها"""
+    model = make_model(resizable=True)
+    windows = np.arange(10 * 4 * 3, dtype=np.float32).reshape(10, 4, 3)
+    outputs = model.run(windows)
+    assert outputs.shape == (10, 1)
+    assert np.allclose(outputs[:, 0], windows.sum(axis=(1, 2)))
+    model.run(windows)
+    assert model.interpreter.invoked == [1, 10, 10]
+    assert model.interpreter.resets == 3
+    assert (model.batch_size, model.invocations, model.windows) == (10, 3, 21)
+
+
+def test_fixed_batch_model_falls_back_to_windows():
+    """نموذج بدفعة ثابتة يُنفذ نافذة بنافذة بنفس النتائج"""
+    model = make_model(resizable=False)
+    windows = np.random.default_rng(0).normal(size=(5, 4, 3)).astype(np.float32)
+    outputs = model.run(windows)
+    assert not model.resizable and model.batch_size == 1
+    assert model.interpreter.invoked == [1] * 6
+    assert np.allclose(outputs[:, 0], windows.sum(axis=(1, 2)), atol=1e-5)
+
+
+def test_sigmoid_agreement_uses_threshold():
+    """مخرج sigmoid واحد - الاتفاق على جهة العتبة 0.5 وليس argmax"""
+
+    class Constant:
+        def __init__(self, values):
+            self.values = np.asarray(values, dtype=np.float32)[:, None]
+
+        def __call__(self, batch, training=False):
+            return self.values[:len(batch)]
+
+        def run(self, batch):
+            return self.values[:len(batch)]
+
+    windows = np.zeros((4, 4, 3), dtype=np.float32)
+    drift = measure_drift(Constant([0.9, 0.2, 0.6, 0.4]), Constant([0.8, 0.3, 0.4, 0.6]), windows)
+    assert drift['agreement'] == 0.5
+    assert np.isclose(drift['max_abs_error'], 0.2)
+
+    softmax = np.array([[0.7, 0.3], [0.2, 0.8]], dtype=np.float32)
+    reference = type('Reference', (), {'__call__': lambda self, batch, training=False: softmax})()
+    candidate = type('Candidate', (), {'run': lambda self, batch: softmax[:, ::-1]})()
+    assert measure_drift(reference, candidate, np.zeros((2, 4, 3)))['agreement'] == 0.0
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+            print(f"✅ {name}")
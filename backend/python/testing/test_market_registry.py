@@ -0,0 +1,46 @@
+# backend/python/testing/test_market_registry.py
+"""
+🧪 اختبار التحقق من الأوامر في سجل الأسواق - مضاعفات التيك واللوت بوحدات صحيحة
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.market_registry import MarketInfo
+
+
+def make_market(tick_size: float = 0.01, amount_step: float = 0.1) -> MarketInfo:
+    return MarketInfo(exchange='binance', symbol='BTC/USDT', market_id='BTCUSDT', base='BTC', quote='USDT',
+                      market_type='spot', active=True, tick_size=tick_size, amount_step=amount_step,
+                      min_amount=None, max_amount=None, min_price=None, max_price=None,
+                      min_notional=None, max_notional=None)
+
+
+def test_float_sums_on_step_are_valid():
+    """0.1 + 0.2 (0.30000000000000004) على خطوة 0.1 ليست خارج الخطوة"""
+    market = make_market()
+    assert market.validate_order(0.1 + 0.2, 0.07 + 0.01 * 3) == []
+    assert market.validate_order(3 * 0.1, 1.1 + 2.2) == []
+
+
+def test_off_step_values_are_rejected():
+    """قيم بين مضاعفين تُرفض"""
+    market = make_market()
+    errors = market.validate_order(0.34, 100.005)
+    assert len(errors) == 2
+
+
+def test_coarse_steps():
+    """خطوات أكبر من 1 وكسرية غير عشرية"""
+    market = make_market(tick_size=0.5, amount_step=5)
+    assert market.validate_order(15, 100.5) == []
+    assert len(market.validate_order(12, 100.25)) == 2
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+            print(f"✅ {name}")
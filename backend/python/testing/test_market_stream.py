@@ -0,0 +1,65 @@
+# backend/python/testing/test_market_stream.py
+"""
+🧪 اختبار مخزن التدفق - قراءة الأسعار مفتاحها المنصة ولا تُستبدل بأسعار منصة أخرى
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.market_stream import MarketDataStream, Tick, TickStore
+
+
+def make_tick(exchange: str, symbol: str = 'BTC/USDT', price: float = 100.0) -> Tick:
+    return Tick(exchange=exchange, symbol=symbol, price=price, bid=price - 0.5, ask=price + 0.5,
+                high_24h=price * 1.1, low_24h=price * 0.9, change_24h=1.0,
+                base_volume=10.0, quote_volume=10.0 * price, timestamp=int(time.time() * 1000))
+
+
+def test_reads_are_keyed_by_exchange():
+    """سعر Binance لا يظهر عند القراءة لـ MEXC"""
+    store = TickStore()
+    store.update_tick(make_tick('binance', price=100.0))
+
+    assert store.get_tick('BTC/USDT', 'mexc') is None
+    assert store.get_price('BTC/USDT', 'mexc', max_age=5) is None
+    assert not store.is_fresh('BTC/USDT', 'mexc', 5)
+
+    assert store.get_price('BTC/USDT', 'binance', max_age=5) == 100.0
+    assert store.is_fresh('BTC/USDT', 'binance', 5)
+
+
+def test_same_symbol_on_two_exchanges():
+    """نفس الرمز على منصتين يحتفظ بسعر كل منصة"""
+    store = TickStore()
+    store.update_tick(make_tick('binance', price=100.0))
+    store.update_tick(make_tick('mexc', price=101.0))
+
+    assert store.get_price('BTC/USDT', 'binance') == 100.0
+    assert store.get_price('BTC/USDT', 'mexc') == 101.0
+
+
+def test_stale_price_is_rejected():
+    """السعر الأقدم من max_age لا يُعاد"""
+    store = TickStore()
+    store.update_tick(make_tick('binance'))
+    store.received_at[('binance', 'BTC/USDT')] -= 10
+
+    assert store.get_price('BTC/USDT', 'binance', max_age=5) is None
+    assert store.get_price('BTC/USDT', 'binance') == 100.0
+
+
+def test_stream_covers_only_adapter_exchange():
+    """محول Binance لا يُستخدم لرموز منصة أخرى"""
+    stream = MarketDataStream()
+    assert stream.covers('binance')
+    assert not stream.covers('mexc')
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+            print(f"✅ {name}")
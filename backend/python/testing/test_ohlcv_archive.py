@@ -0,0 +1,123 @@
+# backend/python/testing/test_ohlcv_archive.py
+"""
+🧪 اختبار أرشيف OHLCV - الإلحاق والقراءة، ملفات الإلحاق والضغط، الأقسام الباردة والتعبئة من المنصة
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from services.ohlcv_archive import OHLCVArchive, timeframe_to_ms
+
+HOUR = timeframe_to_ms('1h')
+
+
+def make_rows(start_ms: int, count: int, step: int = HOUR, close_offset: float = 0.0) -> np.ndarray:
+    timestamps = start_ms + step * np.arange(count, dtype=np.float64)
+    close = 100.0 + np.arange(count) + close_offset
+    return np.column_stack([timestamps, close - 1, close + 1, close - 2, close, np.full(count, 10.0)])
+
+
+class FakePool:
+    """مجمع منصات يعيد شموعاً محفوظة بصفحات مثل fetch_ohlcv"""
+
+    def __init__(self, rows: np.ndarray):
+        self.rows = rows.tolist()
+        self.calls = []
+
+    async def call(self, exchange, method, symbol, timeframe, since_ms, limit):
+        assert method == 'fetch_ohlcv'
+        self.calls.append(since_ms)
+        return [row for row in self.rows if row[0] >= since_ms][:limit]
+
+
+def test_append_and_read_round_trip():
+    """الإلحاق المرتب يكتب الملف الرئيسي والقراءة عرض memmap بدون نسخ"""
+    with tempfile.TemporaryDirectory() as root:
+        archive = OHLCVArchive(root)
+        rows = make_rows(0, 10)
+        assert archive.append('binance', 'BTC/USDT', '1h', rows[:6]) == 6
+        assert archive.append('binance', 'BTC/USDT', '1h', rows[6:]) == 4
+
+        view = archive.read('binance', 'BTC/USDT', '1h', 2 * HOUR, 5 * HOUR)
+        assert isinstance(view, np.memmap)
+        assert np.array_equal(view, rows[2:6])
+        assert np.array_equal(archive.read_last('binance', 'BTC/USDT', '1h', 3), rows[-3:])
+        assert archive.last_timestamp('binance', 'BTC/USDT', '1h') == 9 * HOUR
+        assert archive.list_series() == [('binance', 'BTC/USDT', '1h')]
+
+
+def test_backfill_rows_go_to_delta_and_compact_merges():
+    """الشموع القديمة في ملف إلحاق تُدمج عند القراءة، والضغط يعيد كتابة ملف رئيسي واحد"""
+    with tempfile.TemporaryDirectory() as root:
+        archive = OHLCVArchive(root)
+        rows = make_rows(0, 10)
+        archive.append('binance', 'BTC/USDT', '1h', rows[5:])
+        # تصحيح لشمعة موجودة مع شموع أقدم - الكتابة الأحدث تفوز
+        archive.append('binance', 'BTC/USDT', '1h', make_rows(0, 6, close_offset=1000.0))
+
+        merged = archive.read('binance', 'BTC/USDT', '1h')
+        assert len(merged) == 10 and merged[5, 4] == 1105.0
+        assert archive.get_series_info('binance', 'BTC/USDT', '1h')['delta_files'] == 1
+
+        result = archive.compact('binance', 'BTC/USDT', '1h')
+        assert result['rows'] == 10 and result['merged_deltas'] == 1
+        assert np.array_equal(archive.read('binance', 'BTC/USDT', '1h'), merged)
+        assert archive.get_series_info('binance', 'BTC/USDT', '1h')['delta_files'] == 0
+
+
+def test_cold_partition_read_across():
+    """الشموع الأقدم من الحد تنتقل لقسم بارد مضغوط وتبقى ضمن القراءات"""
+    with tempfile.TemporaryDirectory() as root:
+        archive = OHLCVArchive(root)
+        rows = make_rows(0, 20)
+        archive.append('binance', 'ETH/USDT', '1h', rows)
+        result = archive.compact('binance', 'ETH/USDT', '1h', cold_before_ms=8 * HOUR, codec='lzma')
+
+        assert result['rows'] == 12 and result['cold_partition'].endswith(f".cold-0-{7 * HOUR}.lzma")
+        assert np.array_equal(archive.read('binance', 'ETH/USDT', '1h', 6 * HOUR, 9 * HOUR), rows[6:10])
+        assert np.array_equal(archive.read_last('binance', 'ETH/USDT', '1h', 15), rows[-15:])
+
+
+def test_backfill_pages_closed_candles_only():
+    """التعبئة بصفحات حتى نهاية البيانات، والشمعة المفتوحة لا تُؤرشف"""
+    with tempfile.TemporaryDirectory() as root:
+        archive = OHLCVArchive(root)
+        now_ms = int(time.time() * 1000) // HOUR * HOUR
+        rows = make_rows(now_ms - 9 * HOUR, 10)
+        pool = FakePool(rows)
+
+        written = asyncio.run(archive.backfill(pool, 'binance', 'BTC/USDT', '1h', now_ms - 9 * HOUR, page_limit=4))
+        assert written == 9 and len(pool.calls) == 3
+        assert np.array_equal(archive.read('binance', 'BTC/USDT', '1h'), rows[:-1])
+
+
+def test_ensure_history_fetches_before_first_archived_candle():
+    """أرشيف أقصر من المطلوب يُعبأ بالشموع السابقة لبدايته فقط"""
+    with tempfile.TemporaryDirectory() as root:
+        archive = OHLCVArchive(root)
+        now_ms = int(time.time() * 1000) // HOUR * HOUR
+        rows = make_rows(now_ms - 12 * HOUR, 12)
+        archive.append('binance', 'BTC/USDT', '1h', rows[-4:])
+        pool = FakePool(rows)
+
+        history = asyncio.run(archive.ensure_history(pool, 'binance', 'BTC/USDT', '1h', 10))
+        assert np.array_equal(history, rows[-10:])
+        assert archive.get_series_info('binance', 'BTC/USDT', '1h')['delta_files'] == 1
+
+        calls = len(pool.calls)
+        asyncio.run(archive.ensure_history(pool, 'binance', 'BTC/USDT', '1h', 10))
+        assert len(pool.calls) == calls
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+            print(f"✅ {name}")
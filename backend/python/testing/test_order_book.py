@@ -0,0 +1,186 @@
+# backend/python/testing/test_order_book.py
+"""
+🧪 اختبار دفتر الأوامر L2 - اللقطة والفروقات، إعادة المزامنة عند فجوة التسلسل، العمق والاختلال والانزلاق
+الفروقات واللقطات من خادم إعادة التشغيل (market_replay) بدون اتصال شبكة
+"""
+
+import asyncio
+import json
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.market_replay import MarketReplayServer
+from services.order_book import DepthDiff, OrderBook, OrderBookManager
+
+
+def make_book() -> OrderBook:
+    book = OrderBook('BTC/USDT', 'binance')
+    book.apply_snapshot([(100.0, 1.0), (99.0, 2.0)], [(101.0, 1.0), (102.0, 3.0)], 10)
+    return book
+
+
+def depth_message(server: MarketReplayServer, symbol: str = 'BTCUSDT') -> str:
+    """رسالة depthUpdate من الدفتر العشوائي للخادم بصيغة التدفق المجمع"""
+    data = server._depth_event(symbol, 1_700_000_000_000, 100.0)
+    return json.dumps({'stream': f"{symbol.lower()}@depth@100ms", 'data': data})
+
+
+def assert_matches_server(book: OrderBook, server: MarketReplayServer, symbol: str = 'BTCUSDT'):
+    """الدفتر المحلي = دفتر الخادم بعد كل الفروقات"""
+    expected = server.books[symbol]
+    assert book.last_update_id == expected['last_update_id']
+    assert dict(book.bids.levels(len(book.bids))) == expected['bids']
+    assert dict(book.asks.levels(len(book.asks))) == expected['asks']
+
+
+async def drain(manager: OrderBookManager) -> None:
+    await asyncio.gather(*manager.resync_tasks.values())
+
+
+def test_snapshot_and_diffs():
+    """الفرق يعدل ويضيف ويحذف مستويات، والفروقات الأقدم من اللقطة تُتجاهل، والفجوة تلغي المزامنة"""
+    book = make_book()
+    assert (book.best_bid(), book.best_ask()) == (100.0, 101.0)
+
+    assert book.apply_diff(DepthDiff('BTC/USDT', 5, 10, [(100.0, 9.0)], [], 0))
+    assert book.bids.levels(1) == [(100.0, 1.0)]
+
+    assert book.apply_diff(DepthDiff('BTC/USDT', 11, 12, [(100.5, 2.0), (99.0, 0.0)], [(101.0, 0.0)], 0))
+    assert book.bids.levels(5) == [(100.5, 2.0), (100.0, 1.0)]
+    assert book.asks.levels(5) == [(102.0, 3.0)]
+    assert book.last_update_id == 12 and book.synced
+
+    assert not book.apply_diff(DepthDiff('BTC/USDT', 14, 15, [(98.0, 1.0)], [], 0))
+    assert not book.synced and book.last_update_id == 12
+
+
+def test_depth_imbalance_and_slippage():
+    """العمق ضمن bps من السعر الأوسط، الاختلال، والانزلاق بالمرور على المستويات"""
+    book = make_book()
+    assert book.mid_price() == 100.5
+    assert abs(book.spread_bps() - 1 / 100.5 * 10000) < 1e-9
+
+    depth = book.depth(100)
+    assert depth == {'bid_size': 1.0, 'ask_size': 1.0, 'bid_notional': 100.0, 'ask_notional': 101.0}
+    assert abs(book.imbalance(100) - (100.0 - 101.0) / 201.0) < 1e-12
+    assert book.depth(1000)['ask_size'] == 4.0
+
+    buy = book.estimate_slippage('buy', 2.0)
+    assert buy['fully_filled'] and buy['average_price'] == 101.5 and buy['worst_price'] == 102.0
+    assert abs(buy['slippage_bps'] - 0.5 / 101.0 * 10000) < 1e-9
+
+    sell = book.estimate_slippage('sell', 0.5)
+    assert sell['average_price'] == 100.0 and sell['slippage_bps'] == 0.0
+
+    partial = book.estimate_slippage('buy', 10.0)
+    assert not partial['fully_filled'] and partial['filled'] == 4.0
+
+
+def test_replay_diffs_buffered_until_snapshot():
+    """أول فرق يطلب لقطة، والفروقات التي تصل أثناء جلبها تُخزن ثم تُطبق فوقها"""
+    random.seed(1)
+    server = MarketReplayServer()
+
+    async def run():
+        taken, release = asyncio.Event(), asyncio.Event()
+
+        async def slow_snapshot(symbol, limit):
+            snapshot = await server.depth_snapshot(symbol, limit)
+            taken.set()
+            await release.wait()
+            return snapshot
+
+        manager = OrderBookManager(snapshot_fetcher=slow_snapshot)
+        # فروقات قبل اللقطة - مغطاة بها فتُتجاهل
+        for _ in range(3):
+            await manager.handle_message(depth_message(server))
+        await taken.wait()
+        # فروقات بعد أخذ اللقطة وقبل وصولها
+        for _ in range(2):
+            await manager.handle_message(depth_message(server))
+        assert len(manager.buffers['BTCUSDT']) == 5 and not manager.books['BTCUSDT'].synced
+
+        release.set()
+        await drain(manager)
+        assert_matches_server(manager.books['BTCUSDT'], server)
+
+        for _ in range(20):
+            await manager.handle_message(depth_message(server))
+        return manager
+
+    manager = asyncio.run(run())
+    assert manager.books['BTCUSDT'].synced and 'BTCUSDT' not in manager.buffers
+    assert_matches_server(manager.books['BTCUSDT'], server)
+    assert manager.stats['diffs'] == 25 and manager.stats['snapshots'] == 1 and manager.stats['resyncs'] == 1
+
+
+def test_sequence_gap_triggers_resync():
+    """فرق مفقود يعلم الدفتر غير متزامن ويعيد اللقطة، ثم يطابق الخادم من جديد"""
+    random.seed(2)
+    server = MarketReplayServer()
+    manager = OrderBookManager(snapshot_fetcher=server.depth_snapshot)
+
+    async def run():
+        await manager.handle_message(depth_message(server))
+        await drain(manager)
+        for _ in range(5):
+            await manager.handle_message(depth_message(server))
+
+        depth_message(server)  # فرق لم يصل
+        await manager.handle_message(depth_message(server))
+        assert manager.get_book('BTC/USDT') is None
+        await drain(manager)
+
+        for _ in range(5):
+            await manager.handle_message(depth_message(server))
+
+    asyncio.run(run())
+    book = manager.get_book('BTC/USDT')
+    assert book is not None and manager.stats['resyncs'] == 2 and manager.stats['snapshots'] == 2
+    assert_matches_server(book, server)
+
+    liquidity = manager.get_liquidity('BTCUSDT', bps=50, amount=1.0, side='buy')
+    assert liquidity['spread_bps'] > 0 and -1.0 <= liquidity['imbalance'] <= 1.0
+    assert liquidity['slippage']['fully_filled']
+
+
+def test_failed_snapshot_keeps_buffer():
+    """فشل جلب اللقطة يبقي الفروقات مخزنة ويؤجل المحاولة التالية"""
+    random.seed(3)
+    server = MarketReplayServer()
+    attempts = []
+
+    async def flaky_snapshot(symbol, limit):
+        attempts.append(symbol)
+        if len(attempts) == 1:
+            raise ConnectionError("snapshot timeout")
+        return await server.depth_snapshot(symbol, limit)
+
+    manager = OrderBookManager(snapshot_fetcher=flaky_snapshot)
+
+    async def run():
+        await manager.handle_message(depth_message(server))
+        await drain(manager)
+        assert manager.books['BTCUSDT'].synced is False and len(manager.buffers['BTCUSDT']) == 1
+        # ضمن مهلة إعادة المحاولة لا تُجدول لقطة جديدة
+        await manager.handle_message(depth_message(server))
+        await drain(manager)
+        assert len(attempts) == 1 and len(manager.buffers['BTCUSDT']) == 2
+
+        manager.resync_after['BTCUSDT'] = 0
+        await manager.handle_message(depth_message(server))
+        await drain(manager)
+
+    asyncio.run(run())
+    assert len(attempts) == 2 and 'BTCUSDT' not in manager.buffers
+    assert_matches_server(manager.books['BTCUSDT'], server)
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+            print(f"✅ {name}")
@@ -0,0 +1,202 @@
+# backend/python/testing/test_order_reconciler.py
+"""
+🧪 اختبار مطابقة الأوامر - أحداث التنفيذ الجزئي والكامل والإلغاء من الطلبات المجمعة
+"""
+
+import asyncio
+import os
+import sys
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import ccxt.async_support as ccxt_async
+
+from services.order_reconciler import OrderReconciler, OrderEventType
+
+
+class FakePool:
+    """مجمع منصات وهمي يعيد أوامر مفتوحة ومغلقة ثابتة ويسجل الطلبات"""
+
+    def __init__(self, open_orders=None, closed_orders=None, symbol_required=False, single_orders=None,
+                 fetch_order=True):
+        self.open_orders = open_orders or []
+        self.closed_orders = closed_orders or []
+        self.single_orders = single_orders or {}
+        self.symbol_required = symbol_required
+        self.fetch_order = fetch_order
+        self.calls = []
+
+    async def get_client(self, exchange):
+        return SimpleNamespace(has={'fetchClosedOrders': True, 'fetchOrder': self.fetch_order})
+
+    async def call(self, exchange, method, *args):
+        if method == 'fetch_order':
+            order_id, symbol, params = args
+            self.calls.append((method, order_id or params['clientOrderId']))
+            found = self.single_orders.get(order_id or params['clientOrderId'])
+            if found is None:
+                raise ccxt_async.OrderNotFound(f"order {order_id} not found")
+            return found
+        symbol, args = args[0], args[1:]
+        self.calls.append((method, symbol))
+        if symbol is None and self.symbol_required:
+            raise ccxt_async.ArgumentsRequired(f"{method} requires a symbol")
+        orders = self.open_orders if method == 'fetch_open_orders' else self.closed_orders
+        return [order for order in orders if symbol is None or order['symbol'] == symbol]
+
+
+def remote(order_id, symbol='BTC/USDT', status='open', filled=0.0, amount=1.0, average=None, client_order_id=None):
+    return {'id': order_id, 'clientOrderId': client_order_id, 'symbol': symbol, 'side': 'buy',
+            'amount': amount, 'filled': filled, 'status': status, 'average': average}
+
+
+def make_reconciler(pool):
+    reconciler = OrderReconciler(pool)
+    reconciler.reconciler_config['user_stream_enabled'] = False
+    return reconciler
+
+
+def test_partial_fill_then_filled():
+    """تنفيذ جزئي يصدر حدثاً بالفرق ثم الإغلاق يصدر FILLED ويوقف التتبع"""
+    pool = FakePool(open_orders=[remote('1', filled=0.4, average=100.0)])
+    reconciler = make_reconciler(pool)
+    received = []
+    reconciler.subscribe(received.append)
+    reconciler.track('binance', '1', 'BTC/USDT', 'buy', 1.0)
+
+    events = asyncio.run(reconciler.reconcile(force=True))
+    assert [event.type for event in events] == [OrderEventType.PARTIAL_FILL]
+    assert abs(events[0].fill_delta - 0.4) < 1e-12
+    assert reconciler.get_order('binance', '1').filled == 0.4
+
+    # لا تغيير - لا حدث
+    assert asyncio.run(reconciler.reconcile(force=True)) == []
+
+    pool.open_orders = []
+    pool.closed_orders = [remote('1', status='closed', filled=1.0, average=101.0)]
+    events = asyncio.run(reconciler.reconcile(force=True))
+    assert [event.type for event in events] == [OrderEventType.FILLED]
+    assert abs(events[0].fill_delta - 0.6) < 1e-12
+    assert events[0].average_price == 101.0
+    assert reconciler.get_order('binance', '1') is None
+    assert [event.type for event in received] == [OrderEventType.PARTIAL_FILL, OrderEventType.FILLED]
+
+
+def test_cancel_and_bulk_requests():
+    """الإلغاء حدث نهائي، وطلبان مجمعان فقط لكل منصة مهما كان عدد الأوامر"""
+    pool = FakePool(
+        open_orders=[remote('1'), remote('2', symbol='ETH/USDT')],
+        closed_orders=[remote('3', symbol='SOL/USDT', status='canceled')]
+    )
+    reconciler = make_reconciler(pool)
+    for order_id, symbol in (('1', 'BTC/USDT'), ('2', 'ETH/USDT'), ('3', 'SOL/USDT')):
+        reconciler.track('binance', order_id, symbol, 'buy', 1.0)
+
+    events = asyncio.run(reconciler.reconcile(force=True))
+    assert [(event.order_id, event.type) for event in events] == [('3', OrderEventType.CANCELED)]
+    assert sorted(reconciler.orders['binance']) == ['1', '2']
+    assert pool.calls == [('fetch_open_orders', None), ('fetch_closed_orders', None)]
+
+
+def test_symbol_required_falls_back_per_symbol():
+    """منصة تشترط الرمز - طلب لكل رمز متتبع ويُتذكر ذلك للدورات التالية"""
+    pool = FakePool(open_orders=[remote('1', filled=0.5)], symbol_required=True)
+    reconciler = make_reconciler(pool)
+    reconciler.track('mexc', '1', 'BTC/USDT', 'buy', 1.0)
+
+    events = asyncio.run(reconciler.reconcile(force=True))
+    assert [event.type for event in events] == [OrderEventType.PARTIAL_FILL]
+    assert ('fetch_open_orders', 'BTC/USDT') in pool.calls
+
+    pool.calls.clear()
+    asyncio.run(reconciler.reconcile(force=True))
+    assert all(symbol == 'BTC/USDT' for _, symbol in pool.calls)
+
+
+def test_client_order_id_adopts_exchange_id():
+    """أمر متتبع بمعرف العميل فقط يعتمد معرف المنصة عند ظهوره"""
+    pool = FakePool(open_orders=[remote('99', filled=0.2, client_order_id='c-1')])
+    reconciler = make_reconciler(pool)
+    reconciler.track('binance', None, 'BTC/USDT', 'buy', 1.0, client_order_id='c-1')
+
+    events = asyncio.run(reconciler.reconcile(force=True))
+    assert events[0].order_id == '99' and events[0].client_order_id == 'c-1'
+    assert reconciler.get_order('binance', '99') is not None
+    assert reconciler.get_order('binance', 'c-1') is None
+
+
+def test_min_interval_throttles_unforced_cycles():
+    """دورة غير قسرية خلال min_interval لا ترسل طلبات"""
+    pool = FakePool(open_orders=[remote('1')])
+    reconciler = make_reconciler(pool)
+    reconciler.reconciler_config['min_interval'] = 60
+    reconciler.track('binance', '1', 'BTC/USDT', 'buy', 1.0)
+
+    asyncio.run(reconciler.reconcile())
+    requests = len(pool.calls)
+    asyncio.run(reconciler.reconcile())
+    assert len(pool.calls) == requests
+
+
+def test_missing_orders_count_cycles():
+    """أمر غير موجود في المنصة يزيد عداد الدورات المفقودة بدون حدث"""
+    reconciler = make_reconciler(FakePool())
+    reconciler.track('binance', '1', 'BTC/USDT', 'buy', 1.0)
+
+    assert asyncio.run(reconciler.reconcile(force=True)) == []
+    assert asyncio.run(reconciler.reconcile(force=True)) == []
+    assert reconciler.get_order('binance', '1').missing_cycles == 2
+
+
+def test_missing_order_not_found_is_rejected():
+    """أمر بمعرف العميل فقط لم يصل المنصة - استعلام منفرد ثم حدث REJECTED نهائي"""
+    reconciler = make_reconciler(FakePool())
+    reconciler.reconciler_config['missing_cycles_warning'] = 2
+    received = []
+    reconciler.subscribe(received.append)
+    reconciler.track('binance', None, 'BTC/USDT', 'buy', 1.0, client_order_id='c-1')
+
+    assert asyncio.run(reconciler.reconcile(force=True)) == []
+    events = asyncio.run(reconciler.reconcile(force=True))
+    assert [(event.type, event.client_order_id, event.source) for event in events] == [
+        (OrderEventType.REJECTED, 'c-1', 'missing')
+    ]
+    assert reconciler.get_order('binance', 'c-1') is None
+    assert reconciler.pool.calls[-1] == ('fetch_order', 'c-1')
+    assert received == events
+
+
+def test_missing_order_resolved_by_fetch_order():
+    """أمر خارج نافذة الجلب المجمع - الاستعلام المنفرد يعيد حالته النهائية"""
+    pool = FakePool(single_orders={'1': remote('1', status='closed', filled=1.0, average=100.0)})
+    reconciler = make_reconciler(pool)
+    reconciler.reconciler_config['missing_cycles_warning'] = 1
+    reconciler.track('binance', '1', 'BTC/USDT', 'buy', 1.0)
+
+    events = asyncio.run(reconciler.reconcile(force=True))
+    assert [(event.type, event.source, event.fill_delta) for event in events] == [
+        (OrderEventType.FILLED, 'fetch_order', 1.0)
+    ]
+    assert reconciler.orders['binance'] == {}
+
+
+def test_unresolvable_missing_order_expires():
+    """منصة بدون fetchOrder - الأمر المجهول ينتهي بحدث EXPIRED بعد missing_cycles_expire"""
+    reconciler = make_reconciler(FakePool(fetch_order=False))
+    reconciler.reconciler_config.update({'missing_cycles_warning': 1, 'missing_cycles_expire': 3})
+    reconciler.track('binance', None, 'BTC/USDT', 'buy', 1.0, client_order_id='c-2')
+
+    assert asyncio.run(reconciler.reconcile(force=True)) == []
+    assert asyncio.run(reconciler.reconcile(force=True)) == []
+    events = asyncio.run(reconciler.reconcile(force=True))
+    assert [event.type for event in events] == [OrderEventType.EXPIRED]
+    assert reconciler.stats['expired_missing'] == 1
+    assert reconciler.get_order('binance', 'c-2') is None
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+            print(f"✅ {name}")
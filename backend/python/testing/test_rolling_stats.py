@@ -0,0 +1,96 @@
+# backend/python/testing/test_rolling_stats.py
+"""
+🧪 اختبار الإحصاءات المتحركة المتجهة - نفس نتائج pandas rolling().apply بما فيها NaN والنوافذ الثابتة
+"""
+
+import os
+import sys
+import warnings
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+from services.rolling_stats import (
+    rolling_sum, rolling_variance, rolling_skew, rolling_kurt, rolling_autocorr, rolling_hurst
+)
+
+
+def make_returns(count: int = 600, seed: int = 3) -> pd.Series:
+    """عوائد بفترة سعر ثابت (نوافذ ثابتة) وقيمة مفقودة في المنتصف"""
+    rng = np.random.default_rng(seed)
+    prices = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, count)))
+    prices[200:260] = prices[199]
+    returns = pd.Series(prices).pct_change()
+    returns.iloc[400] = np.nan
+    return returns
+
+
+def hurst_reference(window: np.ndarray, max_lag: int = 20) -> float:
+    """ميل log(std(x[t] - x[t-lag])) على log(lag) بـ np.polyfit"""
+    lags = range(2, min(max_lag, len(window)))
+    tau = [np.std(window[lag:] - window[:-lag]) for lag in lags]
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        slope = np.polyfit(np.log(lags), np.log(tau), 1)[0]
+    return slope if np.isfinite(slope) else np.nan
+
+
+def assert_matches(actual, expected, name):
+    expected = np.asarray(expected, dtype=np.float64)
+    assert np.array_equal(np.isnan(actual), np.isnan(expected)), name
+    valid = ~np.isnan(expected)
+    assert np.allclose(actual[valid], expected[valid], rtol=1e-6, atol=1e-9), name
+
+
+def test_sum_and_variance():
+    returns = make_returns()
+    for window in (5, 20):
+        assert_matches(rolling_sum(returns.values, window), returns.rolling(window).sum(), f"sum {window}")
+        assert_matches(rolling_variance(returns.values, window), returns.rolling(window).var(), f"var {window}")
+        assert_matches(rolling_variance(returns.values, window, ddof=0), returns.rolling(window).var(ddof=0),
+                       f"var0 {window}")
+
+
+def test_variance_of_large_offset_values():
+    """قيم كبيرة بتغير صغير لا تفقد الدقة، والنوافذ الثابتة تباينها صفر تماماً"""
+    rng = np.random.default_rng(1)
+    values = pd.Series(np.r_[np.full(50, 1e5), 1e5 + rng.normal(0, 1e-2, 150)])
+    variance = rolling_variance(values.values, 20)
+    assert_matches(variance, values.rolling(20).var(), "offset var")
+    assert (variance[19:50] == 0.0).all()
+
+
+def test_skew_and_kurtosis():
+    returns = make_returns()
+    assert_matches(rolling_skew(returns.values, 50), returns.rolling(50).skew(), "skew")
+    assert_matches(rolling_kurt(returns.values, 50), returns.rolling(50).kurt(), "kurt")
+
+
+def test_autocorr():
+    returns = make_returns()
+    for lag in (1, 5):
+        expected = returns.rolling(50).apply(lambda window: window.autocorr(lag=lag), raw=False)
+        assert_matches(rolling_autocorr(returns.values, 50, lag), expected, f"autocorr {lag}")
+
+
+def test_hurst():
+    returns = make_returns()
+    expected = returns.rolling(100).apply(hurst_reference, raw=True)
+    assert_matches(rolling_hurst(returns.values, 100), expected, "hurst")
+
+
+def test_short_series():
+    """سلسلة أقصر من النافذة - كلها NaN"""
+    values = make_returns()[:30].values
+    for result in (rolling_skew(values, 50), rolling_kurt(values, 50),
+                   rolling_autocorr(values, 50, 1), rolling_hurst(values, 100)):
+        assert len(result) == 30 and np.isnan(result).all()
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+            print(f"✅ {name}")
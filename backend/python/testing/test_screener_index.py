@@ -0,0 +1,139 @@
+# backend/python/testing/test_screener_index.py
+"""
+🧪 اختبار فهرس الفرز - الترتيب التزايدي مقابل الفرز الكامل، أعلى N بالحجم والعمر، التقادم والتحديث من الناقل
+"""
+
+import asyncio
+import math
+import os
+import random
+import sys
+import time
+from datetime import datetime
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.market_stream import MarketDataBus, Tick
+from services.screener_index import ScreenerIndex, SortedView
+
+
+def add(index: ScreenerIndex, symbol: str, change: float, volume: float = 1e6, **fields) -> None:
+    index.update(symbol, fields.pop('price', 100.0), change_24h=change, quote_volume=volume, **fields)
+
+
+def test_sorted_view_matches_full_sort():
+    """بعد تحديثات وحذف عشوائية يطابق الترتيب الفرز الكامل وتطابق الرتب مواضعها"""
+    rng = random.Random(11)
+    view = SortedView('change_24h')
+    values = {}
+    for _ in range(2000):
+        symbol = f"S{rng.randrange(60)}"
+        value = rng.choice([None, float('nan'), round(rng.uniform(-10, 10), 1)])
+        view.update(symbol, value)
+        if value is None or math.isnan(value):
+            values.pop(symbol, None)
+        else:
+            values[symbol] = value
+
+    expected = sorted((value, symbol) for symbol, value in values.items())
+    assert view.keys == expected and view.values == values
+    assert list(view.iter_ranked()) == expected[::-1]
+    assert list(view.iter_ranked(ascending=True)) == expected
+    for position, (value, symbol) in enumerate(expected):
+        assert view.rank(symbol, ascending=True) == position
+        assert view.rank(symbol) == len(expected) - 1 - position
+    assert view.rank('MISSING') is None
+
+
+def test_update_derives_spread_and_volatility():
+    """الفارق بالنقاط الأساسية والتذبذب من المدى، والقيم غير الصالحة لا تدخل الترتيب"""
+    index = ScreenerIndex()
+    add(index, 'BTC/USDT', 2.0, bid=99.9, ask=100.1, high=110.0, low=90.0)
+    row = index.rows['BTC/USDT']
+    assert abs(row['spread'] - 20.0) < 1e-9
+    assert abs(row['volatility'] - math.log(110.0 / 90.0) * 100) < 1e-9
+
+    add(index, 'ETH/USDT', 1.0, bid=101.0, ask=100.0)
+    assert index.rows['ETH/USDT']['spread'] is None and len(index.views['spread']) == 1
+
+    index.update('BAD/USDT', 0.0, change_24h=50.0)
+    index.update('NONE/USDT', None)
+    assert set(index.rows) == {'BTC/USDT', 'ETH/USDT'} and index.stats['updates'] == 2
+
+    add(index, 'BTC/USDT', float('nan'))
+    assert index.views['change_24h'].values == {'ETH/USDT': 1.0}
+
+
+def test_top_limit_volume_and_order():
+    """أعلى وأدنى N مع حد الحجم، والحد الأقصى للنتائج، والمقياس غير المدعوم خطأ"""
+    index = ScreenerIndex()
+    index.screener_config['max_limit'] = 3
+    for i in range(8):
+        add(index, f"S{i}/USDT", float(i - 4), volume=1e6 * (i + 1))
+
+    assert [row['symbol'] for row in index.top('change_24h', 2)] == ['S7/USDT', 'S6/USDT']
+    assert [row['symbol'] for row in index.top('change_24h', 2, ascending=True)] == ['S0/USDT', 'S1/USDT']
+    assert [row['symbol'] for row in index.top('change_24h', 2, ascending=True, min_volume=3e6)] == \
+        ['S2/USDT', 'S3/USDT']
+    assert len(index.top('volume', 50)) == 3
+
+    rows = index.top('change_24h', 1)
+    rows[0]['price'] = -1.0
+    assert index.rows['S7/USDT']['price'] == 100.0
+
+    try:
+        index.top('funding')
+        assert False, "مقياس غير مدعوم يجب أن يرفع خطأ"
+    except ValueError:
+        pass
+
+    ranked = index.get_row('S5/USDT')
+    assert ranked['ranks']['change_24h'] == 2 and ranked['ranks']['spread'] is None
+    assert index.get_row('MISSING') is None
+
+
+def test_stale_rows_skipped_and_pruned():
+    """الصفوف الأقدم من max_age تُتخطى في الاستعلام وتُزال بالتنظيف"""
+    index = ScreenerIndex()
+    now = time.time()
+    add(index, 'OLD/USDT', 9.0, timestamp=now - 600)
+    add(index, 'NEW/USDT', 1.0, timestamp=now)
+
+    assert [row['symbol'] for row in index.top('change_24h')] == ['NEW/USDT']
+    assert [row['symbol'] for row in index.top('change_24h', max_age=3600)] == ['OLD/USDT', 'NEW/USDT']
+
+    assert index.prune() == 1 and 'OLD/USDT' not in index.rows
+    assert all('OLD/USDT' not in view.values for view in index.views.values())
+    status = index.get_screener_status()
+    assert status['symbols'] == 1 and status['pruned'] == 1 and status['metrics']['change_24h'] == 1
+
+
+def test_bus_ticks_tickers_and_market_data():
+    """تيكات الناقل ولقطات ccxt ونماذج REST تحدث نفس الصف بمصدرها"""
+    index = ScreenerIndex()
+    bus = MarketDataBus()
+    detach = index.attach(bus)
+    now_ms = int(time.time() * 1000)
+    tick = Tick('binance', 'BTC/USDT', 100.0, 99.9, 100.1, 105.0, 95.0, 3.5, 10.0, 1e6, now_ms)
+    asyncio.run(bus.publish('tick', tick.symbol, tick))
+    assert index.rows['BTC/USDT']['source'] == 'stream' and index.rows['BTC/USDT']['change_24h'] == 3.5
+    detach()
+
+    index.update_ticker('ETH/USDT', {'last': 10.0, 'bid': 9.9, 'ask': 10.1, 'high': 11.0, 'low': 9.0,
+                                     'percentage': -2.0, 'quoteVolume': 5e5, 'timestamp': now_ms})
+    assert index.rows['ETH/USDT']['source'] == 'ticker' and index.rows['ETH/USDT']['updated_at'] == now_ms / 1000
+
+    data = SimpleNamespace(symbol='SOL/USDT', price=20.0, bid=None, ask=None, high_24h=None, low_24h=None,
+                           change_24h=7.0, quote_volume=2e6, timestamp=datetime.now())
+    index.update_market_data(data)
+    movers = index.get_movers(limit=1, min_volume=1e6)
+    assert movers['gainers'][0]['symbol'] == 'SOL/USDT' and movers['losers'][0]['symbol'] == 'BTC/USDT'
+    assert movers['volume'][0]['symbol'] == 'SOL/USDT' and movers['widest_spreads'][0]['symbol'] == 'BTC/USDT'
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+            print(f"✅ {name}")
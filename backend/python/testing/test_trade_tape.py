@@ -0,0 +1,137 @@
+# backend/python/testing/test_trade_tape.py
+"""
+🧪 اختبار شريط الصفقات - نوافذ VWAP المتدحرجة مقابل الحساب المباشر، سعة المخزن، شموع الحجم/القيمة والنشر
+"""
+
+import asyncio
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.market_stream import MarketDataBus, Trade
+from services.trade_tape import BarBuilder, TradeTape, TradeTapeAggregator
+
+START_MS = 1_700_000_000_000
+
+
+def make_trades(count: int, seed: int = 7, symbol: str = 'BTC/USDT'):
+    rng = random.Random(seed)
+    timestamp, price = START_MS, 100.0
+    trades = []
+    for trade_id in range(count):
+        timestamp += rng.randint(0, 3000)
+        price *= 1 + rng.gauss(0, 0.001)
+        trades.append(Trade('binance', symbol, trade_id, price, rng.uniform(0.01, 2.0), rng.random() < 0.4, timestamp))
+    return trades
+
+
+def brute_force(trades, now_ms: int, seconds: float):
+    """مقاييس النافذة بالمرور على كل الصفقات"""
+    inside = [trade for trade in trades if trade.timestamp >= now_ms - seconds * 1000]
+    volume = sum(trade.amount for trade in inside)
+    buy = sum(trade.amount for trade in inside if not trade.is_buyer_maker)
+    quote = sum(trade.amount * trade.price for trade in inside)
+    return len(inside), volume, buy, volume - buy, quote / volume if volume else None
+
+
+def make_aggregator(**config) -> TradeTapeAggregator:
+    aggregator = TradeTapeAggregator()
+    aggregator.tape_config.update({'windows': (60.0, 300.0), 'max_trades': 10000,
+                                   'bar_kind': 'volume', 'bar_threshold': 5.0, **config})
+    return aggregator
+
+
+def test_rolling_windows_match_brute_force():
+    """كل نافذة تطابق الحساب المباشر بعد كل صفقة وعند الاستعلام لاحقاً"""
+    trades = make_trades(600)
+    tape = TradeTape('BTC/USDT', (60.0, 300.0), 10000, 'volume', 10.0, 100)
+    for index, trade in enumerate(trades):
+        tape.add(trade)
+        if index % 37:
+            continue
+        for seconds in (60.0, 300.0):
+            metrics = tape.metrics(seconds, now=trade.timestamp / 1000)
+            count, volume, buy, sell, vwap = brute_force(trades[:index + 1], trade.timestamp, seconds)
+            assert metrics['trades'] == count
+            assert abs(metrics['volume'] - volume) < 1e-9
+            assert abs(metrics['buy_volume'] - buy) < 1e-9 and abs(metrics['sell_volume'] - sell) < 1e-9
+            assert abs(metrics['vwap'] - vwap) < 1e-9
+
+    later = tape.metrics(60.0, now=trades[-1].timestamp / 1000 + 120)
+    assert later['trades'] == 0 and later['vwap'] is None and later['flow_imbalance'] == 0.0
+    assert tape.truncated == 0
+
+
+def test_capacity_truncates_window():
+    """المخزن الممتلئ يخرج أقدم الصفقات من النافذة ويحسبها كمقتطعة"""
+    trades = [Trade('binance', 'ETH/USDT', i, 10.0 + i, 1.0, False, START_MS + i * 1000) for i in range(8)]
+    tape = TradeTape('ETH/USDT', (60.0,), 5, 'volume', 100.0, 10)
+    for trade in trades:
+        tape.add(trade)
+
+    metrics = tape.metrics(60.0, now=trades[-1].timestamp / 1000)
+    assert metrics['trades'] == 5 and metrics['volume'] == 5.0
+    assert metrics['vwap'] == sum(10.0 + i for i in range(3, 8)) / 5
+    assert tape.truncated == 3
+
+
+def test_volume_and_dollar_bars_split_large_trades():
+    """الصفقة التي تتجاوز الحد تُقسم على شموع متتالية بنفس مجموع الحجم"""
+    builder = BarBuilder('BTC/USDT', 'volume', 2.0, 10)
+    assert builder.add(Trade('binance', 'BTC/USDT', 1, 100.0, 1.5, False, START_MS)) == []
+    bars = builder.add(Trade('binance', 'BTC/USDT', 2, 101.0, 3.0, True, START_MS + 1000))
+    assert [bar.volume for bar in bars] == [2.0, 2.0]
+    assert bars[0].buy_volume == 1.5 and bars[0].sell_volume == 0.5 and bars[0].high == 101.0
+    assert builder.current.volume == 0.5
+
+    dollar = BarBuilder('BTC/USDT', 'dollar', 1000.0, 10)
+    (bar,) = dollar.add(Trade('binance', 'BTC/USDT', 3, 200.0, 6.0, False, START_MS))
+    assert abs(bar.quote_volume - 1000.0) < 1e-9 and abs(bar.volume - 5.0) < 1e-9
+    assert bar.vwap == 200.0 and bar.to_ohlcv() == [START_MS, 200.0, 200.0, 200.0, 200.0, bar.volume]
+
+
+def test_out_of_order_trade_uses_last_timestamp():
+    """الصفقة المتأخرة تُحسب بوقت آخر صفقة حتى لا تكسر ترتيب النوافذ"""
+    aggregator = make_aggregator()
+    aggregator.add_trade(Trade('binance', 'BTC/USDT', 1, 100.0, 1.0, False, START_MS + 5000))
+    aggregator.add_trade(Trade('binance', 'BTCUSDT', 2, 102.0, 1.0, True, START_MS))
+
+    assert aggregator.stats['out_of_order'] == 1 and len(aggregator.tapes) == 1
+    metrics = aggregator.get_metrics('BTC/USDT', 60.0, now=(START_MS + 5000) / 1000)
+    assert metrics['trades'] == 2 and metrics['vwap'] == 101.0 and metrics['delta'] == 0.0
+
+
+def test_bus_trades_publish_completed_bars():
+    """صفقات الناقل تبني الشموع وتنشرها للمشتركين المتزامنين وغير المتزامنين"""
+    aggregator = make_aggregator()
+    aggregator.set_bar_threshold('ETH/USDT', 'volume', 3.0)
+    bus = MarketDataBus()
+    aggregator.attach(bus)
+    received, awaited = [], []
+    aggregator.subscribe(received.append)
+
+    async def on_bar(bar):
+        awaited.append(bar.symbol)
+
+    aggregator.subscribe(on_bar)
+    aggregator.subscribe(lambda bar: 1 / 0)
+
+    async def run():
+        for trade in make_trades(40, seed=3, symbol='ETH/USDT'):
+            await bus.publish('trade', trade.symbol, trade)
+
+    asyncio.run(run())
+    bars = aggregator.get_bars('ETH/USDT')
+    assert bars and received == bars and awaited == ['ETH/USDT'] * len(bars)
+    assert all(abs(bar.volume - 3.0) < 1e-9 for bar in bars)
+    assert aggregator.stats['trades'] == 40 and aggregator.stats['bars'] == len(bars)
+    assert aggregator.get_bars('ETH/USDT', 2) == bars[-2:]
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+            print(f"✅ {name}")
@@ -0,0 +1,206 @@
+# backend/python/testing/test_universe_scanner.py
+"""
+🧪 اختبار ماسح الكون المتدرج - الفرز البارد بطلب واحد، مؤشرات الطبقة الدافئة، الترقية والتخفيض مع الهامش والتثبيت
+"""
+
+import asyncio
+import math
+import os
+import sys
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from services.universe_scanner import SymbolProfile, Tier, UniverseScanner, warm_indicators
+
+
+def make_ticker(quote_volume: float, high: float = 110.0, low: float = 90.0,
+                bid: float = 99.9, ask: float = 100.1) -> dict:
+    return {'last': 100.0, 'quoteVolume': quote_volume, 'percentage': 1.0,
+            'high': high, 'low': low, 'bid': bid, 'ask': ask}
+
+
+def make_ohlcv(count: int, volume: float = 10.0, step: float = 0.0) -> np.ndarray:
+    close = 100.0 * (1 + step) ** np.arange(count)
+    volumes = np.full(count, volume)
+    return np.column_stack([np.arange(count) * 60000.0, close, close, close, close, volumes])
+
+
+class FakePool:
+    """مجمع منصات بلقطة أسعار ثابتة - يسجل الطلبات"""
+
+    def __init__(self, tickers, bulk=True):
+        self.tickers = tickers
+        self.bulk = bulk
+        self.calls = []
+
+    async def get_client(self, exchange):
+        return SimpleNamespace(has={'fetchTickers': self.bulk})
+
+    async def call(self, exchange, method):
+        self.calls.append(method)
+        return self.tickers
+
+    async def fetch_tickers(self, exchange, symbols):
+        self.calls.append(('fetch_tickers', tuple(symbols)))
+        return {symbol: self.tickers[symbol] for symbol in symbols if symbol in self.tickers}
+
+
+class FakeRegistry:
+    def __init__(self, symbols):
+        self.symbols = symbols
+
+    async def ensure_loaded(self, exchange):
+        return None
+
+    def active_symbols(self, exchange, quote=None):
+        return [symbol for symbol in self.symbols if quote is None or symbol.endswith(f"/{quote}")]
+
+
+class FakeCandles:
+    """مخزن شموع بمصفوفات محفوظة لكل رمز - الرمز غير الموجود يرفع خطأ"""
+
+    def __init__(self, series):
+        self.series = series
+
+    async def get_ohlcv(self, symbol, timeframe, limit, exchange):
+        if symbol not in self.series:
+            raise ConnectionError("timeout")
+        return self.series[symbol][-limit:]
+
+
+def make_scanner(tickers, candles=None, universe=None, **config) -> UniverseScanner:
+    universe = universe if universe is not None else list(tickers)
+    scanner = UniverseScanner(pool=FakePool(tickers), registry=FakeRegistry(universe),
+                              candles=FakeCandles(candles or {}))
+    scanner.universe_config.update({'hot_size': 2, 'warm_size': 3, 'min_quote_volume': 1e6,
+                                    'max_spread_bps': 50.0, 'min_tier_seconds': 0.0,
+                                    'demotion_hysteresis': 0.5, **config})
+    scanner.exchange = 'binance'
+    return scanner
+
+
+def seed_profiles(scanner: UniverseScanner, scores) -> None:
+    for symbol, score in scores.items():
+        scanner.profiles[symbol] = SymbolProfile(symbol, cold_score=score)
+
+
+def test_warm_indicators():
+    """سعر ثابت بلا تذبذب ولا اتجاه، وارتفاع الحجم الأخير يقاس مقابل المتوسط السابق"""
+    flat = warm_indicators(make_ohlcv(40))
+    assert flat == {'realized_volatility': 0.0, 'volume_surge': 1.0, 'trend': 0.0}
+
+    rising = make_ohlcv(40, step=0.01)
+    rising[-4:, 5] = 30.0
+    indicators = warm_indicators(rising)
+    assert indicators['volume_surge'] == 3.0 and indicators['trend'] > 0
+    assert math.isclose(indicators['realized_volatility'], 0.0, abs_tol=1e-9)
+
+
+def test_cold_scan_ranks_and_filters_with_one_request():
+    """لقطة أسعار واحدة، الرموز الضعيفة السيولة أو الواسعة الفارق غير مؤهلة، والكون محدود بأعلى حجم"""
+    tickers = {
+        'BTC/USDT': make_ticker(5e8),
+        'ETH/USDT': make_ticker(2e8, high=130.0, low=80.0),
+        'THIN/USDT': make_ticker(5e5),
+        'WIDE/USDT': make_ticker(5e7, bid=99.0, ask=101.0),
+        'DUST/USDT': make_ticker(1e3),
+        'BTC/EUR': make_ticker(9e9),
+    }
+    scanner = make_scanner(tickers, max_symbols=4)
+    assert asyncio.run(scanner.scan_cold()) == 4
+    assert scanner.pool.calls == ['fetch_tickers'] and scanner.stats['requests'] == 1
+
+    assert set(scanner.profiles) == {'BTC/USDT', 'ETH/USDT', 'THIN/USDT', 'WIDE/USDT'}
+    assert math.isinf(scanner.profiles['THIN/USDT'].cold_score)
+    assert math.isinf(scanner.profiles['WIDE/USDT'].cold_score)
+    assert abs(scanner.profiles['WIDE/USDT'].spread_bps - 200.0) < 1e-9
+    assert math.isclose(scanner.profiles['ETH/USDT'].range_volatility, math.log(130.0 / 80.0))
+
+    asyncio.run(scanner.rebalance())
+    assert set(scanner.symbols(Tier.HOT)) == {'BTC/USDT', 'ETH/USDT'} and scanner.symbols(Tier.WARM) == []
+
+
+def test_hysteresis_and_min_tier_time():
+    """الساخن يبقى حتى تتجاوز رتبته الحجم بالهامش، وقبل الحد الأدنى في طبقته لا يُخفض"""
+    scanner = make_scanner({}, hot_size=2, warm_size=10)
+    seed_profiles(scanner, {'A': 5.0, 'B': 4.0, 'C': 3.0, 'D': 2.0, 'E': 1.0})
+    asyncio.run(scanner.rebalance())
+    assert scanner.symbols(Tier.HOT) == ['A', 'B']
+
+    # B ثالث - ضمن int(2 * 1.5) = 3 رتب فيبقى
+    scanner.profiles['B'].cold_score = 2.5
+    asyncio.run(scanner.rebalance())
+    assert 'B' in scanner.symbols(Tier.HOT)
+
+    # B خامس - خارج الهامش فيُخفض للدافئة
+    scanner.profiles['B'].cold_score = 0.5
+    asyncio.run(scanner.rebalance())
+    assert scanner.get_tier('B') == Tier.WARM and scanner.symbols(Tier.HOT) == ['A', 'C']
+
+    scanner.universe_config['min_tier_seconds'] = 3600.0
+    scanner.profiles['C'].cold_score = -1.0
+    asyncio.run(scanner.rebalance())
+    assert scanner.get_tier('C') == Tier.HOT
+
+
+def test_pinned_symbols_and_delisting():
+    """الرمز المثبت ساخن دائماً ويُحسب من حجم الطبقة، والرمز الذي خرج من الكون يُزال إن كان بارداً"""
+    tickers = {symbol: make_ticker(volume) for symbol, volume in
+               (('BTC/USDT', 5e8), ('ETH/USDT', 4e8), ('SOL/USDT', 3e8), ('XRP/USDT', 2e6))}
+    scanner = make_scanner(tickers, hot_size=1, warm_size=1)
+    asyncio.run(scanner.scan_cold())
+    scanner.pin(['XRP/USDT', 'OLD/USDT'])
+    asyncio.run(scanner.rebalance())
+    assert set(scanner.symbols(Tier.HOT)) == {'XRP/USDT', 'OLD/USDT'}
+    assert scanner.symbols(Tier.WARM) == ['BTC/USDT']
+
+    scanner.pin([])
+    del scanner.pool.tickers['XRP/USDT']
+    scanner.registry.symbols.remove('SOL/USDT')
+    asyncio.run(scanner.scan_cold())
+    assert 'SOL/USDT' not in scanner.profiles
+    assert scanner.get_tier('XRP/USDT') == Tier.HOT and math.isinf(scanner.profiles['XRP/USDT'].cold_score)
+
+    asyncio.run(scanner.rebalance())
+    assert scanner.get_tier('XRP/USDT') == Tier.COLD
+
+
+def test_scan_cycle_uses_warm_indicators_and_notifies():
+    """الدورة الكاملة تحدث مؤشرات الدافئة ثم تختار الساخنة بها وتبلغ المشتركين بالتغييرات"""
+    tickers = {symbol: make_ticker(1e8) for symbol in ('A/USDT', 'B/USDT', 'C/USDT', 'D/USDT')}
+    # التذبذب صفر للجميع - الترتيب الدافئ من ارتفاع الحجم فقط
+    steady, rising, surging = make_ohlcv(96), make_ohlcv(96), make_ohlcv(96)
+    rising[-4:, 5] = 15.0
+    surging[-4:, 5] = 50.0
+    candles = {'A/USDT': steady, 'B/USDT': rising, 'C/USDT': surging}
+    scanner = make_scanner(tickers, candles, hot_size=1, warm_size=3)
+    changes, awaited = [], []
+    scanner.subscribe(lambda *change: changes.append(change))
+
+    async def on_change(symbol, old, new):
+        awaited.append(symbol)
+
+    unsubscribe = scanner.subscribe(on_change)
+    scanner.subscribe(lambda *change: 1 / 0)
+
+    tiers = asyncio.run(scanner.scan('binance'))
+    assert tiers == {'hot': 1, 'warm': 3, 'cold': 0}
+    assert scanner.symbols(Tier.HOT) == ['C/USDT']
+    assert scanner.stats['warm_updates'] == 3 and scanner.stats['errors'] == 1
+    assert scanner.profiles['D/USDT'].warm_score is None
+    assert ('C/USDT', Tier.WARM, Tier.HOT) in changes and len(awaited) == len(changes)
+
+    unsubscribe()
+    assert on_change not in scanner.subscribers
+    status = scanner.get_universe_status()
+    assert status['tiers'] == tiers and status['hot'][0]['tier'] == 'hot' and not status['running']
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+            print(f"✅ {name}")
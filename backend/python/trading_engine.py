@@ -33,15 +33,9 @@ import joblib
 from sklearn.preprocessing import MinMaxScaler
 from sklearn.utils import class_weight
 from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score
-import tensorflow as tf
-from tensorflow.keras.models import Sequential, load_model, save_model
-from tensorflow.keras.layers import LSTM, Dense, Dropout, Bidirectional
-from tensorflow.keras.optimizers import Adam
-from tensorflow.keras.callbacks import EarlyStopping, ModelCheckpoint
-from tensorflow.keras.regularizers import l2
+# TensorFlow/Keras تُستورد داخل مسارات نموذج AITradingModel فقط - تشغيل المحرك لا يحتاجها
 
 # Trading and Technical Analysis
-import ccxt
 import talib
 import pandas_ta as ta
 from scipy import stats
@@ -53,6 +47,23 @@ from aiohttp import ClientSession, TCPConnector
 import aiofiles
 from dotenv import load_dotenv
 
+# Async exchange backend
+from services.async_exchange_pool import AsyncExchangePool, exchange_pool as shared_exchange_pool, normalize_ticker
+from services.http_client import http_client
+from services.arbitrage_scanner import arbitrage_scanner
+from services.inference_coalescer import inference_coalescer
+from services.market_stream import market_stream
+from services.order_book import order_book_manager
+from services.exchange_simulator import simulator_ccxt_config
+from services.trade_tape import trade_tape
+from services.screener_index import screener_index
+from services.fast_lane import FastLane, FastLaneRejected, fast_lane as shared_fast_lane
+from services.universe_scanner import universe_scanner, Tier
+from services.market_registry import MarketRegistry, market_registry as shared_market_registry
+from services.order_reconciler import OrderReconciler, OrderEvent, OrderEventType, order_reconciler as shared_order_reconciler
+from services.ohlcv_archive import ohlcv_archive
+from services.order_pipeline import OrderPipeline, ccxt_order_executor, order_pipeline as shared_order_pipeline
+
 # Security
 import hashlib
 import hmac
@@ -125,6 +136,7 @@ class PlaceOrderRequest(BaseModel):
     leverage: Optional[int] = Field(1, ge=1, le=100)
     take_profit: Optional[float] = Field(None, gt=0)
     stop_loss: Optional[float] = Field(None, gt=0)
+    client_order_id: Optional[str] = Field(None, max_length=36)
 
 class OrderResponse(BaseModel):
     order_id: str
@@ -332,9 +344,13 @@ class TradingSettings:
 class AITradingModel:
     """نموذج الذكاء الاصطناعي للتداول من الكود الأصلي"""
     
-    def __init__(self, symbol: str):
+    def __init__(self, symbol: str, exchange_name: str = 'mexc', timeframe: str = '1h'):
         self.symbol = symbol
+        self.exchange_name = exchange_name
+        self.timeframe = timeframe
         self.model = None
+        self.runner = None
+        self.runner_model = None
         self.scaler = MinMaxScaler()
         self.lookback = 120
         self.sequence_length = 80
@@ -348,7 +364,8 @@ class AITradingModel:
             scaler_path = os.path.join(self.model_dir, "ai_scaler.pkl")
             
             if os.path.exists(model_path) and os.path.exists(scaler_path):
-                self.model = load_model(model_path)
+                from tensorflow.keras.models import load_model as load_keras_model
+                self.model = load_keras_model(model_path)
                 self.scaler = joblib.load(scaler_path)
                 logger.info(f"✅ تم تحميل نموذج الذكاء الاصطناعي لـ {self.symbol}")
                 return True
@@ -357,9 +374,13 @@ class AITradingModel:
         
         return False
     
-    async def train_model(self, ohlcv_data: List[List[float]]):
+    async def train_model(self, ohlcv_data: Optional[List[List[float]]] = None):
         """تدريب النموذج على بيانات OHLCV"""
         try:
+            # القراءة من الأرشيف على القرص إذا لم تمرر البيانات
+            if ohlcv_data is None:
+                ohlcv_data = ohlcv_archive.read_last(self.exchange_name, self.symbol, self.timeframe, 2000)
+            
             if len(ohlcv_data) < 400:
                 logger.warning(f"⚠️ بيانات غير كافية لتدريب النموذج لـ {self.symbol}")
                 return False
@@ -409,6 +430,11 @@ class AITradingModel:
             X_train, X_val, y_train, y_val = train_test_split(X, y, test_size=0.2, shuffle=True, random_state=42)
             
             # بناء النموذج
+            from tensorflow.keras.models import Sequential
+            from tensorflow.keras.layers import LSTM, Dense, Dropout, Bidirectional
+            from tensorflow.keras.optimizers import Adam
+            from tensorflow.keras.callbacks import EarlyStopping, ModelCheckpoint
+            from tensorflow.keras.regularizers import l2
             self.model = Sequential([
                 Bidirectional(LSTM(128, return_sequences=True, input_shape=(self.sequence_length, len(available_features)))),
                 Dropout(0.3),
@@ -490,6 +516,20 @@ class AITradingModel:
         }
         return lookforward_map.get('1h', 8)
     
+    def _runner(self):
+        """تمريرة أمامية مجمعة (tf.function) - تُعاد عند تحميل أو تدريب نموذج جديد"""
+        if self.runner_model is not self.model:
+            import tensorflow as tf
+
+            model = self.model
+            forward = tf.function(
+                lambda batch: model(batch, training=False),
+                input_signature=[tf.TensorSpec(model.input_shape, tf.float32)]
+            )
+            self.runner = lambda windows: forward(tf.convert_to_tensor(windows, tf.float32)).numpy()
+            self.runner_model = model
+        return self.runner
+
     async def predict(self, ohlcv_data: List[List[float]]) -> AIPrediction:
         """توقع حركة السعر"""
         try:
@@ -517,10 +557,11 @@ class AITradingModel:
             available_features = [col for col in feature_columns if col in df.columns]
             
             scaled_data = self.scaler.transform(df[available_features])
-            X = np.array([scaled_data])
             
-            # التوقع
-            prediction_prob = self.model.predict(X, verbose=0)[0][0]
+            # التوقع - الطلبات المتزامنة لنفس النموذج تُدمج في تمريرة أمامية واحدة
+            prediction_prob = (await inference_coalescer.infer(
+                (self.symbol, id(self.model), scaled_data.shape), self._runner(), scaled_data
+            ))[0]
             confidence = abs(prediction_prob - 0.5) * 2  # تحويل إلى ثقة بين 0 و 1
             
             if prediction_prob > 0.6:
@@ -563,10 +604,19 @@ class AITradingModel:
 # =============================================================================
 
 class ExchangeService:
-    """خدمة التداول مع المنصات"""
+    """خدمة التداول مع المنصات - عبر عملاء ccxt غير المتزامنين"""
     
-    def __init__(self):
-        self.exchanges = {}
+    def __init__(self, exchange_pool: AsyncExchangePool = None):
+        self.exchange_pool = exchange_pool or shared_exchange_pool
+        self.market_registry = shared_market_registry if self.exchange_pool is shared_exchange_pool \
+            else MarketRegistry(self.exchange_pool)
+        self.order_pipeline = shared_order_pipeline if self.exchange_pool is shared_exchange_pool \
+            else OrderPipeline()
+        self.order_reconciler = shared_order_reconciler if self.exchange_pool is shared_exchange_pool \
+            else OrderReconciler(self.exchange_pool)
+        self.fast_lane = shared_fast_lane if self.exchange_pool is shared_exchange_pool \
+            else FastLane(self.exchange_pool)
+        self.exchanges: List[str] = []
         self.current_exchange = 'mexc'
         self.initialize_exchanges()
     
@@ -574,7 +624,7 @@ class ExchangeService:
         """تهيئة اتصالات المنصات"""
         try:
             # MEXC Exchange
-            self.exchanges['mexc'] = ccxt.mexc({
+            self.exchange_pool.register_exchange('mexc', {
                 'apiKey': os.getenv('MEXC_API_KEY', 'mx0vglaHTCGu1GuJXk'),
                 'secret': os.getenv('MEXC_SECRET', '75018e91f9bf4d20823955aee2c38c65'),
                 'enableRateLimit': True,
@@ -584,18 +634,33 @@ class ExchangeService:
                     'adjustForTimeDifference': True,
                     'recvWindow': 60000
                 }
-            })
+            }, max_concurrency=int(os.getenv('MEXC_MAX_CONCURRENCY', '10')))
+            self.exchanges.append('mexc')
+            self.order_pipeline.register_executor('mexc', ccxt_order_executor(self.exchange_pool, 'mexc'))
+            
+            # منصة المحاكاة المحلية لاختبار الحمل (تستبدل المنصة الافتراضية)
+            simulator_url = os.getenv('EXCHANGE_SIMULATOR_URL')
+            if simulator_url:
+                self.exchange_pool.register_exchange('binance', simulator_ccxt_config(
+                    simulator_url, os.getenv('EXCHANGE_SIMULATOR_API_KEY', 'sim-key')
+                ), max_concurrency=int(os.getenv('EXCHANGE_SIMULATOR_MAX_CONCURRENCY', '50')))
+                self.exchanges.append('binance')
+                self.order_pipeline.register_executor('binance', ccxt_order_executor(self.exchange_pool, 'binance'))
+                self.current_exchange = 'binance'
+                logger.info(f"🏟 استخدام منصة المحاكاة: {simulator_url}")
             
             # KuCoin Exchange (إذا كانت مفعلة)
             kucoin_api_key = os.getenv('KUCOIN_API_KEY')
             kucoin_secret = os.getenv('KUCOIN_SECRET')
             if kucoin_api_key and kucoin_secret:
-                self.exchanges['kucoin'] = ccxt.kucoin({
+                self.exchange_pool.register_exchange('kucoin', {
                     'apiKey': kucoin_api_key,
                     'secret': kucoin_secret,
                     'password': os.getenv('KUCOIN_PASSWORD', ''),
                     'enableRateLimit': True
-                })
+                }, max_concurrency=int(os.getenv('KUCOIN_MAX_CONCURRENCY', '10')))
+                self.exchanges.append('kucoin')
+                self.order_pipeline.register_executor('kucoin', ccxt_order_executor(self.exchange_pool, 'kucoin'))
             
             logger.info("✅ تم تهيئة اتصالات المنصات بنجاح")
             
@@ -603,17 +668,20 @@ class ExchangeService:
             logger.error(f"❌ فشل تهيئة اتصالات المنصات: {str(e)}")
             raise
     
-    def get_exchange(self, exchange_name: str = None):
-        """الحصول على كائن المنصة"""
-        exchange = exchange_name or self.current_exchange
-        return self.exchanges.get(exchange)
+    def get_exchange_name(self, exchange_name: str = None) -> str:
+        """تحديد اسم المنصة المستخدمة"""
+        return exchange_name or self.current_exchange
+    
+    async def get_exchange(self, exchange_name: str = None):
+        """الحصول على عميل المنصة غير المتزامن"""
+        return await self.exchange_pool.get_client(self.get_exchange_name(exchange_name))
     
     async def get_market_data(self, symbol: str, exchange_name: str = None) -> MarketData:
         """الحصول على بيانات السوق"""
         try:
-            exchange = self.get_exchange(exchange_name)
-            ticker = exchange.fetch_ticker(symbol)
-            ohlcv = exchange.fetch_ohlcv(symbol, '1d', limit=2)
+            exchange = self.get_exchange_name(exchange_name)
+            ticker = await self.exchange_pool.call(exchange, 'fetch_ticker', symbol)
+            ohlcv = await self.exchange_pool.call(exchange, 'fetch_ohlcv', symbol, '1d', limit=2)
             
             change_24h = ((ticker['last'] - ticker['open']) / ticker['open']) * 100 if ticker['open'] else 0
             
@@ -636,61 +704,126 @@ class ExchangeService:
             logger.error(f"❌ خطأ في جلب بيانات السوق لـ {symbol}: {str(e)}")
             raise
     
+    async def get_market_snapshot(self, symbols: List[str], exchange_name: str = None) -> Dict[str, MarketData]:
+        """لقطة سوق مجمعة لعدة رموز بطلب fetch_tickers واحد"""
+        try:
+            exchange = self.get_exchange_name(exchange_name)
+            tickers = await self.exchange_pool.fetch_tickers(exchange, symbols)
+            
+            snapshot = {}
+            for symbol, ticker in tickers.items():
+                try:
+                    snapshot[symbol] = MarketData(**normalize_ticker(symbol, ticker))
+                except Exception as e:
+                    logger.warning(f"⚠️ بيانات غير صالحة لـ {symbol}: {str(e)}")
+            
+            return snapshot
+            
+        except Exception as e:
+            logger.error(f"❌ خطأ في جلب لقطة السوق: {str(e)}")
+            raise
+    
     async def place_order(self, order_data: PlaceOrderRequest, exchange_name: str = None) -> OrderResponse:
         """تنفيذ أمر تداول"""
         try:
-            exchange = self.get_exchange(exchange_name)
+            exchange = self.get_exchange_name(exchange_name)
             
-            order_params = {
-                'symbol': order_data.symbol,
-                'type': order_data.order_type.value,
-                'side': order_data.side.value,
-                'amount': order_data.quantity,
-            }
+            # التحقق من الدقة والحدود من الفهرس المحلي - بدون طلب شبكة
+            errors = self.market_registry.validate_order(
+                exchange, order_data.symbol, order_data.quantity, order_data.price
+            )
+            if errors:
+                raise HTTPException(status_code=400, detail=errors)
             
+            price = None
             if order_data.price and order_data.order_type in [OrderType.LIMIT, OrderType.STOP_LIMIT]:
-                order_params['price'] = order_data.price
+                price = order_data.price
             
+            # المسار السريع: قالب جاهز وتوقيع مخزن وفحص مخاطرة من العدادات
+            if (self.fast_lane.enabled and not order_data.client_order_id
+                    and order_data.order_type in [OrderType.MARKET, OrderType.LIMIT]
+                    and self.fast_lane.has_template(exchange, order_data.symbol)):
+                try:
+                    order = await self.fast_lane.submit(
+                        exchange, order_data.symbol, order_data.side.value, order_data.quantity,
+                        price, order_data.order_type.value
+                    )
+                    return self._order_response(order_data, order)
+                except FastLaneRejected as e:
+                    # بدون سعر حديث من التدفق يُكمل الأمر عبر خط الأوامر العادي
+                    if e.reason != 'no_price':
+                        raise HTTPException(status_code=429 if e.reason == 'rate_limit' else 400, detail=e.reason)
+            
+            extra = {}
             if order_data.stop_price and order_data.order_type in [OrderType.STOP, OrderType.STOP_LIMIT]:
-                order_params['stopPrice'] = order_data.stop_price
-            
-            # تنفيذ الأمر
-            order = exchange.create_order(**order_params)
-            
-            return OrderResponse(
-                order_id=order['id'],
-                symbol=order_data.symbol,
-                side=order_data.side,
-                order_type=order_data.order_type,
-                quantity=order_data.quantity,
-                price=order_data.price,
-                status=order['status'],
-                timestamp=datetime.utcnow(),
-                exchange_id=order['id'],
-                filled_quantity=float(order.get('filled', 0)),
-                remaining_quantity=float(order.get('remaining', order_data.quantity)),
-                average_price=float(order.get('average', order_data.price))
+                extra['stopPrice'] = order_data.stop_price
+            
+            # تنفيذ الأمر عبر خط الأوامر (طابور المنصة + معرف عميل لإعادة المحاولة الآمنة)
+            order = await self.order_pipeline.create_order(
+                exchange, order_data.symbol, order_data.side.value, order_data.order_type.value,
+                order_data.quantity, price, extra, client_order_id=order_data.client_order_id
             )
             
+            # التنفيذ الفوري يدخل عدادات مخاطرة المسار السريع، والباقي يصل من المطابقة المجمعة للمنصة
+            self.fast_lane.record_order(order_data.symbol, order_data.side.value, order)
+            if order.get('status') not in ('closed', 'canceled', 'expired', 'rejected'):
+                self.order_reconciler.track(
+                    exchange, order.get('id'), order_data.symbol, order_data.side.value, order_data.quantity,
+                    client_order_id=order.get('clientOrderId'), filled=order.get('filled') or 0.0
+                )
+            
+            return self._order_response(order_data, order)
+            
         except Exception as e:
             logger.error(f"❌ خطأ في تنفيذ الأمر لـ {order_data.symbol}: {str(e)}")
             raise
     
+    @staticmethod
+    def _order_response(order_data: PlaceOrderRequest, order: Dict[str, Any]) -> OrderResponse:
+        """رد الأمر الموحد من رد المنصة"""
+        return OrderResponse(
+            order_id=order.get('id') or order['clientOrderId'],
+            symbol=order_data.symbol,
+            side=order_data.side,
+            order_type=order_data.order_type,
+            quantity=order_data.quantity,
+            price=order_data.price,
+            status=order.get('status') or 'open',
+            timestamp=datetime.utcnow(),
+            exchange_id=order.get('id') or order['clientOrderId'],
+            filled_quantity=float(order.get('filled') or 0),
+            remaining_quantity=float(order.get('remaining') or order_data.quantity),
+            average_price=order.get('average') or order_data.price
+        )
+    
     async def cancel_order(self, order_id: str, symbol: str, exchange_name: str = None) -> bool:
         """إلغاء أمر"""
         try:
-            exchange = self.get_exchange(exchange_name)
-            result = exchange.cancel_order(order_id, symbol)
+            exchange = self.get_exchange_name(exchange_name)
+            await self.order_pipeline.cancel_order(exchange, symbol, order_id)
+            self.order_reconciler.untrack(exchange, order_id)
             return True
         except Exception as e:
             logger.error(f"❌ خطأ في إلغاء الأمر {order_id}: {str(e)}")
             return False
     
-    async def get_active_symbols(self) -> List[str]:
-        """الحصول على الرموز النشطة"""
+    async def replace_order(self, order_id: str, order_data: PlaceOrderRequest,
+                            exchange_name: str = None) -> Dict[str, Any]:
+        """إلغاء ثم استبدال أمر - الاستبدالات المتتالية غير المرسلة تُدمج"""
+        exchange = self.get_exchange_name(exchange_name)
+        return await self.order_pipeline.replace_order(
+            exchange, order_data.symbol, order_id, order_data.side.value,
+            order_data.order_type.value, order_data.quantity, order_data.price
+        )
+    
+    async def get_active_symbols(self, *tiers: Tier) -> List[str]:
+        """الرموز النشطة - طبقات ماسح الكون (الساخنة والدافئة افتراضياً) أو القائمة الثابتة قبل أول مسح"""
         try:
-            exchange = self.get_exchange()
-            markets = exchange.load_markets()
+            if universe_scanner.ranked:
+                return universe_scanner.symbols(*tiers)
+            
+            exchange = self.get_exchange_name()
+            await self.market_registry.ensure_loaded(exchange)
             
             # تصفية الرموز المدعومة (مثال)
             supported_symbols = [
@@ -698,12 +831,41 @@ class ExchangeService:
                 "DOT/USDT", "DOGE/USDT", "AVAX/USDT", "MATIC/USDT"
             ]
             
-            active_symbols = [symbol for symbol in supported_symbols if symbol in markets]
+            active_markets = set(self.market_registry.active_symbols(exchange))
+            active_symbols = [symbol for symbol in supported_symbols if symbol in active_markets]
             return active_symbols[:20]  # إرجاع أول 20 رمز فقط
             
         except Exception as e:
             logger.error(f"❌ خطأ في جلب الرموز النشطة: {str(e)}")
             return []
+    
+    def start_market_refresh(self):
+        """تحديث سجل الأسواق في الخلفية لجميع المنصات المفعلة"""
+        for exchange in self.exchanges:
+            self.market_registry.start_background_refresh(exchange)
+    
+    def start_order_reconciliation(self):
+        """مطابقة دورية للأوامر المفتوحة مع تدفق أوامر المستخدم إن توفر"""
+        for exchange in self.exchanges:
+            self.order_reconciler.start_user_stream(exchange)
+        self.order_reconciler.start()
+    
+    async def start_fast_lane(self, symbols: List[str]) -> int:
+        """تجهيز قوالب المسار السريع للمنصة الحالية بعد تحميل فهرس الأسواق"""
+        exchange = self.get_exchange_name()
+        await self.market_registry.ensure_loaded(exchange)
+        await self.fast_lane.refresh_balance(exchange)
+        prepared = self.fast_lane.prepare(exchange, symbols)
+        self.fast_lane.start()
+        return prepared
+    
+    async def close(self):
+        """إغلاق اتصالات المنصات ومجمع الاتصالات"""
+        await self.market_registry.stop()
+        await self.order_reconciler.stop()
+        await self.fast_lane.stop()
+        await self.order_pipeline.close()
+        await self.exchange_pool.close()
 
 # =============================================================================
 # 🎯 المحرك الرئيسي - QuantumTradingEngine
@@ -724,12 +886,19 @@ class QuantumTradingEngine:
         
         # Initialize services
         self.exchange_service = ExchangeService()
+        self.market_stream = market_stream
+        self.order_book_manager = order_book_manager
+        self.trade_tape = trade_tape
+        self.trade_tape.attach(self.market_stream.bus)
+        self.screener_index = screener_index
+        self.screener_index.attach(self.market_stream.bus)
         self.ai_models: Dict[str, AITradingModel] = {}
         
         # Trading state
         self.open_positions: Dict[str, Position] = {}
         self.pending_orders: Dict[str, OrderResponse] = {}
         self.trading_enabled = True
+        self.exchange_service.order_reconciler.subscribe(self._on_order_event)
         
         # Market data and AI
         self.market_data: Dict[str, MarketData] = {}
@@ -804,6 +973,10 @@ class QuantumTradingEngine:
         async def get_ai_prediction(symbol: str):
             return await self.get_ai_prediction(symbol)
         
+        @self.app.get("/api/v1/ai/inference-coalescing")
+        async def get_inference_coalescing_status():
+            return inference_coalescer.get_coalescer_status()
+        
         @self.app.get("/api/v1/ai/signals")
         async def get_ai_signals():
             return await self.get_ai_signals()
@@ -812,18 +985,114 @@ class QuantumTradingEngine:
         async def get_live_market_data():
             return await self.get_live_market_data()
         
+        @self.app.get("/api/v1/trading/pipeline-status")
+        async def get_pipeline_status():
+            return self.exchange_service.order_pipeline.get_pipeline_status()
+        
+        @self.app.get("/api/v1/trading/fast-lane")
+        async def get_fast_lane_status():
+            return self.exchange_service.fast_lane.get_fast_lane_status()
+        
+        @self.app.get("/api/v1/arbitrage/opportunities")
+        async def get_arbitrage_opportunities():
+            # بدون مسح دوري يُنفذ مسح واحد عند الطلب
+            if not arbitrage_scanner.get_scanner_status()['running']:
+                await arbitrage_scanner.scan()
+            return arbitrage_scanner.get_scanner_status()
+        
+        @self.app.get("/api/v1/trading/rate-limits")
+        async def get_rate_limits():
+            return self.exchange_service.exchange_pool.rate_limiter.get_limiter_status()
+        
+        @self.app.get("/api/v1/trading/reconciliation")
+        async def get_reconciliation_status():
+            return self.exchange_service.order_reconciler.get_reconciler_status()
+        
+        @self.app.get("/api/v1/live/stream-status")
+        async def get_stream_status():
+            return self.market_stream.get_stream_status()
+        
+        @self.app.get("/api/v1/live/trade-tape")
+        async def get_trade_tape_status():
+            return self.trade_tape.get_tape_status()
+        
+        @self.app.get("/api/v1/live/trade-tape/{symbol}")
+        async def get_trade_flow(symbol: str, window: Optional[float] = None):
+            try:
+                metrics = self.trade_tape.get_metrics(symbol, window)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            if metrics is None:
+                raise HTTPException(status_code=404, detail="لا توجد صفقات للرمز")
+            return {**metrics, 'bars': [bar.to_dict() for bar in self.trade_tape.get_bars(symbol, 20)]}
+        
+        @self.app.get("/api/v1/live/screener")
+        async def get_screener(limit: Optional[int] = None, min_volume: Optional[float] = None):
+            return self.screener_index.get_movers(limit, min_volume)
+        
+        @self.app.get("/api/v1/live/screener/{metric}")
+        async def get_screener_top(metric: str, limit: Optional[int] = None, ascending: bool = False,
+                                   min_volume: Optional[float] = None):
+            try:
+                return self.screener_index.top(metric, limit, ascending, min_volume)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+        
+        @self.app.get("/api/v1/live/universe")
+        async def get_universe_status():
+            return universe_scanner.get_universe_status()
+        
+        @self.app.get("/api/v1/live/order-books")
+        async def get_order_books_status():
+            return self.order_book_manager.get_book_status()
+        
         @self.app.websocket("/ws/trading")
         async def websocket_endpoint(websocket: WebSocket):
             await self.websocket_endpoint(websocket)
+        
+        @self.app.websocket("/ws/market/{symbol}")
+        async def market_stream_endpoint(websocket: WebSocket, symbol: str):
+            await self.market_stream_endpoint(websocket, symbol)
     
     async def startup(self):
         """بدء تشغيل المحرك"""
         logger.info("🚀 بدء تشغيل Quantum AI Trading Engine...")
         
         try:
+            # تحميل سجل الأسواق مرة واحدة ثم تحديثه في الخلفية
+            self.exchange_service.start_market_refresh()
+            
+            # متابعة الأوامر المفتوحة بطلبات مجمعة لكل منصة
+            self.exchange_service.start_order_reconciliation()
+            
+            # ماسح الكون: فرز بارد لكل رموز المنصة، والطبقتان الساخنة والدافئة تصبحان الرموز النشطة
+            if os.getenv('UNIVERSE_SCAN_ENABLED', 'true').lower() == 'true':
+                exchange = self.exchange_service.get_exchange_name()
+                await universe_scanner.scan(exchange)
+                universe_scanner.subscribe(self.on_tier_change)
+                universe_scanner.start(exchange)
+            
             # تحميل نماذج الذكاء الاصطناعي
             await self.load_ai_models()
             
+            # بدء تدفق الأسعار عبر WebSocket - فقط إذا كان للمنصة محول تدفق
+            if os.getenv('MARKET_STREAM_ENABLED', 'true').lower() == 'true':
+                if self.market_stream.covers(self.exchange_service.get_exchange_name()):
+                    symbols = await self.exchange_service.get_active_symbols()
+                    await self.market_stream.start(symbols)
+                else:
+                    logger.info(f"ℹ️ لا يوجد تدفق لـ {self.exchange_service.get_exchange_name()} - الأسعار عبر REST")
+            
+            # دفاتر الأوامر المحلية (L2) للعمق والانزلاق
+            if os.getenv('ORDER_BOOK_ENABLED', 'false').lower() == 'true':
+                symbols = await self.exchange_service.get_active_symbols()
+                await self.order_book_manager.start(symbols)
+            
+            # المسار السريع للتنفيذ (اختياري)
+            if self.exchange_service.fast_lane.enabled:
+                symbols = await self.exchange_service.get_active_symbols()
+                await self.exchange_service.start_fast_lane(symbols)
+            
             # بدء المهام الخلفية
             asyncio.create_task(self.market_data_loop())
             asyncio.create_task(self.ai_analysis_loop())
@@ -836,14 +1105,138 @@ class QuantumTradingEngine:
             logger.error(f"❌ فشل بدء تشغيل المحرك: {str(e)}")
             raise
     
+    async def shutdown(self):
+        """إيقاف المحرك وإغلاق الاتصالات"""
+        logger.info("🛑 إيقاف Quantum AI Trading Engine...")
+        
+        try:
+            await self.market_stream.stop()
+            await self.order_book_manager.stop()
+            await universe_scanner.stop()
+            await self.exchange_service.close()
+            await http_client.close()
+            logger.info("✅ تم إيقاف المحرك بنجاح")
+        except Exception as e:
+            logger.error(f"❌ خطأ أثناء إيقاف المحرك: {str(e)}")
+    
     async def load_ai_models(self):
-        """تحميل نماذج الذكاء الاصطناعي"""
-        symbols = await self.exchange_service.get_active_symbols()
+        """تحميل نماذج الذكاء الاصطناعي للطبقة الساخنة"""
+        symbols = await self.exchange_service.get_active_symbols(Tier.HOT)
         
         for symbol in symbols:
             self.ai_models[symbol] = AITradingModel(symbol)
             await self.ai_models[symbol].load_model()
     
+    async def on_tier_change(self, symbol: str, old_tier: Tier, new_tier: Tier):
+        """الرموز المرقاة للطبقة الساخنة تحصل على نموذجها، والمخفضة تُحرر نموذجها"""
+        if new_tier == Tier.HOT and symbol not in self.ai_models:
+            self.ai_models[symbol] = AITradingModel(symbol)
+            await self.ai_models[symbol].load_model()
+        elif old_tier == Tier.HOT:
+            self.ai_models.pop(symbol, None)
+    
+    async def get_ai_prediction(self, symbol: str) -> AIPrediction:
+        """توقع الرمز من نموذجه - الطلبات المتزامنة تُنفذ في دفعة استدلال واحدة"""
+        model = self.ai_models.get(symbol)
+        if model is None:
+            model = AITradingModel(symbol)
+            await model.load_model()
+        ohlcv = await self.exchange_service.exchange_pool.call(
+            self.exchange_service.get_exchange_name(), 'fetch_ohlcv', symbol, model.timeframe,
+            limit=model.sequence_length
+        )
+        return await model.predict(ohlcv)
+    
+    async def get_live_market_data(self) -> Dict[str, Any]:
+        """بيانات السوق الحية لجميع الرموز النشطة بطلب مجمع واحد"""
+        try:
+            symbols = await self.exchange_service.get_active_symbols()
+            exchange = self.exchange_service.get_exchange_name()
+            
+            # الأسعار الحديثة من مخزن التدفق (لنفس المنصة)، والباقي بطلب REST مجمع
+            snapshot = {}
+            for symbol in symbols:
+                if self.market_stream.store.is_fresh(symbol, exchange, max_age=5):
+                    fields = self.market_stream.store.get_tick(symbol, exchange).to_market_fields()
+                    snapshot[symbol] = MarketData(**fields)
+            
+            missing = [symbol for symbol in symbols if symbol not in snapshot]
+            if missing:
+                snapshot.update(await self.exchange_service.get_market_snapshot(missing))
+            self.market_data.update(snapshot)
+            for symbol in missing:
+                if symbol in snapshot:
+                    self.screener_index.update_market_data(snapshot[symbol])
+            
+            return {
+                "timestamp": datetime.utcnow().isoformat(),
+                "count": len(snapshot),
+                "market_data": {symbol: data.dict() for symbol, data in snapshot.items()}
+            }
+            
+        except Exception as e:
+            logger.error(f"❌ خطأ في جلب بيانات السوق الحية: {str(e)}")
+            raise HTTPException(status_code=502, detail="تعذر جلب بيانات السوق")
+    
+    async def place_order(self, order_data: PlaceOrderRequest) -> OrderResponse:
+        """تنفيذ أمر عبر خط الأوامر"""
+        if not self.trading_enabled:
+            raise HTTPException(status_code=403, detail="التداول متوقف")
+        
+        try:
+            order = await self.exchange_service.place_order(order_data)
+            self.pending_orders[order.order_id] = order
+            return order
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=502, detail=f"فشل تنفيذ الأمر: {str(e)}")
+    
+    async def cancel_order(self, order_id: str, symbol: str) -> Dict[str, Any]:
+        """إلغاء أمر عبر خط الأوامر"""
+        cancelled = await self.exchange_service.cancel_order(order_id, symbol)
+        if cancelled:
+            self.pending_orders.pop(order_id, None)
+        return {"order_id": order_id, "cancelled": cancelled}
+    
+    async def _on_order_event(self, event: OrderEvent):
+        """تحديث الأوامر المعلقة من أحداث المطابقة"""
+        order_id = event.order_id if event.order_id in self.pending_orders else event.client_order_id
+        order = self.pending_orders.get(order_id)
+        if order is None:
+            return
+        
+        order.filled_quantity = event.filled
+        order.remaining_quantity = max(0.0, event.amount - event.filled)
+        order.average_price = event.average_price or order.average_price
+        order.status = event.status
+        if event.type != OrderEventType.PARTIAL_FILL:
+            self.pending_orders.pop(order_id, None)
+    
+    async def market_stream_endpoint(self, websocket: WebSocket, symbol: str):
+        """بث أسعار رمز واحد من التدفق إلى العميل"""
+        await websocket.accept()
+        symbol = symbol.replace('-', '/').upper()
+        channel = f"tick:{symbol}"
+        queue = self.market_stream.bus.subscribe_queue(channel, maxsize=100)
+        
+        exchange = self.exchange_service.get_exchange_name()
+        
+        try:
+            tick = self.market_stream.store.get_tick(symbol, exchange)
+            if tick is not None:
+                await websocket.send_json({**tick.__dict__, 'type': 'tick'})
+            
+            while True:
+                tick = await queue.get()
+                if tick.exchange == exchange:
+                    await websocket.send_json({**tick.__dict__, 'type': 'tick'})
+                
+        except WebSocketDisconnect:
+            logger.info(f"🔌 انقطع عميل تدفق {symbol}")
+        finally:
+            self.market_stream.bus.unsubscribe_queue(channel, queue)
+    
     # ... (استمرار باقي الدوال بنفس النمط السابق)
 
 # =============================================================================
@@ -858,6 +1251,10 @@ def main():
     async def startup():
         await engine.startup()
     
+    @engine.app.on_event("shutdown")
+    async def shutdown():
+        await engine.shutdown()
+    
     uvicorn.run(
         engine.app,
         host="0.0.0.0",